@@ -10,7 +10,10 @@ import pandas as pd
 from typing import List, Dict, Any, Optional
 from theme import COLORS, CHART_COLORS, get_plotly_theme
 from core.utils import format_number, format_percentage, format_duration
+from core.pagination import KeysetPager
+from core.profiling import timed
 
+@timed('render')
 def render_kpi_card(title: str, value: Any, delta: Optional[str] = None, 
                     help_text: Optional[str] = None, accent: bool = False):
     """
@@ -44,6 +47,7 @@ def render_kpi_card(title: str, value: Any, delta: Optional[str] = None,
     </div>
     """, unsafe_allow_html=True)
 
+@timed('render')
 def render_metric_grid(metrics: List[Dict[str, Any]], columns: int = 4):
     """
     Render a grid of metric cards
@@ -64,6 +68,7 @@ def render_metric_grid(metrics: List[Dict[str, Any]], columns: int = 4):
                 accent=metric.get('accent', False)
             )
 
+@timed('figure')
 def create_line_chart(df: pd.DataFrame, x: str, y: str, title: str,
                       color: Optional[str] = None, 
                       x_label: Optional[str] = None,
@@ -96,6 +101,7 @@ def create_line_chart(df: pd.DataFrame, x: str, y: str, title: str,
     
     return fig
 
+@timed('figure')
 def create_bar_chart(df: pd.DataFrame, x: str, y: str, title: str,
                      color: Optional[str] = None,
                      orientation: str = 'v',
@@ -130,6 +136,7 @@ def create_bar_chart(df: pd.DataFrame, x: str, y: str, title: str,
     
     return fig
 
+@timed('figure')
 def create_scatter_plot(df: pd.DataFrame, x: str, y: str, title: str,
                        color: Optional[str] = None,
                        size: Optional[str] = None,
@@ -163,6 +170,7 @@ def create_scatter_plot(df: pd.DataFrame, x: str, y: str, title: str,
     
     return fig
 
+@timed('figure')
 def create_histogram(df: pd.DataFrame, x: str, title: str,
                     nbins: int = 30,
                     x_label: Optional[str] = None) -> go.Figure:
@@ -192,6 +200,7 @@ def create_histogram(df: pd.DataFrame, x: str, title: str,
     
     return fig
 
+@timed('figure')
 def create_box_plot(df: pd.DataFrame, x: str, y: str, title: str,
                    color: Optional[str] = None,
                    x_label: Optional[str] = None,
@@ -223,6 +232,7 @@ def create_box_plot(df: pd.DataFrame, x: str, y: str, title: str,
     
     return fig
 
+@timed('figure')
 def create_heatmap(df: pd.DataFrame, title: str,
                    x_label: Optional[str] = None,
                    y_label: Optional[str] = None,
@@ -264,6 +274,7 @@ def create_heatmap(df: pd.DataFrame, title: str,
     
     return fig
 
+@timed('figure')
 def create_pie_chart(df: pd.DataFrame, names: str, values: str, title: str) -> go.Figure:
     """
     Create a pie chart with theme styling
@@ -291,6 +302,7 @@ def create_pie_chart(df: pd.DataFrame, names: str, values: str, title: str) -> g
     
     return fig
 
+@timed('figure')
 def create_empty_chart(message: str = "No data available") -> go.Figure:
     """Create an empty chart with a message"""
     fig = go.Figure()
@@ -313,8 +325,10 @@ def create_empty_chart(message: str = "No data available") -> go.Figure:
     
     return fig
 
+@timed('render')
 def render_data_table(df: pd.DataFrame, title: Optional[str] = None, 
-                     height: int = 400, key: Optional[str] = None):
+                     height: int = 400, key: Optional[str] = None,
+                     pager: Optional[KeysetPager] = None):
     """
     Render a styled data table
     
@@ -323,21 +337,49 @@ def render_data_table(df: pd.DataFrame, title: Optional[str] = None,
         title: Optional table title
         height: Table height in pixels
         key: Unique key for the dataframe widget
+        pager: Optional keyset pager; adds previous / next page controls
     """
     if title:
         st.markdown(f"### {title}")
     
     if df.empty:
         st.info("No data available")
-        return
+    else:
+        st.dataframe(
+            df,
+            use_container_width=True,
+            height=height,
+            key=key
+        )
+    
+    if pager is not None and (pager.has_previous or pager.has_next):
+        render_pager_controls(pager, len(df))
+
+@timed('render')
+def render_pager_controls(pager: KeysetPager, row_count: int):
+    """
+    Render previous / next buttons and the row range for a keyset pager
     
-    st.dataframe(
-        df,
-        use_container_width=True,
-        height=height,
-        key=key
-    )
+    Args:
+        pager: Keyset pager for the table above
+        row_count: Rows on the current page
+    """
+    first_row = (pager.page_number - 1) * pager.page_size + 1
+    col1, col2, col3 = st.columns([1, 3, 1])
+    
+    with col1:
+        st.button("← Previous", key=f"{pager.key}_previous",
+                  disabled=not pager.has_previous, on_click=pager.previous_page)
+    with col2:
+        if row_count:
+            st.caption(f"Page {pager.page_number} · rows {first_row:,}–{first_row + row_count - 1:,}")
+        else:
+            st.caption(f"Page {pager.page_number}")
+    with col3:
+        st.button("Next →", key=f"{pager.key}_next",
+                  disabled=not pager.has_next, on_click=pager.next_page)
 
+@timed('render')
 def render_summary_section(title: str, metrics: Dict[str, Any]):
     """
     Render a summary section with key-value pairs
@@ -355,6 +397,7 @@ def render_summary_section(title: str, metrics: Dict[str, Any]):
         with col2:
             st.markdown(f"{value}")
 
+@timed('figure')
 def create_gauge_chart(value: float, max_value: float = 100, 
                       title: str = "", suffix: str = "%") -> go.Figure:
     """
@@ -394,6 +437,7 @@ def create_gauge_chart(value: float, max_value: float = 100,
     
     return fig
 
+@timed('render')
 def render_filter_section():
     """Render a collapsible filter section"""
     with st.expander("🔍 Filters", expanded=False):
@@ -1,9 +1,12 @@
+import time
 import streamlit as st
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 import pandas as pd
 from typing import Optional, Dict
 
+from core import telemetry
+
 # Define required secret keys for the database connection
 DB_SECRET_KEYS = [
     "DB_USER",
@@ -81,6 +84,8 @@ def run_query(sql: str, params: Optional[Dict] = None) -> pd.DataFrame:
         # Engine failed to load, return empty DataFrame
         return pd.DataFrame() 
 
+    started = time.perf_counter()
+    df = error = None
     try:
         with engine.connect() as conn:
             # Using text() and parameter binding for secure queries (prevents SQL injection)
@@ -92,6 +97,13 @@ def run_query(sql: str, params: Optional[Dict] = None) -> pd.DataFrame:
             return df
     except Exception as e:
         # Log the specific query failure for debugging
+        error = str(e)
         error_message = f"❌ Database query failed:\nSQL: {sql[:100]}...\nError: {e}"
         st.error(error_message)
         return pd.DataFrame()
+    finally:
+        # SQLAlchemy's pool does not report checkout waits
+        telemetry.record_query(sql, (time.perf_counter() - started) * 1000,
+                               rows=len(df) if df is not None else None,
+                               nbytes=telemetry.dataframe_bytes(df) if df is not None else None,
+                               error=error)
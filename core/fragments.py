@@ -0,0 +1,59 @@
+"""
+Fragment-scoped page sections for MIND Unified Dashboard
+A section function decorated with @section_fragment("Data Tables") runs as
+an st.fragment: a widget drawn inside it (a lazy tab, a pager button, a
+local toggle) reruns only that function, so the KPI strip and the other
+charts keep their output and run no queries.
+
+The function's arguments are the section's declared inputs, i.e. the page
+filters it depends on. A sidebar filter change reruns the whole page and
+calls the section with new values; on a fragment rerun Streamlit replays
+the values from the last full run. A section must read its inputs from its
+arguments, never from widgets drawn outside it, and must not draw into the
+sidebar.
+
+A full page run profiles the section like a mark(). A fragment rerun is
+profiled, traced and counted as a run of its own, "<page> / <section>", so
+its latency shows separately on the Dashboard Internals page.
+"""
+
+import functools
+from typing import Callable, Optional
+
+import streamlit as st
+
+from core.profiling import begin_page, current_profile, end_page, mark
+
+def section_fragment(name: str) -> Callable:
+    """
+    Decorator turning a page section function into an st.fragment
+
+    Args:
+        name: Section name for the profiler and traces
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        # Page of the full run that last drew this section
+        page: Optional[str] = None
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            nonlocal page
+            profile = current_profile()
+            if profile is not None and profile.wall_ms is None:
+                # Part of a full page run
+                page = profile.page
+                mark(name)
+                return func(*args, **kwargs)
+
+            # Fragment rerun: only this section executes
+            begin_page(f"{page} / {name}" if page else name)
+            mark(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end_page()
+        return st.fragment(run)
+    return decorator
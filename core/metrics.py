@@ -0,0 +1,313 @@
+"""
+Prometheus metrics for the dashboard process
+Renders runtime performance metrics in the Prometheus text exposition
+format: query latency histograms and cache hit / miss counts (from
+core/telemetry.py), registry cache totals, connection pool usage, rerun
+durations per page (from core/profiling.py), active sessions, total and
+largest session_state size per page, and process memory.
+
+Two optional exporters, both started on the first profiled rerun:
+
+    METRICS_PORT=9464   side HTTP listener serving GET /metrics
+                        (bound to METRICS_HOST, default 127.0.0.1)
+    METRICS_FILE=path   file rewritten every METRICS_INTERVAL seconds
+                        (default 15), e.g. for node_exporter's textfile
+                        collector
+
+A session counts as active for ACTIVE_SESSION_SECONDS (default 300) after
+its last rerun. Its session_state is sized at most once every
+SESSION_SIZE_SECONDS (default 30); reruns in between reuse the last size.
+Per-session sizes are only shown on the Dashboard Internals page. Pool usage is also sampled every POOL_SAMPLE_SECONDS
+(default 5) into a one-hour history for the Dashboard Internals page.
+"""
+
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core import telemetry
+from core.queries.registry import query_cache
+
+METRICS_PORT = os.getenv('METRICS_PORT')
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_FILE = os.getenv('METRICS_FILE')
+METRICS_INTERVAL = float(os.getenv('METRICS_INTERVAL', 15))
+ACTIVE_SESSION_SECONDS = float(os.getenv('ACTIVE_SESSION_SECONDS', 300))
+SESSION_SIZE_SECONDS = float(os.getenv('SESSION_SIZE_SECONDS', 30))
+POOL_SAMPLE_SECONDS = float(os.getenv('POOL_SAMPLE_SECONDS', 5))
+POOL_HISTORY = int(3600 / POOL_SAMPLE_SECONDS)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Pool metrics: pool_stats() key, metric name, type, help, divisor
+POOL_METRICS = (
+    ('size', 'mind_db_pool_size', 'gauge', "Maximum pooled database connections", 1),
+    ('in_use', 'mind_db_pool_in_use', 'gauge', "Database connections checked out now", 1),
+    ('peak_in_use', 'mind_db_pool_peak_in_use', 'gauge', "Most connections checked out at once since the last reset", 1),
+    ('checkouts', 'mind_db_pool_checkouts_total', 'counter', "Connection checkouts", 1),
+    ('waits', 'mind_db_pool_waits_total', 'counter', "Checkouts that waited for a free connection", 1),
+    ('wait_ms', 'mind_db_pool_wait_seconds_total', 'counter', "Time spent waiting for a free connection", 1000),
+    ('timeouts', 'mind_db_pool_timeouts_total', 'counter', "Checkouts that gave up waiting", 1),
+)
+
+_lock = threading.Lock()
+_reruns: Dict[str, telemetry.LatencyHistogram] = {}
+_sessions: Dict[str, Dict[str, Any]] = {}
+_pools: 'weakref.WeakSet' = weakref.WeakSet()
+_pool_history: deque = deque(maxlen=POOL_HISTORY)
+_exporters_started = False
+
+# ============================================
+# COLLECTION
+# ============================================
+
+def track_pool(manager):
+    """Report a DatabaseManager's pool_stats() (called from its __init__)"""
+    _pools.add(manager)
+
+def session_state_bytes(state) -> int:
+    """Approximate size of one session's st.session_state"""
+    total = 0
+    for key in list(state.keys()):
+        value = state[key]
+        if hasattr(value, 'memory_usage'):
+            total += telemetry.dataframe_bytes(value)
+        elif isinstance(value, dict):
+            total += sys.getsizeof(value) + sum(
+                telemetry.dataframe_bytes(v) if hasattr(v, 'memory_usage') else sys.getsizeof(v)
+                for v in value.values()
+            )
+        else:
+            total += sys.getsizeof(value)
+    return total
+
+def observe_rerun(page: str, duration_ms: float):
+    """Record a finished page rerun and the session that ran it"""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    now = time.monotonic()
+    with _lock:
+        _reruns.setdefault(page, telemetry.LatencyHistogram()).observe(duration_ms)
+        previous = _sessions.get(ctx.session_id) if ctx is not None else None
+    if ctx is not None:
+        # Walking session_state is O(state); sample it instead of paying on every rerun
+        if previous is None or now - previous['sized_at'] >= SESSION_SIZE_SECONDS:
+            state_bytes, sized_at = session_state_bytes(st.session_state), now
+        else:
+            state_bytes, sized_at = previous['state_bytes'], previous['sized_at']
+        with _lock:
+            _sessions[ctx.session_id] = {'last_seen': now, 'page': page,
+                                         'state_bytes': state_bytes, 'sized_at': sized_at}
+    start_exporters()
+
+def rerun_histograms() -> Dict[str, telemetry.LatencyHistogram]:
+    """Copies of the rerun duration histograms, by page"""
+    with _lock:
+        return {page: histogram.copy() for page, histogram in sorted(_reruns.items())}
+
+def pool_totals() -> Dict[str, Any]:
+    """pool_stats() summed over every DatabaseManager in the process (normally one)"""
+    pools = [manager.pool_stats() for manager in list(_pools)]
+    return {key: sum(pool[key] for pool in pools) for key, *_ in POOL_METRICS}
+
+def pool_history() -> List[Dict[str, Any]]:
+    """Pool usage samples from the last hour, oldest first"""
+    with _lock:
+        return list(_pool_history)
+
+def _sample_pools():
+    while True:
+        sample = dict(pool_totals(), time=datetime.now())
+        with _lock:
+            _pool_history.append(sample)
+        time.sleep(POOL_SAMPLE_SECONDS)
+
+def active_sessions() -> Dict[str, Dict[str, Any]]:
+    """Sessions with a rerun in the last ACTIVE_SESSION_SECONDS"""
+    cutoff = time.monotonic() - ACTIVE_SESSION_SECONDS
+    with _lock:
+        for session_id in [s for s, info in _sessions.items() if info['last_seen'] < cutoff]:
+            del _sessions[session_id]
+        return {session_id: dict(info) for session_id, info in _sessions.items()}
+
+def session_state_by_page(sessions: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """Total and largest session_state size of the active sessions, by page"""
+    pages: Dict[str, Dict[str, int]] = {}
+    for info in sessions.values():
+        page = pages.setdefault(info['page'], {'sessions': 0, 'sum': 0, 'max': 0})
+        page['sessions'] += 1
+        page['sum'] += info['state_bytes']
+        page['max'] = max(page['max'], info['state_bytes'])
+    return dict(sorted(pages.items()))
+
+def resident_memory_bytes() -> Optional[int]:
+    """Current resident set size of the process (Linux), else None"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+# ============================================
+# EXPOSITION
+# ============================================
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Writer:
+    """Accumulates metric families in exposition order"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        self.lines.append(f"{name}{_labels(labels or {})} {_number(value)}")
+
+    def histogram(self, name: str, histogram: telemetry.LatencyHistogram, labels: Dict[str, str]):
+        """A telemetry histogram (milliseconds) as cumulative buckets in seconds"""
+        cumulative = 0
+        bounds = [str(ms / 1000) for ms in telemetry.LATENCY_BUCKETS_MS] + ['+Inf']
+        for bound, count in zip(bounds, histogram.buckets):
+            cumulative += count
+            self.sample(f"{name}_bucket", cumulative, dict(labels, le=bound))
+        self.sample(f"{name}_sum", histogram.sum_ms / 1000, labels)
+        self.sample(f"{name}_count", histogram.count, labels)
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+def render() -> str:
+    """Every metric in the Prometheus text format"""
+    out = _Writer()
+
+    out.family('mind_query_duration_seconds', 'histogram', "Executed query latency by query name")
+    for name, histogram in telemetry.query_histograms().items():
+        out.histogram('mind_query_duration_seconds', histogram, {'query': name})
+
+    counts = telemetry.cache_counts()
+    out.family('mind_query_cache_hits_total', 'counter', "Registry cache hits by query name")
+    for name, count in counts.items():
+        out.sample('mind_query_cache_hits_total', count['hits'], {'query': name})
+    out.family('mind_query_cache_misses_total', 'counter', "Registry cache misses by query name")
+    for name, count in counts.items():
+        out.sample('mind_query_cache_misses_total', count['misses'], {'query': name})
+
+    cache = query_cache.stats()
+    lookups = cache['hits'] + cache['misses']
+    out.family('mind_query_cache_hit_ratio', 'gauge', "Registry cache hits / lookups since start")
+    out.sample('mind_query_cache_hit_ratio', cache['hits'] / lookups if lookups else 0.0)
+    out.family('mind_query_cache_entries', 'gauge', "Results held in the registry cache")
+    out.sample('mind_query_cache_entries', cache['entries'])
+    out.family('mind_query_cache_evictions_total', 'counter', "Results evicted from the full registry cache")
+    out.sample('mind_query_cache_evictions_total', cache['evictions'])
+
+    pools = pool_totals()
+    for key, name, kind, help_text, divisor in POOL_METRICS:
+        total = pools[key]
+        out.family(name, kind, help_text)
+        out.sample(name, total / divisor if divisor != 1 else total)
+
+    with _lock:
+        reruns = [(page, histogram.copy()) for page, histogram in sorted(_reruns.items())]
+    out.family('mind_rerun_duration_seconds', 'histogram', "Page rerun wall time")
+    for page, histogram in reruns:
+        out.histogram('mind_rerun_duration_seconds', histogram, {'page': page})
+
+    sessions = active_sessions()
+    out.family('mind_active_sessions', 'gauge', f"Sessions with a rerun in the last {ACTIVE_SESSION_SECONDS:g}s")
+    out.sample('mind_active_sessions', len(sessions))
+    by_page = session_state_by_page(sessions)
+    out.family('mind_session_state_bytes', 'gauge', "Approximate st.session_state size summed over active sessions")
+    for page, size in by_page.items():
+        out.sample('mind_session_state_bytes', size['sum'], {'page': page})
+    out.family('mind_session_state_max_bytes', 'gauge', "Largest approximate st.session_state size of an active session")
+    for page, size in by_page.items():
+        out.sample('mind_session_state_max_bytes', size['max'], {'page': page})
+
+    rss = resident_memory_bytes()
+    if rss is not None:
+        out.family('process_resident_memory_bytes', 'gauge', "Resident memory size in bytes")
+        out.sample('process_resident_memory_bytes', rss)
+    return out.text()
+
+# ============================================
+# EXPORTERS
+# ============================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics for a local Prometheus collector"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the Streamlit console
+        pass
+
+def write_file(path: Path):
+    """Atomically replace path with the current metrics"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + '.tmp')
+    temporary.write_text(render(), encoding='utf-8')
+    os.replace(temporary, path)
+
+def _write_periodically(path: Path):
+    while True:
+        try:
+            write_file(path)
+        except OSError:
+            pass
+        time.sleep(METRICS_INTERVAL)
+
+def start_exporters():
+    """Start the pool sampler and the configured HTTP listener / file writer, once per process"""
+    global _exporters_started
+    with _lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    threading.Thread(target=_sample_pools, name='metrics-pool-sampler', daemon=True).start()
+
+    if METRICS_PORT:
+        try:
+            server = ThreadingHTTPServer((METRICS_HOST, int(METRICS_PORT)), _MetricsHandler)
+        except OSError as e:
+            print(f"⚠️ Metrics listener not started on {METRICS_HOST}:{METRICS_PORT}: {e}", file=sys.stderr)
+        else:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+
+    if METRICS_FILE:
+        threading.Thread(target=_write_periodically, args=(Path(METRICS_FILE),),
+                         name='metrics-file', daemon=True).start()
@@ -0,0 +1,99 @@
+"""
+Keyset pagination for dashboard detail tables
+Pages through a query ordered by a unique sort key, e.g.
+(timestamp, record_id) DESC, by seeking past the last row shown instead of
+using OFFSET, so every page costs one index range read. Pager state lives
+in st.session_state; render_data_table() draws the page controls.
+"""
+
+import streamlit as st
+import pandas as pd
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+def _plain(value: Any) -> Any:
+    """Convert pandas / numpy scalars to values psycopg2 can bind"""
+    if hasattr(value, 'to_pydatetime'):
+        return value.to_pydatetime()
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+class KeysetPager:
+    """Next / previous paging state for one keyset-paginated table"""
+
+    def __init__(self, key: str, key_columns: Sequence[str], page_size: int = 100):
+        """
+        Args:
+            key: Unique widget key for this table
+            key_columns: Result columns that form the sort key, e.g.
+                ('timestamp', 'record_id'); must be unique together
+            page_size: Rows per page
+        """
+        self.key = key
+        self.key_columns = tuple(key_columns)
+        self.page_size = page_size
+        self.state = st.session_state.setdefault(f"pager_{key}", {
+            'cursors': [None],
+            'filters': None,
+            'last': None,
+            'has_next': False
+        })
+
+    def sync(self, *filters: Any):
+        """Go back to page 1 when any filter value changed since the last run"""
+        signature = repr(filters)
+        if self.state['filters'] != signature:
+            self.state.update(cursors=[None], filters=signature, last=None, has_next=False)
+
+    @property
+    def after(self) -> Optional[Tuple[Any, ...]]:
+        """Sort key to seek past for the current page (None on page 1)"""
+        return self.state['cursors'][-1]
+
+    @property
+    def page_number(self) -> int:
+        return len(self.state['cursors'])
+
+    @property
+    def has_next(self) -> bool:
+        return self.state['has_next']
+
+    @property
+    def has_previous(self) -> bool:
+        return self.page_number > 1
+
+    def fetch(self, load: Callable[[Optional[Tuple[Any, ...]], int], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Load the current page
+
+        Args:
+            load: Called as load(after, limit); returns rows ordered by the
+                sort key. One extra row is requested to detect a next page.
+
+        Returns:
+            At most page_size rows
+        """
+        df = load(self.after, self.page_size + 1)
+        self.state['has_next'] = len(df) > self.page_size
+        df = df.head(self.page_size)
+
+        if not df.empty:
+            last = df.iloc[-1]
+            self.state['last'] = tuple(_plain(last[column]) for column in self.key_columns)
+        else:
+            self.state['last'] = None
+        return df
+
+    def next_page(self):
+        """Advance past the last row of the current page"""
+        if self.state['has_next'] and self.state['last'] is not None:
+            self.state['cursors'].append(self.state['last'])
+
+    def previous_page(self):
+        """Go back one page"""
+        if self.has_previous:
+            self.state['cursors'].pop()
+
+    def first_page(self):
+        """Go back to page 1"""
+        self.state['cursors'] = [None]
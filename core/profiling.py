@@ -0,0 +1,274 @@
+"""
+Section-level render profiler for dashboard pages
+A page calls begin_page() once, then mark("KPIs"), mark("Trends"), ... at
+each section header (or wraps a block / function in profile_section()).
+Each section records its wall time split into:
+
+    query   - database time, from core/telemetry.py query events
+    figure  - time in core.components create_* chart builders
+    render  - time in core.components render_* helpers
+    pandas  - the remainder: DataFrame shaping and other page code
+
+render_profile_panel() at the end of the page draws the run as a waterfall
+in a sidebar panel that only Developer and Admin users can switch on.
+The same calls open a trace per run and a span per section (core/tracing.py).
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from contextlib import ContextDecorator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from core import metrics, telemetry, tracing
+
+# Timed categories, in waterfall order; 'pandas' is what remains of the wall time
+CATEGORIES = ('query', 'pandas', 'figure', 'render')
+CATEGORY_COLORS = {'query': '#1f77b4', 'pandas': '#9aa5b1', 'figure': '#ff7f0e', 'render': '#2ca02c'}
+
+# Roles that can open the profiler panel
+PROFILER_ROLES = ('Developer', 'Admin')
+
+class SectionTiming:
+    """Wall time of one page section and how it splits across categories"""
+
+    def __init__(self, name: str, depth: int, start_ms: float):
+        self.name = name
+        self.depth = depth
+        self.start_ms = start_ms
+        self.wall_ms: Optional[float] = None
+        self.totals = {'query': 0.0, 'figure': 0.0, 'render': 0.0}
+        self.queries = 0
+
+    @property
+    def pandas_ms(self) -> float:
+        wall = self.wall_ms or 0.0
+        return max(wall - sum(self.totals.values()), 0.0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'section': self.name,
+            'depth': self.depth,
+            'start_ms': round(self.start_ms, 1),
+            'wall_ms': round(self.wall_ms or 0.0, 1),
+            'query_ms': round(self.totals['query'], 1),
+            'pandas_ms': round(self.pandas_ms, 1),
+            'figure_ms': round(self.totals['figure'], 1),
+            'render_ms': round(self.totals['render'], 1),
+            'queries': self.queries
+        }
+
+class PageProfile:
+    """Sections recorded during one run of a page script"""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started = time.perf_counter()
+        self.wall_ms: Optional[float] = None
+        self.sections: List[SectionTiming] = []
+        self.marked: Optional['profile_section'] = None
+        self._lock = threading.Lock()
+
+    def offset_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def add(self, sections: Tuple[SectionTiming, ...], category: str, ms: float):
+        """Charge time to every open section (nested sections include their children)"""
+        with self._lock:
+            for section in sections:
+                section.totals[category] += ms
+                if category == 'query':
+                    section.queries += 1
+
+    def as_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([section.as_dict() for section in self.sections])
+
+_profile: contextvars.ContextVar[Optional[PageProfile]] = contextvars.ContextVar('page_profile', default=None)
+_open_sections: contextvars.ContextVar[Tuple[SectionTiming, ...]] = contextvars.ContextVar('open_sections', default=())
+_in_timed: contextvars.ContextVar[bool] = contextvars.ContextVar('in_timed', default=False)
+
+def begin_page(page: str) -> PageProfile:
+    """Start profiling a page run (call once, near the top of the page)"""
+    tracing.start_trace(page)
+    profile = PageProfile(page)
+    _profile.set(profile)
+    _open_sections.set(())
+    return profile
+
+def current_profile() -> Optional[PageProfile]:
+    return _profile.get()
+
+class profile_section(ContextDecorator):
+    """
+    Time a page section; use as `with profile_section("Trends"):` or as
+    a decorator on a function that draws one section
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profile: Optional[PageProfile] = None
+        self.timing: Optional[SectionTiming] = None
+        self.span: Optional[tracing.Span] = None
+        self._token = None
+
+    def _recreate_cm(self):
+        return profile_section(self.name)
+
+    def __enter__(self):
+        profile = self.profile = _profile.get()
+        if profile is not None:
+            sections = _open_sections.get()
+            self.timing = SectionTiming(self.name, len(sections), profile.offset_ms())
+            with profile._lock:
+                profile.sections.append(self.timing)
+            self._token = _open_sections.set(sections + (self.timing,))
+            self.span = tracing.open_span(self.name, 'section')
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if self.timing is None or self.timing.wall_ms is not None:
+            return
+        self.timing.wall_ms = self.profile.offset_ms() - self.timing.start_ms
+        tracing.close_span(self.span)
+        try:
+            _open_sections.reset(self._token)
+        except ValueError:
+            # Closed from another context than it was opened in
+            _open_sections.set(tuple(s for s in _open_sections.get() if s is not self.timing))
+
+def mark(name: str):
+    """
+    End the section started by the previous mark() and start a new one
+
+    Suits top-to-bottom page scripts: one call per section header, no
+    re-indenting.
+    """
+    profile = _profile.get()
+    if profile is None:
+        return
+    if profile.marked is not None:
+        profile.marked.close()
+    profile.marked = profile_section(name).__enter__()
+
+def end_page() -> Optional[PageProfile]:
+    """Close the last marked section, the page run and its trace"""
+    profile = _profile.get()
+    if profile is None:
+        return None
+    if profile.marked is not None:
+        profile.marked.close()
+        profile.marked = None
+    if profile.wall_ms is None:
+        profile.wall_ms = profile.offset_ms()
+        # Kept per page for later inspection in the session
+        st.session_state.setdefault('_page_profiles', {})[profile.page] = profile.as_frame()
+        tracing.end_trace()
+        metrics.observe_rerun(profile.page, profile.wall_ms)
+    return profile
+
+def timed(category: str) -> Callable:
+    """Decorator charging a function's time to the open sections under category"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracing.span(func.__name__, category):
+                sections = _open_sections.get()
+                if not sections or _in_timed.get():
+                    return func(*args, **kwargs)
+                token = _in_timed.set(True)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    _in_timed.reset(token)
+                    _profile.get().add(sections, category, (time.perf_counter() - started) * 1000)
+        return wrapper
+    return decorator
+
+def detached(func: Callable) -> Callable:
+    """
+    func run with no open sections, e.g. in a worker thread
+
+    Its queries are not charged to the section that submitted it; time the
+    wait for its result with timed('query') where the result is used.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _open_sections.set(())
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _open_sections.reset(token)
+    return wrapper
+
+def _on_query(event: Dict[str, Any]):
+    """Charge executed queries (not cache hits) to the open sections"""
+    sections = _open_sections.get()
+    if sections and event['kind'] != 'cache':
+        _profile.get().add(sections, 'query', event['duration_ms'])
+
+telemetry.subscribe(_on_query)
+
+# ============================================
+# WATERFALL PANEL
+# ============================================
+
+def create_waterfall(profile: PageProfile):
+    """Horizontal waterfall: one bar per section, split by category"""
+    import plotly.graph_objects as go
+
+    frame = profile.as_frame()
+    labels = [("  " * depth) + name for depth, name in zip(frame['depth'], frame['section'])]
+    fig = go.Figure()
+    base = frame['start_ms'].copy()
+    for category in CATEGORIES:
+        widths = frame[f'{category}_ms']
+        fig.add_trace(go.Bar(
+            y=labels, x=widths, base=base, orientation='h', name=category,
+            marker_color=CATEGORY_COLORS[category],
+            hovertemplate=f"%{{y}}<br>{category}: %{{x:.0f}} ms<extra></extra>"
+        ))
+        base = base + widths
+    fig.update_layout(
+        barmode='overlay',
+        height=80 + 28 * len(labels),
+        margin=dict(l=0, r=0, t=30, b=0),
+        xaxis_title="ms since page start",
+        yaxis=dict(autorange='reversed'),
+        legend=dict(orientation='h', y=1.1),
+        title=f"{profile.page}: {profile.wall_ms:,.0f} ms"
+    )
+    return fig
+
+def render_profile_panel():
+    """
+    Sidebar waterfall of this run's sections (Developer and Admin only)
+
+    Call at the very end of the page; it closes the last section first.
+    """
+    profile = end_page()
+    if profile is None or st.session_state.get('user_role') not in PROFILER_ROLES:
+        return
+
+    with st.sidebar:
+        if not st.toggle("⏱️ Section profiler", key="section_profiler"):
+            return
+        if not profile.sections:
+            st.caption("No sections recorded on this page")
+            return
+        st.plotly_chart(create_waterfall(profile), use_container_width=True)
+        frame = profile.as_frame()
+        st.dataframe(
+            frame[['section', 'wall_ms', 'query_ms', 'pandas_ms', 'figure_ms', 'render_ms', 'queries']],
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption("pandas = section time not spent in queries, chart builders or render helpers")
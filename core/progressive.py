@@ -0,0 +1,242 @@
+"""
+Progressive rendering for dashboard pages
+A page lists its sections up front. Each gets a placeholder showing a
+skeleton at once and every section's queries start together on a shared
+thread pool. The script still runs top to bottom, so sections replace their
+skeletons strictly in page order: each one once its own queries and every
+section above it are done. The KPI strip appears after the KPI query alone
+instead of after every query on the page, and later sections usually find
+their results ready. Total query time drops towards the slowest query only
+while workers are free: a page runs at most PROGRESSIVE_SESSION_QUERIES of
+its queries at once, the rest start in submission order as those finish,
+and every session queues for the same PROGRESSIVE_WORKERS threads.
+
+    progressive = ProgressivePage([("KPIs", 'kpis', 8), ("Trends", 'charts', 4)], page=__file__)
+    progressive.submit('kpis', db.execute_query_df, kpi_query, date_params)
+    ...
+    mark("KPIs")
+    progressive.fill("KPIs")
+    kpi_df = progressive.result('kpis')
+
+Queries run through tracing.submit(), so they stay inside the page trace.
+Their time is charged to the section that waits for them, not the one
+that submitted them. Worker threads are attached to the session's script
+run context, their queries are recorded against the page passed in (the
+call stack no longer shows it), and query errors are drawn by result() in
+the section that uses them.
+
+Each worker holds one pooled connection while its query runs, so the
+workers take at most PROGRESSIVE_WORKERS of the DB_POOL_SIZE slots guarded
+by DatabaseManager's semaphore. The rest stay free for script threads and
+fragments running queries inline. Those would otherwise wait behind a full
+pool and time out after DB_POOL_TIMEOUT. The worker count is therefore
+capped at DB_POOL_SIZE - 1.
+
+Settings (environment):
+    PROGRESSIVE_RENDER           0 to run queries inline when a section needs them (default 1)
+    PROGRESSIVE_WORKERS          query threads shared by all sessions
+                                 (default half of DB_POOL_SIZE)
+    PROGRESSIVE_SESSION_QUERIES  queries one page run keeps in flight (default 3)
+"""
+
+import functools
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from core import telemetry, tracing
+from core.profiling import detached, timed
+from db import collect_errors
+from theme import get_colors
+
+PROGRESSIVE_RENDER = os.getenv('PROGRESSIVE_RENDER', '1').lower() in ('1', 'true', 'yes')
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+PROGRESSIVE_WORKERS = min(int(os.getenv('PROGRESSIVE_WORKERS', DB_POOL_SIZE // 2)),
+                          DB_POOL_SIZE - 1)
+PROGRESSIVE_SESSION_QUERIES = int(os.getenv('PROGRESSIVE_SESSION_QUERIES', 3))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, PROGRESSIVE_WORKERS),
+                                           thread_name_prefix='progressive')
+    return _executor
+
+# ============================================
+# SKELETONS
+# ============================================
+
+SKELETON_CSS = """
+<style>
+@keyframes mind-skeleton-pulse {{
+    0%, 100% {{ opacity: 1; }}
+    50% {{ opacity: 0.45; }}
+}}
+.mind-skeleton {{
+    background-color: {fill};
+    border: 1px solid {border};
+    border-radius: 10px;
+    animation: mind-skeleton-pulse 1.4s ease-in-out infinite;
+}}
+.mind-skeleton-title {{ height: 28px; width: 280px; margin: 8px 0 16px 0; }}
+.mind-skeleton-grid {{ display: grid; gap: 16px; margin-bottom: 16px; }}
+</style>
+"""
+
+# Skeleton kind: (grid columns, block height in px)
+SKELETON_LAYOUTS = {
+    'kpis': (4, 110),
+    'charts': (2, 400),
+    'panels': (2, 240),
+    'table': (1, 420),
+}
+
+def skeleton_html(kind: str, count: int = 1) -> str:
+    """
+    Grey pulsing blocks in the shape of a section
+
+    Args:
+        kind: 'kpis', 'charts', 'panels' or 'table'
+        count: Number of cards / charts / panels
+
+    Returns:
+        HTML for st.markdown(..., unsafe_allow_html=True)
+    """
+    columns, height = SKELETON_LAYOUTS[kind]
+    blocks = "".join(f'<div class="mind-skeleton" style="height: {height}px;"></div>' for _ in range(count))
+    return (
+        '<div class="mind-skeleton mind-skeleton-title"></div>'
+        f'<div class="mind-skeleton-grid" style="grid-template-columns: repeat({columns}, 1fr);">{blocks}</div>'
+    )
+
+def _worker(fn: Callable, ctx: Any, page: Optional[str]) -> Callable:
+    """fn for a pool thread: in the session's run context, errors held for result()"""
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        # Pool threads are reused across sessions; attach this one every time
+        add_script_run_ctx(threading.current_thread(), ctx)
+        with telemetry.on_page(page), collect_errors() as errors:
+            return fn(*args, **kwargs), errors
+    return run
+
+@timed('query')
+def wait_for_query(future: Future) -> Any:
+    """Result of a submitted query, charged to the open sections as query time"""
+    return future.result()
+
+# ============================================
+# PAGE
+# ============================================
+
+class ProgressivePage:
+    """Section placeholders and parallel queries for one page run"""
+
+    def __init__(self, sections: Sequence[Tuple[str, str, int]], page: str,
+                 enabled: bool = PROGRESSIVE_RENDER):
+        """
+        Draw a skeleton placeholder for every section, in page order
+
+        Args:
+            sections: (section name, skeleton kind, block count) per section
+            page: The page script's __file__, for query telemetry
+            enabled: False runs each query inline on result() and draws
+                sections where fill() is called, like a plain page
+        """
+        self.page = telemetry.page_name(page)
+        self.enabled = enabled
+        self.slots: Dict[str, Any] = {}
+        self.pending: Dict[str, Any] = {}
+        self.active = None
+        # Submitted but not yet started (future, bound worker, args, kwargs)
+        self._queued: deque = deque()
+        self._running = 0
+        self._queue_lock = threading.Lock()
+        if not enabled:
+            return
+
+        colors = get_colors()
+        st.markdown(SKELETON_CSS.format(fill=colors['secondary_bg'], border=colors['border']),
+                    unsafe_allow_html=True)
+        for name, kind, count in sections:
+            slot = st.empty()
+            slot.markdown(skeleton_html(kind, count), unsafe_allow_html=True)
+            self.slots[name] = slot
+
+    def submit(self, key: str, fn: Callable, *args, **kwargs):
+        """
+        Queue fn(*args, **kwargs) on the query pool; collect it with result(key)
+
+        It starts at once unless PROGRESSIVE_SESSION_QUERIES of this page's
+        queries are already running, then as soon as one of those finishes.
+        """
+        if self.enabled:
+            # Bound to the tracing context here: queued work is started from a pool thread
+            worker = tracing.bind_context(_worker(detached(fn), get_script_run_ctx(), self.page))
+            future = Future()
+            with self._queue_lock:
+                self._queued.append((future, worker, args, kwargs))
+            self.pending[key] = future
+            self._start_queued()
+        else:
+            self.pending[key] = (fn, args, kwargs)
+
+    def _start_queued(self):
+        """Start queued queries while fewer than PROGRESSIVE_SESSION_QUERIES are running"""
+        while True:
+            with self._queue_lock:
+                if not self._queued or self._running >= max(1, PROGRESSIVE_SESSION_QUERIES):
+                    return
+                future, worker, args, kwargs = self._queued.popleft()
+                self._running += 1
+            running = _get_executor().submit(worker, *args, **kwargs)
+            running.add_done_callback(functools.partial(self._finished, future))
+
+    def _finished(self, future: Future, running: Future):
+        """Hand a finished query's outcome to its result() and start the next one"""
+        with self._queue_lock:
+            self._running -= 1
+        error = running.exception()
+        if error is None:
+            future.set_result(running.result())
+        else:
+            future.set_exception(error)
+        self._start_queued()
+
+    def result(self, key: str) -> Any:
+        """Wait for a submitted query, drawing its query errors here (re-raising any exception)"""
+        pending = self.pending.pop(key)
+        if isinstance(pending, Future):
+            value, errors = wait_for_query(pending)
+            for message in errors:
+                st.error(message)
+            return value
+        fn, args, kwargs = pending
+        return fn(*args, **kwargs)
+
+    def fill(self, name: str):
+        """
+        Draw everything that follows into a section's placeholder
+
+        Replaces the section's skeleton, and ends the previous fill(). Call
+        after the section's mark(), like mark() at the section header;
+        sections therefore fill in page order, not in query completion order.
+        """
+        self.close()
+        if self.enabled:
+            self.active = self.slots.pop(name).container()
+            self.active.__enter__()
+
+    def close(self):
+        """Stop drawing into the current placeholder; call before the page footer"""
+        if self.active is not None:
+            self.active.__exit__(None, None, None)
+            self.active = None
@@ -5,6 +5,15 @@ Provides functions for administrative dashboard
 
 from typing import Optional
 
+from core.queries.bound_query import BoundQuery
+from core.queries.time_bounds import window_start, day_start
+from core.queries.registry import register
+
+@register(
+    tables=('admin_aggregates',),
+    cost='scan',
+    columns=('metric_id', 'metric_name', 'metric_value', 'timestamp', 'description')
+)
 def get_admin_aggregates(metric_names: Optional[list] = None) -> str:
     """
     Get administrative aggregate metrics
@@ -33,12 +42,20 @@ def get_admin_aggregates(metric_names: Optional[list] = None) -> str:
     
     return query
 
+@register(
+    tables=('attempts', 'case_studies', 'students'),
+    cost='scan',
+    columns=(
+        'total_students', 'active_students_30d', 'total_attempts', 'completed_attempts',
+        'avg_score', 'avg_ces', 'total_cohorts', 'total_campuses', 'total_cases'
+    )
+)
 def get_platform_overview() -> str:
     """Get platform-wide overview statistics"""
-    return """
+    query = """
     SELECT 
         (SELECT COUNT(DISTINCT student_id) FROM students WHERE role = 'Student') as total_students,
-        (SELECT COUNT(DISTINCT student_id) FROM attempts WHERE timestamp >= CURRENT_DATE - INTERVAL '30 days') as active_students_30d,
+        (SELECT COUNT(DISTINCT student_id) FROM attempts WHERE timestamp >= %(start_30d)s) as active_students_30d,
         (SELECT COUNT(*) FROM attempts) as total_attempts,
         (SELECT COUNT(*) FROM attempts WHERE state = 'Completed') as completed_attempts,
         (SELECT ROUND(AVG(score), 2) FROM attempts) as avg_score,
@@ -47,7 +64,17 @@ def get_platform_overview() -> str:
         (SELECT COUNT(DISTINCT campus) FROM students WHERE campus IS NOT NULL) as total_campuses,
         (SELECT COUNT(*) FROM case_studies) as total_cases
     """
+    
+    return BoundQuery(query, {'start_30d': day_start(30)})
 
+@register(
+    tables=('attempts', 'students'),
+    cost='scan',
+    columns=(
+        'campus', 'student_count', 'active_students', 'total_attempts', 'avg_score', 'avg_ces',
+        'avg_duration'
+    )
+)
 def get_usage_by_campus() -> str:
     """Get usage statistics by campus"""
     return """
@@ -66,6 +93,14 @@ def get_usage_by_campus() -> str:
     ORDER BY student_count DESC
     """
 
+@register(
+    tables=('attempts', 'students'),
+    cost='scan',
+    columns=(
+        'department', 'student_count', 'active_students', 'total_attempts', 'avg_score',
+        'avg_ces'
+    )
+)
 def get_usage_by_department() -> str:
     """Get usage statistics by department"""
     return """
@@ -83,6 +118,14 @@ def get_usage_by_department() -> str:
     ORDER BY student_count DESC
     """
 
+@register(
+    tables=('attempts', 'case_studies'),
+    cost='scan',
+    columns=(
+        'case_id', 'title', 'unique_students', 'total_attempts', 'avg_score', 'avg_duration',
+        'avg_ces', 'completion_rate'
+    )
+)
 def get_case_study_performance_summary() -> str:
     """Get performance summary for all case studies"""
     return """
@@ -102,61 +145,83 @@ def get_case_study_performance_summary() -> str:
     ORDER BY total_attempts DESC
     """
 
-def get_top_performing_cohorts(limit: int = 10) -> str:
-    """Get top performing cohorts"""
+@register(
+    tables=('cohort_leaderboard',),
+    cost='rollup',
+    columns=(
+        'cohort_id', 'student_count', 'total_attempts', 'avg_score', 'avg_ces', 'avg_duration'
+    )
+)
+def get_top_performing_cohorts(limit: int = 10, min_attempts: int = 10) -> str:
+    """Get top performing cohorts from the maintained cohort leaderboard"""
     return f"""
     SELECT 
-        s.cohort_id,
-        COUNT(DISTINCT s.student_id) as student_count,
-        COUNT(a.attempt_id) as total_attempts,
-        AVG(a.score) as avg_score,
-        AVG(a.ces_value) as avg_ces,
-        AVG(a.duration_seconds) as avg_duration
-    FROM students s
-    INNER JOIN attempts a ON s.student_id = a.student_id
-    WHERE s.cohort_id IS NOT NULL
-    GROUP BY s.cohort_id
-    HAVING COUNT(a.attempt_id) >= 10
-    ORDER BY avg_score DESC
+        cohort_id,
+        student_count,
+        attempt_count as total_attempts,
+        avg_score,
+        ces_sum / NULLIF(ces_count, 0) as avg_ces,
+        duration_sum / NULLIF(duration_count, 0) as avg_duration
+    FROM cohort_leaderboard
+    WHERE avg_score IS NOT NULL
+    AND attempt_count >= {min_attempts}
+    ORDER BY avg_score DESC, attempt_count DESC, cohort_id ASC
     LIMIT {limit}
     """
 
-def get_bottom_performing_cohorts(limit: int = 10) -> str:
-    """Get bottom performing cohorts"""
+@register(
+    tables=('cohort_leaderboard',),
+    cost='rollup',
+    columns=(
+        'cohort_id', 'student_count', 'total_attempts', 'avg_score', 'avg_ces', 'avg_duration'
+    )
+)
+def get_bottom_performing_cohorts(limit: int = 10, min_attempts: int = 10) -> str:
+    """Get bottom performing cohorts from the maintained cohort leaderboard"""
     return f"""
     SELECT 
-        s.cohort_id,
-        COUNT(DISTINCT s.student_id) as student_count,
-        COUNT(a.attempt_id) as total_attempts,
-        AVG(a.score) as avg_score,
-        AVG(a.ces_value) as avg_ces,
-        AVG(a.duration_seconds) as avg_duration
-    FROM students s
-    INNER JOIN attempts a ON s.student_id = a.student_id
-    WHERE s.cohort_id IS NOT NULL
-    GROUP BY s.cohort_id
-    HAVING COUNT(a.attempt_id) >= 10
-    ORDER BY avg_score ASC
+        cohort_id,
+        student_count,
+        attempt_count as total_attempts,
+        avg_score,
+        ces_sum / NULLIF(ces_count, 0) as avg_ces,
+        duration_sum / NULLIF(duration_count, 0) as avg_duration
+    FROM cohort_leaderboard
+    WHERE avg_score IS NOT NULL
+    AND attempt_count >= {min_attempts}
+    ORDER BY avg_score ASC, attempt_count DESC, cohort_id ASC
     LIMIT {limit}
     """
 
+@register(
+    tables=('attempts',),
+    cost='range',
+    columns=('date', 'active_users', 'total_attempts', 'avg_score')
+)
 def get_daily_active_users_trend(days: int = 30) -> str:
     """Get daily active users trend"""
-    return f"""
+    query = """
     SELECT 
-        DATE(timestamp) as date,
+        mind_local_date(timestamp) as date,
         COUNT(DISTINCT student_id) as active_users,
         COUNT(*) as total_attempts,
         AVG(score) as avg_score
     FROM attempts
-    WHERE timestamp >= CURRENT_DATE - INTERVAL '{days} days'
+    WHERE timestamp >= %(start_ts)s
     GROUP BY date
     ORDER BY date ASC
     """
+    
+    return BoundQuery(query, {'start_ts': day_start(days)})
 
+@register(
+    tables=('attempts',),
+    cost='range',
+    columns=('week', 'active_students', 'total_attempts', 'avg_score', 'avg_ces', 'avg_duration')
+)
 def get_weekly_metrics_trend(weeks: int = 12) -> str:
     """Get weekly aggregated metrics"""
-    return f"""
+    query = """
     SELECT 
         DATE_TRUNC('week', timestamp) as week,
         COUNT(DISTINCT student_id) as active_students,
@@ -165,21 +230,31 @@ def get_weekly_metrics_trend(weeks: int = 12) -> str:
         AVG(ces_value) as avg_ces,
         AVG(duration_seconds) as avg_duration
     FROM attempts
-    WHERE timestamp >= CURRENT_DATE - INTERVAL '{weeks} weeks'
+    WHERE timestamp >= %(start_ts)s
     GROUP BY week
     ORDER BY week ASC
     """
+    
+    return BoundQuery(query, {'start_ts': day_start(weeks * 7)})
 
+@register(
+    tables=('attempts', 'environment_metrics', 'system_reliability'),
+    cost='range',
+    columns=(
+        'avg_reliability', 'avg_latency', 'avg_error_rate', 'avg_stability', 'avg_env_latency',
+        'avg_noise_quality'
+    )
+)
 def get_overall_system_health() -> str:
     """Get overall system health metrics"""
-    return """
+    query = """
     WITH recent_reliability AS (
         SELECT 
             AVG(reliability_index) as avg_reliability,
             AVG(latency_ms) as avg_latency,
             AVG(error_rate) as avg_error_rate
         FROM system_reliability
-        WHERE timestamp >= NOW() - INTERVAL '24 hours'
+        WHERE timestamp >= %(start_24h)s
     ),
     recent_environment AS (
         SELECT 
@@ -188,7 +263,7 @@ def get_overall_system_health() -> str:
             AVG(noise_quality_index) as avg_noise_quality
         FROM environment_metrics em
         INNER JOIN attempts a ON em.attempt_id = a.attempt_id
-        WHERE a.timestamp >= CURRENT_DATE - INTERVAL '7 days'
+        WHERE a.timestamp >= %(start_7d)s
     )
     SELECT 
         rr.avg_reliability,
@@ -200,10 +275,20 @@ def get_overall_system_health() -> str:
     FROM recent_reliability rr
     CROSS JOIN recent_environment re
     """
+    
+    return BoundQuery(query, {'start_24h': window_start(hours=24), 'start_7d': day_start(7)})
 
+@register(
+    tables=('system_reliability',),
+    cost='range',
+    columns=(
+        'severity', 'location', 'incident_count', 'avg_latency', 'avg_error_rate',
+        'last_occurrence'
+    )
+)
 def get_key_incidents_summary(days: int = 7) -> str:
     """Get summary of key incidents"""
-    return f"""
+    query = """
     SELECT 
         severity,
         location,
@@ -212,53 +297,104 @@ def get_key_incidents_summary(days: int = 7) -> str:
         AVG(error_rate) as avg_error_rate,
         MAX(timestamp) as last_occurrence
     FROM system_reliability
-    WHERE timestamp >= CURRENT_DATE - INTERVAL '{days} days'
+    WHERE timestamp >= %(start_ts)s
     AND severity IN ('Warning', 'Critical')
     GROUP BY severity, location
     ORDER BY severity DESC, incident_count DESC
     """
+    
+    return BoundQuery(query, {'start_ts': day_start(days)})
 
+@register(
+    tables=('engagement_logs',),
+    cost='range',
+    columns=(
+        'engaged_students', 'total_sessions', 'total_actions', 'total_duration_seconds',
+        'avg_action_duration', 'active_days'
+    )
+)
 def get_engagement_summary() -> str:
     """Get platform-wide engagement summary"""
-    return """
+    query = """
     SELECT 
         COUNT(DISTINCT student_id) as engaged_students,
         COUNT(DISTINCT session_id) as total_sessions,
         COUNT(*) as total_actions,
         SUM(duration_seconds) as total_duration_seconds,
         AVG(duration_seconds) as avg_action_duration,
-        COUNT(DISTINCT DATE(timestamp)) as active_days
+        COUNT(DISTINCT mind_local_date(timestamp)) as active_days
     FROM engagement_logs
-    WHERE timestamp >= CURRENT_DATE - INTERVAL '30 days'
+    WHERE timestamp >= %(start_ts)s
     """
+    
+    return BoundQuery(query, {'start_ts': day_start(30)})
 
+@register(
+    tables=('attempt_improvements',),
+    cost='rollup',
+    columns=(
+        'total_with_second_attempt', 'avg_improvement', 'pct_improved', 'max_improvement',
+        'min_improvement'
+    )
+)
 def get_improvement_metrics() -> str:
     """Get platform-wide improvement metrics"""
     return """
-    WITH attempt_improvements AS (
-        SELECT 
-            a1.student_id,
-            a1.case_id,
-            a1.score as attempt1_score,
-            a2.score as attempt2_score,
-            a2.score - a1.score as improvement
-        FROM attempts a1
-        INNER JOIN attempts a2 
-            ON a1.student_id = a2.student_id 
-            AND a1.case_id = a2.case_id
-            AND a1.attempt_number = 1 
-            AND a2.attempt_number = 2
-    )
     SELECT 
         COUNT(*) as total_with_second_attempt,
         AVG(improvement) as avg_improvement,
         SUM(CASE WHEN improvement > 0 THEN 1 ELSE 0 END)::FLOAT / 
-            COUNT(*) * 100 as pct_improved,
+            NULLIF(COUNT(*), 0) * 100 as pct_improved,
         MAX(improvement) as max_improvement,
         MIN(improvement) as min_improvement
     FROM attempt_improvements
+    WHERE attempt1_at IS NOT NULL
+    AND attempt2_at IS NOT NULL
     """
 
+@register(
+    tables=('attempt_improvements', 'students'),
+    cost='rollup',
+    columns=(
+        'cohort_id', 'total_with_second_attempt', 'students_with_second_attempt',
+        'avg_improvement', 'pct_improved', 'max_improvement', 'min_improvement'
+    )
+)
+def get_cohort_improvement_metrics(cohort_id: Optional[str] = None) -> str:
+    """Get improvement metrics per cohort, or for a single cohort"""
+    query = """
+    SELECT 
+        s.cohort_id,
+        COUNT(*) as total_with_second_attempt,
+        COUNT(DISTINCT ai.student_id) as students_with_second_attempt,
+        AVG(ai.improvement) as avg_improvement,
+        SUM(CASE WHEN ai.improvement > 0 THEN 1 ELSE 0 END)::FLOAT / 
+            NULLIF(COUNT(*), 0) * 100 as pct_improved,
+        MAX(ai.improvement) as max_improvement,
+        MIN(ai.improvement) as min_improvement
+    FROM attempt_improvements ai
+    INNER JOIN students s ON ai.student_id = s.student_id
+    WHERE ai.attempt1_at IS NOT NULL
+    AND ai.attempt2_at IS NOT NULL
+    """
+    
+    if cohort_id:
+        query += f" AND s.cohort_id = '{cohort_id}'"
+    else:
+        query += " AND s.cohort_id IS NOT NULL"
+    
+    query += """
+    GROUP BY s.cohort_id
+    ORDER BY avg_improvement DESC NULLS LAST
+    """
+    
+    return query
+
+@register(
+    tables=('students',),
+    cost='scan',
+    columns=('role', 'user_count')
+)
 def get_role_distribution() -> str:
     """Get distribution of users by role"""
     return """
@@ -6,6 +6,18 @@ Provides functions to query student attempt data
 from typing import Optional, List
 import pandas as pd
 
+from core.queries.bound_query import BoundQuery
+from core.queries.time_bounds import time_range
+from core.queries.registry import register
+
+@register(
+    tables=('attempts', 'case_studies'),
+    cost='lookup',
+    columns=(
+        'attempt_id', 'student_id', 'case_id', 'case_title', 'attempt_number', 'score',
+        'duration_seconds', 'ces_value', 'timestamp', 'state'
+    )
+)
 def get_student_attempts(student_id: str, start_date: Optional[str] = None, 
                         end_date: Optional[str] = None) -> str:
     """
@@ -36,15 +48,24 @@ def get_student_attempts(student_id: str, start_date: Optional[str] = None,
     WHERE a.student_id = '{student_id}'
     """
     
-    if start_date:
-        query += f" AND a.timestamp >= '{start_date}'"
-    if end_date:
-        query += f" AND a.timestamp <= '{end_date}'"
+    bounds = time_range(start_date, end_date)
+    if 'start_ts' in bounds:
+        query += " AND a.timestamp >= %(start_ts)s"
+    if 'end_ts' in bounds:
+        query += " AND a.timestamp < %(end_ts)s"
     
     query += " ORDER BY a.timestamp DESC"
     
-    return query
+    return BoundQuery(query, bounds)
 
+@register(
+    tables=('attempts', 'case_studies'),
+    cost='lookup',
+    columns=(
+        'total_cases_attempted', 'avg_score', 'avg_duration', 'avg_ces', 'min_score',
+        'max_score'
+    )
+)
 def get_student_performance_summary(student_id: str) -> str:
     """
     Get performance summary for a student
@@ -91,10 +112,60 @@ def get_student_performance_summary(student_id: str) -> str:
     FROM attempt_scores
     """
 
+@register(
+    tables=('student_snapshots',),
+    cost='lookup',
+    columns=(
+        'student_id', 'total_attempts', 'total_cases_attempted', 'avg_score', 'avg_duration',
+        'avg_ces', 'min_score', 'max_score', 'last_attempt_at', 'active_days',
+        'total_engagement_seconds', 'last_activity_at', 'rubric_mastery', 'updated_at'
+    )
+)
+def get_student_snapshot(student_id: str) -> str:
+    """
+    Get the precomputed KPI snapshot for a student (one primary-key lookup)
+    
+    Reads the student_snapshots table maintained by
+    migrations/003_student_snapshots.sql. Score, duration and CES averages
+    are over the latest attempt per case.
+    
+    Args:
+        student_id: Student ID
+        
+    Returns:
+        SQL query string
+    """
+    return f"""
+    SELECT 
+        student_id,
+        total_attempts,
+        total_cases_attempted,
+        avg_score,
+        avg_duration,
+        avg_ces,
+        min_score,
+        max_score,
+        last_attempt_at,
+        active_days,
+        total_engagement_seconds,
+        last_activity_at,
+        rubric_mastery,
+        updated_at
+    FROM student_snapshots
+    WHERE student_id = '{student_id}'
+    """
+
+@register(
+    tables=('attempt_improvements', 'case_studies'),
+    cost='lookup',
+    columns=('case_id', 'case_title', 'attempt1_score', 'attempt2_score', 'improvement')
+)
 def get_attempt_improvement(student_id: str) -> str:
     """
     Calculate improvement between attempt 1 and 2 for each case
     
+    Served from the attempt_improvements table (migration 002).
+    
     Args:
         student_id: Student ID
         
@@ -102,41 +173,91 @@ def get_attempt_improvement(student_id: str) -> str:
         SQL query string
     """
     return f"""
-    WITH attempt_data AS (
-        SELECT 
-            a.case_id,
-            cs.title as case_title,
-            a.attempt_number,
-            a.score
-        FROM attempts a
-        LEFT JOIN case_studies cs ON a.case_id = cs.case_id
-        WHERE a.student_id = '{student_id}'
-        AND a.attempt_number IN (1, 2)
-    ),
-    pivoted AS (
-        SELECT 
-            case_id,
-            case_title,
-            MAX(CASE WHEN attempt_number = 1 THEN score END) as attempt1_score,
-            MAX(CASE WHEN attempt_number = 2 THEN score END) as attempt2_score
-        FROM attempt_data
-        GROUP BY case_id, case_title
-    )
     SELECT 
-        case_id,
-        case_title,
-        attempt1_score,
-        attempt2_score,
-        CASE 
-            WHEN attempt2_score IS NOT NULL AND attempt1_score IS NOT NULL 
-            THEN attempt2_score - attempt1_score 
-            ELSE NULL 
-        END as improvement
-    FROM pivoted
-    WHERE attempt1_score IS NOT NULL
-    ORDER BY improvement DESC NULLS LAST
+        ai.case_id,
+        cs.title as case_title,
+        ai.attempt1_score,
+        ai.attempt2_score,
+        ai.improvement
+    FROM attempt_improvements ai
+    LEFT JOIN case_studies cs ON ai.case_id = cs.case_id
+    WHERE ai.student_id = '{student_id}'
+    AND ai.attempt1_score IS NOT NULL
+    ORDER BY ai.improvement DESC NULLS LAST
+    """
+
+@register(
+    tables=('attempt_improvements', 'case_studies', 'students'),
+    cost='rollup',
+    columns=('case_title', 'attempt_1', 'attempt_2')
+)
+def get_case_improvement_summary(cohort_id: Optional[str] = None,
+                                 department: Optional[str] = None,
+                                 campus: Optional[str] = None,
+                                 start_date: Optional[str] = None,
+                                 end_date: Optional[str] = None,
+                                 role: Optional[str] = 'Student') -> str:
+    """
+    Get average attempt 1 and attempt 2 scores per case for a filtered slice
+    
+    Each attempt is counted when its own timestamp falls in the date range.
+    Only cases with both attempt averages are returned.
+    
+    Args:
+        cohort_id: Optional cohort filter
+        department: Optional department filter
+        campus: Optional campus filter
+        start_date: Optional start date filter
+        end_date: Optional end date filter
+        role: Optional student role filter
+        
+    Returns:
+        SQL query string
     """
+    bounds = time_range(start_date, end_date)
+    attempt1_filter = ["ai.attempt1_at IS NOT NULL"]
+    attempt2_filter = ["ai.attempt2_at IS NOT NULL"]
+    if 'start_ts' in bounds:
+        attempt1_filter.append("ai.attempt1_at >= %(start_ts)s")
+        attempt2_filter.append("ai.attempt2_at >= %(start_ts)s")
+    if 'end_ts' in bounds:
+        attempt1_filter.append("ai.attempt1_at < %(end_ts)s")
+        attempt2_filter.append("ai.attempt2_at < %(end_ts)s")
+    
+    query = f"""
+    SELECT 
+        cs.title as case_title,
+        AVG(ai.attempt1_score) FILTER (WHERE {' AND '.join(attempt1_filter)}) as attempt_1,
+        AVG(ai.attempt2_score) FILTER (WHERE {' AND '.join(attempt2_filter)}) as attempt_2
+    FROM attempt_improvements ai
+    INNER JOIN case_studies cs ON ai.case_id = cs.case_id
+    INNER JOIN students s ON ai.student_id = s.student_id
+    WHERE 1=1
+    """
+    
+    if role:
+        query += f" AND s.role = '{role}'"
+    if cohort_id:
+        query += f" AND s.cohort_id = '{cohort_id}'"
+    if department:
+        query += f" AND s.department = '{department}'"
+    if campus:
+        query += f" AND s.campus = '{campus}'"
+    
+    query += f"""
+    GROUP BY cs.title
+    HAVING AVG(ai.attempt1_score) FILTER (WHERE {' AND '.join(attempt1_filter)}) IS NOT NULL
+    AND AVG(ai.attempt2_score) FILTER (WHERE {' AND '.join(attempt2_filter)}) IS NOT NULL
+    ORDER BY cs.title
+    """
+    
+    return BoundQuery(query, bounds)
 
+@register(
+    tables=('attempts', 'case_studies'),
+    cost='lookup',
+    columns=('attempt_id', 'case_id', 'case_title', 'score', 'timestamp')
+)
 def get_score_trend(student_id: str) -> str:
     """
     Get score trend over time for a student
@@ -171,6 +292,14 @@ def get_score_trend(student_id: str) -> str:
     ORDER BY timestamp ASC
     """
 
+@register(
+    tables=('attempts', 'students'),
+    cost='lookup',
+    columns=(
+        'attempt_id', 'student_id', 'student_name', 'cohort_id', 'attempt_number', 'score',
+        'duration_seconds', 'ces_value', 'timestamp', 'state'
+    )
+)
 def get_attempts_by_case(case_id: str, start_date: Optional[str] = None,
                         end_date: Optional[str] = None) -> str:
     """
@@ -201,15 +330,24 @@ def get_attempts_by_case(case_id: str, start_date: Optional[str] = None,
     WHERE a.case_id = '{case_id}'
     """
     
-    if start_date:
-        query += f" AND a.timestamp >= '{start_date}'"
-    if end_date:
-        query += f" AND a.timestamp <= '{end_date}'"
+    bounds = time_range(start_date, end_date)
+    if 'start_ts' in bounds:
+        query += " AND a.timestamp >= %(start_ts)s"
+    if 'end_ts' in bounds:
+        query += " AND a.timestamp < %(end_ts)s"
     
     query += " ORDER BY a.timestamp DESC"
     
-    return query
+    return BoundQuery(query, bounds)
 
+@register(
+    tables=('attempts', 'students'),
+    cost='lookup',
+    columns=(
+        'student_id', 'student_name', 'cases_attempted', 'avg_score', 'avg_duration',
+        'avg_ces', 'last_attempt_date'
+    )
+)
 def get_cohort_performance(cohort_id: str, start_date: Optional[str] = None,
                           end_date: Optional[str] = None) -> str:
     """
@@ -237,18 +375,27 @@ def get_cohort_performance(cohort_id: str, start_date: Optional[str] = None,
     WHERE s.cohort_id = '{cohort_id}'
     """
     
-    if start_date:
-        query += f" AND a.timestamp >= '{start_date}'"
-    if end_date:
-        query += f" AND a.timestamp <= '{end_date}'"
+    bounds = time_range(start_date, end_date)
+    if 'start_ts' in bounds:
+        query += " AND a.timestamp >= %(start_ts)s"
+    if 'end_ts' in bounds:
+        query += " AND a.timestamp < %(end_ts)s"
     
     query += """
     GROUP BY a.student_id, s.name
     ORDER BY avg_score DESC
     """
     
-    return query
+    return BoundQuery(query, bounds)
 
+@register(
+    tables=('attempts', 'case_studies'),
+    cost='scan',
+    columns=(
+        'case_id', 'case_title', 'total_attempts', 'avg_attempt1_score', 'avg_attempt2_score',
+        'avg_attempt1_duration', 'avg_attempt2_duration', 'avg_ces'
+    )
+)
 def get_attempt_statistics_by_case() -> str:
     """
     Get aggregated statistics for each case study
@@ -284,6 +431,11 @@ def get_attempt_statistics_by_case() -> str:
     ORDER BY total_attempts DESC
     """
 
+@register(
+    tables=('attempts',),
+    cost='range',
+    columns=('active_students',)
+)
 def get_active_students(start_date: str, end_date: str) -> str:
     """
     Get count of active students in date range
@@ -295,14 +447,21 @@ def get_active_students(start_date: str, end_date: str) -> str:
     Returns:
         SQL query string
     """
-    return f"""
+    query = """
     SELECT 
         COUNT(DISTINCT student_id) as active_students
     FROM attempts
-    WHERE timestamp >= '{start_date}'
-    AND timestamp <= '{end_date}'
+    WHERE timestamp >= %(start_ts)s
+    AND timestamp < %(end_ts)s
     """
+    
+    return BoundQuery(query, time_range(start_date, end_date))
 
+@register(
+    tables=('attempts', 'case_studies'),
+    cost='scan',
+    columns=('case_id', 'case_title', 'total_attempts', 'completed_attempts', 'completion_rate')
+)
 def get_completion_rate_by_case() -> str:
     """
     Get completion rate for each case study
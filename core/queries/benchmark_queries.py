@@ -0,0 +1,123 @@
+"""
+SQL queries for performance benchmarks
+Computes every benchmark metric in a single pass over the filtered attempts
+"""
+
+from typing import Optional, List, Dict
+
+from core.queries.bound_query import BoundQuery
+from core.queries.time_bounds import time_range
+from core.queries.registry import register
+
+# Benchmark definitions, in display order. Each expression is an aggregate
+# over `students s LEFT JOIN attempts a` (attempts already restricted to the
+# date window), so students without attempts only count where an expression
+# reads s.* columns. New benchmarks only need a new entry here.
+BENCHMARKS: List[Dict[str, str]] = [
+    {
+        'metric': 'Platform Average',
+        'expression': "AVG(a.score)",
+        'description': 'Overall student performance'
+    },
+    {
+        'metric': 'Completion Rate',
+        'expression': "COUNT(a.attempt_id) FILTER (WHERE a.state = 'Completed') * 100.0 "
+                      "/ NULLIF(COUNT(a.attempt_id), 0)",
+        'description': 'Percentage of completed attempts'
+    },
+    {
+        'metric': 'Average CES',
+        'expression': "AVG(a.ces_value)",
+        'description': 'Customer Effort Score'
+    },
+    {
+        'metric': 'Avg Learning Hours/Student',
+        'expression': "SUM(a.duration_seconds) / 3600.0 / NULLIF(COUNT(DISTINCT a.student_id), 0)",
+        'description': 'Total hours per student'
+    },
+    {
+        'metric': 'Student Engagement Rate',
+        'expression': "COUNT(DISTINCT a.student_id) * 100.0 / NULLIF(COUNT(DISTINCT s.student_id), 0)",
+        'description': 'Percentage of students with attempts'
+    },
+]
+
+def _quote(value: str) -> str:
+    """Quote a string as a SQL literal"""
+    return "'" + value.replace("'", "''") + "'"
+
+@register(
+    tables=('attempts', 'students'),
+    cost='range',
+    columns=('metric', 'value', 'description')
+)
+def get_performance_benchmarks(cohort_id: Optional[str] = None,
+                               department: Optional[str] = None,
+                               start_date: Optional[str] = None,
+                               end_date: Optional[str] = None,
+                               role: Optional[str] = 'Student',
+                               benchmarks: Optional[List[Dict[str, str]]] = None) -> str:
+    """
+    Get benchmark metrics in long format (metric, value, description)
+
+    All metrics are computed as one row of aggregates over a single scan of
+    students joined to their attempts, then unpivoted.
+
+    Args:
+        cohort_id: Optional cohort filter
+        department: Optional department filter
+        start_date: Optional start timestamp filter (ISO format)
+        end_date: Optional end timestamp filter (ISO format)
+        role: Optional student role filter
+        benchmarks: Optional benchmark definitions (defaults to BENCHMARKS)
+
+    Returns:
+        SQL query string
+    """
+    benchmarks = benchmarks if benchmarks is not None else BENCHMARKS
+
+    attempt_conditions = ["a.student_id = s.student_id"]
+    bounds = time_range(start_date, end_date)
+    if 'start_ts' in bounds:
+        attempt_conditions.append("a.timestamp >= %(start_ts)s")
+    if 'end_ts' in bounds:
+        attempt_conditions.append("a.timestamp < %(end_ts)s")
+
+    student_conditions = ["1=1"]
+    if role:
+        student_conditions.append(f"s.role = '{role}'")
+    if cohort_id:
+        student_conditions.append(f"s.cohort_id = '{cohort_id}'")
+    if department:
+        student_conditions.append(f"s.department = '{department}'")
+
+    aggregates = ",\n        ".join(
+        f"({b['expression']})::NUMERIC as m{i}" for i, b in enumerate(benchmarks)
+    )
+    rows = ",\n        ".join(
+        f"({i}, {_quote(b['metric'])}, t.m{i}, {_quote(b['description'])})"
+        for i, b in enumerate(benchmarks)
+    )
+
+    query = f"""
+    WITH totals AS (
+        SELECT
+        {aggregates}
+        FROM students s
+        LEFT JOIN attempts a
+            ON {' AND '.join(attempt_conditions)}
+        WHERE {' AND '.join(student_conditions)}
+    )
+    SELECT
+        v.metric,
+        v.value,
+        v.description
+    FROM totals t
+    CROSS JOIN LATERAL (
+        VALUES
+        {rows}
+    ) AS v(ordinal, metric, value, description)
+    ORDER BY v.ordinal
+    """
+
+    return BoundQuery(query, bounds)
@@ -0,0 +1,49 @@
+"""
+SQL strings that carry their own bind parameters
+Builders that take time bounds return a BoundQuery: the SQL uses
+%(name)s placeholders and the values travel with the string, so callers
+keep passing the builder's result straight to execute_query_df().
+Builders registered in core/queries/registry.py also stamp their name on
+the result, which telemetry reports instead of a SQL fingerprint.
+Paged builders use seek_clause() for keyset pagination (core/pagination.py).
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+class BoundQuery(str):
+    """A SQL string with pyformat placeholders and the values to bind to them"""
+    
+    def __new__(cls, sql: str, params: Optional[Dict[str, Any]] = None, name: Optional[str] = None):
+        query = super().__new__(cls, sql)
+        query.params = dict(params) if params else None
+        query.name = name
+        return query
+    
+    def __repr__(self) -> str:
+        return f"BoundQuery({str.__repr__(self)}, params={self.params!r})"
+
+def seek_clause(columns: Sequence[str], after: Optional[Sequence[Any]],
+                descending: bool = True) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build a keyset (seek) predicate for paging past a row
+    
+    Compares the sort key as a row value, e.g. (sr.timestamp, sr.record_id)
+    < (%(after_0)s, %(after_1)s), which a btree index on the same columns
+    serves as a range read however deep the page.
+    
+    Args:
+        columns: Sort key columns, most significant first
+        after: Sort key of the last row already shown, or None for page 1
+        descending: True when the query orders by the key DESC
+        
+    Returns:
+        (SQL predicate, params); ("1=1", {}) when after is None
+    """
+    if after is None:
+        return "1=1", {}
+    
+    names = [f"after_{i}" for i in range(len(columns))]
+    placeholders = ", ".join(f"%({name})s" for name in names)
+    operator = "<" if descending else ">"
+    clause = f"({', '.join(columns)}) {operator} ({placeholders})"
+    return clause, dict(zip(names, after))
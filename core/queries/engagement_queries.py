@@ -5,6 +5,18 @@ Provides functions to query student engagement data
 
 from typing import Optional
 
+from core.queries.bound_query import BoundQuery
+from core.queries.time_bounds import time_range, day_range, day_start
+from core.queries.registry import register
+
+@register(
+    tables=('case_studies', 'engagement_logs'),
+    cost='lookup',
+    columns=(
+        'session_id', 'case_id', 'case_title', 'attempt_id', 'timestamp', 'action_type',
+        'duration_seconds', 'session_phase'
+    )
+)
 def get_student_engagement(student_id: str, start_date: Optional[str] = None,
                           end_date: Optional[str] = None) -> str:
     """
@@ -33,15 +45,21 @@ def get_student_engagement(student_id: str, start_date: Optional[str] = None,
     WHERE el.student_id = '{student_id}'
     """
     
-    if start_date:
-        query += f" AND el.timestamp >= '{start_date}'"
-    if end_date:
-        query += f" AND el.timestamp <= '{end_date}'"
+    bounds = time_range(start_date, end_date)
+    if 'start_ts' in bounds:
+        query += " AND el.timestamp >= %(start_ts)s"
+    if 'end_ts' in bounds:
+        query += " AND el.timestamp < %(end_ts)s"
     
     query += " ORDER BY el.timestamp DESC"
     
-    return query
+    return BoundQuery(query, bounds)
 
+@register(
+    tables=('engagement_daily',),
+    cost='rollup',
+    columns=('active_days',)
+)
 def get_student_active_days(student_id: str) -> str:
     """
     Count active days for a student
@@ -54,11 +72,19 @@ def get_student_active_days(student_id: str) -> str:
     """
     return f"""
     SELECT 
-        COUNT(DISTINCT DATE(timestamp)) as active_days
-    FROM engagement_logs
+        COUNT(*) as active_days
+    FROM engagement_daily
     WHERE student_id = '{student_id}'
     """
 
+@register(
+    tables=('engagement_daily',),
+    cost='rollup',
+    columns=(
+        'total_sessions', 'cases_engaged', 'total_actions', 'total_duration_seconds',
+        'avg_action_duration', 'unique_action_types'
+    )
+)
 def get_engagement_summary_by_student(student_id: str) -> str:
     """
     Get engagement summary metrics for a student
@@ -70,17 +96,26 @@ def get_engagement_summary_by_student(student_id: str) -> str:
         SQL query string
     """
     return f"""
+    WITH days AS (
+        SELECT *
+        FROM engagement_daily
+        WHERE student_id = '{student_id}'
+    )
     SELECT 
-        COUNT(DISTINCT session_id) as total_sessions,
-        COUNT(DISTINCT case_id) as cases_engaged,
-        COUNT(*) as total_actions,
-        SUM(duration_seconds) as total_duration_seconds,
-        AVG(duration_seconds) as avg_action_duration,
-        COUNT(DISTINCT action_type) as unique_action_types
-    FROM engagement_logs
-    WHERE student_id = '{student_id}'
+        (SELECT COUNT(DISTINCT session_id) FROM days, unnest(days.session_ids) AS session_id) as total_sessions,
+        (SELECT COUNT(DISTINCT case_id) FROM days, unnest(days.case_ids) AS case_id) as cases_engaged,
+        SUM(action_count) as total_actions,
+        SUM(duration_sum) as total_duration_seconds,
+        SUM(duration_sum)::NUMERIC / NULLIF(SUM(action_count), 0) as avg_action_duration,
+        (SELECT COUNT(DISTINCT action_type) FROM days, jsonb_object_keys(days.action_counts) AS action_type) as unique_action_types
+    FROM days
     """
 
+@register(
+    tables=('engagement_daily',),
+    cost='rollup',
+    columns=('date', 'action_count', 'total_duration', 'session_count', 'case_count')
+)
 def get_daily_engagement_trend(student_id: str, days: int = 30) -> str:
     """
     Get daily engagement trend for a student
@@ -92,20 +127,85 @@ def get_daily_engagement_trend(student_id: str, days: int = 30) -> str:
     Returns:
         SQL query string
     """
-    return f"""
+    query = f"""
     SELECT 
-        DATE(timestamp) as date,
-        COUNT(*) as action_count,
-        SUM(duration_seconds) as total_duration,
-        COUNT(DISTINCT session_id) as session_count,
-        COUNT(DISTINCT case_id) as case_count
-    FROM engagement_logs
+        day as date,
+        action_count,
+        duration_sum as total_duration,
+        cardinality(session_ids) as session_count,
+        cardinality(case_ids) as case_count
+    FROM engagement_daily
     WHERE student_id = '{student_id}'
-    AND timestamp >= CURRENT_DATE - INTERVAL '{days} days'
-    GROUP BY DATE(timestamp)
+    AND day >= %(start_day)s
     ORDER BY date ASC
     """
+    
+    return BoundQuery(query, {'start_day': day_start(days).date()})
 
+@register(
+    tables=('engagement_daily', 'students'),
+    cost='rollup',
+    columns=('date', 'active_students', 'total_hours')
+)
+def get_engagement_daily_trend(cohort_id: Optional[str] = None,
+                               department: Optional[str] = None,
+                               campus: Optional[str] = None,
+                               start_date: Optional[str] = None,
+                               end_date: Optional[str] = None,
+                               role: Optional[str] = 'Student') -> str:
+    """
+    Get daily active students and engagement hours for a filtered slice
+    
+    Reads the daily engagement rollup, so the date filter works at day
+    granularity (both ends inclusive).
+    
+    Args:
+        cohort_id: Optional cohort filter
+        department: Optional department filter
+        campus: Optional campus filter
+        start_date: Optional first day to include (ISO format)
+        end_date: Optional last day to include (ISO format)
+        role: Optional student role filter
+        
+    Returns:
+        SQL query string
+    """
+    query = """
+    SELECT 
+        ed.day as date,
+        COUNT(*) as active_students,
+        SUM(ed.duration_sum) / 3600.0 as total_hours
+    FROM engagement_daily ed
+    INNER JOIN students s ON ed.student_id = s.student_id
+    WHERE 1=1
+    """
+    
+    if role:
+        query += f" AND s.role = '{role}'"
+    if cohort_id:
+        query += f" AND s.cohort_id = '{cohort_id}'"
+    if department:
+        query += f" AND s.department = '{department}'"
+    if campus:
+        query += f" AND s.campus = '{campus}'"
+    bounds = day_range(start_date, end_date)
+    if 'start_day' in bounds:
+        query += " AND ed.day >= %(start_day)s"
+    if 'end_day' in bounds:
+        query += " AND ed.day < %(end_day)s"
+    
+    query += """
+    GROUP BY ed.day
+    ORDER BY date
+    """
+    
+    return BoundQuery(query, bounds)
+
+@register(
+    tables=('engagement_daily',),
+    cost='rollup',
+    columns=('action_type', 'action_count', 'total_duration', 'avg_duration')
+)
 def get_engagement_by_action_type(student_id: str) -> str:
     """
     Get engagement breakdown by action type
@@ -118,16 +218,23 @@ def get_engagement_by_action_type(student_id: str) -> str:
     """
     return f"""
     SELECT 
-        action_type,
-        COUNT(*) as action_count,
-        SUM(duration_seconds) as total_duration,
-        AVG(duration_seconds) as avg_duration
-    FROM engagement_logs
-    WHERE student_id = '{student_id}'
-    GROUP BY action_type
+        ac.key as action_type,
+        SUM(ac.value::BIGINT) as action_count,
+        SUM(COALESCE((ed.action_durations ->> ac.key)::BIGINT, 0)) as total_duration,
+        SUM(COALESCE((ed.action_durations ->> ac.key)::BIGINT, 0))::NUMERIC
+            / NULLIF(SUM(ac.value::BIGINT), 0) as avg_duration
+    FROM engagement_daily ed
+    CROSS JOIN LATERAL jsonb_each_text(ed.action_counts) AS ac
+    WHERE ed.student_id = '{student_id}'
+    GROUP BY ac.key
     ORDER BY action_count DESC
     """
 
+@register(
+    tables=('engagement_logs',),
+    cost='lookup',
+    columns=('session_phase', 'action_count', 'total_duration', 'avg_duration', 'session_count')
+)
 def get_engagement_by_session_phase(student_id: str) -> str:
     """
     Get engagement breakdown by session phase
@@ -152,11 +259,22 @@ def get_engagement_by_session_phase(student_id: str) -> str:
     ORDER BY total_duration DESC
     """
 
+@register(
+    tables=('engagement_daily', 'students'),
+    cost='rollup',
+    columns=(
+        'student_id', 'student_name', 'total_sessions', 'total_actions',
+        'total_duration_seconds', 'avg_action_duration', 'active_days'
+    )
+)
 def get_cohort_engagement_summary(cohort_id: str, start_date: Optional[str] = None,
                                  end_date: Optional[str] = None) -> str:
     """
     Get engagement summary for a cohort
     
+    Reads the daily engagement rollup, so the date filter works at day
+    granularity (both ends inclusive).
+    
     Args:
         cohort_id: Cohort ID
         start_date: Optional start date filter
@@ -166,31 +284,55 @@ def get_cohort_engagement_summary(cohort_id: str, start_date: Optional[str] = No
         SQL query string
     """
     query = f"""
-    SELECT 
-        el.student_id,
-        s.name as student_name,
-        COUNT(DISTINCT el.session_id) as total_sessions,
-        COUNT(*) as total_actions,
-        SUM(el.duration_seconds) as total_duration_seconds,
-        AVG(el.duration_seconds) as avg_action_duration,
-        COUNT(DISTINCT DATE(el.timestamp)) as active_days
-    FROM engagement_logs el
-    INNER JOIN students s ON el.student_id = s.student_id
-    WHERE s.cohort_id = '{cohort_id}'
+    WITH days AS (
+        SELECT 
+            ed.*,
+            s.name as student_name
+        FROM engagement_daily ed
+        INNER JOIN students s ON ed.student_id = s.student_id
+        WHERE s.cohort_id = '{cohort_id}'
     """
     
-    if start_date:
-        query += f" AND el.timestamp >= '{start_date}'"
-    if end_date:
-        query += f" AND el.timestamp <= '{end_date}'"
+    bounds = day_range(start_date, end_date)
+    if 'start_day' in bounds:
+        query += " AND ed.day >= %(start_day)s"
+    if 'end_day' in bounds:
+        query += " AND ed.day < %(end_day)s"
     
     query += """
-    GROUP BY el.student_id, s.name
+    ),
+    sessions AS (
+        SELECT 
+            d.student_id,
+            COUNT(DISTINCT session_id) as total_sessions
+        FROM days d
+        CROSS JOIN LATERAL unnest(d.session_ids) AS session_id
+        GROUP BY d.student_id
+    )
+    SELECT 
+        d.student_id,
+        d.student_name,
+        COALESCE(se.total_sessions, 0) as total_sessions,
+        SUM(d.action_count) as total_actions,
+        SUM(d.duration_sum) as total_duration_seconds,
+        SUM(d.duration_sum)::NUMERIC / NULLIF(SUM(d.action_count), 0) as avg_action_duration,
+        COUNT(*) as active_days
+    FROM days d
+    LEFT JOIN sessions se ON d.student_id = se.student_id
+    GROUP BY d.student_id, d.student_name, se.total_sessions
     ORDER BY total_duration_seconds DESC
     """
     
-    return query
+    return BoundQuery(query, bounds)
 
+@register(
+    tables=('engagement_logs',),
+    cost='lookup',
+    columns=(
+        'unique_students', 'total_sessions', 'total_actions', 'total_duration',
+        'avg_action_duration', 'unique_actions'
+    )
+)
 def get_case_engagement_metrics(case_id: str) -> str:
     """
     Get engagement metrics for a specific case
@@ -213,6 +355,14 @@ def get_case_engagement_metrics(case_id: str) -> str:
     WHERE case_id = '{case_id}'
     """
 
+@register(
+    tables=('engagement_daily', 'students'),
+    cost='rollup',
+    columns=(
+        'student_id', 'student_name', 'total_duration_seconds', 'session_count',
+        'last_activity'
+    )
+)
 def get_low_engagement_students(cohort_id: str, min_hours: float = 1.0) -> str:
     """
     Identify students with low engagement
@@ -230,17 +380,30 @@ def get_low_engagement_students(cohort_id: str, min_hours: float = 1.0) -> str:
     SELECT 
         s.student_id,
         s.name as student_name,
-        COALESCE(SUM(el.duration_seconds), 0) as total_duration_seconds,
-        COALESCE(COUNT(DISTINCT el.session_id), 0) as session_count,
-        COALESCE(MAX(el.timestamp), NULL) as last_activity
+        COALESCE(eng.total_duration_seconds, 0) as total_duration_seconds,
+        COALESCE(eng.session_count, 0) as session_count,
+        eng.last_activity
     FROM students s
-    LEFT JOIN engagement_logs el ON s.student_id = el.student_id
+    LEFT JOIN LATERAL (
+        SELECT 
+            SUM(ed.duration_sum) as total_duration_seconds,
+            (SELECT COUNT(DISTINCT session_id)
+             FROM engagement_daily ed2, unnest(ed2.session_ids) AS session_id
+             WHERE ed2.student_id = s.student_id) as session_count,
+            MAX(ed.last_at) as last_activity
+        FROM engagement_daily ed
+        WHERE ed.student_id = s.student_id
+    ) eng ON TRUE
     WHERE s.cohort_id = '{cohort_id}'
-    GROUP BY s.student_id, s.name
-    HAVING COALESCE(SUM(el.duration_seconds), 0) < {min_seconds}
+    AND COALESCE(eng.total_duration_seconds, 0) < {min_seconds}
     ORDER BY total_duration_seconds ASC
     """
 
+@register(
+    tables=('engagement_daily',),
+    cost='rollup',
+    columns=('hour_of_day', 'action_count', 'unique_students', 'total_duration')
+)
 def get_peak_engagement_hours() -> str:
     """
     Get peak engagement hours across all students
@@ -250,11 +413,14 @@ def get_peak_engagement_hours() -> str:
     """
     return """
     SELECT 
-        EXTRACT(HOUR FROM timestamp) as hour_of_day,
-        COUNT(*) as action_count,
-        COUNT(DISTINCT student_id) as unique_students,
-        SUM(duration_seconds) as total_duration
-    FROM engagement_logs
-    GROUP BY hour_of_day
+        h.slot - 1 as hour_of_day,
+        SUM(h.actions) as action_count,
+        COUNT(DISTINCT ed.student_id) FILTER (WHERE h.actions > 0) as unique_students,
+        SUM(h.duration) as total_duration
+    FROM engagement_daily ed
+    CROSS JOIN LATERAL unnest(ed.hour_actions, ed.hour_durations)
+        WITH ORDINALITY AS h(actions, duration, slot)
+    GROUP BY h.slot
+    HAVING SUM(h.actions) > 0
     ORDER BY hour_of_day
     """
@@ -3,12 +3,21 @@ SQL queries for environment_metrics and system_reliability tables
 Provides functions for developer dashboard
 """
 
-from typing import Optional, List
+from typing import Optional, List, Sequence, Any
+
+from core.queries.bound_query import BoundQuery, seek_clause
+from core.queries.time_bounds import window_start, day_start, time_range
+from core.queries.registry import register
 
 # ============================================
 # ENVIRONMENT METRICS QUERIES
 # ============================================
 
+@register(
+    tables=('attempts', 'case_studies', 'environment_metrics'),
+    cost='lookup',
+    columns=None
+)
 def get_environment_metrics_for_attempt(attempt_id: str) -> str:
     """Get environment metrics for a specific attempt"""
     return f"""
@@ -23,6 +32,15 @@ def get_environment_metrics_for_attempt(attempt_id: str) -> str:
     WHERE em.attempt_id = '{attempt_id}'
     """
 
+@register(
+    tables=('attempts', 'case_studies', 'environment_metrics'),
+    cost='lookup',
+    columns=(
+        'attempt_id', 'case_id', 'case_title', 'noise_level', 'noise_quality_index',
+        'internet_latency_ms', 'internet_stability_score', 'connection_drops', 'device_type',
+        'microphone_type', 'signal_strength', 'score', 'timestamp'
+    )
+)
 def get_student_environment_history(student_id: str) -> str:
     """Get environment quality history for a student"""
     return f"""
@@ -47,6 +65,11 @@ def get_student_environment_history(student_id: str) -> str:
     ORDER BY a.timestamp DESC
     """
 
+@register(
+    tables=('environment_metrics',),
+    cost='scan',
+    columns=('noise_category', 'stability_category', 'attempt_count', 'avg_latency', 'avg_drops')
+)
 def get_environment_quality_distribution() -> str:
     """Get distribution of environment quality metrics"""
     return """
@@ -71,6 +94,14 @@ def get_environment_quality_distribution() -> str:
     ORDER BY noise_category, stability_category
     """
 
+@register(
+    tables=('attempts', 'environment_metrics'),
+    cost='scan',
+    columns=(
+        'latency_category', 'attempt_count', 'avg_score', 'avg_duration',
+        'avg_connection_drops'
+    )
+)
 def get_environment_impact_on_performance() -> str:
     """Analyze correlation between environment and performance"""
     return """
@@ -98,6 +129,13 @@ def get_environment_impact_on_performance() -> str:
         END
     """
 
+@register(
+    tables=('environment_metrics',),
+    cost='scan',
+    columns=(
+        'device_type', 'microphone_type', 'usage_count', 'avg_noise_quality', 'avg_stability'
+    )
+)
 def get_device_type_distribution() -> str:
     """Get distribution of device types"""
     return """
@@ -113,6 +151,15 @@ def get_device_type_distribution() -> str:
     ORDER BY usage_count DESC
     """
 
+@register(
+    tables=('attempts', 'case_studies', 'environment_metrics', 'students'),
+    cost='scan',
+    columns=(
+        'attempt_id', 'student_id', 'student_name', 'case_id', 'case_title', 'noise_level',
+        'noise_quality_index', 'internet_latency_ms', 'internet_stability_score',
+        'connection_drops', 'score', 'timestamp'
+    )
+)
 def get_poor_environment_attempts(threshold: int = 50) -> str:
     """Get attempts with poor environment quality"""
     return f"""
@@ -140,13 +187,69 @@ def get_poor_environment_attempts(threshold: int = 50) -> str:
     LIMIT 100
     """
 
+@register(
+    tables=('attempts', 'environment_metrics'),
+    cost='range',
+    columns=(
+        'timestamp', 'attempt_id', 'device_type', 'microphone_type', 'noise_level',
+        'noise_quality_index', 'internet_latency_ms', 'internet_stability_score',
+        'connection_drops', 'signal_strength', 'student_score'
+    )
+)
+def get_environment_metrics_log(after: Optional[Sequence[Any]] = None,
+                                limit: int = 100) -> str:
+    """
+    Get one page of environment metrics, newest attempt first
+    
+    Keyset-paginated on (a.timestamp, a.attempt_id); see core/pagination.py.
+    Attempts without a timestamp have no place in that order and are left out.
+    
+    Args:
+        after: (timestamp, attempt_id) of the last row of the previous page
+        limit: Page size (callers ask for one extra row to detect a next page)
+        
+    Returns:
+        SQL query string
+    """
+    seek, params = seek_clause(['a.timestamp', 'a.attempt_id'], after)
+    query = f"""
+    SELECT 
+        a.timestamp,
+        em.attempt_id,
+        em.device_type,
+        em.microphone_type,
+        em.noise_level,
+        em.noise_quality_index,
+        em.internet_latency_ms,
+        em.internet_stability_score,
+        em.connection_drops,
+        em.signal_strength,
+        a.score as student_score
+    FROM attempts a
+    INNER JOIN environment_metrics em ON em.attempt_id = a.attempt_id
+    WHERE a.timestamp IS NOT NULL
+    AND {seek}
+    ORDER BY a.timestamp DESC, a.attempt_id DESC
+    LIMIT {int(limit)}
+    """
+    
+    return BoundQuery(query, params)
+
 # ============================================
 # SYSTEM RELIABILITY QUERIES
 # ============================================
 
+@register(
+    tables=('system_reliability',),
+    cost='range',
+    columns=(
+        'api_name', 'total_records', 'avg_latency', 'p50_latency', 'p95_latency',
+        'avg_error_rate', 'avg_reliability', 'critical_count', 'warning_count'
+    )
+)
 def get_system_reliability_overview(hours: int = 24) -> str:
     """Get system reliability overview for last N hours"""
-    return f"""
+    query = """
     SELECT 
         api_name,
         COUNT(*) as total_records,
@@ -158,14 +261,21 @@ def get_system_reliability_overview(hours: int = 24) -> str:
         SUM(CASE WHEN severity = 'Critical' THEN 1 ELSE 0 END) as critical_count,
         SUM(CASE WHEN severity = 'Warning' THEN 1 ELSE 0 END) as warning_count
     FROM system_reliability
-    WHERE timestamp >= NOW() - INTERVAL '{hours} hours'
+    WHERE timestamp >= %(start_ts)s
     GROUP BY api_name
     ORDER BY avg_reliability DESC
     """
+    
+    return BoundQuery(query, {'start_ts': window_start(hours=hours)})
 
+@register(
+    tables=('system_reliability',),
+    cost='range',
+    columns=('hour', 'avg_latency', 'min_latency', 'max_latency', 'record_count')
+)
 def get_latency_trend(api_name: str, hours: int = 24) -> str:
     """Get latency trend for specific API"""
-    return f"""
+    query = f"""
     SELECT 
         DATE_TRUNC('hour', timestamp) as hour,
         AVG(latency_ms) as avg_latency,
@@ -174,28 +284,45 @@ def get_latency_trend(api_name: str, hours: int = 24) -> str:
         COUNT(*) as record_count
     FROM system_reliability
     WHERE api_name = '{api_name}'
-    AND timestamp >= NOW() - INTERVAL '{hours} hours'
+    AND timestamp >= %(start_ts)s
     GROUP BY hour
     ORDER BY hour ASC
     """
+    
+    return BoundQuery(query, {'start_ts': window_start(hours=hours)})
 
+@register(
+    tables=('system_reliability',),
+    cost='range',
+    columns=('api_name', 'avg_error_rate', 'max_error_rate', 'sample_count')
+)
 def get_error_rate_by_api(hours: int = 24) -> str:
     """Get error rates by API"""
-    return f"""
+    query = """
     SELECT 
         api_name,
         AVG(error_rate) as avg_error_rate,
         MAX(error_rate) as max_error_rate,
         COUNT(*) as sample_count
     FROM system_reliability
-    WHERE timestamp >= NOW() - INTERVAL '{hours} hours'
+    WHERE timestamp >= %(start_ts)s
     GROUP BY api_name
     ORDER BY avg_error_rate DESC
     """
+    
+    return BoundQuery(query, {'start_ts': window_start(hours=hours)})
 
+@register(
+    tables=('system_reliability',),
+    cost='range',
+    columns=(
+        'record_id', 'api_name', 'latency_ms', 'error_rate', 'reliability_index', 'timestamp',
+        'location', 'severity'
+    )
+)
 def get_critical_incidents(days: int = 7) -> str:
     """Get critical incidents"""
-    return f"""
+    query = """
     SELECT 
         record_id,
         api_name,
@@ -207,14 +334,91 @@ def get_critical_incidents(days: int = 7) -> str:
         severity
     FROM system_reliability
     WHERE severity = 'Critical'
-    AND timestamp >= NOW() - INTERVAL '{days} days'
+    AND timestamp >= %(start_ts)s
     ORDER BY timestamp DESC
     LIMIT 100
     """
+    
+    return BoundQuery(query, {'start_ts': window_start(days=days)})
 
+@register(
+    tables=('system_reliability',),
+    cost='range',
+    columns=(
+        'timestamp', 'record_id', 'api_name', 'latency_ms', 'error_rate', 'reliability_index',
+        'location', 'severity'
+    )
+)
+def get_system_reliability_log(api_name: Optional[str] = None,
+                               location: Optional[str] = None,
+                               severity: Optional[str] = None,
+                               start_date: Optional[str] = None,
+                               end_date: Optional[str] = None,
+                               after: Optional[Sequence[Any]] = None,
+                               limit: int = 100) -> str:
+    """
+    Get one page of system reliability records, newest first
+    
+    Keyset-paginated on (timestamp, record_id); see core/pagination.py.
+    
+    Args:
+        api_name: Optional API filter
+        location: Optional location filter
+        severity: Optional severity filter
+        start_date: Optional start date / datetime filter
+        end_date: Optional end date / datetime filter
+        after: (timestamp, record_id) of the last row of the previous page
+        limit: Page size (callers ask for one extra row to detect a next page)
+        
+    Returns:
+        SQL query string
+    """
+    bounds = time_range(start_date, end_date)
+    seek, seek_params = seek_clause(['sr.timestamp', 'sr.record_id'], after)
+    
+    query = f"""
+    SELECT 
+        sr.timestamp,
+        sr.record_id,
+        sr.api_name,
+        sr.latency_ms,
+        sr.error_rate,
+        sr.reliability_index,
+        sr.location,
+        sr.severity
+    FROM system_reliability sr
+    WHERE {seek}
+    """
+    
+    if api_name:
+        query += f" AND sr.api_name = '{api_name}'"
+    if location:
+        query += f" AND sr.location = '{location}'"
+    if severity:
+        query += f" AND sr.severity = '{severity}'"
+    if 'start_ts' in bounds:
+        query += " AND sr.timestamp >= %(start_ts)s"
+    if 'end_ts' in bounds:
+        query += " AND sr.timestamp < %(end_ts)s"
+    
+    query += f"""
+    ORDER BY sr.timestamp DESC, sr.record_id DESC
+    LIMIT {int(limit)}
+    """
+    
+    return BoundQuery(query, dict(bounds, **seek_params))
+
+@register(
+    tables=('system_reliability',),
+    cost='range',
+    columns=(
+        'location', 'total_records', 'avg_latency', 'avg_error_rate', 'avg_reliability',
+        'critical_count'
+    )
+)
 def get_reliability_by_location(hours: int = 24) -> str:
     """Get reliability metrics by location"""
-    return f"""
+    query = """
     SELECT 
         location,
         COUNT(*) as total_records,
@@ -223,34 +427,51 @@ def get_reliability_by_location(hours: int = 24) -> str:
         AVG(reliability_index) as avg_reliability,
         SUM(CASE WHEN severity = 'Critical' THEN 1 ELSE 0 END) as critical_count
     FROM system_reliability
-    WHERE timestamp >= NOW() - INTERVAL '{hours} hours'
+    WHERE timestamp >= %(start_ts)s
     AND location IS NOT NULL
     GROUP BY location
     ORDER BY avg_reliability DESC
     """
+    
+    return BoundQuery(query, {'start_ts': window_start(hours=hours)})
 
+@register(
+    tables=('system_reliability',),
+    cost='range',
+    columns=('date', 'avg_reliability', 'avg_latency', 'avg_error_rate', 'critical_incidents')
+)
 def get_reliability_trend_over_time(days: int = 7) -> str:
     """Get overall reliability trend"""
-    return f"""
+    query = """
     SELECT 
-        DATE(timestamp) as date,
+        mind_local_date(timestamp) as date,
         AVG(reliability_index) as avg_reliability,
         AVG(latency_ms) as avg_latency,
         AVG(error_rate) as avg_error_rate,
         SUM(CASE WHEN severity = 'Critical' THEN 1 ELSE 0 END) as critical_incidents
     FROM system_reliability
-    WHERE timestamp >= CURRENT_DATE - INTERVAL '{days} days'
+    WHERE timestamp >= %(start_ts)s
     GROUP BY date
     ORDER BY date ASC
     """
+    
+    return BoundQuery(query, {'start_ts': day_start(days)})
 
+@register(
+    tables=('system_reliability',),
+    cost='range',
+    columns=(
+        'api_name', 'total_calls', 'avg_latency', 'p95_latency', 'avg_error_rate',
+        'avg_reliability', 'last_checked'
+    )
+)
 def get_api_performance_summary() -> str:
     """Get comprehensive API performance summary"""
-    return """
+    query = """
     WITH recent_data AS (
         SELECT *
         FROM system_reliability
-        WHERE timestamp >= NOW() - INTERVAL '24 hours'
+        WHERE timestamp >= %(start_ts)s
     )
     SELECT 
         api_name,
@@ -264,3 +485,5 @@ def get_api_performance_summary() -> str:
     GROUP BY api_name
     ORDER BY avg_reliability DESC
     """
+    
+    return BoundQuery(query, {'start_ts': window_start(hours=24)})
@@ -0,0 +1,340 @@
+"""
+Declarative registry of dashboard queries
+Every builder in core/queries/*_queries.py registers itself with @register,
+declaring the tables it reads, an expected cost class, a cache TTL and its
+result columns. Parameters and their types come from the builder's
+signature. Caching, invalidation, scheduling and instrumentation work on
+the query's registered name instead of its SQL text.
+"""
+
+import functools
+import importlib
+import inspect
+import os
+import pkgutil
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core import telemetry, tracing
+from core.queries.bound_query import BoundQuery
+
+# Cost classes, cheapest first, with the default TTL (seconds) for each
+COST_CLASSES: Dict[str, Dict[str, Any]] = {
+    'lookup': {'ttl': 60, 'description': "Index lookup for one student, attempt, case or cohort"},
+    'rollup': {'ttl': 300, 'description': "Reads trigger-maintained rollup tables"},
+    'range': {'ttl': 300, 'description': "Index range read over a time window"},
+    'scan': {'ttl': 900, 'description': "Aggregate over a whole table"},
+}
+
+# Results the shared cache holds before evicting the least recently used
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', 512))
+
+# Rollup tables and the base tables whose triggers maintain them (migrations 001-005)
+DERIVED_TABLES: Dict[str, Tuple[str, ...]] = {
+    'rubric_mastery_cube': ('rubric_scores',),
+    'rubric_mastery_by_student': ('rubric_scores',),
+    'attempt_improvements': ('attempts',),
+    'student_snapshots': ('attempts', 'rubric_scores', 'engagement_logs'),
+    'engagement_daily': ('engagement_logs',),
+    'cohort_leaderboard': ('attempts',),
+}
+
+class QuerySpec:
+    """A registered query: its builder plus what it reads and costs"""
+
+    def __init__(self, name: str, builder: Callable[..., str], tables: Sequence[str],
+                 cost: str, ttl: Optional[int] = None, columns: Optional[Sequence[str]] = None):
+        if cost not in COST_CLASSES:
+            raise ValueError(f"Unknown cost class '{cost}' for {name}")
+        self.name = name
+        self.builder = builder
+        self.module = builder.__module__
+        self.tables = tuple(tables)
+        self.cost = cost
+        self.ttl = COST_CLASSES[cost]['ttl'] if ttl is None else ttl
+        self.columns = tuple(columns) if columns is not None else None
+        self.description = (inspect.getdoc(builder) or '').split('\n')[0]
+
+    @property
+    def params(self) -> Dict[str, Dict[str, Any]]:
+        """Builder parameters: name -> {type, default, required}"""
+        params = {}
+        for name, param in inspect.signature(self.builder).parameters.items():
+            required = param.default is inspect.Parameter.empty
+            params[name] = {
+                'type': param.annotation if param.annotation is not inspect.Parameter.empty else Any,
+                'default': None if required else param.default,
+                'required': required
+            }
+        return params
+
+    @property
+    def source_tables(self) -> Tuple[str, ...]:
+        """Tables read directly, plus the base tables behind any rollups"""
+        tables = list(self.tables)
+        for table in self.tables:
+            tables.extend(DERIVED_TABLES.get(table, ()))
+        return tuple(dict.fromkeys(tables))
+
+    def bind(self, **kwargs) -> str:
+        """
+        Build the SQL for a parameter set
+
+        Raises:
+            TypeError: Unknown or missing parameters
+        """
+        params = self.params
+        unknown = set(kwargs) - set(params)
+        if unknown:
+            raise TypeError(f"{self.name} got unknown parameter(s): {', '.join(sorted(unknown))}")
+        missing = [name for name, p in params.items() if p['required'] and name not in kwargs]
+        if missing:
+            raise TypeError(f"{self.name} missing required parameter(s): {', '.join(missing)}")
+        return self.named(self.builder(**kwargs))
+
+    def named(self, sql: str) -> BoundQuery:
+        """The builder's SQL as a BoundQuery carrying this query's name"""
+        return BoundQuery(sql, getattr(sql, 'params', None), name=self.name)
+
+    def cache_key(self, kwargs: Dict[str, Any]) -> Tuple:
+        """Identity of one call: the query name and its non-default arguments"""
+        defaults = {name: p['default'] for name, p in self.params.items()}
+        items = tuple(sorted(
+            (name, _hashable(value)) for name, value in kwargs.items()
+            if value != defaults.get(name)
+        ))
+        return (self.name, items)
+
+    def missing_columns(self, columns: Iterable[str]) -> List[str]:
+        """Declared result columns absent from an actual result"""
+        if self.columns is None:
+            return []
+        present = set(columns)
+        return [column for column in self.columns if column not in present]
+
+    def __repr__(self) -> str:
+        return f"QuerySpec({self.name!r}, cost={self.cost!r}, tables={self.tables!r})"
+
+def _hashable(value: Any) -> Any:
+    """Make list / dict / set arguments usable in a cache key"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, set):
+        return tuple(sorted(value))
+    return value
+
+_REGISTRY: Dict[str, QuerySpec] = {}
+_loaded = False
+
+def register(tables: Sequence[str], cost: str, ttl: Optional[int] = None,
+             columns: Optional[Sequence[str]] = None, name: Optional[str] = None):
+    """
+    Decorator registering a query builder
+
+    The builder keeps its name and signature; its result becomes a
+    BoundQuery carrying the query's name (reported by core/telemetry.py)
+    and its QuerySpec is attached as `query_spec`.
+
+    Args:
+        tables: Tables the query reads
+        cost: Cost class (see COST_CLASSES)
+        ttl: Cache TTL in seconds (default: the cost class TTL)
+        columns: Result columns, in order (None when they vary)
+        name: Registered name (default: the builder's function name)
+    """
+    def decorator(builder: Callable[..., str]) -> Callable[..., str]:
+        spec = QuerySpec(name or builder.__name__, builder, tables, cost, ttl, columns)
+        existing = _REGISTRY.get(spec.name)
+        if existing is not None and existing.module != spec.module:
+            raise ValueError(f"Query '{spec.name}' registered by both {existing.module} and {spec.module}")
+        _REGISTRY[spec.name] = spec
+
+        @functools.wraps(builder)
+        def named_builder(*args, **kwargs) -> str:
+            return spec.named(builder(*args, **kwargs))
+
+        named_builder.query_spec = spec
+        return named_builder
+    return decorator
+
+def load_all():
+    """Import every core/queries/*_queries.py module so its builders register"""
+    global _loaded
+    if _loaded:
+        return
+    package = importlib.import_module('core.queries')
+    for module in pkgutil.iter_modules(package.__path__):
+        if module.name.endswith('_queries'):
+            try:
+                importlib.import_module(f"core.queries.{module.name}")
+            except ImportError:
+                # Modules with unavailable dependencies register nothing
+                continue
+    _loaded = True
+
+def get_spec(name: str) -> QuerySpec:
+    """
+    Look up a registered query
+
+    Raises:
+        KeyError: No query registered under that name
+    """
+    load_all()
+    return _REGISTRY[name]
+
+def all_specs() -> List[QuerySpec]:
+    """Every registered query, by name"""
+    load_all()
+    return [_REGISTRY[name] for name in sorted(_REGISTRY)]
+
+def specs_reading(table: str) -> List[QuerySpec]:
+    """Registered queries whose results depend on a table"""
+    return [spec for spec in all_specs() if table in spec.source_tables]
+
+# ============================================
+# RESULT CACHE
+# ============================================
+
+# INSERT INTO t / UPDATE t / DELETE FROM t / TRUNCATE t / COPY t
+WRITE_TARGET_RE = re.compile(
+    r'\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?|COPY)\s+(?:ONLY\s+)?"?(\w+)"?',
+    re.IGNORECASE
+)
+
+def written_tables(sql: str) -> List[str]:
+    """Tables a write statement modifies"""
+    return list(dict.fromkeys(m.group(1).lower() for m in WRITE_TARGET_RE.finditer(sql)))
+
+class QueryCache:
+    """
+    TTL cache of query results keyed by query identity
+
+    Entries expire after their spec's TTL and are dropped early when a
+    table they depend on is written. At most max_entries results are held;
+    past that the least recently used is evicted. Shared by every session
+    in the process.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES):
+        self._entries: 'OrderedDict[Tuple, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, spec: QuerySpec, kwargs: Dict[str, Any]) -> Optional[Any]:
+        """Cached result for a call, or None when absent or expired"""
+        key = spec.cache_key(kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, spec: QuerySpec, kwargs: Dict[str, Any], result: Any):
+        """Store a result for the spec's TTL, dropping expired and excess entries"""
+        if spec.ttl <= 0 or self.max_entries <= 0:
+            return
+        key = spec.cache_key(kwargs)
+        now = time.monotonic()
+        with self._lock:
+            for stale in [k for k, (expires, _) in self._entries.items() if expires < now]:
+                del self._entries[stale]
+            self._entries[key] = (now + spec.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table: Optional[str] = None, name: Optional[str] = None) -> int:
+        """
+        Drop cached results
+
+        Args:
+            table: Drop every query that depends on this table
+            name: Drop every cached call of this query
+            (neither: drop everything)
+
+        Returns:
+            Number of entries dropped
+        """
+        if table is None and name is None:
+            names = None
+        elif name is not None:
+            names = {name}
+        else:
+            names = {spec.name for spec in specs_reading(table.lower())}
+
+        with self._lock:
+            keys = [key for key in self._entries if names is None or key[0] in names]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def invalidate_for_write(self, sql: str) -> int:
+        """Drop results that depend on any table a write statement modifies"""
+        return sum(self.invalidate(table=table) for table in written_tables(sql))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions}
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Live cached results: query name, arguments, rows, bytes and seconds left"""
+        now = time.monotonic()
+        with self._lock:
+            items = [(key, entry) for key, entry in self._entries.items() if entry[0] >= now]
+        return [
+            {
+                'query': name,
+                'arguments': ", ".join(f"{arg}={value!r}" for arg, value in args) or "defaults",
+                'rows': len(result),
+                'bytes': telemetry.dataframe_bytes(result) if hasattr(result, 'memory_usage') else None,
+                'expires_in_s': round(expires - now)
+            }
+            for (name, args), (expires, result) in items
+        ]
+
+query_cache = QueryCache()
+
+def fetch(db, name: str, **kwargs):
+    """
+    Run a registered query through the shared cache
+
+    Args:
+        db: DatabaseManager
+        name: Registered query name
+        **kwargs: Builder arguments
+
+    Returns:
+        pandas DataFrame (empty results are not cached)
+    """
+    spec = get_spec(name)
+    with tracing.span(f"fetch {name}", 'cache') as span:
+        started = time.perf_counter()
+        cached = query_cache.get(spec, kwargs)
+        if cached is not None:
+            if span is not None:
+                span.args['cache'] = 'hit'
+            telemetry.record_query(spec.bind(**kwargs), (time.perf_counter() - started) * 1000,
+                                   rows=len(cached), nbytes=telemetry.dataframe_bytes(cached), kind='cache')
+            return cached.copy()
+
+        if span is not None:
+            span.args['cache'] = 'miss'
+        with telemetry.cache_status('miss'):
+            df = db.execute_query_df(spec.bind(**kwargs))
+        if not df.empty:
+            query_cache.put(spec, kwargs, df)
+        return df.copy()
@@ -3,8 +3,20 @@ SQL queries for rubric_scores table
 Provides functions to query rubric scoring data
 """
 
-from typing import Optional
+from typing import Optional, Sequence, Any
 
+from core.queries.bound_query import BoundQuery, seek_clause
+from core.queries.time_bounds import day_range
+from core.queries.registry import register
+
+@register(
+    tables=('attempts', 'case_studies', 'rubric_scores'),
+    cost='lookup',
+    columns=(
+        'rubric_score_id', 'attempt_id', 'case_id', 'case_title', 'attempt_number',
+        'rubric_dimension', 'score', 'max_score', 'percentage', 'comment', 'improvement_flag'
+    )
+)
 def get_student_rubric_scores(student_id: str, case_id: Optional[str] = None) -> str:
     """
     Get rubric scores for a student
@@ -42,10 +54,21 @@ def get_student_rubric_scores(student_id: str, case_id: Optional[str] = None) ->
     
     return query
 
+@register(
+    tables=('rubric_mastery_by_student',),
+    cost='rollup',
+    columns=(
+        'rubric_dimension', 'total_scores', 'avg_score', 'avg_max_score', 'avg_percentage',
+        'improvements_count'
+    )
+)
 def get_rubric_mastery_by_dimension(student_id: str) -> str:
     """
     Get average rubric mastery by dimension for a student
     
+    Served from the rubric_mastery_by_student rollup (migration 001),
+    one primary-key range read per student.
+    
     Args:
         student_id: Student ID
         
@@ -54,23 +77,32 @@ def get_rubric_mastery_by_dimension(student_id: str) -> str:
     """
     return f"""
     SELECT 
-        rs.rubric_dimension,
-        COUNT(*) as total_scores,
-        AVG(rs.score) as avg_score,
-        AVG(rs.max_score) as avg_max_score,
-        ROUND(AVG(rs.score::NUMERIC / rs.max_score::NUMERIC) * 100, 2) as avg_percentage,
-        SUM(CASE WHEN rs.improvement_flag = TRUE THEN 1 ELSE 0 END) as improvements_count
-    FROM rubric_scores rs
-    INNER JOIN attempts a ON rs.attempt_id = a.attempt_id
-    WHERE a.student_id = '{student_id}'
-    GROUP BY rs.rubric_dimension
+        ms.rubric_dimension,
+        ms.score_count as total_scores,
+        ms.score_sum / NULLIF(ms.score_count, 0) as avg_score,
+        ms.max_score_sum / NULLIF(ms.score_count, 0) as avg_max_score,
+        ROUND(ms.pct_sum / NULLIF(ms.pct_count, 0) * 100, 2) as avg_percentage,
+        ms.improvement_count as improvements_count
+    FROM rubric_mastery_by_student ms
+    WHERE ms.student_id = '{student_id}'
     ORDER BY avg_percentage DESC
     """
 
+@register(
+    tables=('rubric_mastery_by_student', 'rubric_mastery_cube', 'students'),
+    cost='rollup',
+    columns=(
+        'rubric_dimension', 'student_count', 'total_assessments', 'avg_score', 'avg_max_score',
+        'avg_percentage', 'min_percentage', 'max_percentage'
+    )
+)
 def get_cohort_rubric_performance(cohort_id: str) -> str:
     """
     Get rubric performance for a cohort
     
+    Averages and extremes come from the rubric mastery cube; the distinct
+    student count comes from the per-student rollup.
+    
     Args:
         cohort_id: Cohort ID
         
@@ -78,23 +110,47 @@ def get_cohort_rubric_performance(cohort_id: str) -> str:
         SQL query string
     """
     return f"""
+    WITH cube_slice AS (
+        SELECT 
+            c.rubric_dimension,
+            SUM(c.score_count) as total_assessments,
+            SUM(c.score_sum) / NULLIF(SUM(c.score_count), 0) as avg_score,
+            SUM(c.max_score_sum) / NULLIF(SUM(c.score_count), 0) as avg_max_score,
+            ROUND(SUM(c.pct_sum) / NULLIF(SUM(c.pct_count), 0) * 100, 2) as avg_percentage,
+            MIN(c.min_pct) * 100 as min_percentage,
+            MAX(c.max_pct) * 100 as max_percentage
+        FROM rubric_mastery_cube c
+        WHERE c.cohort_id = '{cohort_id}'
+        GROUP BY c.rubric_dimension
+    ),
+    cohort_students AS (
+        SELECT 
+            ms.rubric_dimension,
+            COUNT(*) as student_count
+        FROM rubric_mastery_by_student ms
+        INNER JOIN students s ON ms.student_id = s.student_id
+        WHERE s.cohort_id = '{cohort_id}'
+        GROUP BY ms.rubric_dimension
+    )
     SELECT 
-        rs.rubric_dimension,
-        COUNT(DISTINCT a.student_id) as student_count,
-        COUNT(*) as total_assessments,
-        AVG(rs.score) as avg_score,
-        AVG(rs.max_score) as avg_max_score,
-        ROUND(AVG(rs.score::NUMERIC / rs.max_score::NUMERIC) * 100, 2) as avg_percentage,
-        MIN(rs.score::NUMERIC / rs.max_score::NUMERIC * 100) as min_percentage,
-        MAX(rs.score::NUMERIC / rs.max_score::NUMERIC * 100) as max_percentage
-    FROM rubric_scores rs
-    INNER JOIN attempts a ON rs.attempt_id = a.attempt_id
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE s.cohort_id = '{cohort_id}'
-    GROUP BY rs.rubric_dimension
-    ORDER BY avg_percentage DESC
+        cs.rubric_dimension,
+        COALESCE(st.student_count, 0) as student_count,
+        cs.total_assessments,
+        cs.avg_score,
+        cs.avg_max_score,
+        cs.avg_percentage,
+        cs.min_percentage,
+        cs.max_percentage
+    FROM cube_slice cs
+    LEFT JOIN cohort_students st ON cs.rubric_dimension = st.rubric_dimension
+    ORDER BY cs.avg_percentage DESC
     """
 
+@register(
+    tables=('case_studies', 'rubric_mastery_cube'),
+    cost='rollup',
+    columns=('case_id', 'case_title', 'rubric_dimension', 'avg_percentage')
+)
 def get_rubric_heatmap_data(case_ids: Optional[list] = None) -> str:
     """
     Get rubric dimension performance across cases for heatmap visualization
@@ -107,26 +163,92 @@ def get_rubric_heatmap_data(case_ids: Optional[list] = None) -> str:
     """
     query = """
     SELECT 
-        a.case_id,
+        c.case_id,
         cs.title as case_title,
-        rs.rubric_dimension,
-        ROUND(AVG(rs.score::NUMERIC / rs.max_score::NUMERIC) * 100, 2) as avg_percentage
-    FROM rubric_scores rs
-    INNER JOIN attempts a ON rs.attempt_id = a.attempt_id
-    LEFT JOIN case_studies cs ON a.case_id = cs.case_id
+        c.rubric_dimension,
+        ROUND(SUM(c.pct_sum) / NULLIF(SUM(c.pct_count), 0) * 100, 2) as avg_percentage
+    FROM rubric_mastery_cube c
+    LEFT JOIN case_studies cs ON c.case_id = cs.case_id
     """
     
     if case_ids:
         case_list = "','".join(case_ids)
-        query += f" WHERE a.case_id IN ('{case_list}')"
+        query += f" WHERE c.case_id IN ('{case_list}')"
     
     query += """
-    GROUP BY a.case_id, cs.title, rs.rubric_dimension
-    ORDER BY a.case_id, rs.rubric_dimension
+    GROUP BY c.case_id, cs.title, c.rubric_dimension
+    ORDER BY c.case_id, c.rubric_dimension
     """
     
     return query
 
+@register(
+    tables=('case_studies', 'rubric_mastery_cube'),
+    cost='rollup',
+    columns=('case_title', 'rubric_dimension', 'avg_percentage')
+)
+def get_rubric_mastery_heatmap(cohort_id: Optional[str] = None,
+                               department: Optional[str] = None,
+                               campus: Optional[str] = None,
+                               start_date: Optional[str] = None,
+                               end_date: Optional[str] = None,
+                               role: Optional[str] = 'Student') -> str:
+    """
+    Get rubric mastery by case title and dimension for a filtered slice
+    
+    Reads the rubric mastery cube, so the date filter works at day
+    granularity (both ends inclusive).
+    
+    Args:
+        cohort_id: Optional cohort filter
+        department: Optional department filter
+        campus: Optional campus filter
+        start_date: Optional first day to include (ISO format)
+        end_date: Optional last day to include (ISO format)
+        role: Optional student role filter
+        
+    Returns:
+        SQL query string
+    """
+    query = """
+    SELECT 
+        cs.title as case_title,
+        c.rubric_dimension,
+        SUM(c.pct_sum) / NULLIF(SUM(c.pct_count), 0) * 100 as avg_percentage
+    FROM rubric_mastery_cube c
+    INNER JOIN case_studies cs ON c.case_id = cs.case_id
+    WHERE 1=1
+    """
+    
+    if role:
+        query += f" AND c.role = '{role}'"
+    if cohort_id:
+        query += f" AND c.cohort_id = '{cohort_id}'"
+    if department:
+        query += f" AND c.department = '{department}'"
+    if campus:
+        query += f" AND c.campus = '{campus}'"
+    bounds = day_range(start_date, end_date)
+    if 'start_day' in bounds:
+        query += " AND c.day >= %(start_day)s"
+    if 'end_day' in bounds:
+        query += " AND c.day < %(end_day)s"
+    
+    query += """
+    GROUP BY cs.title, c.rubric_dimension
+    ORDER BY cs.title, c.rubric_dimension
+    """
+    
+    return BoundQuery(query, bounds)
+
+@register(
+    tables=('attempts', 'case_studies', 'rubric_scores', 'students'),
+    cost='scan',
+    columns=(
+        'student_id', 'student_name', 'case_id', 'case_title', 'attempt_number',
+        'rubric_dimension', 'score', 'max_score', 'percentage', 'comment', 'timestamp'
+    )
+)
 def get_improvement_flagged_scores(student_id: Optional[str] = None) -> str:
     """
     Get scores flagged for improvement
@@ -164,6 +286,11 @@ def get_improvement_flagged_scores(student_id: Optional[str] = None) -> str:
     
     return query
 
+@register(
+    tables=('rubric_scores',),
+    cost='scan',
+    columns=('percentage', 'frequency')
+)
 def get_rubric_dimension_distribution(dimension: str) -> str:
     """
     Get score distribution for a specific rubric dimension
@@ -184,6 +311,14 @@ def get_rubric_dimension_distribution(dimension: str) -> str:
     ORDER BY percentage
     """
 
+@register(
+    tables=('attempts', 'rubric_scores'),
+    cost='lookup',
+    columns=(
+        'rubric_dimension', 'score', 'max_score', 'percentage', 'comment', 'improvement_flag',
+        'attempt_number', 'timestamp'
+    )
+)
 def get_student_rubric_detail(student_id: str, case_id: str) -> str:
     """
     Get detailed rubric breakdown for a student's case
@@ -217,45 +352,72 @@ def get_student_rubric_detail(student_id: str, case_id: str) -> str:
     ORDER BY rs.rubric_dimension
     """
 
-def get_top_performers_by_dimension(dimension: str, limit: int = 10) -> str:
+@register(
+    tables=('rubric_mastery_by_student', 'students'),
+    cost='rollup',
+    columns=('student_id', 'student_name', 'cohort_id', 'assessments_count', 'avg_percentage')
+)
+def get_top_performers_by_dimension(dimension: str, limit: int = 10,
+                                    min_assessments: int = 3) -> str:
     """
     Get top performing students in a specific rubric dimension
     
+    Reads the per-student mastery table, whose (rubric_dimension, avg_pct)
+    index serves the ranking directly. Ties go to the student with more
+    assessments, then by student ID.
+    
     Args:
         dimension: Rubric dimension name
         limit: Number of top performers to return
+        min_assessments: Minimum rubric scores a student needs to be ranked
         
     Returns:
         SQL query string
     """
     return f"""
     SELECT 
-        a.student_id,
+        m.student_id,
         s.name as student_name,
         s.cohort_id,
-        COUNT(*) as assessments_count,
-        ROUND(AVG(rs.score::NUMERIC / rs.max_score::NUMERIC) * 100, 2) as avg_percentage
-    FROM rubric_scores rs
-    INNER JOIN attempts a ON rs.attempt_id = a.attempt_id
-    LEFT JOIN students s ON a.student_id = s.student_id
-    WHERE rs.rubric_dimension = '{dimension}'
-    GROUP BY a.student_id, s.name, s.cohort_id
-    HAVING COUNT(*) >= 3
-    ORDER BY avg_percentage DESC
+        m.score_count as assessments_count,
+        ROUND(m.avg_pct * 100, 2) as avg_percentage
+    FROM rubric_mastery_by_student m
+    LEFT JOIN students s ON m.student_id = s.student_id
+    WHERE m.rubric_dimension = '{dimension}'
+    AND m.avg_pct IS NOT NULL
+    AND m.score_count >= {min_assessments}
+    ORDER BY m.avg_pct DESC, m.score_count DESC, m.student_id ASC
     LIMIT {limit}
     """
 
-def get_rubric_comments_for_review(case_id: Optional[str] = None) -> str:
+@register(
+    tables=('attempts', 'case_studies', 'rubric_scores', 'students'),
+    cost='range',
+    columns=(
+        'rubric_score_id', 'student_id', 'student_name', 'case_id', 'case_title',
+        'rubric_dimension', 'score', 'max_score', 'comment', 'improvement_flag', 'timestamp'
+    )
+)
+def get_rubric_comments_for_review(case_id: Optional[str] = None,
+                                   after: Optional[Sequence[Any]] = None,
+                                   limit: Optional[int] = None) -> str:
     """
     Get all rubric comments for review
     
+    Newest first; with a limit it pages by keyset on
+    (a.timestamp, rs.rubric_score_id), see core/pagination.py. Comments on
+    attempts without a timestamp are left out.
+    
     Args:
         case_id: Optional case ID filter
+        after: (timestamp, rubric_score_id) of the last row of the previous page
+        limit: Optional page size
         
     Returns:
         SQL query string
     """
-    query = """
+    seek, params = seek_clause(['a.timestamp', 'rs.rubric_score_id'], after)
+    query = f"""
     SELECT 
         rs.rubric_score_id,
         a.student_id,
@@ -273,11 +435,15 @@ def get_rubric_comments_for_review(case_id: Optional[str] = None) -> str:
     LEFT JOIN students s ON a.student_id = s.student_id
     LEFT JOIN case_studies cs ON a.case_id = cs.case_id
     WHERE rs.comment IS NOT NULL AND rs.comment != ''
+    AND a.timestamp IS NOT NULL
+    AND {seek}
     """
     
     if case_id:
         query += f" AND a.case_id = '{case_id}'"
     
-    query += " ORDER BY a.timestamp DESC"
+    query += " ORDER BY a.timestamp DESC, rs.rubric_score_id DESC"
+    if limit:
+        query += f" LIMIT {int(limit)}"
     
-    return query
+    return BoundQuery(query, params)
@@ -0,0 +1,110 @@
+"""
+Time bounds for query builders
+Time filters compare the raw timestamp column against bound parameters
+computed here, always as a half-open [start, end) range, so the planner
+can prune partitions and range-scan indexes (see
+migrations/007_time_partitions.sql and migrations/008_local_date_indexes.sql).
+Days are UTC days, matching mind_local_date() in the rollups.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Union
+
+DateLike = Union[str, date, datetime]
+
+def window_start(hours: int = 0, days: int = 0) -> datetime:
+    """
+    Get the start of a trailing time window
+    
+    Floored to the minute so repeated renders bind the same value.
+    
+    Args:
+        hours: Window length in hours
+        days: Window length in days
+        
+    Returns:
+        Timezone-aware UTC datetime
+    """
+    start = datetime.now(timezone.utc) - timedelta(hours=hours, days=days)
+    return start.replace(second=0, microsecond=0)
+
+def day_start(days_ago: int = 0) -> datetime:
+    """
+    Get midnight (UTC) of the day `days_ago` days before today
+    
+    Equivalent to CURRENT_DATE - INTERVAL 'N days', but as a constant.
+    
+    Args:
+        days_ago: Number of days before today
+        
+    Returns:
+        Timezone-aware UTC datetime
+    """
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days_ago)
+
+def _parse(value: DateLike) -> Union[date, datetime]:
+    """Parse an ISO date / datetime string, passing date objects through"""
+    if isinstance(value, (date, datetime)):
+        return value
+    value = value.strip()
+    if len(value) == 10:
+        return date.fromisoformat(value)
+    return datetime.fromisoformat(value)
+
+def time_range(start_date: Optional[DateLike] = None,
+               end_date: Optional[DateLike] = None) -> Dict[str, Any]:
+    """
+    Convert a dashboard date filter to half-open timestamp bounds
+    
+    A date-only end (or an end-of-day datetime from datetime.max.time()) is
+    inclusive of that whole day, so it becomes the next midnight; any other
+    datetime end is used as the exclusive upper bound. Midnights derived from
+    dates are UTC, so the bounds do not depend on the session TimeZone.
+    
+    Args:
+        start_date: Optional first date / datetime to include
+        end_date: Optional last date to include, or exclusive end datetime
+        
+    Returns:
+        Dict with start_ts and/or end_ts for the bounds that were given
+    """
+    bounds = {}
+    if start_date:
+        start = _parse(start_date)
+        if not isinstance(start, datetime):
+            start = datetime.combine(start, datetime.min.time(), timezone.utc)
+        bounds['start_ts'] = start
+    if end_date:
+        end = _parse(end_date)
+        if not isinstance(end, datetime):
+            end = datetime.combine(end + timedelta(days=1), datetime.min.time(), timezone.utc)
+        elif end.time() == datetime.max.time():
+            end = datetime.combine(end.date() + timedelta(days=1), datetime.min.time(),
+                                   end.tzinfo or timezone.utc)
+        bounds['end_ts'] = end
+    return bounds
+
+def day_range(start_date: Optional[DateLike] = None,
+              end_date: Optional[DateLike] = None) -> Dict[str, Any]:
+    """
+    Convert a dashboard date filter to half-open bounds on a DATE column
+    
+    Used for the rollup tables keyed by `day`.
+    
+    Args:
+        start_date: Optional first date to include
+        end_date: Optional last date to include
+        
+    Returns:
+        Dict with start_day and/or end_day (exclusive) for the bounds given
+    """
+    bounds = {}
+    if start_date:
+        start = _parse(start_date)
+        bounds['start_day'] = start.date() if isinstance(start, datetime) else start
+    if end_date:
+        end = _parse(end_date)
+        end = end.date() if isinstance(end, datetime) else end
+        bounds['end_day'] = end + timedelta(days=1)
+    return bounds
@@ -0,0 +1,73 @@
+"""
+SQL queries for daily institutional trends
+Computes every daily trend metric in one grouped pass over attempts
+"""
+
+from typing import Optional
+
+from core.queries.bound_query import BoundQuery
+from core.queries.time_bounds import time_range
+from core.queries.registry import register
+
+@register(
+    tables=('attempts', 'students'),
+    cost='range',
+    columns=(
+        'date', 'avg_score', 'active_students', 'total_attempts', 'total_hours',
+        'avg_duration_min', 'completion_rate'
+    )
+)
+def get_daily_trends(cohort_id: Optional[str] = None,
+                     department: Optional[str] = None,
+                     start_date: Optional[str] = None,
+                     end_date: Optional[str] = None,
+                     role: Optional[str] = 'Student') -> str:
+    """
+    Get all daily trend metrics as one wide frame (one row per day)
+
+    Columns: date, avg_score, active_students, total_attempts, total_hours,
+    avg_duration_min, completion_rate. Each trend chart reads its own column.
+
+    Args:
+        cohort_id: Optional cohort filter
+        department: Optional department filter
+        start_date: Optional first day or exact start timestamp (ISO format)
+        end_date: Optional last day or exclusive end timestamp (ISO format);
+            see time_range()
+        role: Optional student role filter
+
+    Returns:
+        SQL query string
+    """
+    query = """
+    SELECT
+        mind_local_date(a.timestamp) as date,
+        AVG(a.score) as avg_score,
+        COUNT(DISTINCT a.student_id) as active_students,
+        COUNT(*) as total_attempts,
+        SUM(a.duration_seconds) / 3600.0 as total_hours,
+        AVG(a.duration_seconds) / 60.0 as avg_duration_min,
+        COUNT(*) FILTER (WHERE a.state = 'Completed') * 100.0 / NULLIF(COUNT(*), 0) as completion_rate
+    FROM attempts a
+    INNER JOIN students s ON a.student_id = s.student_id
+    WHERE 1=1
+    """
+
+    if role:
+        query += f" AND s.role = '{role}'"
+    if cohort_id:
+        query += f" AND s.cohort_id = '{cohort_id}'"
+    if department:
+        query += f" AND s.department = '{department}'"
+    bounds = time_range(start_date, end_date)
+    if 'start_ts' in bounds:
+        query += " AND a.timestamp >= %(start_ts)s"
+    if 'end_ts' in bounds:
+        query += " AND a.timestamp < %(end_ts)s"
+
+    query += """
+    GROUP BY mind_local_date(a.timestamp)
+    ORDER BY date
+    """
+
+    return BoundQuery(query, bounds)
@@ -0,0 +1,72 @@
+"""
+Lazy tabs for dashboard detail tables
+st.tabs runs every tab body on every rerun, so each detail table's query
+and formatting cost is paid even though only one tab is visible. LazyTabs
+draws a tab strip whose selection reaches the script, runs only the active
+tab's body, and keeps each tab's result in st.session_state until a filter
+changes, so switching back to a tab costs no query.
+"""
+
+import streamlit as st
+from typing import Any, Callable, Optional, Sequence
+
+class LazyTabs:
+    """Tab strip that runs and caches only the tab the user opens"""
+
+    def __init__(self, key: str, labels: Sequence[str]):
+        """
+        Args:
+            key: Unique widget key for this tab strip
+            labels: Tab labels, in display order
+        """
+        self.key = key
+        self.labels = list(labels)
+        self.active: Optional[str] = None
+        self.state = st.session_state.setdefault(f"lazy_tabs_{key}", {
+            'filters': None,
+            'results': {}
+        })
+
+    def sync(self, *filters: Any):
+        """Drop cached tab results when any filter value changed since the last run"""
+        signature = repr(filters)
+        if self.state['filters'] != signature:
+            self.state.update(filters=signature, results={})
+
+    def select(self) -> str:
+        """
+        Render the tab strip
+
+        Returns:
+            Label of the active tab (the first tab until the user picks one)
+        """
+        self.active = st.radio(
+            "Table",
+            self.labels,
+            horizontal=True,
+            key=f"{self.key}_tab",
+            label_visibility="collapsed"
+        )
+        return self.active
+
+    def load(self, build: Callable[[], Any], *key: Any) -> Any:
+        """
+        Result for the active tab, built on its first activation
+
+        Args:
+            build: Runs the tab's query and formatting; called only when no
+                result is cached for the active tab under the current filters
+            *key: Extra values the result depends on besides the filters
+
+        Returns:
+            The cached or freshly built result
+        """
+        cache_key = (self.active, repr(key))
+        results = self.state['results']
+        if cache_key not in results:
+            results[cache_key] = build()
+        return results[cache_key]
+
+    def clear(self):
+        """Forget every cached tab result"""
+        self.state['results'] = {}
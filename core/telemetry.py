@@ -0,0 +1,297 @@
+"""
+Per-query telemetry for MIND Unified Dashboard
+Every query DatabaseManager (db.py) or run_query (core/db.py) executes, and
+every registry cache hit, becomes one structured event: query name (or a
+fingerprint of the SQL for inline queries), duration, rows, bytes, cache
+hit / miss, pool wait and the calling page. Events feed per-query latency
+histograms, cache hit / miss counts and a bounded in-memory buffer;
+queries slower than SLOW_QUERY_MS are appended to a rotating JSON-lines
+slow-query log.
+
+Settings (environment):
+    SLOW_QUERY_MS           threshold for the slow log (default 500)
+    SLOW_QUERY_LOG          log file (default logs/slow_queries.log)
+    SLOW_QUERY_LOG_BYTES    size before rotating (default 5 MB)
+    SLOW_QUERY_LOG_BACKUPS  rotated files kept (default 5)
+"""
+
+import bisect
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PAGES_DIR = REPO_ROOT / "pages"
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 500))
+SLOW_QUERY_LOG = Path(os.getenv('SLOW_QUERY_LOG', REPO_ROOT / "logs" / "slow_queries.log"))
+SLOW_QUERY_LOG_BYTES = int(os.getenv('SLOW_QUERY_LOG_BYTES', 5 * 2 ** 20))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv('SLOW_QUERY_LOG_BACKUPS', 5))
+
+# Histogram bucket upper bounds in milliseconds (a final +Inf bucket is implied)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Events kept in memory for inspection
+RECENT_EVENTS = 1000
+
+# ============================================
+# FINGERPRINTS
+# ============================================
+
+_COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER_RE = re.compile(r'%\(\w+\)s|%s')
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+def normalize_sql(sql: str) -> str:
+    """SQL with comments dropped, literals and placeholders as ? and whitespace collapsed"""
+    sql = _COMMENT_RE.sub(' ', sql)
+    sql = _STRING_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(?)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+def fingerprint(sql: str) -> str:
+    """Stable short id for a statement's shape, e.g. 'sql:3f2a91c0d4'"""
+    digest = hashlib.sha1(normalize_sql(sql).lower().encode('utf-8')).hexdigest()
+    return f"sql:{digest[:10]}"
+
+def query_name(sql: str) -> str:
+    """Registered query name carried by a BoundQuery, else the SQL fingerprint"""
+    return getattr(sql, 'name', None) or fingerprint(sql)
+
+def page_name(filename: str) -> Optional[str]:
+    """'Home.py' or 'pages/<file>' for a page script path, else None"""
+    path = Path(filename)
+    if path.parent == PAGES_DIR or path == REPO_ROOT / "Home.py":
+        return path.relative_to(REPO_ROOT).as_posix()
+    return None
+
+def calling_page() -> Optional[str]:
+    """Home.py or pages/<file> on the current call stack, if any"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        page = page_name(frame.f_code.co_filename)
+        if page is not None:
+            return page
+        frame = frame.f_back
+    return None
+
+# ============================================
+# HISTOGRAMS
+# ============================================
+
+class LatencyHistogram:
+    """Cumulative latency distribution for one query name"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS_MS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max_ms)
+            seen += count
+        return self.max_ms
+
+    def copy(self) -> 'LatencyHistogram':
+        copy = LatencyHistogram()
+        copy.buckets = list(self.buckets)
+        copy.count = self.count
+        copy.sum_ms = self.sum_ms
+        copy.max_ms = self.max_ms
+        return copy
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum_ms': round(self.sum_ms, 3),
+            'mean_ms': round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50), 3),
+            'p95_ms': round(self.quantile(0.95), 3),
+            'p99_ms': round(self.quantile(0.99), 3),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': dict(zip([str(b) for b in LATENCY_BUCKETS_MS] + ['+Inf'], self.buckets))
+        }
+
+# ============================================
+# EVENTS
+# ============================================
+
+# Cache outcome of the registry lookup wrapping the current query, if any
+_cache_status: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('cache_status', default=None)
+
+# Page set explicitly for queries run off the page's call stack (worker threads)
+_page: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('page', default=None)
+
+_lock = threading.Lock()
+_histograms: Dict[str, LatencyHistogram] = {}
+_cache_counts: Dict[str, Dict[str, int]] = {}
+_recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_EVENTS)
+_subscribers: List[Callable[[Dict[str, Any]], None]] = []
+_slow_log: Optional[logging.Logger] = None
+
+@contextmanager
+def cache_status(status: str):
+    """Mark queries run inside the block as a cache 'hit' or 'miss'"""
+    token = _cache_status.set(status)
+    try:
+        yield
+    finally:
+        _cache_status.reset(token)
+
+@contextmanager
+def on_page(page: Optional[str]):
+    """Attribute queries run inside the block to page instead of the call stack"""
+    token = _page.set(page)
+    try:
+        yield
+    finally:
+        _page.reset(token)
+
+def subscribe(callback: Callable[[Dict[str, Any]], None]):
+    """Call callback(event) for every query event (from the executing thread)"""
+    with _lock:
+        _subscribers.append(callback)
+
+def unsubscribe(callback: Callable[[Dict[str, Any]], None]):
+    with _lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+def _slow_logger() -> logging.Logger:
+    """JSON-lines logger writing to the rotating slow-query log"""
+    global _slow_log
+    if _slow_log is None:
+        SLOW_QUERY_LOG.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(SLOW_QUERY_LOG, maxBytes=SLOW_QUERY_LOG_BYTES,
+                                      backupCount=SLOW_QUERY_LOG_BACKUPS, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger = logging.getLogger('mind.slow_queries')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        _slow_log = logger
+    return _slow_log
+
+def record_query(sql: str, duration_ms: float, rows: Optional[int] = None, nbytes: Optional[int] = None,
+                 pool_wait_ms: Optional[float] = None, kind: str = 'read',
+                 error: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Record one query execution
+
+    Args:
+        sql: The statement (a BoundQuery carries its registered name)
+        duration_ms: Wall time including the pool wait
+        rows: Rows returned (or affected, for writes)
+        nbytes: Approximate result size in bytes
+        pool_wait_ms: Time spent waiting for a pooled connection
+        kind: 'read', 'write' or 'cache' (served from the registry cache)
+        error: Error message when the query failed
+
+    Returns:
+        The event
+    """
+    name = query_name(sql)
+    event = {
+        'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        'name': name,
+        'fingerprint': name if name.startswith('sql:') else fingerprint(sql),
+        'kind': kind,
+        'duration_ms': round(duration_ms, 3),
+        'rows': rows,
+        'bytes': nbytes,
+        'cache': 'hit' if kind == 'cache' else _cache_status.get(),
+        'pool_wait_ms': round(pool_wait_ms, 3) if pool_wait_ms is not None else None,
+        'page': _page.get() or calling_page(),
+        'error': error
+    }
+
+    with _lock:
+        if kind == 'cache':
+            _cache_counts.setdefault(name, {'hits': 0, 'misses': 0})['hits'] += 1
+        else:
+            # Histograms describe executed queries; cache hits are counted instead
+            _histograms.setdefault(name, LatencyHistogram()).observe(duration_ms)
+            if event['cache'] == 'miss':
+                _cache_counts.setdefault(name, {'hits': 0, 'misses': 0})['misses'] += 1
+        _recent.append(event)
+        subscribers = list(_subscribers)
+
+    if duration_ms >= SLOW_QUERY_MS and kind != 'cache':
+        try:
+            _slow_logger().info(json.dumps(dict(event, sql=normalize_sql(sql)), default=str))
+        except OSError:
+            # An unwritable log must not break the dashboard
+            pass
+
+    for callback in subscribers:
+        callback(event)
+    return event
+
+def histograms() -> Dict[str, Dict[str, Any]]:
+    """Latency histogram snapshot per query name, slowest total time first"""
+    with _lock:
+        snapshots = {name: histogram.snapshot() for name, histogram in _histograms.items()}
+    return dict(sorted(snapshots.items(), key=lambda item: item[1]['sum_ms'], reverse=True))
+
+def query_histograms() -> Dict[str, LatencyHistogram]:
+    """Copies of the per-query histograms, by name"""
+    with _lock:
+        return {name: histogram.copy() for name, histogram in sorted(_histograms.items())}
+
+def cache_counts() -> Dict[str, Dict[str, int]]:
+    """Registry cache hits and misses per query name"""
+    with _lock:
+        return {name: dict(counts) for name, counts in sorted(_cache_counts.items())}
+
+def recent_events(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """The most recent events, oldest first"""
+    with _lock:
+        events = list(_recent)
+    return events[-limit:] if limit else events
+
+def reset():
+    """Drop histograms and buffered events"""
+    with _lock:
+        _histograms.clear()
+        _cache_counts.clear()
+        _recent.clear()
+
+def dataframe_bytes(df) -> int:
+    """Shallow in-memory size of a result DataFrame"""
+    return int(df.memory_usage(index=False).sum())
+
+def rows_bytes(rows: List[Dict[str, Any]]) -> int:
+    """Approximate in-memory size of a list-of-dicts result"""
+    return sum(sys.getsizeof(value) for row in rows for value in row.values())
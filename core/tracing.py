@@ -0,0 +1,274 @@
+"""
+Hierarchical tracing for dashboard reruns
+One trace per page rerun: a root span for the rerun, child spans for page
+sections (core/profiling.py) and grandchild spans for queries, registry
+cache lookups and chart builds. The current span lives in a contextvar, so
+work submitted to a thread pool through submit() / bind_context() stays
+inside the span that submitted it.
+
+Finished traces are kept in memory and, with TRACE_EXPORT=1, written to
+TRACE_DIR (default logs/traces/) in the Chrome Trace Event format, which
+chrome://tracing and https://ui.perfetto.dev open offline.
+
+Settings (environment):
+    TRACE_EXPORT    1 to write every finished trace to a file (default 0)
+    TRACE_DIR       directory for trace files (default logs/traces)
+    TRACE_KEEP      trace files kept, oldest deleted first (default 200)
+"""
+
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from core import telemetry
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+TRACE_EXPORT = os.getenv('TRACE_EXPORT', '0').lower() in ('1', 'true', 'yes')
+TRACE_DIR = Path(os.getenv('TRACE_DIR', REPO_ROOT / "logs" / "traces"))
+TRACE_KEEP = int(os.getenv('TRACE_KEEP', 200))
+
+# Finished traces kept in memory for inspection
+RECENT_TRACES = 20
+
+class Span:
+    """One timed operation inside a trace"""
+
+    def __init__(self, trace: 'Trace', name: str, category: str, parent: Optional['Span'],
+                 args: Optional[Dict[str, Any]] = None, start: Optional[float] = None):
+        self.trace = trace
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.args = dict(args or {})
+        self.start = time.perf_counter() if start is None else start
+        self.end: Optional[float] = None
+        self.thread_id = threading.get_ident()
+        self.thread_name = threading.current_thread().name
+        # Context token from open_span(), restored by close_span()
+        self.token = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def finish(self, end: Optional[float] = None):
+        if self.end is None:
+            self.end = time.perf_counter() if end is None else end
+
+class Trace:
+    """Spans recorded for one page rerun"""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = datetime.now()
+        # Wall clock and perf_counter at the same instant, for event timestamps
+        self.epoch_us = time.time() * 1e6
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = self.add(name, 'rerun', None)
+
+    def add(self, name: str, category: str, parent: Optional[Span],
+            args: Optional[Dict[str, Any]] = None, start: Optional[float] = None) -> Span:
+        span = Span(self, name, category, parent, args, start)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """
+        The trace as a Chrome Trace Event document
+
+        Each span is a complete ('X') event; threads are named with
+        metadata ('M') events so pool workers show as their own rows.
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        threads = {}
+        for span in spans:
+            threads.setdefault(span.thread_id, span.thread_name)
+            end = span.end if span.end is not None else self.root.end or time.perf_counter()
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': round(self.epoch_us + (span.start - self.origin) * 1e6, 3),
+                'dur': round((end - span.start) * 1e6, 3),
+                'pid': pid,
+                'tid': span.thread_id,
+                'args': span.args
+            })
+        for thread_id, thread_name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id,
+                           'args': {'name': thread_name}})
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'trace_id': self.trace_id, 'name': self.name,
+                          'started_at': self.started_at.isoformat(timespec='seconds')}
+        }
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('current_span', default=None)
+_recent: Deque[Trace] = deque(maxlen=RECENT_TRACES)
+_recent_lock = threading.Lock()
+
+# ============================================
+# SPANS
+# ============================================
+
+def start_trace(name: str) -> Trace:
+    """Begin a trace for one rerun; its root span becomes the current span"""
+    trace = Trace(name)
+    _current.set(trace.root)
+    return trace
+
+def current_trace() -> Optional[Trace]:
+    span = _current.get()
+    return span.trace if span is not None else None
+
+def end_trace() -> Optional[Trace]:
+    """Finish the current trace, keep it in memory and export it if enabled"""
+    span = _current.get()
+    if span is None:
+        return None
+    trace = span.trace
+    trace.root.finish()
+    _current.set(None)
+    with _recent_lock:
+        _recent.append(trace)
+    if TRACE_EXPORT:
+        try:
+            export(trace)
+        except OSError:
+            # An unwritable trace directory must not break the dashboard
+            pass
+    return trace
+
+@contextmanager
+def span(name: str, category: str = 'function', **args):
+    """
+    Time a block as a child of the current span
+
+    A no-op (yielding None) when no trace is active.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.trace.add(name, category, parent, args)
+    token = _current.set(child)
+    try:
+        yield child
+    finally:
+        child.finish()
+        _current.reset(token)
+
+def open_span(name: str, category: str = 'function', **args) -> Optional[Span]:
+    """Start a child span without a with-block; pair with close_span()"""
+    parent = _current.get()
+    if parent is None:
+        return None
+    child = parent.trace.add(name, category, parent, args)
+    child.token = _current.set(child)
+    return child
+
+def close_span(child: Optional[Span]):
+    """Finish a span started by open_span() and restore its parent"""
+    if child is None or child.end is not None:
+        return
+    child.finish()
+    try:
+        _current.reset(child.token)
+    except ValueError:
+        # Closed from another context than it was opened in
+        _current.set(child.parent)
+
+def record_span(name: str, category: str, duration_ms: float, **args) -> Optional[Span]:
+    """Add an already finished span that ended now, e.g. from a telemetry event"""
+    parent = _current.get()
+    if parent is None:
+        return None
+    end = time.perf_counter()
+    child = parent.trace.add(name, category, parent, args, start=end - duration_ms / 1000)
+    child.finish(end)
+    return child
+
+def _on_query(event: Dict[str, Any]):
+    """Turn executed-query telemetry events into spans (fetch() spans its own cache lookups)"""
+    if event['kind'] == 'cache':
+        return
+    record_span(
+        event['name'],
+        'query',
+        event['duration_ms'],
+        **{key: event[key] for key in ('kind', 'rows', 'bytes', 'cache', 'pool_wait_ms', 'error')
+           if event[key] is not None}
+    )
+
+telemetry.subscribe(_on_query)
+
+# ============================================
+# THREAD POOLS
+# ============================================
+
+def bind_context(fn: Callable) -> Callable:
+    """fn bound to a copy of the caller's context (current span, open sections)"""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+    return run
+
+def submit(executor, fn: Callable, *args, **kwargs):
+    """executor.submit() that keeps fn inside the submitting span"""
+    return executor.submit(bind_context(fn), *args, **kwargs)
+
+# ============================================
+# EXPORT
+# ============================================
+
+def export(trace: Trace, directory: Optional[Path] = None) -> Path:
+    """
+    Write a trace as Chrome Trace Event JSON
+
+    Args:
+        trace: Finished trace
+        directory: Output directory (default TRACE_DIR); the oldest files
+            beyond TRACE_KEEP are deleted
+
+    Returns:
+        Path of the written file
+    """
+    directory = directory or TRACE_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r'[^a-z0-9]+', '_', trace.name.lower()).strip('_')
+    path = directory / f"{trace.started_at:%Y%m%d_%H%M%S_%f}_{slug}_{trace.trace_id[:8]}.json"
+    path.write_text(json.dumps(trace.to_chrome(), default=str), encoding='utf-8')
+
+    files = sorted(directory.glob('*.json'))
+    for old in files[:max(len(files) - TRACE_KEEP, 0)]:
+        old.unlink(missing_ok=True)
+    return path
+
+def recent_traces() -> List[Trace]:
+    """Finished traces kept in memory, oldest first"""
+    with _recent_lock:
+        return list(_recent)
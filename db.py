@@ -3,29 +3,82 @@ Database connection manager for MIND Unified Dashboard
 Handles Neon Postgres connections securely
 """
 
+import contextvars
 import os
+import threading
+import time
+from contextlib import contextmanager
 import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 import streamlit as st
 from typing import List, Dict, Any, Optional
 import pandas as pd
 
+from core import metrics, telemetry
+from core.queries.registry import query_cache
+
+# Query error messages held for the page thread (see collect_errors)
+_held_errors: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar('held_errors', default=None)
+
+@contextmanager
+def collect_errors():
+    """
+    Hold query error messages raised inside the block instead of drawing them
+
+    For queries run off the page thread (core/progressive.py), whose
+    st.error calls would land outside the section that uses the result.
+
+    Yields:
+        List the messages are appended to
+    """
+    errors: List[str] = []
+    token = _held_errors.set(errors)
+    try:
+        yield errors
+    finally:
+        _held_errors.reset(token)
+
+def show_error(message: str):
+    """st.error(message), or hold it inside collect_errors()"""
+    errors = _held_errors.get()
+    if errors is None:
+        st.error(message)
+    else:
+        errors.append(message)
+
 class DatabaseManager:
     """Manages database connections and query execution"""
     
     def __init__(self):
         """Initialize database connection from Streamlit secrets or environment variables"""
         self.connection_params = self._get_connection_params()
-        self.conn = None
+        self.pool = None
+        self.pool_min = int(os.getenv('DB_POOL_MIN', 1))
+        self.pool_size = int(os.getenv('DB_POOL_SIZE', 10))
+        self.pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', 30))
+        # Sessions block here when every pooled connection is checked out
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        # Pool wait of the calling thread's latest checkout, for telemetry
+        self._local = threading.local()
+        self.reset_pool_stats()
+        metrics.track_pool(self)
         
     def _get_connection_params(self) -> Dict[str, str]:
         """
         Get database connection parameters from Streamlit secrets or environment
         
         Priority:
-        1. Streamlit secrets (for deployment)
-        2. Environment variables (for local development)
+        1. DATABASE_URL (how tools/ point the app at a local database)
+        2. Streamlit secrets (for deployment)
+        3. Environment variables (for local development)
         """
+        if os.getenv('DATABASE_URL'):
+            return {'dsn': os.getenv('DATABASE_URL')}
+        
         try:
             # Try Streamlit secrets first
             params = {
@@ -59,15 +112,92 @@ class DatabaseManager:
                 'sslmode': os.getenv('DB_SSLMODE', 'require')
             }
     
-    def get_connection(self):
-        """Get or create database connection"""
+    def _get_pool(self) -> Optional[ThreadedConnectionPool]:
+        """Create the connection pool on first use"""
+        with self._lock:
+            if self.pool is None:
+                try:
+                    self.pool = ThreadedConnectionPool(self.pool_min, self.pool_size, **self.connection_params)
+                except psycopg2.Error as e:
+                    show_error(f"Database connection error: {e}")
+                    return None
+            return self.pool
+    
+    @contextmanager
+    def connection(self):
+        """
+        Check a connection out of the pool for the duration of a block
+        
+        Waits up to pool_timeout seconds when every connection is in use.
+        The connection is rolled back to idle before it goes back.
+        
+        Yields:
+            psycopg2 connection, or None if none could be obtained
+        """
+        started = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['waits'] += 1
+            if not self._slots.acquire(timeout=self.pool_timeout):
+                self._local.wait_ms = self.pool_timeout * 1000
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                show_error(f"Database busy: no connection free after {self.pool_timeout:g}s")
+                yield None
+                return
+        
+        wait_ms = (time.perf_counter() - started) * 1000
+        self._local.wait_ms = wait_ms
+        with self._lock:
+            self._in_use += 1
+            self._stats['checkouts'] += 1
+            self._stats['wait_ms'] += wait_ms
+            self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], wait_ms)
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._in_use)
+        
+        pool = self._get_pool()
+        conn = None
         try:
-            if self.conn is None or self.conn.closed:
-                self.conn = psycopg2.connect(**self.connection_params)
-            return self.conn
-        except psycopg2.Error as e:
-            st.error(f"Database connection error: {e}")
-            return None
+            if pool is not None:
+                try:
+                    conn = pool.getconn()
+                except psycopg2.Error as e:
+                    show_error(f"Database connection error: {e}")
+            yield conn
+        finally:
+            if conn is not None:
+                if not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    try:
+                        conn.rollback()
+                    except psycopg2.Error:
+                        pass
+                pool.putconn(conn, close=bool(conn.closed))
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Connection pool counters since the last reset_pool_stats()
+        
+        Returns:
+            size, in_use, peak_in_use, checkouts, waits (checkouts that had
+            to wait for a free connection), wait_ms, max_wait_ms and timeouts
+        """
+        with self._lock:
+            return dict(self._stats, size=self.pool_size, in_use=self._in_use)
+    
+    def reset_pool_stats(self):
+        """Zero the pool counters (connections currently in use still count)"""
+        with self._lock:
+            self._stats = {
+                'peak_in_use': self._in_use,
+                'checkouts': 0,
+                'waits': 0,
+                'wait_ms': 0.0,
+                'max_wait_ms': 0.0,
+                'timeouts': 0
+            }
     
     def execute_query(self, query: str, params: tuple = None) -> Optional[List[Dict[str, Any]]]:
         """
@@ -75,25 +205,37 @@ class DatabaseManager:
         
         Args:
             query: SQL query string
-            params: Query parameters (for parameterized queries)
+            params: Query parameters (for parameterized queries); defaults
+                to the params carried by a BoundQuery
             
         Returns:
             List of dictionaries with query results, or None if error
         """
+        if params is None:
+            params = getattr(query, 'params', None)
+        
+        started = time.perf_counter()
+        rows = error = None
         try:
-            conn = self.get_connection()
-            if conn is None:
-                return None
-                
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query, params)
-                results = cursor.fetchall()
-                # Convert RealDictRow to regular dict
-                return [dict(row) for row in results]
+            with self.connection() as conn:
+                if conn is None:
+                    error = "no connection"
+                    return None
+                    
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
+                    # Convert RealDictRow to regular dict
+                    rows = [dict(row) for row in results]
+                    return rows
                 
         except psycopg2.Error as e:
-            st.error(f"Query execution error: {e}")
+            error = str(e)
+            show_error(f"Query execution error: {e}")
             return None
+        finally:
+            self._record(query, started, rows=len(rows) if rows is not None else None,
+                         nbytes=telemetry.rows_bytes(rows) if rows is not None else None, error=error)
     
     def execute_query_df(self, query: str, params: tuple = None) -> Optional[pd.DataFrame]:
         """
@@ -101,22 +243,33 @@ class DatabaseManager:
         
         Args:
             query: SQL query string
-            params: Query parameters
+            params: Query parameters; defaults to the params carried by a
+                BoundQuery
             
         Returns:
             pandas DataFrame with query results, or empty DataFrame if error
         """
+        if params is None:
+            params = getattr(query, 'params', None)
+        
+        started = time.perf_counter()
+        df = error = None
         try:
-            conn = self.get_connection()
-            if conn is None:
-                return pd.DataFrame()
-                
-            df = pd.read_sql_query(query, conn, params=params)
-            return df
+            with self.connection() as conn:
+                if conn is None:
+                    error = "no connection"
+                    return pd.DataFrame()
+                    
+                df = pd.read_sql_query(query, conn, params=params)
+                return df
             
         except (psycopg2.Error, pd.io.sql.DatabaseError) as e:
-            st.error(f"Query execution error: {e}")
+            error = str(e)
+            show_error(f"Query execution error: {e}")
             return pd.DataFrame()
+        finally:
+            self._record(query, started, rows=len(df) if df is not None else None,
+                         nbytes=telemetry.dataframe_bytes(df) if df is not None else None, error=error)
     
     def execute_write(self, query: str, params: tuple = None) -> bool:
         """
@@ -129,41 +282,57 @@ class DatabaseManager:
         Returns:
             True if successful, False otherwise
         """
+        started = time.perf_counter()
+        rows = error = None
         try:
-            conn = self.get_connection()
-            if conn is None:
-                return False
-                
-            with conn.cursor() as cursor:
-                cursor.execute(query, params)
-                conn.commit()
-                return True
+            with self.connection() as conn:
+                if conn is None:
+                    error = "no connection"
+                    return False
+                    
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    rows = cursor.rowcount
+                    conn.commit()
+            # Cached dashboard results that read the written tables are stale
+            query_cache.invalidate_for_write(query)
+            return True
                 
         except psycopg2.Error as e:
-            st.error(f"Write operation error: {e}")
-            if self.conn:
-                self.conn.rollback()
+            # The failed transaction is rolled back as the connection returns to the pool
+            error = str(e)
+            show_error(f"Write operation error: {e}")
             return False
+        finally:
+            self._record(query, started, rows=rows, kind='write', error=error)
+    
+    def _record(self, query: str, started: float, kind: str = 'read', **details):
+        """Emit the telemetry event for one execution (see core/telemetry.py)"""
+        telemetry.record_query(query, (time.perf_counter() - started) * 1000,
+                               pool_wait_ms=getattr(self._local, 'wait_ms', None), kind=kind, **details)
+        self._local.wait_ms = None
     
     def test_connection(self) -> bool:
         """Test database connection"""
         try:
-            conn = self.get_connection()
-            if conn is None:
-                return False
-                
-            with conn.cursor() as cursor:
-                cursor.execute("SELECT 1;")
-                result = cursor.fetchone()
-                return result[0] == 1
+            with self.connection() as conn:
+                if conn is None:
+                    return False
+                    
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1;")
+                    result = cursor.fetchone()
+                    return result[0] == 1
                 
         except psycopg2.Error:
             return False
     
     def close(self):
-        """Close database connection"""
-        if self.conn and not self.conn.closed:
-            self.conn.close()
+        """Close every pooled database connection"""
+        with self._lock:
+            if self.pool is not None and not self.pool.closed:
+                self.pool.closeall()
+            self.pool = None
 
 
 # Global database manager instance
@@ -0,0 +1,94 @@
+-- ============================================================================
+-- MIND Unified Dashboard - base schema
+--
+-- The eight tables the dashboards read. Rollups, indexes and partitioning
+-- are layered on top by migrations/ (python -m tools.migrate).
+--
+-- For a synthetic local dataset, create this schema, load it with
+-- tools/generate_data.py, then apply the migrations so the rollups are
+-- backfilled once instead of maintained row by row during the load.
+--
+-- Safe to re-run: every table is created with IF NOT EXISTS.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS students (
+    student_id          VARCHAR(50)  PRIMARY KEY,
+    name                TEXT         NOT NULL,
+    cohort_id           VARCHAR(50),
+    department          TEXT,
+    campus              TEXT,
+    role                TEXT         DEFAULT 'Student'
+);
+
+CREATE TABLE IF NOT EXISTS case_studies (
+    case_id             VARCHAR(50)  PRIMARY KEY,
+    title               TEXT         NOT NULL,
+    description         TEXT,
+    difficulty          TEXT
+);
+
+CREATE TABLE IF NOT EXISTS attempts (
+    attempt_id          VARCHAR(100) PRIMARY KEY,
+    student_id          VARCHAR(50)  REFERENCES students (student_id),
+    case_id             VARCHAR(50)  REFERENCES case_studies (case_id),
+    attempt_number      SMALLINT     CHECK (attempt_number IN (1, 2)),
+    score               SMALLINT     CHECK (score BETWEEN 0 AND 100),
+    duration_seconds    INTEGER,
+    ces_value           SMALLINT     CHECK (ces_value BETWEEN 0 AND 100),
+    timestamp           TIMESTAMPTZ,
+    state               TEXT
+);
+
+CREATE TABLE IF NOT EXISTS rubric_scores (
+    rubric_score_id     VARCHAR(150) PRIMARY KEY,
+    attempt_id          VARCHAR(100) REFERENCES attempts (attempt_id),
+    rubric_dimension    TEXT,
+    score               SMALLINT     CHECK (score BETWEEN 0 AND 100),
+    max_score           SMALLINT,
+    comment             TEXT,
+    improvement_flag    BOOLEAN
+);
+
+CREATE TABLE IF NOT EXISTS engagement_logs (
+    session_id          VARCHAR(100),
+    student_id          VARCHAR(50)  REFERENCES students (student_id),
+    case_id             VARCHAR(50)  REFERENCES case_studies (case_id),
+    attempt_id          VARCHAR(100) REFERENCES attempts (attempt_id),
+    timestamp           TIMESTAMPTZ,
+    action_type         TEXT,
+    duration_seconds    INTEGER,
+    session_phase       TEXT
+);
+
+CREATE TABLE IF NOT EXISTS environment_metrics (
+    attempt_id                  VARCHAR(100) PRIMARY KEY REFERENCES attempts (attempt_id),
+    student_id                  VARCHAR(50)  REFERENCES students (student_id),
+    case_id                     VARCHAR(50)  REFERENCES case_studies (case_id),
+    noise_level                 SMALLINT     CHECK (noise_level BETWEEN 0 AND 120),
+    noise_quality_index         SMALLINT     CHECK (noise_quality_index BETWEEN 0 AND 100),
+    internet_latency_ms         INTEGER,
+    internet_stability_score    SMALLINT     CHECK (internet_stability_score BETWEEN 0 AND 100),
+    connection_drops            INTEGER,
+    device_type                 TEXT,
+    microphone_type             TEXT,
+    signal_strength             TEXT
+);
+
+CREATE TABLE IF NOT EXISTS system_reliability (
+    record_id           VARCHAR(50)  PRIMARY KEY,
+    api_name            TEXT,
+    latency_ms          INTEGER,
+    error_rate          NUMERIC(6,3),
+    reliability_index   NUMERIC(5,2) CHECK (reliability_index BETWEEN 0 AND 100),
+    timestamp           TIMESTAMPTZ,
+    location            TEXT,
+    severity            TEXT         CHECK (severity IN ('Info', 'Warning', 'Critical'))
+);
+
+CREATE TABLE IF NOT EXISTS admin_aggregates (
+    metric_id           VARCHAR(50)  PRIMARY KEY,
+    metric_name         TEXT         NOT NULL,
+    metric_value        NUMERIC,
+    timestamp           TIMESTAMPTZ  DEFAULT NOW(),
+    description         TEXT
+);
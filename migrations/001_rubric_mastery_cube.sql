@@ -0,0 +1,311 @@
+-- ============================================================================
+-- 001 - Rubric mastery cube
+--
+-- Maintained sum/count rollup of rubric_scores by
+-- dimension x case x cohort x department x campus x role x day, plus a
+-- per-student x dimension companion table for the Student Dashboard.
+-- Both are kept current by statement-level triggers on rubric_scores and can
+-- be rebuilt at any time with SELECT refresh_rubric_mastery_cube();
+-- Rubric rows without a dimension, or whose attempt has no timestamp (cube)
+-- or no student_id (per-student table), are left out of the rollups.
+--
+-- Safe to re-run: every object is created with IF NOT EXISTS / OR REPLACE.
+-- ============================================================================
+
+-- Day bucket used by every rollup. Kept in one place so the dashboard and the
+-- triggers always agree on where a day starts.
+CREATE OR REPLACE FUNCTION mind_local_date(ts TIMESTAMPTZ)
+RETURNS DATE
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT (ts AT TIME ZONE 'UTC')::DATE
+$$;
+
+CREATE TABLE IF NOT EXISTS rubric_mastery_cube (
+    rubric_dimension  TEXT         NOT NULL,
+    case_id           VARCHAR(50)  NOT NULL DEFAULT '',
+    cohort_id         VARCHAR(50)  NOT NULL DEFAULT '',
+    department        TEXT         NOT NULL DEFAULT '',
+    campus            TEXT         NOT NULL DEFAULT '',
+    role              TEXT         NOT NULL DEFAULT '',
+    day               DATE         NOT NULL,
+    score_count       BIGINT       NOT NULL DEFAULT 0,   -- all rubric rows
+    pct_count         BIGINT       NOT NULL DEFAULT 0,   -- rows with a usable max_score
+    pct_sum           NUMERIC      NOT NULL DEFAULT 0,   -- SUM(score / max_score)
+    score_sum         NUMERIC      NOT NULL DEFAULT 0,
+    max_score_sum     NUMERIC      NOT NULL DEFAULT 0,
+    improvement_count BIGINT       NOT NULL DEFAULT 0,
+    min_pct           NUMERIC,                           -- insert-only, exact after refresh
+    max_pct           NUMERIC,                           -- insert-only, exact after refresh
+    PRIMARY KEY (rubric_dimension, case_id, cohort_id, department, campus, role, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rubric_mastery_cube_day
+    ON rubric_mastery_cube (day);
+CREATE INDEX IF NOT EXISTS idx_rubric_mastery_cube_cohort_day
+    ON rubric_mastery_cube (cohort_id, day);
+CREATE INDEX IF NOT EXISTS idx_rubric_mastery_cube_case
+    ON rubric_mastery_cube (case_id, rubric_dimension);
+
+CREATE TABLE IF NOT EXISTS rubric_mastery_by_student (
+    student_id        VARCHAR(50)  NOT NULL,
+    rubric_dimension  TEXT         NOT NULL,
+    score_count       BIGINT       NOT NULL DEFAULT 0,
+    pct_count         BIGINT       NOT NULL DEFAULT 0,
+    pct_sum           NUMERIC      NOT NULL DEFAULT 0,
+    score_sum         NUMERIC      NOT NULL DEFAULT 0,
+    max_score_sum     NUMERIC      NOT NULL DEFAULT 0,
+    improvement_count BIGINT       NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, rubric_dimension)
+);
+
+-- ----------------------------------------------------------------------------
+-- Incremental maintenance
+-- ----------------------------------------------------------------------------
+
+-- Dimension attributes are taken from attempts/students at the time the
+-- rubric rows are written. Deleting an attempt with cascading rubric rows, or
+-- moving a student between cohorts, is only reflected after a refresh.
+CREATE OR REPLACE FUNCTION rubric_mastery_cube_maintain()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    -- Rows this statement emptied; only these are deleted (by primary key)
+    emptied_cube     rubric_mastery_cube[];
+    emptied_students rubric_mastery_by_student[];
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        WITH changed AS (
+            UPDATE rubric_mastery_cube c
+            SET score_count       = c.score_count - d.score_count,
+                pct_count         = c.pct_count - d.pct_count,
+                pct_sum           = c.pct_sum - d.pct_sum,
+                score_sum         = c.score_sum - d.score_sum,
+                max_score_sum     = c.max_score_sum - d.max_score_sum,
+                improvement_count = c.improvement_count - d.improvement_count
+            FROM (
+                SELECT
+                    o.rubric_dimension,
+                    COALESCE(a.case_id, '') as case_id,
+                    COALESCE(s.cohort_id, '') as cohort_id,
+                    COALESCE(s.department, '') as department,
+                    COALESCE(s.campus, '') as campus,
+                    COALESCE(s.role, '') as role,
+                    mind_local_date(a.timestamp) as day,
+                    COUNT(*) as score_count,
+                    COUNT(o.score::NUMERIC / NULLIF(o.max_score, 0)) as pct_count,
+                    COALESCE(SUM(o.score::NUMERIC / NULLIF(o.max_score, 0)), 0) as pct_sum,
+                    COALESCE(SUM(o.score), 0) as score_sum,
+                    COALESCE(SUM(o.max_score), 0) as max_score_sum,
+                    COUNT(*) FILTER (WHERE o.improvement_flag) as improvement_count
+                FROM old_rows o
+                INNER JOIN attempts a ON o.attempt_id = a.attempt_id
+                LEFT JOIN students s ON a.student_id = s.student_id
+                GROUP BY 1, 2, 3, 4, 5, 6, 7
+            ) d
+            WHERE c.rubric_dimension = d.rubric_dimension
+            AND c.case_id = d.case_id
+            AND c.cohort_id = d.cohort_id
+            AND c.department = d.department
+            AND c.campus = d.campus
+            AND c.role = d.role
+            AND c.day = d.day
+            RETURNING c
+        )
+        SELECT array_agg(changed.c) FILTER (WHERE (changed.c).score_count <= 0)
+        INTO emptied_cube
+        FROM changed;
+
+        WITH changed AS (
+            UPDATE rubric_mastery_by_student m
+            SET score_count       = m.score_count - d.score_count,
+                pct_count         = m.pct_count - d.pct_count,
+                pct_sum           = m.pct_sum - d.pct_sum,
+                score_sum         = m.score_sum - d.score_sum,
+                max_score_sum     = m.max_score_sum - d.max_score_sum,
+                improvement_count = m.improvement_count - d.improvement_count
+            FROM (
+                SELECT
+                    a.student_id,
+                    o.rubric_dimension,
+                    COUNT(*) as score_count,
+                    COUNT(o.score::NUMERIC / NULLIF(o.max_score, 0)) as pct_count,
+                    COALESCE(SUM(o.score::NUMERIC / NULLIF(o.max_score, 0)), 0) as pct_sum,
+                    COALESCE(SUM(o.score), 0) as score_sum,
+                    COALESCE(SUM(o.max_score), 0) as max_score_sum,
+                    COUNT(*) FILTER (WHERE o.improvement_flag) as improvement_count
+                FROM old_rows o
+                INNER JOIN attempts a ON o.attempt_id = a.attempt_id
+                GROUP BY 1, 2
+            ) d
+            WHERE m.student_id = d.student_id
+            AND m.rubric_dimension = d.rubric_dimension
+            RETURNING m
+        )
+        SELECT array_agg(changed.m) FILTER (WHERE (changed.m).score_count <= 0)
+        INTO emptied_students
+        FROM changed;
+
+        DELETE FROM rubric_mastery_cube c
+        USING unnest(emptied_cube) e
+        WHERE c.rubric_dimension = e.rubric_dimension
+        AND c.case_id = e.case_id
+        AND c.cohort_id = e.cohort_id
+        AND c.department = e.department
+        AND c.campus = e.campus
+        AND c.role = e.role
+        AND c.day = e.day;
+
+        DELETE FROM rubric_mastery_by_student m
+        USING unnest(emptied_students) e
+        WHERE m.student_id = e.student_id
+        AND m.rubric_dimension = e.rubric_dimension;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO rubric_mastery_cube AS c (
+            rubric_dimension, case_id, cohort_id, department, campus, role, day,
+            score_count, pct_count, pct_sum, score_sum, max_score_sum,
+            improvement_count, min_pct, max_pct
+        )
+        SELECT
+            n.rubric_dimension,
+            COALESCE(a.case_id, ''),
+            COALESCE(s.cohort_id, ''),
+            COALESCE(s.department, ''),
+            COALESCE(s.campus, ''),
+            COALESCE(s.role, ''),
+            mind_local_date(a.timestamp),
+            COUNT(*),
+            COUNT(n.score::NUMERIC / NULLIF(n.max_score, 0)),
+            COALESCE(SUM(n.score::NUMERIC / NULLIF(n.max_score, 0)), 0),
+            COALESCE(SUM(n.score), 0),
+            COALESCE(SUM(n.max_score), 0),
+            COUNT(*) FILTER (WHERE n.improvement_flag),
+            MIN(n.score::NUMERIC / NULLIF(n.max_score, 0)),
+            MAX(n.score::NUMERIC / NULLIF(n.max_score, 0))
+        FROM new_rows n
+        INNER JOIN attempts a ON n.attempt_id = a.attempt_id
+        LEFT JOIN students s ON a.student_id = s.student_id
+        WHERE a.timestamp IS NOT NULL AND n.rubric_dimension IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5, 6, 7
+        ON CONFLICT (rubric_dimension, case_id, cohort_id, department, campus, role, day)
+        DO UPDATE SET
+            score_count       = c.score_count + EXCLUDED.score_count,
+            pct_count         = c.pct_count + EXCLUDED.pct_count,
+            pct_sum           = c.pct_sum + EXCLUDED.pct_sum,
+            score_sum         = c.score_sum + EXCLUDED.score_sum,
+            max_score_sum     = c.max_score_sum + EXCLUDED.max_score_sum,
+            improvement_count = c.improvement_count + EXCLUDED.improvement_count,
+            min_pct           = LEAST(c.min_pct, EXCLUDED.min_pct),
+            max_pct           = GREATEST(c.max_pct, EXCLUDED.max_pct);
+
+        INSERT INTO rubric_mastery_by_student AS m (
+            student_id, rubric_dimension,
+            score_count, pct_count, pct_sum, score_sum, max_score_sum,
+            improvement_count
+        )
+        SELECT
+            a.student_id,
+            n.rubric_dimension,
+            COUNT(*),
+            COUNT(n.score::NUMERIC / NULLIF(n.max_score, 0)),
+            COALESCE(SUM(n.score::NUMERIC / NULLIF(n.max_score, 0)), 0),
+            COALESCE(SUM(n.score), 0),
+            COALESCE(SUM(n.max_score), 0),
+            COUNT(*) FILTER (WHERE n.improvement_flag)
+        FROM new_rows n
+        INNER JOIN attempts a ON n.attempt_id = a.attempt_id
+        WHERE a.student_id IS NOT NULL AND n.rubric_dimension IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT (student_id, rubric_dimension)
+        DO UPDATE SET
+            score_count       = m.score_count + EXCLUDED.score_count,
+            pct_count         = m.pct_count + EXCLUDED.pct_count,
+            pct_sum           = m.pct_sum + EXCLUDED.pct_sum,
+            score_sum         = m.score_sum + EXCLUDED.score_sum,
+            max_score_sum     = m.max_score_sum + EXCLUDED.max_score_sum,
+            improvement_count = m.improvement_count + EXCLUDED.improvement_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+-- Transition tables allow only one event per trigger, hence three triggers.
+DROP TRIGGER IF EXISTS trg_rubric_mastery_cube_insert ON rubric_scores;
+CREATE TRIGGER trg_rubric_mastery_cube_insert
+    AFTER INSERT ON rubric_scores
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION rubric_mastery_cube_maintain();
+
+DROP TRIGGER IF EXISTS trg_rubric_mastery_cube_update ON rubric_scores;
+CREATE TRIGGER trg_rubric_mastery_cube_update
+    AFTER UPDATE ON rubric_scores
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION rubric_mastery_cube_maintain();
+
+DROP TRIGGER IF EXISTS trg_rubric_mastery_cube_delete ON rubric_scores;
+CREATE TRIGGER trg_rubric_mastery_cube_delete
+    AFTER DELETE ON rubric_scores
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION rubric_mastery_cube_maintain();
+
+-- ----------------------------------------------------------------------------
+-- Full rebuild (backfill, or after cohort moves / cascading deletes)
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION refresh_rubric_mastery_cube()
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    TRUNCATE rubric_mastery_cube, rubric_mastery_by_student;
+
+    INSERT INTO rubric_mastery_cube (
+        rubric_dimension, case_id, cohort_id, department, campus, role, day,
+        score_count, pct_count, pct_sum, score_sum, max_score_sum,
+        improvement_count, min_pct, max_pct
+    )
+    SELECT
+        rs.rubric_dimension,
+        COALESCE(a.case_id, ''),
+        COALESCE(s.cohort_id, ''),
+        COALESCE(s.department, ''),
+        COALESCE(s.campus, ''),
+        COALESCE(s.role, ''),
+        mind_local_date(a.timestamp),
+        COUNT(*),
+        COUNT(rs.score::NUMERIC / NULLIF(rs.max_score, 0)),
+        COALESCE(SUM(rs.score::NUMERIC / NULLIF(rs.max_score, 0)), 0),
+        COALESCE(SUM(rs.score), 0),
+        COALESCE(SUM(rs.max_score), 0),
+        COUNT(*) FILTER (WHERE rs.improvement_flag),
+        MIN(rs.score::NUMERIC / NULLIF(rs.max_score, 0)),
+        MAX(rs.score::NUMERIC / NULLIF(rs.max_score, 0))
+    FROM rubric_scores rs
+    INNER JOIN attempts a ON rs.attempt_id = a.attempt_id
+    LEFT JOIN students s ON a.student_id = s.student_id
+    WHERE a.timestamp IS NOT NULL AND rs.rubric_dimension IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5, 6, 7;
+
+    INSERT INTO rubric_mastery_by_student (
+        student_id, rubric_dimension,
+        score_count, pct_count, pct_sum, score_sum, max_score_sum,
+        improvement_count
+    )
+    SELECT
+        a.student_id,
+        rs.rubric_dimension,
+        COUNT(*),
+        COUNT(rs.score::NUMERIC / NULLIF(rs.max_score, 0)),
+        COALESCE(SUM(rs.score::NUMERIC / NULLIF(rs.max_score, 0)), 0),
+        COALESCE(SUM(rs.score), 0),
+        COALESCE(SUM(rs.max_score), 0),
+        COUNT(*) FILTER (WHERE rs.improvement_flag)
+    FROM rubric_scores rs
+    INNER JOIN attempts a ON rs.attempt_id = a.attempt_id
+    WHERE a.student_id IS NOT NULL AND rs.rubric_dimension IS NOT NULL
+    GROUP BY 1, 2;
+END;
+$$;
+
+SELECT refresh_rubric_mastery_cube();
@@ -0,0 +1,152 @@
+-- ============================================================================
+-- 002 - Attempt 1 -> attempt 2 improvement table
+--
+-- One row per (student, case) holding the first- and second-attempt scores
+-- and timestamps, replacing the attempts self-join / MAX(CASE ...) pivots.
+-- Rows are recomputed from attempts for just the (student, case) pairs that a
+-- statement touches, so inserts, corrections and deletes all stay exact.
+-- Attempts missing a student_id or case_id have no pair and are skipped.
+--
+-- Safe to re-run: every object is created with IF NOT EXISTS / OR REPLACE.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS attempt_improvements (
+    student_id      VARCHAR(50)  NOT NULL,
+    case_id         VARCHAR(50)  NOT NULL,
+    attempt1_score  NUMERIC,
+    attempt2_score  NUMERIC,
+    attempt1_at     TIMESTAMPTZ,
+    attempt2_at     TIMESTAMPTZ,
+    improvement     NUMERIC GENERATED ALWAYS AS (attempt2_score - attempt1_score) STORED,
+    PRIMARY KEY (student_id, case_id)
+);
+
+-- Pairs with a second attempt are what every improvement stat aggregates over.
+CREATE INDEX IF NOT EXISTS idx_attempt_improvements_paired_case
+    ON attempt_improvements (case_id)
+    WHERE attempt1_at IS NOT NULL AND attempt2_at IS NOT NULL;
+
+-- ----------------------------------------------------------------------------
+-- Incremental maintenance
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION refresh_attempt_improvements_for(
+    p_student_ids TEXT[],
+    p_case_ids    TEXT[]
+)
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM attempt_improvements ai
+    USING unnest(p_student_ids, p_case_ids) AS k(student_id, case_id)
+    WHERE ai.student_id = k.student_id
+    AND ai.case_id = k.case_id;
+
+    INSERT INTO attempt_improvements (
+        student_id, case_id, attempt1_score, attempt2_score, attempt1_at, attempt2_at
+    )
+    SELECT
+        a.student_id,
+        a.case_id,
+        MAX(a.score) FILTER (WHERE a.attempt_number = 1),
+        MAX(a.score) FILTER (WHERE a.attempt_number = 2),
+        MAX(a.timestamp) FILTER (WHERE a.attempt_number = 1),
+        MAX(a.timestamp) FILTER (WHERE a.attempt_number = 2)
+    FROM attempts a
+    INNER JOIN (
+        SELECT DISTINCT student_id, case_id
+        FROM unnest(p_student_ids, p_case_ids) AS k(student_id, case_id)
+    ) k ON a.student_id = k.student_id AND a.case_id = k.case_id
+    WHERE a.attempt_number IN (1, 2)
+    GROUP BY a.student_id, a.case_id;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION attempt_improvements_maintain()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_attempt_improvements_for(
+            ARRAY(
+                SELECT student_id FROM old_rows
+                WHERE attempt_number IN (1, 2)
+                AND student_id IS NOT NULL AND case_id IS NOT NULL
+                ORDER BY student_id, case_id
+            ),
+            ARRAY(
+                SELECT case_id FROM old_rows
+                WHERE attempt_number IN (1, 2)
+                AND student_id IS NOT NULL AND case_id IS NOT NULL
+                ORDER BY student_id, case_id
+            )
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_attempt_improvements_for(
+            ARRAY(
+                SELECT student_id FROM new_rows
+                WHERE attempt_number IN (1, 2)
+                AND student_id IS NOT NULL AND case_id IS NOT NULL
+                ORDER BY student_id, case_id
+            ),
+            ARRAY(
+                SELECT case_id FROM new_rows
+                WHERE attempt_number IN (1, 2)
+                AND student_id IS NOT NULL AND case_id IS NOT NULL
+                ORDER BY student_id, case_id
+            )
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_attempt_improvements_insert ON attempts;
+CREATE TRIGGER trg_attempt_improvements_insert
+    AFTER INSERT ON attempts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attempt_improvements_maintain();
+
+DROP TRIGGER IF EXISTS trg_attempt_improvements_update ON attempts;
+CREATE TRIGGER trg_attempt_improvements_update
+    AFTER UPDATE ON attempts
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attempt_improvements_maintain();
+
+DROP TRIGGER IF EXISTS trg_attempt_improvements_delete ON attempts;
+CREATE TRIGGER trg_attempt_improvements_delete
+    AFTER DELETE ON attempts
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attempt_improvements_maintain();
+
+-- ----------------------------------------------------------------------------
+-- Full rebuild
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION refresh_attempt_improvements()
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    TRUNCATE attempt_improvements;
+
+    INSERT INTO attempt_improvements (
+        student_id, case_id, attempt1_score, attempt2_score, attempt1_at, attempt2_at
+    )
+    SELECT
+        student_id,
+        case_id,
+        MAX(score) FILTER (WHERE attempt_number = 1),
+        MAX(score) FILTER (WHERE attempt_number = 2),
+        MAX(timestamp) FILTER (WHERE attempt_number = 1),
+        MAX(timestamp) FILTER (WHERE attempt_number = 2)
+    FROM attempts
+    WHERE attempt_number IN (1, 2)
+    AND student_id IS NOT NULL AND case_id IS NOT NULL
+    GROUP BY student_id, case_id;
+END;
+$$;
+
+SELECT refresh_attempt_improvements();
@@ -0,0 +1,333 @@
+-- ============================================================================
+-- 003 - Per-student snapshot for the Student Dashboard KPI strip
+--
+-- One row per student holding every KPI tile value, so the strip loads with a
+-- single primary-key lookup. Each source table only refreshes the columns it
+-- feeds:
+--   attempts         -> attempt KPIs, recomputed for the touched students
+--   rubric_scores    -> rubric mastery, read from rubric_mastery_by_student (001)
+--   engagement_logs  -> active days / engagement time, applied as deltas on
+--                       insert and recomputed on update or delete; 004
+--                       replaces this with a locked recompute from
+--                       engagement_daily
+--
+-- Rows without a student_id have no snapshot and are skipped everywhere.
+--
+-- Requires 001 (mind_local_date, rubric_mastery_by_student).
+-- Safe to re-run: every object is created with IF NOT EXISTS / OR REPLACE.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS student_snapshots (
+    student_id                VARCHAR(50)  PRIMARY KEY,
+    total_attempts            INTEGER      NOT NULL DEFAULT 0,
+    total_cases_attempted     INTEGER      NOT NULL DEFAULT 0,
+    avg_score                 NUMERIC,     -- latest attempt per case
+    avg_duration              NUMERIC,     -- latest attempt per case
+    avg_ces                   NUMERIC,     -- latest attempt per case
+    min_score                 NUMERIC,     -- latest attempt per case
+    max_score                 NUMERIC,     -- latest attempt per case
+    last_attempt_at           TIMESTAMPTZ,
+    active_days               INTEGER      NOT NULL DEFAULT 0,
+    total_engagement_seconds  BIGINT       NOT NULL DEFAULT 0,
+    last_activity_at          TIMESTAMPTZ,
+    rubric_mastery            NUMERIC,     -- mean of per-dimension mastery %
+    updated_at                TIMESTAMPTZ  NOT NULL DEFAULT NOW()
+);
+
+-- First instant of a mind_local_date() day, for index-friendly range scans.
+CREATE OR REPLACE FUNCTION mind_day_start(day DATE)
+RETURNS TIMESTAMPTZ
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT day::TIMESTAMP AT TIME ZONE 'UTC'
+$$;
+
+-- ----------------------------------------------------------------------------
+-- Per-source refresh functions (upsert only the columns each source feeds)
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION refresh_student_snapshot_attempts(p_student_ids TEXT[])
+RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO student_snapshots AS ss (
+        student_id, total_attempts, total_cases_attempted, avg_score, avg_duration,
+        avg_ces, min_score, max_score, last_attempt_at, updated_at
+    )
+    SELECT
+        k.student_id,
+        totals.total_attempts,
+        latest.total_cases,
+        latest.avg_score,
+        latest.avg_duration,
+        latest.avg_ces,
+        latest.min_score,
+        latest.max_score,
+        totals.last_attempt_at,
+        NOW()
+    FROM (SELECT DISTINCT unnest(p_student_ids) AS student_id) k
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*) as total_attempts, MAX(a.timestamp) as last_attempt_at
+        FROM attempts a
+        WHERE a.student_id = k.student_id
+    ) totals
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(*) as total_cases,
+            AVG(la.score) as avg_score,
+            AVG(la.duration_seconds) as avg_duration,
+            AVG(la.ces_value) as avg_ces,
+            MIN(la.score) as min_score,
+            MAX(la.score) as max_score
+        FROM (
+            SELECT DISTINCT ON (a.case_id) a.score, a.duration_seconds, a.ces_value
+            FROM attempts a
+            WHERE a.student_id = k.student_id
+            ORDER BY a.case_id, a.attempt_number DESC, a.timestamp DESC
+        ) la
+    ) latest
+    ON CONFLICT (student_id) DO UPDATE SET
+        total_attempts        = EXCLUDED.total_attempts,
+        total_cases_attempted = EXCLUDED.total_cases_attempted,
+        avg_score             = EXCLUDED.avg_score,
+        avg_duration          = EXCLUDED.avg_duration,
+        avg_ces               = EXCLUDED.avg_ces,
+        min_score             = EXCLUDED.min_score,
+        max_score             = EXCLUDED.max_score,
+        last_attempt_at       = EXCLUDED.last_attempt_at,
+        updated_at            = EXCLUDED.updated_at;
+$$;
+
+CREATE OR REPLACE FUNCTION refresh_student_snapshot_rubric(p_student_ids TEXT[])
+RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO student_snapshots AS ss (student_id, rubric_mastery, updated_at)
+    SELECT
+        k.student_id,
+        (
+            SELECT AVG(ROUND(ms.pct_sum / NULLIF(ms.pct_count, 0) * 100, 2))
+            FROM rubric_mastery_by_student ms
+            WHERE ms.student_id = k.student_id
+        ),
+        NOW()
+    FROM (SELECT DISTINCT unnest(p_student_ids) AS student_id) k
+    ON CONFLICT (student_id) DO UPDATE SET
+        rubric_mastery = EXCLUDED.rubric_mastery,
+        updated_at     = EXCLUDED.updated_at;
+$$;
+
+CREATE OR REPLACE FUNCTION refresh_student_snapshot_engagement(p_student_ids TEXT[])
+RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO student_snapshots AS ss (
+        student_id, active_days, total_engagement_seconds, last_activity_at, updated_at
+    )
+    SELECT
+        k.student_id,
+        eng.active_days,
+        eng.total_seconds,
+        eng.last_activity_at,
+        NOW()
+    FROM (SELECT DISTINCT unnest(p_student_ids) AS student_id) k
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(DISTINCT mind_local_date(el.timestamp)) as active_days,
+            COALESCE(SUM(el.duration_seconds), 0) as total_seconds,
+            MAX(el.timestamp) as last_activity_at
+        FROM engagement_logs el
+        WHERE el.student_id = k.student_id
+    ) eng
+    ON CONFLICT (student_id) DO UPDATE SET
+        active_days              = EXCLUDED.active_days,
+        total_engagement_seconds = EXCLUDED.total_engagement_seconds,
+        last_activity_at         = EXCLUDED.last_activity_at,
+        updated_at               = EXCLUDED.updated_at;
+$$;
+
+-- ----------------------------------------------------------------------------
+-- Triggers
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION student_snapshots_on_attempts()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_student_snapshot_attempts(ARRAY(
+            SELECT student_id FROM old_rows WHERE student_id IS NOT NULL
+        ));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_student_snapshot_attempts(ARRAY(
+            SELECT student_id FROM new_rows WHERE student_id IS NOT NULL
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Named so it sorts after the trg_rubric_mastery_cube_* triggers: those update
+-- rubric_mastery_by_student first, which this one then reads.
+CREATE OR REPLACE FUNCTION student_snapshots_on_rubric()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_student_snapshot_rubric(ARRAY(
+            SELECT a.student_id
+            FROM old_rows o
+            INNER JOIN attempts a ON o.attempt_id = a.attempt_id
+            WHERE a.student_id IS NOT NULL
+        ));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_student_snapshot_rubric(ARRAY(
+            SELECT a.student_id
+            FROM new_rows n
+            INNER JOIN attempts a ON n.attempt_id = a.attempt_id
+            WHERE a.student_id IS NOT NULL
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION student_snapshots_on_engagement()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        -- Appends are the hot path: add the new seconds, and count a day as
+        -- new when every log row for that student-day came from this statement.
+        WITH new_days AS (
+            SELECT
+                student_id,
+                mind_local_date(timestamp) as day,
+                COUNT(*) as row_count,
+                COALESCE(SUM(duration_seconds), 0) as seconds,
+                MAX(timestamp) as last_activity_at
+            FROM new_rows
+            WHERE student_id IS NOT NULL
+            GROUP BY 1, 2
+        ),
+        flagged AS (
+            SELECT
+                nd.*,
+                (
+                    SELECT COUNT(*)
+                    FROM engagement_logs el
+                    WHERE el.student_id = nd.student_id
+                    AND el.timestamp >= mind_day_start(nd.day)
+                    AND el.timestamp < mind_day_start(nd.day + 1)
+                ) = nd.row_count as is_new_day
+            FROM new_days nd
+        )
+        INSERT INTO student_snapshots AS ss (
+            student_id, active_days, total_engagement_seconds, last_activity_at, updated_at
+        )
+        SELECT
+            student_id,
+            COUNT(*) FILTER (WHERE is_new_day),
+            SUM(seconds),
+            MAX(last_activity_at),
+            NOW()
+        FROM flagged
+        GROUP BY student_id
+        ON CONFLICT (student_id) DO UPDATE SET
+            active_days              = ss.active_days + EXCLUDED.active_days,
+            total_engagement_seconds = ss.total_engagement_seconds + EXCLUDED.total_engagement_seconds,
+            last_activity_at         = GREATEST(ss.last_activity_at, EXCLUDED.last_activity_at),
+            updated_at               = EXCLUDED.updated_at;
+    ELSE
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM refresh_student_snapshot_engagement(ARRAY(
+                SELECT student_id FROM old_rows WHERE student_id IS NOT NULL
+            ));
+        END IF;
+        IF TG_OP = 'UPDATE' THEN
+            PERFORM refresh_student_snapshot_engagement(ARRAY(
+                SELECT student_id FROM new_rows WHERE student_id IS NOT NULL
+            ));
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_attempts_insert ON attempts;
+CREATE TRIGGER trg_student_snapshots_attempts_insert
+    AFTER INSERT ON attempts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_attempts();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_attempts_update ON attempts;
+CREATE TRIGGER trg_student_snapshots_attempts_update
+    AFTER UPDATE ON attempts
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_attempts();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_attempts_delete ON attempts;
+CREATE TRIGGER trg_student_snapshots_attempts_delete
+    AFTER DELETE ON attempts
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_attempts();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_rubric_insert ON rubric_scores;
+CREATE TRIGGER trg_student_snapshots_rubric_insert
+    AFTER INSERT ON rubric_scores
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_rubric();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_rubric_update ON rubric_scores;
+CREATE TRIGGER trg_student_snapshots_rubric_update
+    AFTER UPDATE ON rubric_scores
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_rubric();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_rubric_delete ON rubric_scores;
+CREATE TRIGGER trg_student_snapshots_rubric_delete
+    AFTER DELETE ON rubric_scores
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_rubric();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_engagement_insert ON engagement_logs;
+CREATE TRIGGER trg_student_snapshots_engagement_insert
+    AFTER INSERT ON engagement_logs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_engagement();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_engagement_update ON engagement_logs;
+CREATE TRIGGER trg_student_snapshots_engagement_update
+    AFTER UPDATE ON engagement_logs
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_engagement();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_engagement_delete ON engagement_logs;
+CREATE TRIGGER trg_student_snapshots_engagement_delete
+    AFTER DELETE ON engagement_logs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_engagement();
+
+-- ----------------------------------------------------------------------------
+-- Full rebuild
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION refresh_student_snapshots()
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+DECLARE
+    all_students TEXT[];
+BEGIN
+    TRUNCATE student_snapshots;
+
+    all_students := ARRAY(
+        SELECT student_id FROM attempts WHERE student_id IS NOT NULL
+        UNION
+        SELECT student_id FROM engagement_logs WHERE student_id IS NOT NULL
+    );
+
+    PERFORM refresh_student_snapshot_attempts(all_students);
+    PERFORM refresh_student_snapshot_engagement(all_students);
+    PERFORM refresh_student_snapshot_rubric(all_students);
+END;
+$$;
+
+SELECT refresh_student_snapshots();
@@ -0,0 +1,329 @@
+-- ============================================================================
+-- 004 - Daily per-student engagement rollup
+--
+-- One row per (student, day) summarising that day's engagement_logs:
+--   action_count / duration_sum          totals for the day
+--   session_ids / case_ids               exact distinct sets (small per day),
+--                                        unnested to count distinct across days
+--   action_counts / action_durations     JSONB breakdown keyed by action_type
+--   hour_actions / hour_durations        24-slot hour-of-day histograms
+--                                        (index 1 = 00:00-00:59)
+--
+-- Rows are recomputed from engagement_logs for just the (student, day) keys a
+-- statement touches, so inserts, corrections and deletes all stay exact.
+-- Concurrent statements on the same key are serialised with mind_lock_keys(),
+-- so the later one recomputes with the earlier one's rows committed.
+-- Log rows without a student_id are not rolled up.
+--
+-- Requires 001 (mind_local_date) and 003 (mind_day_start, student_snapshots).
+-- Safe to re-run: every object is created with IF NOT EXISTS / OR REPLACE.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS engagement_daily (
+    student_id        VARCHAR(50)  NOT NULL,
+    day               DATE         NOT NULL,
+    action_count      INTEGER      NOT NULL DEFAULT 0,
+    duration_sum      BIGINT       NOT NULL DEFAULT 0,
+    session_ids       TEXT[]       NOT NULL DEFAULT '{}',
+    case_ids          TEXT[]       NOT NULL DEFAULT '{}',
+    action_counts     JSONB        NOT NULL DEFAULT '{}',
+    action_durations  JSONB        NOT NULL DEFAULT '{}',
+    hour_actions      INTEGER[]    NOT NULL,
+    hour_durations    BIGINT[]     NOT NULL,
+    first_at          TIMESTAMPTZ,
+    last_at           TIMESTAMPTZ,
+    PRIMARY KEY (student_id, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_engagement_daily_day ON engagement_daily (day);
+
+-- Per-key recomputes read one student-day range at a time.
+CREATE INDEX IF NOT EXISTS idx_engagement_logs_student_timestamp
+    ON engagement_logs (student_id, timestamp);
+
+-- Hour-of-day bucket matching mind_local_date().
+CREATE OR REPLACE FUNCTION mind_local_hour(ts TIMESTAMPTZ)
+RETURNS INTEGER
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT EXTRACT(HOUR FROM ts AT TIME ZONE 'UTC')::INTEGER
+$$;
+
+-- ----------------------------------------------------------------------------
+-- Incremental maintenance
+-- ----------------------------------------------------------------------------
+
+-- Serialise rollup maintenance per key across concurrent transactions, before
+-- a recompute that runs in a later statement: under READ COMMITTED that
+-- statement then sees the rows of the transaction it waited for. Keys are
+-- advisory-locked in sorted order so two statements never wait in a cycle.
+-- A statement touching more than 1000 keys (bulk loads, full rebuilds) locks
+-- the rollup table itself instead of filling the shared lock table; the
+-- ROW EXCLUSIVE lock taken on the per-key path makes the two wait on each
+-- other.
+CREATE OR REPLACE FUNCTION mind_lock_keys(p_table REGCLASS, p_keys TEXT[])
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+DECLARE
+    lock_key TEXT;
+BEGIN
+    IF cardinality(p_keys) > 1000 THEN
+        EXECUTE format('LOCK TABLE %s IN SHARE ROW EXCLUSIVE MODE', p_table);
+        RETURN;
+    END IF;
+
+    EXECUTE format('LOCK TABLE %s IN ROW EXCLUSIVE MODE', p_table);
+    FOR lock_key IN
+        SELECT DISTINCT k FROM unnest(p_keys) AS k WHERE k IS NOT NULL ORDER BY k
+    LOOP
+        PERFORM pg_advisory_xact_lock(hashtext(p_table::TEXT), hashtext(lock_key));
+    END LOOP;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION refresh_engagement_daily_for(
+    p_student_ids TEXT[],
+    p_days        DATE[]
+)
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM mind_lock_keys(
+        'engagement_daily',
+        ARRAY(SELECT k.student_id || ':' || k.day FROM unnest(p_student_ids, p_days) AS k(student_id, day))
+    );
+
+    WITH keys AS (
+        SELECT DISTINCT student_id, day
+        FROM unnest(p_student_ids, p_days) AS k(student_id, day)
+    ),
+    src AS (
+        SELECT
+            el.student_id,
+            k.day,
+            el.session_id,
+            el.case_id,
+            COALESCE(el.action_type, 'unknown') as action_type,
+            mind_local_hour(el.timestamp) as hour,
+            COALESCE(el.duration_seconds, 0) as duration,
+            el.timestamp
+        FROM keys k
+        INNER JOIN engagement_logs el
+            ON el.student_id = k.student_id
+            AND el.timestamp >= mind_day_start(k.day)
+            AND el.timestamp < mind_day_start(k.day + 1)
+    ),
+    totals AS (
+        SELECT
+            student_id,
+            day,
+            COUNT(*) as action_count,
+            SUM(duration) as duration_sum,
+            COALESCE(ARRAY_AGG(DISTINCT session_id) FILTER (WHERE session_id IS NOT NULL), '{}') as session_ids,
+            COALESCE(ARRAY_AGG(DISTINCT case_id) FILTER (WHERE case_id IS NOT NULL), '{}') as case_ids,
+            MIN(timestamp) as first_at,
+            MAX(timestamp) as last_at
+        FROM src
+        GROUP BY student_id, day
+    ),
+    by_type AS (
+        SELECT
+            student_id,
+            day,
+            jsonb_object_agg(action_type, action_count) as action_counts,
+            jsonb_object_agg(action_type, duration_sum) as action_durations
+        FROM (
+            SELECT student_id, day, action_type, COUNT(*) as action_count, SUM(duration) as duration_sum
+            FROM src
+            GROUP BY student_id, day, action_type
+        ) t
+        GROUP BY student_id, day
+    ),
+    by_hour AS (
+        SELECT
+            t.student_id,
+            t.day,
+            ARRAY_AGG(COALESCE(h.action_count, 0)::INTEGER ORDER BY g.hour) as hour_actions,
+            ARRAY_AGG(COALESCE(h.duration_sum, 0)::BIGINT ORDER BY g.hour) as hour_durations
+        FROM totals t
+        CROSS JOIN generate_series(0, 23) AS g(hour)
+        LEFT JOIN (
+            SELECT student_id, day, hour, COUNT(*) as action_count, SUM(duration) as duration_sum
+            FROM src
+            GROUP BY student_id, day, hour
+        ) h ON h.student_id = t.student_id AND h.day = t.day AND h.hour = g.hour
+        GROUP BY t.student_id, t.day
+    )
+    INSERT INTO engagement_daily (
+        student_id, day, action_count, duration_sum, session_ids, case_ids,
+        action_counts, action_durations, hour_actions, hour_durations, first_at, last_at
+    )
+    SELECT
+        t.student_id,
+        t.day,
+        t.action_count,
+        t.duration_sum,
+        t.session_ids,
+        t.case_ids,
+        bt.action_counts,
+        bt.action_durations,
+        bh.hour_actions,
+        bh.hour_durations,
+        t.first_at,
+        t.last_at
+    FROM totals t
+    INNER JOIN by_type bt ON bt.student_id = t.student_id AND bt.day = t.day
+    INNER JOIN by_hour bh ON bh.student_id = t.student_id AND bh.day = t.day
+    ON CONFLICT (student_id, day) DO UPDATE SET
+        action_count     = EXCLUDED.action_count,
+        duration_sum     = EXCLUDED.duration_sum,
+        session_ids      = EXCLUDED.session_ids,
+        case_ids         = EXCLUDED.case_ids,
+        action_counts    = EXCLUDED.action_counts,
+        action_durations = EXCLUDED.action_durations,
+        hour_actions     = EXCLUDED.hour_actions,
+        hour_durations   = EXCLUDED.hour_durations,
+        first_at         = EXCLUDED.first_at,
+        last_at          = EXCLUDED.last_at;
+
+    -- Days whose last log row was deleted or moved away
+    DELETE FROM engagement_daily ed
+    USING unnest(p_student_ids, p_days) AS k(student_id, day)
+    WHERE ed.student_id = k.student_id
+    AND ed.day = k.day
+    AND NOT EXISTS (
+        SELECT 1
+        FROM engagement_logs el
+        WHERE el.student_id = k.student_id
+        AND el.timestamp >= mind_day_start(k.day)
+        AND el.timestamp < mind_day_start(k.day + 1)
+    );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION engagement_daily_maintain()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_engagement_daily_for(
+            ARRAY(SELECT student_id FROM old_rows WHERE student_id IS NOT NULL ORDER BY student_id, mind_local_date(timestamp)),
+            ARRAY(SELECT mind_local_date(timestamp) FROM old_rows WHERE student_id IS NOT NULL ORDER BY student_id, mind_local_date(timestamp))
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_engagement_daily_for(
+            ARRAY(SELECT student_id FROM new_rows WHERE student_id IS NOT NULL ORDER BY student_id, mind_local_date(timestamp)),
+            ARRAY(SELECT mind_local_date(timestamp) FROM new_rows WHERE student_id IS NOT NULL ORDER BY student_id, mind_local_date(timestamp))
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_engagement_daily_insert ON engagement_logs;
+CREATE TRIGGER trg_engagement_daily_insert
+    AFTER INSERT ON engagement_logs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_daily_maintain();
+
+DROP TRIGGER IF EXISTS trg_engagement_daily_update ON engagement_logs;
+CREATE TRIGGER trg_engagement_daily_update
+    AFTER UPDATE ON engagement_logs
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_daily_maintain();
+
+DROP TRIGGER IF EXISTS trg_engagement_daily_delete ON engagement_logs;
+CREATE TRIGGER trg_engagement_daily_delete
+    AFTER DELETE ON engagement_logs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_daily_maintain();
+
+-- ----------------------------------------------------------------------------
+-- Full rebuild
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION refresh_engagement_daily()
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+DECLARE
+    key_students TEXT[];
+    key_days     DATE[];
+BEGIN
+    TRUNCATE engagement_daily;
+
+    SELECT
+        ARRAY_AGG(student_id ORDER BY student_id, day),
+        ARRAY_AGG(day ORDER BY student_id, day)
+    INTO key_students, key_days
+    FROM (
+        SELECT DISTINCT student_id, mind_local_date(timestamp) as day
+        FROM engagement_logs
+        WHERE student_id IS NOT NULL
+    ) k;
+
+    PERFORM refresh_engagement_daily_for(key_students, key_days);
+END;
+$$;
+
+SELECT refresh_engagement_daily();
+
+-- ----------------------------------------------------------------------------
+-- Student snapshot engagement columns (003), read from engagement_daily
+-- ----------------------------------------------------------------------------
+
+-- 003 applied engagement inserts as deltas and counted a day as new from the
+-- log rows its own transaction could see, so two transactions inserting a
+-- student's first rows for a day both counted it. The columns are recomputed
+-- per touched student from engagement_daily instead, under a per-student
+-- lock. trg_student_snapshots_engagement_* sort after trg_engagement_daily_*,
+-- so the day rows are already current when this runs.
+CREATE OR REPLACE FUNCTION refresh_student_snapshot_engagement(p_student_ids TEXT[])
+RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO student_snapshots AS ss (
+        student_id, active_days, total_engagement_seconds, last_activity_at, updated_at
+    )
+    SELECT
+        k.student_id,
+        eng.active_days,
+        eng.total_seconds,
+        eng.last_activity_at,
+        NOW()
+    FROM (SELECT DISTINCT unnest(p_student_ids) AS student_id) k
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(*) as active_days,
+            COALESCE(SUM(ed.duration_sum), 0) as total_seconds,
+            MAX(ed.last_at) as last_activity_at
+        FROM engagement_daily ed
+        WHERE ed.student_id = k.student_id
+    ) eng
+    ON CONFLICT (student_id) DO UPDATE SET
+        active_days              = EXCLUDED.active_days,
+        total_engagement_seconds = EXCLUDED.total_engagement_seconds,
+        last_activity_at         = EXCLUDED.last_activity_at,
+        updated_at               = EXCLUDED.updated_at;
+$$;
+
+CREATE OR REPLACE FUNCTION student_snapshots_on_engagement()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    touched TEXT[] := '{}';
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        touched := touched || ARRAY(SELECT student_id FROM old_rows WHERE student_id IS NOT NULL);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        touched := touched || ARRAY(SELECT student_id FROM new_rows WHERE student_id IS NOT NULL);
+    END IF;
+
+    PERFORM mind_lock_keys('student_snapshots', touched);
+    PERFORM refresh_student_snapshot_engagement(touched);
+    RETURN NULL;
+END;
+$$;
+
+SELECT refresh_student_snapshot_engagement(ARRAY(SELECT student_id FROM student_snapshots));
@@ -0,0 +1,218 @@
+-- ============================================================================
+-- 005 - Maintained leaderboards
+--
+-- cohort_leaderboard
+--     One row per cohort with running attempt/score/CES/duration totals and a
+--     stored avg_score, so top/bottom-k is an index walk instead of a
+--     re-aggregation of every attempt. Attempt changes are applied as signed
+--     deltas; student_count moves when a student gains a first attempt or
+--     loses their last one, decided under a per-student lock so concurrent
+--     first (or last) attempts count once.
+--
+-- rubric_mastery_by_student (from 001)
+--     Gains a stored avg_pct and a (rubric_dimension, avg_pct) index, which
+--     turns it into the per-dimension student leaderboard.
+--
+-- Cohort membership is taken from students at the time attempts are written;
+-- moving a student between cohorts is only reflected after a refresh.
+--
+-- Requires 001 and 004 (mind_lock_keys).
+-- Safe to re-run: every object is created with IF NOT EXISTS / OR REPLACE.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS cohort_leaderboard (
+    cohort_id       VARCHAR(50)  PRIMARY KEY,
+    student_count   BIGINT       NOT NULL DEFAULT 0,
+    attempt_count   BIGINT       NOT NULL DEFAULT 0,
+    score_count     BIGINT       NOT NULL DEFAULT 0,
+    score_sum       NUMERIC      NOT NULL DEFAULT 0,
+    ces_count       BIGINT       NOT NULL DEFAULT 0,
+    ces_sum         NUMERIC      NOT NULL DEFAULT 0,
+    duration_count  BIGINT       NOT NULL DEFAULT 0,
+    duration_sum    NUMERIC      NOT NULL DEFAULT 0,
+    avg_score       NUMERIC GENERATED ALWAYS AS (score_sum / NULLIF(score_count, 0)) STORED
+);
+
+CREATE INDEX IF NOT EXISTS idx_cohort_leaderboard_avg_score
+    ON cohort_leaderboard (avg_score, attempt_count);
+
+ALTER TABLE rubric_mastery_by_student
+    ADD COLUMN IF NOT EXISTS avg_pct NUMERIC
+    GENERATED ALWAYS AS (pct_sum / NULLIF(pct_count, 0)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_rubric_mastery_by_student_leaderboard
+    ON rubric_mastery_by_student (rubric_dimension, avg_pct DESC, score_count DESC);
+
+-- ----------------------------------------------------------------------------
+-- Incremental maintenance
+-- ----------------------------------------------------------------------------
+
+-- p_rows is a JSON array of attempt rows carrying a sign: +1 for rows that now
+-- exist, -1 for rows that no longer do.
+CREATE OR REPLACE FUNCTION cohort_leaderboard_apply(p_rows JSONB)
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- The membership counts below then see every other transaction's
+    -- attempts for these students as committed
+    PERFORM mind_lock_keys(
+        'cohort_leaderboard',
+        ARRAY(SELECT DISTINCT x.student_id FROM jsonb_to_recordset(p_rows) AS x(student_id TEXT))
+    );
+
+    WITH d AS (
+        SELECT *
+        FROM jsonb_to_recordset(p_rows)
+            AS x(student_id TEXT, sign INTEGER, score NUMERIC, ces_value NUMERIC, duration_seconds NUMERIC)
+    ),
+    measure_delta AS (
+        SELECT
+            s.cohort_id,
+            SUM(d.sign) as attempt_count,
+            COALESCE(SUM(d.sign) FILTER (WHERE d.score IS NOT NULL), 0) as score_count,
+            COALESCE(SUM(d.sign * d.score), 0) as score_sum,
+            COALESCE(SUM(d.sign) FILTER (WHERE d.ces_value IS NOT NULL), 0) as ces_count,
+            COALESCE(SUM(d.sign * d.ces_value), 0) as ces_sum,
+            COALESCE(SUM(d.sign) FILTER (WHERE d.duration_seconds IS NOT NULL), 0) as duration_count,
+            COALESCE(SUM(d.sign * d.duration_seconds), 0) as duration_sum
+        FROM d
+        INNER JOIN students s ON d.student_id = s.student_id
+        WHERE s.cohort_id IS NOT NULL
+        GROUP BY s.cohort_id
+    ),
+    -- A student joins a cohort's count when they had no attempts before this
+    -- statement and have some now, and leaves it on the reverse.
+    membership AS (
+        SELECT
+            n.student_id,
+            n.net_rows,
+            (SELECT COUNT(*) FROM attempts a WHERE a.student_id = n.student_id) as after_count
+        FROM (SELECT student_id, SUM(sign) as net_rows FROM d GROUP BY student_id) n
+    ),
+    member_delta AS (
+        SELECT
+            s.cohort_id,
+            SUM(
+                CASE
+                    WHEN m.after_count > 0 AND m.after_count - m.net_rows = 0 THEN 1
+                    WHEN m.after_count = 0 AND m.after_count - m.net_rows > 0 THEN -1
+                    ELSE 0
+                END
+            ) as student_count
+        FROM membership m
+        INNER JOIN students s ON m.student_id = s.student_id
+        WHERE s.cohort_id IS NOT NULL
+        GROUP BY s.cohort_id
+    )
+    INSERT INTO cohort_leaderboard AS cl (
+        cohort_id, student_count, attempt_count, score_count, score_sum,
+        ces_count, ces_sum, duration_count, duration_sum
+    )
+    SELECT
+        md.cohort_id,
+        COALESCE(mb.student_count, 0),
+        md.attempt_count,
+        md.score_count,
+        md.score_sum,
+        md.ces_count,
+        md.ces_sum,
+        md.duration_count,
+        md.duration_sum
+    FROM measure_delta md
+    LEFT JOIN member_delta mb ON md.cohort_id = mb.cohort_id
+    ON CONFLICT (cohort_id) DO UPDATE SET
+        student_count  = cl.student_count + EXCLUDED.student_count,
+        attempt_count  = cl.attempt_count + EXCLUDED.attempt_count,
+        score_count    = cl.score_count + EXCLUDED.score_count,
+        score_sum      = cl.score_sum + EXCLUDED.score_sum,
+        ces_count      = cl.ces_count + EXCLUDED.ces_count,
+        ces_sum        = cl.ces_sum + EXCLUDED.ces_sum,
+        duration_count = cl.duration_count + EXCLUDED.duration_count,
+        duration_sum   = cl.duration_sum + EXCLUDED.duration_sum;
+
+    DELETE FROM cohort_leaderboard WHERE attempt_count <= 0;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION cohort_leaderboard_maintain()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    delta JSONB := '[]'::JSONB;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        delta := delta || (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                'student_id', student_id, 'sign', -1, 'score', score,
+                'ces_value', ces_value, 'duration_seconds', duration_seconds
+            )), '[]'::JSONB)
+            FROM old_rows
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        delta := delta || (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                'student_id', student_id, 'sign', 1, 'score', score,
+                'ces_value', ces_value, 'duration_seconds', duration_seconds
+            )), '[]'::JSONB)
+            FROM new_rows
+        );
+    END IF;
+
+    PERFORM cohort_leaderboard_apply(delta);
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_cohort_leaderboard_insert ON attempts;
+CREATE TRIGGER trg_cohort_leaderboard_insert
+    AFTER INSERT ON attempts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION cohort_leaderboard_maintain();
+
+DROP TRIGGER IF EXISTS trg_cohort_leaderboard_update ON attempts;
+CREATE TRIGGER trg_cohort_leaderboard_update
+    AFTER UPDATE ON attempts
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION cohort_leaderboard_maintain();
+
+DROP TRIGGER IF EXISTS trg_cohort_leaderboard_delete ON attempts;
+CREATE TRIGGER trg_cohort_leaderboard_delete
+    AFTER DELETE ON attempts
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION cohort_leaderboard_maintain();
+
+-- ----------------------------------------------------------------------------
+-- Full rebuild
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION refresh_cohort_leaderboard()
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    TRUNCATE cohort_leaderboard;
+
+    INSERT INTO cohort_leaderboard (
+        cohort_id, student_count, attempt_count, score_count, score_sum,
+        ces_count, ces_sum, duration_count, duration_sum
+    )
+    SELECT
+        s.cohort_id,
+        COUNT(DISTINCT a.student_id),
+        COUNT(*),
+        COUNT(a.score),
+        COALESCE(SUM(a.score), 0),
+        COUNT(a.ces_value),
+        COALESCE(SUM(a.ces_value), 0),
+        COUNT(a.duration_seconds),
+        COALESCE(SUM(a.duration_seconds), 0)
+    FROM attempts a
+    INNER JOIN students s ON a.student_id = s.student_id
+    WHERE s.cohort_id IS NOT NULL
+    GROUP BY s.cohort_id;
+END;
+$$;
+
+SELECT refresh_cohort_leaderboard();
@@ -0,0 +1,85 @@
+-- migrate: no-transaction
+-- ============================================================================
+-- 006 - Composite and covering indexes for the dashboard workload
+--
+-- Covers the hot predicates of the query builders in core/queries/ and the
+-- inline page queries (see tools/index_advisor.py, which re-derives these
+-- from EXPLAIN and writes any further proposals as later migrations).
+--
+-- The single-column indexes from the base schema are kept; the composites
+-- below serve the equality + time-range and join-then-aggregate shapes that
+-- the single-column ones can only half serve.
+--
+-- Runs outside a transaction (see tools/migrate.py) so the indexes are built
+-- with CONCURRENTLY and the tables stay writable meanwhile. A build that
+-- fails part-way leaves an INVALID index that IF NOT EXISTS would skip:
+-- DROP INDEX CONCURRENTLY it before re-running.
+--
+-- Safe to re-run: every index is created with IF NOT EXISTS.
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- students: every page filters on role plus optional cohort / department /
+-- campus, then joins on student_id. role leads because it is always present.
+-- ----------------------------------------------------------------------------
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_students_role_cohort_department_campus
+    ON students (role, cohort_id, department, campus)
+    INCLUDE (student_id);
+
+-- ----------------------------------------------------------------------------
+-- attempts
+-- ----------------------------------------------------------------------------
+
+-- Student attempt history, score trend and latest-attempt-per-case lookups
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_student_id_timestamp_covering
+    ON attempts (student_id, timestamp)
+    INCLUDE (case_id, attempt_number, score);
+
+-- Per-case analytics and retry-rate counts (attempt_number 1 vs 2)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_case_id_attempt_number_covering
+    ON attempts (case_id, attempt_number)
+    INCLUDE (score, duration_seconds);
+
+-- Time-window aggregates that join back to students
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_timestamp_student_id_covering
+    ON attempts (timestamp, student_id)
+    INCLUDE (score, duration_seconds, ces_value, state);
+
+-- ----------------------------------------------------------------------------
+-- rubric_scores: joined to attempts by attempt_id, then aggregated per
+-- dimension; the INCLUDE list makes the join an index-only scan.
+-- ----------------------------------------------------------------------------
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rubric_scores_attempt_id_covering
+    ON rubric_scores (attempt_id)
+    INCLUDE (rubric_dimension, score, max_score, improvement_flag);
+
+-- ----------------------------------------------------------------------------
+-- engagement_logs: per-student time ranges (also created by 004)
+-- ----------------------------------------------------------------------------
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_engagement_logs_student_timestamp
+    ON engagement_logs (student_id, timestamp);
+
+-- ----------------------------------------------------------------------------
+-- system_reliability: Developer dashboard time windows, grouped or filtered
+-- by API service
+-- ----------------------------------------------------------------------------
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_system_reliability_timestamp_api_name_covering
+    ON system_reliability (timestamp, api_name)
+    INCLUDE (latency_ms, error_rate, reliability_index, severity);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_system_reliability_api_name_timestamp
+    ON system_reliability (api_name, timestamp);
+
+-- ----------------------------------------------------------------------------
+-- environment_metrics: attempt_id is the primary key, so joins on it are
+-- already indexed. student_id serves the per-student environment history.
+-- ----------------------------------------------------------------------------
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_environment_metrics_student_id
+    ON environment_metrics (student_id);
+
+ANALYZE students;
+ANALYZE attempts;
+ANALYZE rubric_scores;
+ANALYZE engagement_logs;
+ANALYZE system_reliability;
+ANALYZE environment_metrics;
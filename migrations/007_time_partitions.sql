@@ -0,0 +1,280 @@
+-- ============================================================================
+-- 007 - Monthly range partitions for engagement_logs and system_reliability
+--
+-- Both tables are append-only time series queried by time window. They are
+-- converted to RANGE (timestamp) partitioned tables with one partition per
+-- UTC month (matching mind_local_date), plus a DEFAULT partition for rows
+-- outside the pre-created months (empty as long as partition_manager runs;
+-- creating a month's partition later moves that month's rows out of it).
+--
+-- The primary key is extended with timestamp, which makes it NOT NULL. The
+-- conversion refuses to start while rows with a NULL timestamp exist; fix or
+-- delete them first, e.g.
+--   SELECT count(*) FROM engagement_logs WHERE timestamp IS NULL;
+--
+-- Ongoing maintenance is done by tools/partition_manager.py, which calls:
+--   mind_ensure_month_partitions(table, months_ahead)
+--   mind_archive_partitions_before(table, cutoff, archive_schema)
+--
+-- Archiving detaches whole partitions, which fires no row triggers: the
+-- rollups built from engagement_logs (003, 004) keep their history.
+--
+-- Requires 003 (mind_day_start), 004 and 006 (triggers / indexes recreated
+-- here on the partitioned engagement_logs).
+-- Safe to re-run: tables that are already partitioned are left alone.
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- Partition helpers
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION mind_partition_name(p_table TEXT, p_month DATE)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT p_table || '_p' || to_char(p_month, 'YYYY_MM')
+$$;
+
+-- Create the partition holding p_month (any day in the month) if missing.
+-- Rows for that month already in the DEFAULT partition would make the
+-- CREATE fail, so then the default is detached, the new partition created,
+-- the month's rows moved over and the default attached again. The move
+-- targets the partitions directly, so the parent's rollup triggers do not
+-- fire and the rollups (003, 004) are unchanged.
+CREATE OR REPLACE FUNCTION mind_create_month_partition(p_table TEXT, p_month DATE)
+RETURNS TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start       DATE := date_trunc('month', p_month::TIMESTAMP)::DATE;
+    partition         TEXT := mind_partition_name(p_table, month_start);
+    lower_bound       TIMESTAMPTZ := mind_day_start(month_start);
+    upper_bound       TIMESTAMPTZ := mind_day_start((month_start + INTERVAL '1 month')::DATE);
+    default_partition REGCLASS;
+    blocking          BOOLEAN := FALSE;
+BEGIN
+    IF to_regclass(partition) IS NOT NULL THEN
+        RETURN partition;
+    END IF;
+
+    SELECT NULLIF(partdefid, 0)::REGCLASS INTO default_partition
+    FROM pg_partitioned_table
+    WHERE partrelid = p_table::REGCLASS;
+
+    IF default_partition IS NOT NULL THEN
+        -- Blocks inserts routed to the default until this transaction ends
+        EXECUTE format('LOCK TABLE %s IN SHARE MODE', default_partition);
+        EXECUTE format(
+            'SELECT EXISTS (SELECT 1 FROM %s WHERE timestamp >= $1 AND timestamp < $2)',
+            default_partition
+        ) INTO blocking USING lower_bound, upper_bound;
+    END IF;
+
+    IF blocking THEN
+        EXECUTE format('ALTER TABLE %I DETACH PARTITION %s', p_table, default_partition);
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+        partition, p_table, lower_bound, upper_bound
+    );
+
+    IF blocking THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM %s WHERE timestamp >= $1 AND timestamp < $2 RETURNING *) ' ||
+            'INSERT INTO %I SELECT * FROM moved',
+            default_partition, partition
+        ) USING lower_bound, upper_bound;
+        EXECUTE format('ALTER TABLE %I ATTACH PARTITION %s DEFAULT', p_table, default_partition);
+    END IF;
+
+    RETURN partition;
+END;
+$$;
+
+-- Make sure partitions exist from the current month through p_months_ahead.
+CREATE OR REPLACE FUNCTION mind_ensure_month_partitions(p_table TEXT, p_months_ahead INTEGER DEFAULT 3)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    month DATE;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', mind_local_date(NOW())::TIMESTAMP),
+            date_trunc('month', mind_local_date(NOW())::TIMESTAMP) + make_interval(months => p_months_ahead),
+            INTERVAL '1 month'
+        )::DATE
+    LOOP
+        RETURN NEXT mind_create_month_partition(p_table, month);
+    END LOOP;
+END;
+$$;
+
+-- Detach every monthly partition that ends on or before p_cutoff and move it
+-- to p_archive_schema (created if missing). Returns the archived names.
+CREATE OR REPLACE FUNCTION mind_archive_partitions_before(
+    p_table          TEXT,
+    p_cutoff         DATE,
+    p_archive_schema TEXT DEFAULT 'archive'
+)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    part RECORD;
+BEGIN
+    EXECUTE format('CREATE SCHEMA IF NOT EXISTS %I', p_archive_schema);
+
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        INNER JOIN pg_class c ON i.inhrelid = c.oid
+        WHERE i.inhparent = p_table::REGCLASS
+        AND c.relname ~ ('^' || p_table || '_p[0-9]{4}_[0-9]{2}$')
+        AND to_date(right(c.relname, 7), 'YYYY_MM') + INTERVAL '1 month' <= p_cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', p_table, part.relname);
+        EXECUTE format('ALTER TABLE %I SET SCHEMA %I', part.relname, p_archive_schema);
+        RETURN NEXT p_archive_schema || '.' || part.relname;
+    END LOOP;
+END;
+$$;
+
+-- Convert a plain table to a monthly-partitioned one in place. Columns,
+-- defaults, check and foreign-key constraints are carried over; the primary
+-- key (if any) is extended with the partition key, and timestamp becomes
+-- NOT NULL. Raises before changing anything if a timestamp is NULL. Indexes
+-- and triggers are recreated by the caller.
+CREATE OR REPLACE FUNCTION mind_partition_by_month(p_table TEXT)
+RETURNS BOOLEAN
+LANGUAGE plpgsql AS $$
+DECLARE
+    legacy     TEXT := p_table || '_unpartitioned';
+    pk_columns TEXT;
+    fk         RECORD;
+    month      DATE;
+    null_rows  BIGINT;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = p_table::REGCLASS) THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format('LOCK TABLE %I IN ACCESS EXCLUSIVE MODE', p_table);
+
+    EXECUTE format('SELECT count(*) FROM %I WHERE timestamp IS NULL', p_table) INTO null_rows;
+    IF null_rows > 0 THEN
+        RAISE EXCEPTION '% has % row(s) with a NULL timestamp', p_table, null_rows
+            USING HINT = 'Backfill or delete them before partitioning; timestamp becomes part of the primary key.';
+    END IF;
+
+    SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY k.ord)
+    INTO pk_columns
+    FROM pg_index i
+    CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+    INNER JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+    WHERE i.indrelid = p_table::REGCLASS AND i.indisprimary;
+
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', p_table, legacy);
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (timestamp)',
+        p_table, legacy
+    );
+
+    FOR fk IN
+        SELECT conname, pg_get_constraintdef(oid) as definition
+        FROM pg_constraint
+        WHERE conrelid = legacy::REGCLASS AND contype = 'f'
+    LOOP
+        EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I %s', p_table, fk.conname, fk.definition);
+    END LOOP;
+
+    -- One partition per month present in the data, then the look-ahead window
+    FOR month IN
+        EXECUTE format(
+            'SELECT DISTINCT date_trunc(''month'', mind_local_date(timestamp)::TIMESTAMP)::DATE FROM %I',
+            legacy
+        )
+    LOOP
+        PERFORM mind_create_month_partition(p_table, month);
+    END LOOP;
+    PERFORM mind_ensure_month_partitions(p_table, 3);
+    EXECUTE format('ALTER TABLE %I ALTER COLUMN timestamp SET NOT NULL', p_table);
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF %I DEFAULT', p_table || '_default', p_table);
+
+    EXECUTE format('INSERT INTO %I SELECT * FROM %I', p_table, legacy);
+    EXECUTE format('DROP TABLE %I', legacy);
+
+    -- After the drop, so the <table>_pkey name is free again
+    IF pk_columns IS NOT NULL THEN
+        EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (%s, timestamp)', p_table, pk_columns);
+    END IF;
+
+    RETURN TRUE;
+END;
+$$;
+
+-- ----------------------------------------------------------------------------
+-- engagement_logs
+-- ----------------------------------------------------------------------------
+
+SELECT mind_partition_by_month('engagement_logs');
+
+CREATE INDEX IF NOT EXISTS idx_engagement_logs_attempt_id ON engagement_logs (attempt_id);
+CREATE INDEX IF NOT EXISTS idx_engagement_logs_student_id ON engagement_logs (student_id);
+CREATE INDEX IF NOT EXISTS idx_engagement_logs_timestamp ON engagement_logs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_engagement_logs_student_timestamp
+    ON engagement_logs (student_id, timestamp);
+
+-- Rollup triggers from 003 and 004 (dropped with the unpartitioned table)
+DROP TRIGGER IF EXISTS trg_engagement_daily_insert ON engagement_logs;
+CREATE TRIGGER trg_engagement_daily_insert
+    AFTER INSERT ON engagement_logs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_daily_maintain();
+
+DROP TRIGGER IF EXISTS trg_engagement_daily_update ON engagement_logs;
+CREATE TRIGGER trg_engagement_daily_update
+    AFTER UPDATE ON engagement_logs
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_daily_maintain();
+
+DROP TRIGGER IF EXISTS trg_engagement_daily_delete ON engagement_logs;
+CREATE TRIGGER trg_engagement_daily_delete
+    AFTER DELETE ON engagement_logs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_daily_maintain();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_engagement_insert ON engagement_logs;
+CREATE TRIGGER trg_student_snapshots_engagement_insert
+    AFTER INSERT ON engagement_logs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_engagement();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_engagement_update ON engagement_logs;
+CREATE TRIGGER trg_student_snapshots_engagement_update
+    AFTER UPDATE ON engagement_logs
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_engagement();
+
+DROP TRIGGER IF EXISTS trg_student_snapshots_engagement_delete ON engagement_logs;
+CREATE TRIGGER trg_student_snapshots_engagement_delete
+    AFTER DELETE ON engagement_logs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_snapshots_on_engagement();
+
+-- ----------------------------------------------------------------------------
+-- system_reliability
+-- ----------------------------------------------------------------------------
+
+SELECT mind_partition_by_month('system_reliability');
+
+CREATE INDEX IF NOT EXISTS idx_system_reliability_timestamp ON system_reliability (timestamp);
+CREATE INDEX IF NOT EXISTS idx_system_reliability_api_name ON system_reliability (api_name);
+CREATE INDEX IF NOT EXISTS idx_system_reliability_severity ON system_reliability (severity);
+CREATE INDEX IF NOT EXISTS idx_system_reliability_timestamp_api_name_covering
+    ON system_reliability (timestamp, api_name)
+    INCLUDE (latency_ms, error_rate, reliability_index, severity);
+CREATE INDEX IF NOT EXISTS idx_system_reliability_api_name_timestamp
+    ON system_reliability (api_name, timestamp);
+
+ANALYZE engagement_logs;
+ANALYZE system_reliability;
@@ -0,0 +1,48 @@
+-- migrate: no-transaction
+-- ============================================================================
+-- 008 - Local-date expression indexes for day-bucketed queries
+--
+-- The query builders filter the raw tables with half-open timestamp ranges
+-- (timestamp >= start AND timestamp < end, bound as parameters), which the
+-- timestamp indexes from 006 / 007 already range-scan. What they still wrap
+-- is the grouping key: per-day trends and active-day counts bucket rows
+-- with mind_local_date(timestamp) instead of DATE(timestamp), which depends
+-- on the session time zone and cannot be indexed.
+--
+-- The expression indexes below give the planner statistics on the day
+-- buckets (so group counts for HashAggregate are estimated instead of
+-- guessed) and serve day-equality lookups such as
+--   WHERE mind_local_date(timestamp) = '2025-01-31'
+-- directly. Checked by tools/check_sargable.py.
+--
+-- Requires 001 (mind_local_date). Indexes on the partitioned tables from
+-- 007 cascade to every partition, current and future.
+-- Runs outside a transaction (see tools/migrate.py). The attempts index is
+-- built with CONCURRENTLY, so attempts stays writable meanwhile. PostgreSQL
+-- cannot build an index CONCURRENTLY on a partitioned table, so the
+-- indexes on the tables partitioned by 007 are plain builds, each committed
+-- on its own. A concurrent build that fails part-way leaves an INVALID
+-- index that IF NOT EXISTS would skip: DROP INDEX CONCURRENTLY it before
+-- re-running.
+--
+-- Safe to re-run: every index is created with IF NOT EXISTS.
+-- ============================================================================
+
+-- Daily trends: day bucket, then the distinct-student count per day
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_local_date_student_id
+    ON attempts (mind_local_date(timestamp), student_id);
+
+-- Active-day counts, platform-wide and per student
+CREATE INDEX IF NOT EXISTS idx_engagement_logs_local_date
+    ON engagement_logs (mind_local_date(timestamp));
+
+CREATE INDEX IF NOT EXISTS idx_engagement_logs_student_id_local_date
+    ON engagement_logs (student_id, mind_local_date(timestamp));
+
+-- Developer dashboard reliability trend
+CREATE INDEX IF NOT EXISTS idx_system_reliability_local_date
+    ON system_reliability (mind_local_date(timestamp));
+
+ANALYZE attempts;
+ANALYZE engagement_logs;
+ANALYZE system_reliability;
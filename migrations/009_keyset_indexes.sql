@@ -0,0 +1,39 @@
+-- migrate: no-transaction
+-- ============================================================================
+-- 009 - Sort-key indexes for keyset-paginated detail tables
+--
+-- The Developer dashboard detail tables page with
+--   WHERE (timestamp, id) < (:last_timestamp, :last_id)
+--   ORDER BY timestamp DESC, id DESC LIMIT :page_size + 1
+-- (see core/pagination.py). With an index on exactly (timestamp, id) the
+-- row comparison is an Index Cond and every page is a backward range read
+-- of page_size + 1 entries, however deep the user pages.
+--
+-- Indexes on the partitioned system_reliability (007) cascade to every
+-- partition.
+-- Runs outside a transaction (see tools/migrate.py). The attempts index is
+-- built with CONCURRENTLY, so attempts stays writable meanwhile. PostgreSQL
+-- cannot build an index CONCURRENTLY on a partitioned table, so the
+-- indexes on the tables partitioned by 007 are plain builds, each committed
+-- on its own. A concurrent build that fails part-way leaves an INVALID
+-- index that IF NOT EXISTS would skip: DROP INDEX CONCURRENTLY it before
+-- re-running.
+--
+-- Safe to re-run: every index is created with IF NOT EXISTS.
+-- ============================================================================
+
+-- System Reliability Log
+CREATE INDEX IF NOT EXISTS idx_system_reliability_timestamp_record_id
+    ON system_reliability (timestamp, record_id);
+
+-- Critical Incidents (severity = 'Critical', then the same sort key)
+CREATE INDEX IF NOT EXISTS idx_system_reliability_severity_timestamp_record_id
+    ON system_reliability (severity, timestamp, record_id);
+
+-- Environment Metrics by Attempt and rubric comment review, both ordered by
+-- attempt time
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_timestamp_attempt_id
+    ON attempts (timestamp, attempt_id);
+
+ANALYZE system_reliability;
+ANALYZE attempts;
@@ -17,22 +17,13 @@ from core.components import (
     render_kpi_card, render_metric_grid, create_line_chart, create_bar_chart,
     create_scatter_plot, create_histogram, render_data_table, create_gauge_chart
 )
+from core.profiling import begin_page, mark, render_profile_panel
+from core.fragments import section_fragment
 from core.utils import (
     format_number, format_percentage, format_duration, get_date_range_filter,
     calculate_rubric_mastery
 )
-from core.queries.attempts_queries import (
-    get_student_attempts, get_student_performance_summary,
-    get_attempt_improvement, get_score_trend
-)
-from core.queries.rubric_queries import (
-    get_student_rubric_scores, get_rubric_mastery_by_dimension
-)
-from core.queries.engagement_queries import (
-    get_student_engagement, get_student_active_days,
-    get_engagement_summary_by_student, get_daily_engagement_trend,
-    get_engagement_by_action_type
-)
+from core.queries.registry import fetch
 
 # Apply theme CSS (must be first)
 apply_theme()
@@ -50,6 +41,10 @@ st.markdown(apply_streamlit_theme(), unsafe_allow_html=True)
 # Require authentication
 require_auth(allowed_roles=["Student", "Admin"])
 
+# Profile this run section by section (see core/profiling.py)
+begin_page("Student Dashboard")
+mark("Setup")
+
 # Get user info
 user = get_current_user()
 student_id = user.get('student_id') or 'STU001'  # Fallback for admin viewing
@@ -85,25 +80,23 @@ with st.sidebar:
             "All Time": 3650
         }
         days = days_map[date_range_option]
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-    
-    st.markdown("---")
-    st.markdown("### 📊 View Options")
-    show_details = st.checkbox("Show Detailed Tables", value=True)
+        # End of today and a minute-floored start, so reruns bind the same
+        # arguments and hit the query cache
+        end_date = datetime.combine(datetime.now().date(), datetime.max.time())
+        start_date = (datetime.now() - timedelta(days=days)).replace(second=0, microsecond=0)
 
 # ============================================
 # KEY PERFORMANCE INDICATORS
 # ============================================
 
+mark("Key Performance Indicators")
 st.markdown("## 📊 Key Performance Indicators")
 
-# Fetch performance summary
-summary_query = get_student_performance_summary(student_id)
-summary_df = db.execute_query_df(summary_query)
+# Fetch the precomputed KPI snapshot (single primary-key lookup)
+snapshot_df = fetch(db, 'get_student_snapshot', student_id=student_id)
 
-if not summary_df.empty:
-    summary = summary_df.iloc[0]
+if not snapshot_df.empty:
+    summary = snapshot_df.iloc[0]
     
     # Safely get values with defaults for None/NaN
     total_cases = summary['total_cases_attempted'] if pd.notna(summary['total_cases_attempted']) else 0
@@ -111,27 +104,9 @@ if not summary_df.empty:
     avg_ces = summary['avg_ces'] if pd.notna(summary['avg_ces']) else 0
     avg_duration = summary['avg_duration'] if pd.notna(summary['avg_duration']) else 0
     max_score = summary['max_score'] if pd.notna(summary['max_score']) else 0
-    
-    # Calculate additional metrics
-    active_days_query = get_student_active_days(student_id)
-    active_days_df = db.execute_query_df(active_days_query)
-    active_days = active_days_df.iloc[0]['active_days'] if not active_days_df.empty else 0
-    active_days = active_days if pd.notna(active_days) else 0
-    
-    # Engagement summary
-    engagement_query = get_engagement_summary_by_student(student_id)
-    engagement_df = db.execute_query_df(engagement_query)
-    
-    total_duration = 0
-    if not engagement_df.empty:
-        total_duration = engagement_df.iloc[0]['total_duration_seconds']
-        total_duration = total_duration if pd.notna(total_duration) else 0
-    
-    # Rubric mastery
-    rubric_query = get_rubric_mastery_by_dimension(student_id)
-    rubric_df = db.execute_query_df(rubric_query)
-    avg_rubric_mastery = rubric_df['avg_percentage'].mean() if not rubric_df.empty else 0
-    avg_rubric_mastery = avg_rubric_mastery if pd.notna(avg_rubric_mastery) else 0
+    active_days = summary['active_days'] if pd.notna(summary['active_days']) else 0
+    total_duration = summary['total_engagement_seconds'] if pd.notna(summary['total_engagement_seconds']) else 0
+    avg_rubric_mastery = summary['rubric_mastery'] if pd.notna(summary['rubric_mastery']) else 0
     
     # Display KPI cards
     metrics = [
@@ -223,14 +198,14 @@ st.markdown("---")
 # CHARTS SECTION
 # ============================================
 
+mark("Charts")
 st.markdown("## 📈 Performance Analytics")
 
 col1, col2 = st.columns(2)
 
 with col1:
     # Score trend over time
-    score_trend_query = get_score_trend(student_id)
-    score_trend_df = db.execute_query_df(score_trend_query)
+    score_trend_df = fetch(db, 'get_score_trend', student_id=student_id)
     
     if not score_trend_df.empty:
         fig = create_line_chart(
@@ -247,8 +222,7 @@ with col1:
 
 with col2:
     # Attempt improvement
-    improvement_query = get_attempt_improvement(student_id)
-    improvement_df = db.execute_query_df(improvement_query)
+    improvement_df = fetch(db, 'get_attempt_improvement', student_id=student_id)
     
     if not improvement_df.empty and 'improvement' in improvement_df.columns:
         # Filter out null improvements
@@ -273,6 +247,7 @@ col3, col4 = st.columns(2)
 
 with col3:
     # Rubric dimension mastery
+    rubric_df = fetch(db, 'get_rubric_mastery_by_dimension', student_id=student_id)
     
     if not rubric_df.empty:
         fig = create_bar_chart(
@@ -290,8 +265,7 @@ with col3:
 
 with col4:
     # Engagement by action type
-    action_query = get_engagement_by_action_type(student_id)
-    action_df = db.execute_query_df(action_query)
+    action_df = fetch(db, 'get_engagement_by_action_type', student_id=student_id)
     
     if not action_df.empty:
         from core.components import create_pie_chart
@@ -306,8 +280,7 @@ with col4:
         st.info("Engagement data will appear here")
 
 # Daily engagement trend
-daily_engagement_query = get_daily_engagement_trend(student_id, days=30)
-daily_engagement_df = db.execute_query_df(daily_engagement_query)
+daily_engagement_df = fetch(db, 'get_daily_engagement_trend', student_id=student_id, days=30)
 
 if not daily_engagement_df.empty:
     fig = create_line_chart(
@@ -328,19 +301,26 @@ st.markdown("---")
 # DETAILED TABLES
 # ============================================
 
-if show_details:
+@section_fragment("Detailed Tables")
+def detailed_tables(student_id, start_date, end_date, date_range_option):
+    """Attempt, rubric and engagement tables; the checkbox reruns only this section"""
+    # Drawn here, not in the sidebar: a fragment may not write to the sidebar
+    if not st.checkbox("Show Detailed Tables", value=True, key="show_detailed_tables"):
+        return
+    
     st.markdown("## 📋 Detailed Data")
     
     tab1, tab2, tab3 = st.tabs(["📝 Attempt History", "📊 Rubric Scores", "🎯 Engagement Logs"])
     
     with tab1:
         st.markdown("### Attempt History")
-        attempts_query = get_student_attempts(
-            student_id,
-            start_date.isoformat() if date_range_option != "All Time" else None,
-            end_date.isoformat()
+        attempts_df = fetch(
+            db,
+            'get_student_attempts',
+            student_id=student_id,
+            start_date=start_date.isoformat() if date_range_option != "All Time" else None,
+            end_date=end_date.isoformat()
         )
-        attempts_df = db.execute_query_df(attempts_query)
         
         if not attempts_df.empty:
             # Format the dataframe
@@ -365,8 +345,7 @@ if show_details:
     
     with tab2:
         st.markdown("### Rubric Scores & Feedback")
-        rubric_scores_query = get_student_rubric_scores(student_id)
-        rubric_scores_df = db.execute_query_df(rubric_scores_query)
+        rubric_scores_df = fetch(db, 'get_student_rubric_scores', student_id=student_id)
         
         if not rubric_scores_df.empty:
             # Format the dataframe
@@ -391,12 +370,13 @@ if show_details:
     
     with tab3:
         st.markdown("### Engagement Session Logs")
-        engagement_query = get_student_engagement(
-            student_id,
-            start_date.isoformat() if date_range_option != "All Time" else None,
-            end_date.isoformat()
+        engagement_data_df = fetch(
+            db,
+            'get_student_engagement',
+            student_id=student_id,
+            start_date=start_date.isoformat() if date_range_option != "All Time" else None,
+            end_date=end_date.isoformat()
         )
-        engagement_data_df = db.execute_query_df(engagement_query)
         
         if not engagement_data_df.empty:
             # Format the dataframe
@@ -419,6 +399,10 @@ if show_details:
         else:
             st.info("No engagement logs in the selected date range")
 
+detailed_tables(student_id, start_date, end_date, date_range_option)
+
 # Footer
 st.markdown("---")
 st.caption("💡 MIND Unified Dashboard | Miva Open University")
+
+render_profile_panel()
@@ -16,6 +16,9 @@ from core.components import (
     render_kpi_card, render_metric_grid, create_line_chart, create_bar_chart,
     create_heatmap, create_box_plot, render_data_table
 )
+from core.profiling import begin_page, mark, render_profile_panel
+from core.fragments import section_fragment
+from core.tabs import LazyTabs
 from core.utils import (
     format_number, format_percentage, format_duration,
     get_at_risk_students
@@ -30,6 +33,8 @@ from core.queries.rubric_queries import (
 from core.queries.engagement_queries import (
     get_cohort_engagement_summary, get_daily_engagement_trend
 )
+from core.queries.registry import fetch
+from core.queries.time_bounds import time_range
 
 # Apply theme CSS (must be first)
 apply_theme()
@@ -47,6 +52,10 @@ st.markdown(apply_streamlit_theme(), unsafe_allow_html=True)
 # Require authentication
 require_auth(allowed_roles=["Faculty", "Admin"])
 
+# Profile this run section by section (see core/profiling.py)
+begin_page("Faculty Dashboard")
+mark("Setup")
+
 # Get user info
 user = get_current_user()
 
@@ -63,6 +72,8 @@ st.markdown("---")
 # FILTERS SECTION
 # ============================================================================
 
+mark("Filters")
+
 # Theme toggle in sidebar
 with st.sidebar:
     create_theme_toggle()
@@ -119,8 +130,10 @@ else:
         "All Time": 3650  # ~10 years
     }
     days = date_range_map.get(date_range, 30)
-    start_date = datetime.now() - timedelta(days=days)
-    end_date = datetime.now()
+    # End of today and a minute-floored start, so reruns bind the same
+    # arguments and hit the query cache
+    start_date = (datetime.now() - timedelta(days=days)).replace(second=0, microsecond=0)
+    end_date = datetime.combine(datetime.now().date(), datetime.max.time())
 
 st.markdown("---")
 
@@ -144,13 +157,18 @@ def build_student_filter():
 def build_date_filter(alias='a'):
     """Build date filter for attempts"""
     if start_date and end_date:
-        return f"{alias}.timestamp >= '{start_date}' AND {alias}.timestamp <= '{end_date}'"
+        return f"{alias}.timestamp >= %(start_ts)s AND {alias}.timestamp < %(end_ts)s"
     return "1=1"
 
+# Half-open [start, end) bounds for the placeholders build_date_filter() emits;
+# pass as params to every query that embeds a date filter
+date_params = time_range(start_date, end_date)
+
 # ============================================================================
 # KEY PERFORMANCE INDICATORS
 # ============================================================================
 
+mark("Key Performance Indicators")
 st.markdown("### 📈 Key Performance Indicators")
 
 # Query for KPIs
@@ -208,7 +226,7 @@ CROSS JOIN improvement_stats i
 CROSS JOIN at_risk_count ar
 """
 
-kpi_df = db.execute_query_df(kpi_query)
+kpi_df = db.execute_query_df(kpi_query, date_params)
 
 if not kpi_df.empty:
     kpi = kpi_df.iloc[0]
@@ -278,6 +296,7 @@ st.markdown("---")
 # CHARTS SECTION
 # ============================================================================
 
+mark("Charts")
 st.markdown("### 📊 Performance Analytics")
 
 # Two columns for charts
@@ -301,7 +320,7 @@ with col1:
     ORDER BY cs.title
     """
     
-    score_dist_df = db.execute_query_df(score_dist_query)
+    score_dist_df = db.execute_query_df(score_dist_query, date_params)
     
     if not score_dist_df.empty and len(score_dist_df) > 0:
         fig = create_bar_chart(
@@ -332,7 +351,7 @@ with col2:
     ORDER BY avg_score DESC
     """
     
-    dept_perf_df = db.execute_query_df(dept_perf_query)
+    dept_perf_df = db.execute_query_df(dept_perf_query, date_params)
     
     if not dept_perf_df.empty and len(dept_perf_df) > 0:
         fig = create_bar_chart(
@@ -353,33 +372,15 @@ col3, col4 = st.columns(2)
 
 with col3:
     # Query for improvement
-    improvement_query = f"""
-    WITH attempt_scores AS (
-        SELECT 
-            a.case_id,
-            cs.title as case_title,
-            a.attempt_number,
-            AVG(a.score) as avg_score
-        FROM attempts a
-        INNER JOIN case_studies cs ON a.case_id = cs.case_id
-        INNER JOIN students s ON a.student_id = s.student_id
-        WHERE {student_filter}
-        AND {date_filter}
-        AND a.attempt_number IN (1, 2)
-        GROUP BY a.case_id, cs.title, a.attempt_number
+    improvement_df = fetch(
+        db,
+        'get_case_improvement_summary',
+        cohort_id=selected_cohort if selected_cohort != 'All' else None,
+        department=selected_department if selected_department != 'All' else None,
+        campus=selected_campus if selected_campus != 'All' else None,
+        start_date=start_date.isoformat(),
+        end_date=end_date.isoformat()
     )
-    SELECT 
-        case_title,
-        MAX(CASE WHEN attempt_number = 1 THEN avg_score END) as attempt_1,
-        MAX(CASE WHEN attempt_number = 2 THEN avg_score END) as attempt_2
-    FROM attempt_scores
-    GROUP BY case_title
-    HAVING MAX(CASE WHEN attempt_number = 1 THEN avg_score END) IS NOT NULL
-    AND MAX(CASE WHEN attempt_number = 2 THEN avg_score END) IS NOT NULL
-    ORDER BY case_title
-    """
-    
-    improvement_df = db.execute_query_df(improvement_query)
     
     if not improvement_df.empty and len(improvement_df) > 0:
         # Calculate improvement
@@ -414,7 +415,7 @@ with col4:
     ORDER BY avg_score DESC
     """
     
-    campus_perf_df = db.execute_query_df(campus_perf_query)
+    campus_perf_df = db.execute_query_df(campus_perf_query, date_params)
     
     if not campus_perf_df.empty and len(campus_perf_df) > 0:
         fig = create_bar_chart(
@@ -436,22 +437,16 @@ st.markdown("---")
 # RUBRIC MASTERY HEATMAP
 # ============================================================================
 
-rubric_heatmap_query = f"""
-SELECT 
-    cs.title as case_title,
-    rs.rubric_dimension,
-    AVG(rs.score * 100.0 / NULLIF(rs.max_score, 0)) as avg_percentage
-FROM rubric_scores rs
-INNER JOIN attempts a ON rs.attempt_id = a.attempt_id
-INNER JOIN case_studies cs ON a.case_id = cs.case_id
-INNER JOIN students s ON a.student_id = s.student_id
-WHERE {student_filter}
-AND {date_filter}
-GROUP BY cs.title, rs.rubric_dimension
-ORDER BY cs.title, rs.rubric_dimension
-"""
-
-rubric_heatmap_df = db.execute_query_df(rubric_heatmap_query)
+mark("Rubric Mastery Heatmap")
+rubric_heatmap_df = fetch(
+    db,
+    'get_rubric_mastery_heatmap',
+    cohort_id=selected_cohort if selected_cohort != 'All' else None,
+    department=selected_department if selected_department != 'All' else None,
+    campus=selected_campus if selected_campus != 'All' else None,
+    start_date=start_date.date().isoformat(),
+    end_date=end_date.date().isoformat()
+)
 
 if not rubric_heatmap_df.empty and len(rubric_heatmap_df) > 0:
     # Pivot for heatmap
@@ -477,23 +472,16 @@ st.markdown("---")
 # ENGAGEMENT TRENDS
 # ============================================================================
 
-# Build date filter for engagement_logs (using 'el' alias)
-engagement_date_filter = build_date_filter('el')
-
-engagement_trend_query = f"""
-SELECT 
-    DATE(el.timestamp) as date,
-    COUNT(DISTINCT el.student_id) as active_students,
-    SUM(el.duration_seconds) / 3600.0 as total_hours
-FROM engagement_logs el
-INNER JOIN students s ON el.student_id = s.student_id
-WHERE {student_filter}
-AND {engagement_date_filter}
-GROUP BY DATE(el.timestamp)
-ORDER BY date
-"""
-
-engagement_trend_df = db.execute_query_df(engagement_trend_query)
+mark("Engagement Trends")
+engagement_trend_df = fetch(
+    db,
+    'get_engagement_daily_trend',
+    cohort_id=selected_cohort if selected_cohort != 'All' else None,
+    department=selected_department if selected_department != 'All' else None,
+    campus=selected_campus if selected_campus != 'All' else None,
+    start_date=start_date.date().isoformat(),
+    end_date=end_date.date().isoformat()
+)
 
 if not engagement_trend_df.empty and len(engagement_trend_df) > 0:
     engagement_trend_df['date'] = pd.to_datetime(engagement_trend_df['date'])
@@ -516,191 +504,227 @@ st.markdown("---")
 # DATA TABLES
 # ============================================================================
 
-st.markdown("### 📋 Detailed Performance Data")
-
-tab1, tab2, tab3, tab4 = st.tabs([
-    "📊 Student Performance Summary",
-    "📚 Case Study Summary",
-    "⚠️ At-Risk Students",
-    "🎯 Rubric Details"
-])
-
-with tab1:
-    st.markdown("#### Student Performance Summary")
-    
-    student_summary_query = f"""
-    SELECT 
-        s.student_id,
-        s.name,
-        s.cohort_id,
-        s.department,
-        s.campus,
-        COUNT(DISTINCT a.case_id) as cases_attempted,
-        AVG(a.score) as avg_score,
-        MIN(a.score) as min_score,
-        MAX(a.score) as max_score,
-        AVG(a.ces_value) as avg_ces,
-        SUM(a.duration_seconds) / 3600.0 as total_hours
-    FROM students s
-    LEFT JOIN attempts a ON s.student_id = a.student_id
-    WHERE {student_filter}
-    AND ({date_filter} OR a.attempt_id IS NULL)
-    GROUP BY s.student_id, s.name, s.cohort_id, s.department, s.campus
-    HAVING COUNT(a.attempt_id) > 0
-    ORDER BY avg_score DESC
-    """
+@section_fragment("Data Tables")
+def data_tables(student_filter, date_filter, date_params, date_range, start_date, end_date):
+    """Detail tables; switching tabs reruns only this section"""
+    st.markdown("### 📋 Detailed Performance Data")
     
-    student_summary_df = db.execute_query_df(student_summary_query)
+    detail_tabs = LazyTabs('faculty_detail_tables', [
+        "📊 Student Performance Summary",
+        "📚 Case Study Summary",
+        "⚠️ At-Risk Students",
+        "🎯 Rubric Details"
+    ])
+    # Only the open tab queries; its result is kept until a filter changes.
+    # Keyed on the period and its days, not date_params: preset periods end
+    # at datetime.now(), which differs on every rerun
+    detail_tabs.sync(student_filter, date_range, start_date.date(), end_date.date())
+    active_tab = detail_tabs.select()
     
-    if not student_summary_df.empty:
-        # Format columns
-        student_summary_df['avg_score'] = student_summary_df['avg_score'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
-        student_summary_df['min_score'] = student_summary_df['min_score'].apply(
-            lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
-        )
-        student_summary_df['max_score'] = student_summary_df['max_score'].apply(
-            lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
-        )
-        student_summary_df['avg_ces'] = student_summary_df['avg_ces'].apply(
-            lambda x: f"{x:.1f}" if pd.notna(x) else "N/A"
-        )
-        student_summary_df['total_hours'] = student_summary_df['total_hours'].apply(
-            lambda x: f"{x:.1f}h" if pd.notna(x) else "0h"
-        )
+    if active_tab == "📊 Student Performance Summary":
+        st.markdown("#### Student Performance Summary")
         
-        render_data_table(student_summary_df, f"student_performance_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.info("No student performance data available")
-
-with tab2:
-    st.markdown("#### Case Study Performance Summary")
-    
-    case_summary_query = f"""
-    SELECT 
-        cs.title as case_study,
-        COUNT(DISTINCT a.student_id) as students_attempted,
-        AVG(a.score) as avg_score,
-        MIN(a.score) as min_score,
-        MAX(a.score) as max_score,
-        AVG(a.ces_value) as avg_ces,
-        AVG(a.duration_seconds) / 60.0 as avg_duration_min,
-        COUNT(CASE WHEN a.attempt_number = 2 THEN 1 END) * 100.0 / 
-            NULLIF(COUNT(CASE WHEN a.attempt_number = 1 THEN 1 END), 0) as retry_rate
-    FROM case_studies cs
-    LEFT JOIN attempts a ON cs.case_id = a.case_id
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {date_filter}
-    GROUP BY cs.case_id, cs.title
-    ORDER BY students_attempted DESC
-    """
-    
-    case_summary_df = db.execute_query_df(case_summary_query)
-    
-    if not case_summary_df.empty:
-        # Format columns
-        case_summary_df['avg_score'] = case_summary_df['avg_score'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
-        case_summary_df['min_score'] = case_summary_df['min_score'].apply(
-            lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
-        )
-        case_summary_df['max_score'] = case_summary_df['max_score'].apply(
-            lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
-        )
-        case_summary_df['avg_ces'] = case_summary_df['avg_ces'].apply(
-            lambda x: f"{x:.1f}" if pd.notna(x) else "N/A"
-        )
-        case_summary_df['avg_duration_min'] = case_summary_df['avg_duration_min'].apply(
-            lambda x: f"{x:.1f} min" if pd.notna(x) else "N/A"
-        )
-        case_summary_df['retry_rate'] = case_summary_df['retry_rate'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "0%"
-        )
+        student_summary_query = f"""
+        SELECT 
+            s.student_id,
+            s.name,
+            s.cohort_id,
+            s.department,
+            s.campus,
+            COUNT(DISTINCT a.case_id) as cases_attempted,
+            AVG(a.score) as avg_score,
+            MIN(a.score) as min_score,
+            MAX(a.score) as max_score,
+            AVG(a.ces_value) as avg_ces,
+            SUM(a.duration_seconds) / 3600.0 as total_hours
+        FROM students s
+        LEFT JOIN attempts a ON s.student_id = a.student_id
+        WHERE {student_filter}
+        AND ({date_filter} OR a.attempt_id IS NULL)
+        GROUP BY s.student_id, s.name, s.cohort_id, s.department, s.campus
+        HAVING COUNT(a.attempt_id) > 0
+        ORDER BY avg_score DESC
+        """
         
-        render_data_table(case_summary_df, f"case_study_summary_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.info("No case study data available")
-
-with tab3:
-    st.markdown("#### Students At Risk (Score < 60%)")
-    
-    at_risk_query = f"""
-    SELECT 
-        s.student_id,
-        s.name,
-        s.cohort_id,
-        s.department,
-        s.campus,
-        COUNT(DISTINCT a.case_id) as cases_attempted,
-        AVG(a.score) as avg_score,
-        MIN(a.score) as lowest_score,
-        COUNT(CASE WHEN a.score < 60 THEN 1 END) as failing_attempts,
-        MAX(a.timestamp) as last_attempt_date
-    FROM students s
-    INNER JOIN attempts a ON s.student_id = a.student_id
-    WHERE {student_filter}
-    AND {date_filter}
-    GROUP BY s.student_id, s.name, s.cohort_id, s.department, s.campus
-    HAVING AVG(a.score) < 60 OR COUNT(CASE WHEN a.score < 60 THEN 1 END) > 0
-    ORDER BY avg_score ASC
-    """
-    
-    at_risk_df = db.execute_query_df(at_risk_query)
-    
-    if not at_risk_df.empty:
-        # Format columns
-        at_risk_df['avg_score'] = at_risk_df['avg_score'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
-        at_risk_df['lowest_score'] = at_risk_df['lowest_score'].apply(
-            lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
-        )
-        at_risk_df['last_attempt_date'] = pd.to_datetime(at_risk_df['last_attempt_date']).dt.strftime('%Y-%m-%d')
+        def load_student_summary():
+            """Run and format the student summary"""
+            student_summary_df = db.execute_query_df(student_summary_query, date_params)
+            
+            if not student_summary_df.empty:
+                # Format columns
+                student_summary_df['avg_score'] = student_summary_df['avg_score'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+                )
+                student_summary_df['min_score'] = student_summary_df['min_score'].apply(
+                    lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
+                )
+                student_summary_df['max_score'] = student_summary_df['max_score'].apply(
+                    lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
+                )
+                student_summary_df['avg_ces'] = student_summary_df['avg_ces'].apply(
+                    lambda x: f"{x:.1f}" if pd.notna(x) else "N/A"
+                )
+                student_summary_df['total_hours'] = student_summary_df['total_hours'].apply(
+                    lambda x: f"{x:.1f}h" if pd.notna(x) else "0h"
+                )
+            return student_summary_df
         
-        st.warning(f"⚠️ {len(at_risk_df)} student(s) need attention")
-        render_data_table(at_risk_df, f"at_risk_students_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.success("✅ No at-risk students in the selected filters")
-
-with tab4:
-    st.markdown("#### Detailed Rubric Performance")
+        student_summary_df = detail_tabs.load(load_student_summary)
+        
+        if not student_summary_df.empty:
+            render_data_table(student_summary_df, f"student_performance_{datetime.now().strftime('%Y%m%d')}")
+        else:
+            st.info("No student performance data available")
     
-    rubric_detail_query = f"""
-    SELECT 
-        cs.title as case_study,
-        rs.rubric_dimension,
-        AVG(rs.score * 100.0 / NULLIF(rs.max_score, 0)) as avg_percentage,
-        COUNT(DISTINCT a.student_id) as students_assessed,
-        COUNT(CASE WHEN rs.improvement_flag = TRUE THEN 1 END) as needs_improvement_count,
-        COUNT(CASE WHEN rs.improvement_flag = TRUE THEN 1 END) * 100.0 / 
-            NULLIF(COUNT(*), 0) as improvement_rate
-    FROM rubric_scores rs
-    INNER JOIN attempts a ON rs.attempt_id = a.attempt_id
-    INNER JOIN case_studies cs ON a.case_id = cs.case_id
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {date_filter}
-    GROUP BY cs.title, rs.rubric_dimension
-    ORDER BY cs.title, avg_percentage ASC
-    """
+    elif active_tab == "📚 Case Study Summary":
+        st.markdown("#### Case Study Performance Summary")
+        
+        case_summary_query = f"""
+        SELECT 
+            cs.title as case_study,
+            COUNT(DISTINCT a.student_id) as students_attempted,
+            AVG(a.score) as avg_score,
+            MIN(a.score) as min_score,
+            MAX(a.score) as max_score,
+            AVG(a.ces_value) as avg_ces,
+            AVG(a.duration_seconds) / 60.0 as avg_duration_min,
+            COUNT(CASE WHEN a.attempt_number = 2 THEN 1 END) * 100.0 / 
+                NULLIF(COUNT(CASE WHEN a.attempt_number = 1 THEN 1 END), 0) as retry_rate
+        FROM case_studies cs
+        LEFT JOIN attempts a ON cs.case_id = a.case_id
+        INNER JOIN students s ON a.student_id = s.student_id
+        WHERE {student_filter}
+        AND {date_filter}
+        GROUP BY cs.case_id, cs.title
+        ORDER BY students_attempted DESC
+        """
+        
+        def load_case_summary():
+            """Run and format the case study summary"""
+            case_summary_df = db.execute_query_df(case_summary_query, date_params)
+            
+            if not case_summary_df.empty:
+                # Format columns
+                case_summary_df['avg_score'] = case_summary_df['avg_score'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+                )
+                case_summary_df['min_score'] = case_summary_df['min_score'].apply(
+                    lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
+                )
+                case_summary_df['max_score'] = case_summary_df['max_score'].apply(
+                    lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
+                )
+                case_summary_df['avg_ces'] = case_summary_df['avg_ces'].apply(
+                    lambda x: f"{x:.1f}" if pd.notna(x) else "N/A"
+                )
+                case_summary_df['avg_duration_min'] = case_summary_df['avg_duration_min'].apply(
+                    lambda x: f"{x:.1f} min" if pd.notna(x) else "N/A"
+                )
+                case_summary_df['retry_rate'] = case_summary_df['retry_rate'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "0%"
+                )
+            return case_summary_df
+        
+        case_summary_df = detail_tabs.load(load_case_summary)
+        
+        if not case_summary_df.empty:
+            render_data_table(case_summary_df, f"case_study_summary_{datetime.now().strftime('%Y%m%d')}")
+        else:
+            st.info("No case study data available")
     
-    rubric_detail_df = db.execute_query_df(rubric_detail_query)
+    elif active_tab == "⚠️ At-Risk Students":
+        st.markdown("#### Students At Risk (Score < 60%)")
+        
+        at_risk_query = f"""
+        SELECT 
+            s.student_id,
+            s.name,
+            s.cohort_id,
+            s.department,
+            s.campus,
+            COUNT(DISTINCT a.case_id) as cases_attempted,
+            AVG(a.score) as avg_score,
+            MIN(a.score) as lowest_score,
+            COUNT(CASE WHEN a.score < 60 THEN 1 END) as failing_attempts,
+            MAX(a.timestamp) as last_attempt_date
+        FROM students s
+        INNER JOIN attempts a ON s.student_id = a.student_id
+        WHERE {student_filter}
+        AND {date_filter}
+        GROUP BY s.student_id, s.name, s.cohort_id, s.department, s.campus
+        HAVING AVG(a.score) < 60 OR COUNT(CASE WHEN a.score < 60 THEN 1 END) > 0
+        ORDER BY avg_score ASC
+        """
+        
+        def load_at_risk():
+            """Run and format the at-risk student list"""
+            at_risk_df = db.execute_query_df(at_risk_query, date_params)
+            
+            if not at_risk_df.empty:
+                # Format columns
+                at_risk_df['avg_score'] = at_risk_df['avg_score'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+                )
+                at_risk_df['lowest_score'] = at_risk_df['lowest_score'].apply(
+                    lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
+                )
+                at_risk_df['last_attempt_date'] = pd.to_datetime(at_risk_df['last_attempt_date']).dt.strftime('%Y-%m-%d')
+            return at_risk_df
+        
+        at_risk_df = detail_tabs.load(load_at_risk)
+        
+        if not at_risk_df.empty:
+            st.warning(f"⚠️ {len(at_risk_df)} student(s) need attention")
+            render_data_table(at_risk_df, f"at_risk_students_{datetime.now().strftime('%Y%m%d')}")
+        else:
+            st.success("✅ No at-risk students in the selected filters")
     
-    if not rubric_detail_df.empty:
-        # Format columns
-        rubric_detail_df['avg_percentage'] = rubric_detail_df['avg_percentage'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
-        rubric_detail_df['improvement_rate'] = rubric_detail_df['improvement_rate'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "0%"
-        )
+    elif active_tab == "🎯 Rubric Details":
+        st.markdown("#### Detailed Rubric Performance")
         
-        render_data_table(rubric_detail_df, f"rubric_details_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.info("No rubric data available")
+        rubric_detail_query = f"""
+        SELECT 
+            cs.title as case_study,
+            rs.rubric_dimension,
+            AVG(rs.score * 100.0 / NULLIF(rs.max_score, 0)) as avg_percentage,
+            COUNT(DISTINCT a.student_id) as students_assessed,
+            COUNT(CASE WHEN rs.improvement_flag = TRUE THEN 1 END) as needs_improvement_count,
+            COUNT(CASE WHEN rs.improvement_flag = TRUE THEN 1 END) * 100.0 / 
+                NULLIF(COUNT(*), 0) as improvement_rate
+        FROM rubric_scores rs
+        INNER JOIN attempts a ON rs.attempt_id = a.attempt_id
+        INNER JOIN case_studies cs ON a.case_id = cs.case_id
+        INNER JOIN students s ON a.student_id = s.student_id
+        WHERE {student_filter}
+        AND {date_filter}
+        GROUP BY cs.title, rs.rubric_dimension
+        ORDER BY cs.title, avg_percentage ASC
+        """
+        
+        def load_rubric_details():
+            """Run and format the rubric details"""
+            rubric_detail_df = db.execute_query_df(rubric_detail_query, date_params)
+            
+            if not rubric_detail_df.empty:
+                # Format columns
+                rubric_detail_df['avg_percentage'] = rubric_detail_df['avg_percentage'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+                )
+                rubric_detail_df['improvement_rate'] = rubric_detail_df['improvement_rate'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "0%"
+                )
+            return rubric_detail_df
+        
+        rubric_detail_df = detail_tabs.load(load_rubric_details)
+        
+        if not rubric_detail_df.empty:
+            render_data_table(rubric_detail_df, f"rubric_details_{datetime.now().strftime('%Y%m%d')}")
+        else:
+            st.info("No rubric data available")
+
+data_tables(student_filter, date_filter, date_params, date_range, start_date, end_date)
 
 st.markdown("---")
 st.caption("💡 MIND Unified Dashboard | Miva Open University")
+
+render_profile_panel()
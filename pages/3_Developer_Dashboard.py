@@ -16,9 +16,17 @@ from core.components import (
     render_kpi_card, render_metric_grid, create_line_chart, create_bar_chart,
     create_heatmap, create_box_plot, render_data_table, create_scatter_plot
 )
+from core.profiling import begin_page, mark, render_profile_panel
+from core.fragments import section_fragment
+from core.tabs import LazyTabs
 from core.utils import (
     format_number, format_percentage, format_duration
 )
+from core.queries.time_bounds import time_range
+from core.queries.environment_queries import (
+    get_system_reliability_log, get_environment_metrics_log
+)
+from core.pagination import KeysetPager
 
 # Apply theme CSS (must be first)
 apply_theme()
@@ -36,6 +44,10 @@ st.markdown(apply_streamlit_theme(), unsafe_allow_html=True)
 # Require authentication
 require_auth(allowed_roles=["Developer", "Admin"])
 
+# Profile this run section by section (see core/profiling.py)
+begin_page("Developer Dashboard")
+mark("Setup")
+
 # Get user info
 user = get_current_user()
 
@@ -52,6 +64,8 @@ st.markdown("---")
 # FILTERS SECTION
 # ============================================================================
 
+mark("Filters")
+
 # Theme toggle in sidebar
 with st.sidebar:
     create_theme_toggle()
@@ -129,13 +143,18 @@ def build_system_filter(alias='sr'):
 def build_date_filter(alias='sr'):
     """Build date filter"""
     if start_date and end_date:
-        return f"{alias}.timestamp >= '{start_date}' AND {alias}.timestamp <= '{end_date}'"
+        return f"{alias}.timestamp >= %(start_ts)s AND {alias}.timestamp < %(end_ts)s"
     return "1=1"
 
+# Half-open [start, end) bounds for the placeholders build_date_filter() emits;
+# pass as params to every query that embeds a date filter
+date_params = time_range(start_date, end_date)
+
 # ============================================================================
 # SYSTEM HEALTH KPIs
 # ============================================================================
 
+mark("System Health KPIs")
 st.markdown("### 📊 System Health Overview")
 
 system_filter = build_system_filter()
@@ -176,7 +195,7 @@ FROM system_stats ss
 CROSS JOIN severity_counts sc
 """
 
-kpi_df = db.execute_query_df(kpi_query)
+kpi_df = db.execute_query_df(kpi_query, date_params)
 
 if not kpi_df.empty:
     kpi = kpi_df.iloc[0]
@@ -242,6 +261,7 @@ st.markdown("---")
 # API PERFORMANCE CHARTS
 # ============================================================================
 
+mark("API Performance Charts")
 st.markdown("### 📈 API Performance Analytics")
 
 col1, col2 = st.columns(2)
@@ -262,7 +282,7 @@ with col1:
     ORDER BY avg_latency DESC
     """
     
-    latency_df = db.execute_query_df(latency_query)
+    latency_df = db.execute_query_df(latency_query, date_params)
     
     if not latency_df.empty and len(latency_df) > 0:
         fig = create_bar_chart(
@@ -293,7 +313,7 @@ with col2:
     ORDER BY avg_error_rate DESC
     """
     
-    error_df = db.execute_query_df(error_query)
+    error_df = db.execute_query_df(error_query, date_params)
     
     if not error_df.empty and len(error_df) > 0:
         fig = create_bar_chart(
@@ -328,7 +348,7 @@ with col3:
     ORDER BY avg_latency DESC
     """
     
-    location_df = db.execute_query_df(location_query)
+    location_df = db.execute_query_df(location_query, date_params)
     
     if not location_df.empty and len(location_df) > 0:
         fig = create_bar_chart(
@@ -363,7 +383,7 @@ with col4:
         END
     """
     
-    severity_df = db.execute_query_df(severity_query)
+    severity_df = db.execute_query_df(severity_query, date_params)
     
     if not severity_df.empty and len(severity_df) > 0:
         fig = create_bar_chart(
@@ -385,6 +405,7 @@ st.markdown("---")
 # LATENCY TRENDS OVER TIME
 # ============================================================================
 
+mark("Latency Trends Over Time")
 st.markdown("### 📅 Latency Trends Over Time")
 
 # Build date filter for system_reliability
@@ -392,18 +413,18 @@ sr_date_filter = build_date_filter('sr')
 
 trend_query = f"""
 SELECT 
-    DATE(sr.timestamp) as date,
+    mind_local_date(sr.timestamp) as date,
     AVG(sr.latency_ms) as avg_latency,
     MAX(sr.latency_ms) as max_latency,
     MIN(sr.latency_ms) as min_latency
 FROM system_reliability sr
 WHERE {system_filter}
 AND {sr_date_filter}
-GROUP BY DATE(sr.timestamp)
+GROUP BY mind_local_date(sr.timestamp)
 ORDER BY date
 """
 
-trend_df = db.execute_query_df(trend_query)
+trend_df = db.execute_query_df(trend_query, date_params)
 
 if not trend_df.empty and len(trend_df) > 0:
     trend_df['date'] = pd.to_datetime(trend_df['date'])
@@ -426,6 +447,7 @@ st.markdown("---")
 # ENVIRONMENT QUALITY METRICS
 # ============================================================================
 
+mark("Environment Quality Metrics")
 st.markdown("### 🌍 Environment Quality Analysis")
 
 col1, col2 = st.columns(2)
@@ -597,6 +619,7 @@ st.markdown("---")
 # ENVIRONMENT CORRELATION ANALYSIS
 # ============================================================================
 
+mark("Environment Correlation Analysis")
 st.markdown("### 🔬 Environment Impact on Performance")
 
 correlation_query = """
@@ -653,168 +676,174 @@ st.markdown("---")
 # DATA TABLES
 # ============================================================================
 
-st.markdown("### 📋 Detailed System Data")
-
-tab1, tab2, tab3, tab4 = st.tabs([
-    "🖥️ System Reliability",
-    "🌍 Environment Metrics",
-    "⚠️ Critical Incidents",
-    "📊 Performance Summary"
-])
-
-with tab1:
-    st.markdown("#### System Reliability Log")
-    
-    system_table_query = f"""
-    SELECT 
-        sr.timestamp,
-        sr.api_name,
-        sr.latency_ms,
-        sr.error_rate,
-        sr.reliability_index,
-        sr.location,
-        sr.severity
-    FROM system_reliability sr
-    WHERE {system_filter}
-    AND {date_filter}
-    ORDER BY sr.timestamp DESC
-    LIMIT 1000
-    """
-    
-    system_table_df = db.execute_query_df(system_table_query)
-    
-    if not system_table_df.empty:
-        system_table_df['timestamp'] = pd.to_datetime(system_table_df['timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
-        system_table_df['latency_ms'] = system_table_df['latency_ms'].apply(
-            lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
-        )
-        system_table_df['error_rate'] = system_table_df['error_rate'].apply(
-            lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A"
-        )
-        system_table_df['reliability_index'] = system_table_df['reliability_index'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
+@section_fragment("Data Tables")
+def data_tables(system_filter, date_filter, date_params, selected_api, selected_location, selected_severity,
+                date_range, start_date, end_date):
+    """Detail tables; switching tabs or pages reruns only this section"""
+    st.markdown("### 📋 Detailed System Data")
+    
+    detail_tabs = LazyTabs('developer_detail_tables', [
+        "🖥️ System Reliability",
+        "🌍 Environment Metrics",
+        "⚠️ Critical Incidents",
+        "📊 Performance Summary"
+    ])
+    # Only the open tab queries. Paged logs re-read one keyset page each time;
+    # the summary is kept until a filter changes. Keyed on the period and its
+    # days, not date_params: preset periods end at datetime.now()
+    detail_tabs.sync(system_filter, date_range, start_date.date(), end_date.date())
+    active_tab = detail_tabs.select()
+    
+    if active_tab == "🖥️ System Reliability":
+        st.markdown("#### System Reliability Log")
         
-        render_data_table(system_table_df, f"system_reliability_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.info("No system reliability data available")
-
-with tab2:
-    st.markdown("#### Environment Metrics by Attempt")
-    
-    env_table_query = """
-    SELECT 
-        em.attempt_id,
-        em.device_type,
-        em.microphone_type,
-        em.noise_level,
-        em.noise_quality_index,
-        em.internet_latency_ms,
-        em.internet_stability_score,
-        em.connection_drops,
-        em.signal_strength,
-        a.score as student_score
-    FROM environment_metrics em
-    INNER JOIN attempts a ON em.attempt_id = a.attempt_id
-    ORDER BY a.timestamp DESC
-    LIMIT 500
-    """
-    
-    env_table_df = db.execute_query_df(env_table_query)
-    
-    if not env_table_df.empty:
-        env_table_df['noise_level'] = env_table_df['noise_level'].apply(
-            lambda x: f"{x:.0f} dB" if pd.notna(x) else "N/A"
-        )
-        env_table_df['internet_latency_ms'] = env_table_df['internet_latency_ms'].apply(
-            lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
-        )
-        env_table_df['student_score'] = env_table_df['student_score'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
+        system_log_pager = KeysetPager('system_reliability_log', ('timestamp', 'record_id'))
+        system_log_pager.sync(selected_api, selected_location, selected_severity,
+                              date_range, start_date.date(), end_date.date())
+        system_table_df = system_log_pager.fetch(lambda after, limit: db.execute_query_df(
+            get_system_reliability_log(
+                api_name=None if selected_api == 'All' else selected_api,
+                location=None if selected_location == 'All' else selected_location,
+                severity=None if selected_severity == 'All' else selected_severity,
+                start_date=start_date,
+                end_date=end_date,
+                after=after,
+                limit=limit
+            )
+        ))
         
-        render_data_table(env_table_df, f"environment_metrics_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.info("No environment metrics available")
-
-with tab3:
-    st.markdown("#### Critical Incidents")
-    
-    critical_query = f"""
-    SELECT 
-        sr.timestamp,
-        sr.api_name,
-        sr.latency_ms,
-        sr.error_rate,
-        sr.reliability_index,
-        sr.location,
-        sr.severity
-    FROM system_reliability sr
-    WHERE sr.severity = 'Critical'
-    AND {date_filter}
-    ORDER BY sr.timestamp DESC
-    LIMIT 200
-    """
-    
-    critical_df = db.execute_query_df(critical_query)
-    
-    if not critical_df.empty:
-        critical_df['timestamp'] = pd.to_datetime(critical_df['timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
-        critical_df['latency_ms'] = critical_df['latency_ms'].apply(
-            lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
-        )
-        critical_df['error_rate'] = critical_df['error_rate'].apply(
-            lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A"
-        )
+        if not system_table_df.empty:
+            system_table_df = system_table_df.drop(columns=['record_id'])
+            system_table_df['timestamp'] = pd.to_datetime(system_table_df['timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
+            system_table_df['latency_ms'] = system_table_df['latency_ms'].apply(
+                lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
+            )
+            system_table_df['error_rate'] = system_table_df['error_rate'].apply(
+                lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A"
+            )
+            system_table_df['reliability_index'] = system_table_df['reliability_index'].apply(
+                lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+            )
+            
+            render_data_table(system_table_df, f"system_reliability_{datetime.now().strftime('%Y%m%d')}",
+                              pager=system_log_pager)
+        else:
+            st.info("No system reliability data available")
+    
+    elif active_tab == "🌍 Environment Metrics":
+        st.markdown("#### Environment Metrics by Attempt")
         
-        st.warning(f"⚠️ {len(critical_df)} critical incident(s) found")
-        render_data_table(critical_df, f"critical_incidents_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.success("✅ No critical incidents in the selected time period")
-
-with tab4:
-    st.markdown("#### Performance Summary by API")
-    
-    summary_query = f"""
-    SELECT 
-        api_name,
-        COUNT(*) as total_requests,
-        AVG(latency_ms) as avg_latency,
-        MIN(latency_ms) as min_latency,
-        MAX(latency_ms) as max_latency,
-        AVG(error_rate) as avg_error_rate,
-        AVG(reliability_index) as avg_reliability,
-        COUNT(CASE WHEN severity = 'Critical' THEN 1 END) as critical_count,
-        COUNT(CASE WHEN severity = 'Warning' THEN 1 END) as warning_count
-    FROM system_reliability sr
-    WHERE {system_filter}
-    AND {date_filter}
-    GROUP BY api_name
-    ORDER BY avg_latency DESC
-    """
-    
-    summary_df = db.execute_query_df(summary_query)
-    
-    if not summary_df.empty:
-        summary_df['avg_latency'] = summary_df['avg_latency'].apply(
-            lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
-        )
-        summary_df['min_latency'] = summary_df['min_latency'].apply(
-            lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
-        )
-        summary_df['max_latency'] = summary_df['max_latency'].apply(
-            lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
-        )
-        summary_df['avg_error_rate'] = summary_df['avg_error_rate'].apply(
-            lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A"
-        )
-        summary_df['avg_reliability'] = summary_df['avg_reliability'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
+        env_log_pager = KeysetPager('environment_metrics_log', ('timestamp', 'attempt_id'))
+        env_table_df = env_log_pager.fetch(lambda after, limit: db.execute_query_df(
+            get_environment_metrics_log(after=after, limit=limit)
+        ))
         
-        render_data_table(summary_df, f"api_summary_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.info("No summary data available")
+        if not env_table_df.empty:
+            env_table_df = env_table_df.drop(columns=['timestamp'])
+            env_table_df['noise_level'] = env_table_df['noise_level'].apply(
+                lambda x: f"{x:.0f} dB" if pd.notna(x) else "N/A"
+            )
+            env_table_df['internet_latency_ms'] = env_table_df['internet_latency_ms'].apply(
+                lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
+            )
+            env_table_df['student_score'] = env_table_df['student_score'].apply(
+                lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+            )
+            
+            render_data_table(env_table_df, f"environment_metrics_{datetime.now().strftime('%Y%m%d')}",
+                              pager=env_log_pager)
+        else:
+            st.info("No environment metrics available")
+    
+    elif active_tab == "⚠️ Critical Incidents":
+        st.markdown("#### Critical Incidents")
+        
+        critical_pager = KeysetPager('critical_incidents', ('timestamp', 'record_id'))
+        critical_pager.sync(date_range, start_date.date(), end_date.date())
+        critical_df = critical_pager.fetch(lambda after, limit: db.execute_query_df(
+            get_system_reliability_log(
+                severity='Critical',
+                start_date=start_date,
+                end_date=end_date,
+                after=after,
+                limit=limit
+            )
+        ))
+        
+        if not critical_df.empty:
+            critical_df = critical_df.drop(columns=['record_id'])
+            critical_df['timestamp'] = pd.to_datetime(critical_df['timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
+            critical_df['latency_ms'] = critical_df['latency_ms'].apply(
+                lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
+            )
+            critical_df['error_rate'] = critical_df['error_rate'].apply(
+                lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A"
+            )
+            
+            shown = (critical_pager.page_number - 1) * critical_pager.page_size + len(critical_df)
+            if critical_pager.has_next:
+                st.warning(f"⚠️ More than {shown} critical incidents found")
+            else:
+                st.warning(f"⚠️ {shown} critical incident(s) found")
+            render_data_table(critical_df, f"critical_incidents_{datetime.now().strftime('%Y%m%d')}",
+                              pager=critical_pager)
+        else:
+            st.success("✅ No critical incidents in the selected time period")
+    
+    elif active_tab == "📊 Performance Summary":
+        st.markdown("#### Performance Summary by API")
+        
+        summary_query = f"""
+        SELECT 
+            api_name,
+            COUNT(*) as total_requests,
+            AVG(latency_ms) as avg_latency,
+            MIN(latency_ms) as min_latency,
+            MAX(latency_ms) as max_latency,
+            AVG(error_rate) as avg_error_rate,
+            AVG(reliability_index) as avg_reliability,
+            COUNT(CASE WHEN severity = 'Critical' THEN 1 END) as critical_count,
+            COUNT(CASE WHEN severity = 'Warning' THEN 1 END) as warning_count
+        FROM system_reliability sr
+        WHERE {system_filter}
+        AND {date_filter}
+        GROUP BY api_name
+        ORDER BY avg_latency DESC
+        """
+        
+        def load_api_summary():
+            """Run and format the per-API performance summary"""
+            summary_df = db.execute_query_df(summary_query, date_params)
+            
+            if not summary_df.empty:
+                summary_df['avg_latency'] = summary_df['avg_latency'].apply(
+                    lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
+                )
+                summary_df['min_latency'] = summary_df['min_latency'].apply(
+                    lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
+                )
+                summary_df['max_latency'] = summary_df['max_latency'].apply(
+                    lambda x: f"{x:.0f} ms" if pd.notna(x) else "N/A"
+                )
+                summary_df['avg_error_rate'] = summary_df['avg_error_rate'].apply(
+                    lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A"
+                )
+                summary_df['avg_reliability'] = summary_df['avg_reliability'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+                )
+            return summary_df
+        
+        summary_df = detail_tabs.load(load_api_summary)
+        
+        if not summary_df.empty:
+            render_data_table(summary_df, f"api_summary_{datetime.now().strftime('%Y%m%d')}")
+        else:
+            st.info("No summary data available")
+
+data_tables(system_filter, date_filter, date_params, selected_api, selected_location, selected_severity,
+            date_range, start_date, end_date)
 
 st.markdown("---")
 st.caption("💡 MIND Unified Dashboard | Miva Open University")
+
+render_profile_panel()
@@ -17,9 +17,15 @@ from core.components import (
     create_heatmap, create_box_plot, render_data_table, create_scatter_plot,
     create_pie_chart
 )
+from core.profiling import begin_page, mark, render_profile_panel
+from core.fragments import section_fragment
+from core.tabs import LazyTabs
+from core.progressive import ProgressivePage
 from core.utils import (
     format_number, format_percentage, format_duration
 )
+from core.queries.registry import fetch
+from core.queries.time_bounds import time_range
 
 # Apply theme CSS (must be first)
 apply_theme()
@@ -37,6 +43,10 @@ st.markdown(apply_streamlit_theme(), unsafe_allow_html=True)
 # Require authentication
 require_auth(allowed_roles=["Admin"])
 
+# Profile this run section by section (see core/profiling.py)
+begin_page("Admin Dashboard")
+mark("Setup")
+
 # Get user info
 user = get_current_user()
 
@@ -53,6 +63,8 @@ st.markdown("---")
 # FILTERS SECTION
 # ============================================================================
 
+mark("Filters")
+
 # Theme toggle in sidebar
 with st.sidebar:
     create_theme_toggle()
@@ -101,8 +113,10 @@ else:
         "All Time": 3650
     }
     days = date_range_map.get(date_range, 30)
-    start_date = datetime.now() - timedelta(days=days)
-    end_date = datetime.now()
+    # End of today and a minute-floored start, so reruns bind the same
+    # arguments and hit the query cache
+    start_date = (datetime.now() - timedelta(days=days)).replace(second=0, microsecond=0)
+    end_date = datetime.combine(datetime.now().date(), datetime.max.time())
 
 st.markdown("---")
 
@@ -124,17 +138,39 @@ def build_student_filter():
 def build_date_filter(alias='a'):
     """Build date filter"""
     if start_date and end_date:
-        return f"{alias}.timestamp >= '{start_date}' AND {alias}.timestamp <= '{end_date}'"
+        return f"{alias}.timestamp >= %(start_ts)s AND {alias}.timestamp < %(end_ts)s"
     return "1=1"
 
+# Half-open [start, end) bounds for the placeholders build_date_filter() emits;
+# pass as params to every query that embeds a date filter
+date_params = time_range(start_date, end_date)
+
+def load_daily_trends(cohort_id, department, start, end):
+    """Load the wide daily trend frame shared by the trend charts"""
+    # Cached by query identity; writes to attempts / students invalidate it.
+    # start / end are the datetimes behind date_params, so time_range() gives
+    # the trends the same [start_ts, end_ts) window as the KPI strip
+    trends_df = fetch(
+        db,
+        'get_daily_trends',
+        cohort_id=cohort_id,
+        department=department,
+        start_date=start.isoformat(),
+        end_date=end.isoformat()
+    )
+    if not trends_df.empty:
+        trends_df['date'] = pd.to_datetime(trends_df['date'])
+    return trends_df
+
 # ============================================================================
-# EXECUTIVE SUMMARY KPIs
+# PROGRESSIVE RENDERING
 # ============================================================================
 
-st.markdown("### 📈 Executive Summary")
+mark("Queries")
 
 student_filter = build_student_filter()
 date_filter = build_date_filter()
+el_date_filter = build_date_filter('a')
 
 kpi_query = f"""
 WITH student_base AS (
@@ -197,7 +233,124 @@ CROSS JOIN improvement_stats i
 CROSS JOIN engagement_stats es
 """
 
-kpi_df = db.execute_query_df(kpi_query)
+dept_perf_query = f"""
+SELECT 
+    s.department,
+    COUNT(DISTINCT s.student_id) as student_count,
+    AVG(a.score) as avg_score,
+    COUNT(a.attempt_id) as total_attempts,
+    AVG(a.ces_value) as avg_ces,
+    SUM(a.duration_seconds) / 3600.0 as total_hours
+FROM students s
+LEFT JOIN attempts a ON s.student_id = a.student_id
+WHERE {student_filter}
+AND ({el_date_filter} OR a.attempt_id IS NULL)
+AND s.department IS NOT NULL
+GROUP BY s.department
+HAVING COUNT(a.attempt_id) > 0
+ORDER BY avg_score DESC
+"""
+
+campus_perf_query = f"""
+SELECT 
+    s.campus,
+    COUNT(DISTINCT s.student_id) as student_count,
+    AVG(a.score) as avg_score,
+    COUNT(a.attempt_id) as total_attempts,
+    SUM(a.duration_seconds) / 3600.0 as total_hours
+FROM students s
+LEFT JOIN attempts a ON s.student_id = a.student_id
+WHERE {student_filter}
+AND ({el_date_filter} OR a.attempt_id IS NULL)
+AND s.campus IS NOT NULL
+GROUP BY s.campus
+HAVING COUNT(a.attempt_id) > 0
+ORDER BY avg_score DESC
+"""
+
+cohort_dist_query = f"""
+SELECT 
+    cohort_id,
+    COUNT(*) as student_count
+FROM students s
+WHERE {student_filter}
+AND cohort_id IS NOT NULL
+GROUP BY cohort_id
+ORDER BY student_count DESC
+LIMIT 10
+"""
+
+case_usage_query = f"""
+SELECT 
+    cs.title as case_study,
+    COUNT(DISTINCT a.student_id) as unique_students,
+    COUNT(a.attempt_id) as total_attempts,
+    AVG(a.score) as avg_score
+FROM case_studies cs
+LEFT JOIN attempts a ON cs.case_id = a.case_id
+INNER JOIN students s ON a.student_id = s.student_id
+WHERE {student_filter}
+AND {el_date_filter}
+GROUP BY cs.case_id, cs.title
+HAVING COUNT(a.attempt_id) > 0
+ORDER BY total_attempts DESC
+"""
+
+system_summary_query = """
+SELECT 
+    AVG(latency_ms) as avg_latency,
+    MAX(latency_ms) as max_latency,
+    AVG(error_rate) as avg_error_rate,
+    AVG(reliability_index) as avg_reliability,
+    COUNT(CASE WHEN severity = 'Critical' THEN 1 END) as critical_incidents
+FROM system_reliability
+"""
+
+env_summary_query = """
+SELECT 
+    AVG(noise_level) as avg_noise,
+    AVG(internet_stability_score) as avg_stability,
+    AVG(internet_latency_ms) as avg_latency,
+    AVG(connection_drops) as avg_drops,
+    COUNT(*) as total_attempts
+FROM environment_metrics
+"""
+
+# Every section shows a skeleton right away and all queries start together;
+# sections replace their skeletons in page order, KPIs first
+progressive = ProgressivePage([
+    ("Executive Summary KPIs", 'kpis', 12),
+    ("Institutional Trends", 'charts', 4),
+    ("Cross-Sectional Analysis", 'charts', 4),
+    ("System & Environment Overview", 'panels', 2),
+    ("Administrative Data Tables", 'table', 1)
+], page=__file__)
+
+progressive.submit('kpis', db.execute_query_df, kpi_query, date_params)
+progressive.submit(
+    'trends',
+    load_daily_trends,
+    selected_cohort if selected_cohort != 'All' else None,
+    selected_department if selected_department != 'All' else None,
+    start_date,
+    end_date
+)
+progressive.submit('dept_perf', db.execute_query_df, dept_perf_query, date_params)
+progressive.submit('campus_perf', db.execute_query_df, campus_perf_query, date_params)
+progressive.submit('cohort_dist', db.execute_query_df, cohort_dist_query)
+progressive.submit('case_usage', db.execute_query_df, case_usage_query, date_params)
+progressive.submit('system_summary', db.execute_query_df, system_summary_query)
+progressive.submit('env_summary', db.execute_query_df, env_summary_query)
+
+# ============================================================================
+# EXECUTIVE SUMMARY KPIs
+# ============================================================================
+
+mark("Executive Summary KPIs")
+progressive.fill("Executive Summary KPIs")
+st.markdown("### 📈 Executive Summary")
+
+kpi_df = progressive.result('kpis')
 
 if not kpi_df.empty:
     kpi = kpi_df.iloc[0]
@@ -290,35 +443,20 @@ st.markdown("---")
 # INSTITUTIONAL TRENDS
 # ============================================================================
 
+mark("Institutional Trends")
+progressive.fill("Institutional Trends")
 st.markdown("### 📊 Institutional Trends")
 
 col1, col2 = st.columns(2)
 
+# One grouped pass feeds all four trend charts
+trends_df = progressive.result('trends')
+
 with col1:
     
-    el_date_filter = build_date_filter('a')
-    
-    perf_trend_query = f"""
-    SELECT 
-        DATE(a.timestamp) as date,
-        AVG(a.score) as avg_score,
-        COUNT(DISTINCT a.student_id) as active_students,
-        COUNT(*) as attempts
-    FROM attempts a
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    GROUP BY DATE(a.timestamp)
-    ORDER BY date
-    """
-    
-    perf_trend_df = db.execute_query_df(perf_trend_query)
-    
-    if not perf_trend_df.empty and len(perf_trend_df) > 0:
-        perf_trend_df['date'] = pd.to_datetime(perf_trend_df['date'])
-        
+    if not trends_df.empty and len(trends_df) > 0:
         fig = create_line_chart(
-            perf_trend_df,
+            trends_df,
             x='date',
             y='avg_score',
             title="Daily Average Performance Score",
@@ -331,26 +469,9 @@ with col1:
 
 with col2:
     
-    engagement_trend_query = f"""
-    SELECT 
-        DATE(a.timestamp) as date,
-        COUNT(DISTINCT a.student_id) as active_students,
-        COUNT(*) as total_attempts
-    FROM attempts a
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    GROUP BY DATE(a.timestamp)
-    ORDER BY date
-    """
-    
-    eng_trend_df = db.execute_query_df(engagement_trend_query)
-    
-    if not eng_trend_df.empty and len(eng_trend_df) > 0:
-        eng_trend_df['date'] = pd.to_datetime(eng_trend_df['date'])
-        
+    if not trends_df.empty and len(trends_df) > 0:
         fig = create_line_chart(
-            eng_trend_df,
+            trends_df,
             x='date',
             y='active_students',
             title="Daily Active Students",
@@ -366,26 +487,9 @@ col3, col4 = st.columns(2)
 
 with col3:
     
-    hours_trend_query = f"""
-    SELECT 
-        DATE(a.timestamp) as date,
-        SUM(a.duration_seconds) / 3600.0 as total_hours,
-        AVG(a.duration_seconds) / 60.0 as avg_duration_min
-    FROM attempts a
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    GROUP BY DATE(a.timestamp)
-    ORDER BY date
-    """
-    
-    hours_trend_df = db.execute_query_df(hours_trend_query)
-    
-    if not hours_trend_df.empty and len(hours_trend_df) > 0:
-        hours_trend_df['date'] = pd.to_datetime(hours_trend_df['date'])
-        
+    if not trends_df.empty and len(trends_df) > 0:
         fig = create_line_chart(
-            hours_trend_df,
+            trends_df,
             x='date',
             y='total_hours',
             title="Daily Total Learning Hours",
@@ -398,26 +502,9 @@ with col3:
 
 with col4:
     
-    completion_trend_query = f"""
-    SELECT 
-        DATE(a.timestamp) as date,
-        COUNT(CASE WHEN a.state = 'Completed' THEN 1 END) * 100.0 / NULLIF(COUNT(*), 0) as completion_rate,
-        COUNT(*) as total_attempts
-    FROM attempts a
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    GROUP BY DATE(a.timestamp)
-    ORDER BY date
-    """
-    
-    completion_trend_df = db.execute_query_df(completion_trend_query)
-    
-    if not completion_trend_df.empty and len(completion_trend_df) > 0:
-        completion_trend_df['date'] = pd.to_datetime(completion_trend_df['date'])
-        
+    if not trends_df.empty and len(trends_df) > 0:
         fig = create_line_chart(
-            completion_trend_df,
+            trends_df,
             x='date',
             y='completion_rate',
             title="Daily Completion Rate",
@@ -434,31 +521,15 @@ st.markdown("---")
 # CROSS-SECTIONAL ANALYSIS
 # ============================================================================
 
+mark("Cross-Sectional Analysis")
+progressive.fill("Cross-Sectional Analysis")
 st.markdown("### 🎯 Cross-Sectional Analysis")
 
 col1, col2 = st.columns(2)
 
 with col1:
     
-    dept_perf_query = f"""
-    SELECT 
-        s.department,
-        COUNT(DISTINCT s.student_id) as student_count,
-        AVG(a.score) as avg_score,
-        COUNT(a.attempt_id) as total_attempts,
-        AVG(a.ces_value) as avg_ces,
-        SUM(a.duration_seconds) / 3600.0 as total_hours
-    FROM students s
-    LEFT JOIN attempts a ON s.student_id = a.student_id
-    WHERE {student_filter}
-    AND ({el_date_filter} OR a.attempt_id IS NULL)
-    AND s.department IS NOT NULL
-    GROUP BY s.department
-    HAVING COUNT(a.attempt_id) > 0
-    ORDER BY avg_score DESC
-    """
-    
-    dept_perf_df = db.execute_query_df(dept_perf_query)
+    dept_perf_df = progressive.result('dept_perf')
     
     if not dept_perf_df.empty and len(dept_perf_df) > 0:
         fig = create_bar_chart(
@@ -476,24 +547,7 @@ with col1:
 
 with col2:
     
-    campus_perf_query = f"""
-    SELECT 
-        s.campus,
-        COUNT(DISTINCT s.student_id) as student_count,
-        AVG(a.score) as avg_score,
-        COUNT(a.attempt_id) as total_attempts,
-        SUM(a.duration_seconds) / 3600.0 as total_hours
-    FROM students s
-    LEFT JOIN attempts a ON s.student_id = a.student_id
-    WHERE {student_filter}
-    AND ({el_date_filter} OR a.attempt_id IS NULL)
-    AND s.campus IS NOT NULL
-    GROUP BY s.campus
-    HAVING COUNT(a.attempt_id) > 0
-    ORDER BY avg_score DESC
-    """
-    
-    campus_perf_df = db.execute_query_df(campus_perf_query)
+    campus_perf_df = progressive.result('campus_perf')
     
     if not campus_perf_df.empty and len(campus_perf_df) > 0:
         fig = create_bar_chart(
@@ -514,19 +568,7 @@ col5, col6 = st.columns(2)
 
 with col5:
     
-    cohort_dist_query = f"""
-    SELECT 
-        cohort_id,
-        COUNT(*) as student_count
-    FROM students s
-    WHERE {student_filter}
-    AND cohort_id IS NOT NULL
-    GROUP BY cohort_id
-    ORDER BY student_count DESC
-    LIMIT 10
-    """
-    
-    cohort_dist_df = db.execute_query_df(cohort_dist_query)
+    cohort_dist_df = progressive.result('cohort_dist')
     
     if not cohort_dist_df.empty and len(cohort_dist_df) > 0:
         fig = create_pie_chart(
@@ -541,23 +583,7 @@ with col5:
 
 with col6:
     
-    case_usage_query = f"""
-    SELECT 
-        cs.title as case_study,
-        COUNT(DISTINCT a.student_id) as unique_students,
-        COUNT(a.attempt_id) as total_attempts,
-        AVG(a.score) as avg_score
-    FROM case_studies cs
-    LEFT JOIN attempts a ON cs.case_id = a.case_id
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    GROUP BY cs.case_id, cs.title
-    HAVING COUNT(a.attempt_id) > 0
-    ORDER BY total_attempts DESC
-    """
-    
-    case_usage_df = db.execute_query_df(case_usage_query)
+    case_usage_df = progressive.result('case_usage')
     
     if not case_usage_df.empty and len(case_usage_df) > 0:
         fig = create_bar_chart(
@@ -579,6 +605,8 @@ st.markdown("---")
 # SYSTEM & ENVIRONMENT OVERVIEW
 # ============================================================================
 
+mark("System & Environment Overview")
+progressive.fill("System & Environment Overview")
 st.markdown("### 🖥️ System & Environment Overview")
 
 col1, col2 = st.columns(2)
@@ -586,17 +614,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("#### ⚡ System Performance Summary")
     
-    system_summary_query = """
-    SELECT 
-        AVG(latency_ms) as avg_latency,
-        MAX(latency_ms) as max_latency,
-        AVG(error_rate) as avg_error_rate,
-        AVG(reliability_index) as avg_reliability,
-        COUNT(CASE WHEN severity = 'Critical' THEN 1 END) as critical_incidents
-    FROM system_reliability
-    """
-    
-    system_summary_df = db.execute_query_df(system_summary_query)
+    system_summary_df = progressive.result('system_summary')
     
     if not system_summary_df.empty:
         sys = system_summary_df.iloc[0]
@@ -629,17 +647,7 @@ with col1:
 with col2:
     st.markdown("#### 🌍 Environment Quality Summary")
     
-    env_summary_query = """
-    SELECT 
-        AVG(noise_level) as avg_noise,
-        AVG(internet_stability_score) as avg_stability,
-        AVG(internet_latency_ms) as avg_latency,
-        AVG(connection_drops) as avg_drops,
-        COUNT(*) as total_attempts
-    FROM environment_metrics
-    """
-    
-    env_summary_df = db.execute_query_df(env_summary_query)
+    env_summary_df = progressive.result('env_summary')
     
     if not env_summary_df.empty:
         env = env_summary_df.iloc[0]
@@ -675,229 +683,223 @@ st.markdown("---")
 # ADMINISTRATIVE DATA TABLES
 # ============================================================================
 
-st.markdown("### 📋 Administrative Reports")
-
-tab1, tab2, tab3, tab4 = st.tabs([
-    "📊 Department Summary",
-    "🏫 Campus Summary",
-    "📚 Case Study Analytics",
-    "🎯 Performance Benchmarks"
-])
-
-with tab1:
-    st.markdown("#### Department Performance Summary")
-    
-    dept_summary_query = f"""
-    SELECT 
-        s.department,
-        COUNT(DISTINCT s.student_id) as total_students,
-        COUNT(DISTINCT CASE WHEN a.attempt_id IS NOT NULL THEN s.student_id END) as active_students,
-        COUNT(a.attempt_id) as total_attempts,
-        AVG(a.score) as avg_score,
-        MIN(a.score) as min_score,
-        MAX(a.score) as max_score,
-        AVG(a.ces_value) as avg_ces,
-        SUM(a.duration_seconds) / 3600.0 as total_hours,
-        COUNT(CASE WHEN a.score < 60 THEN 1 END) as at_risk_attempts
-    FROM students s
-    LEFT JOIN attempts a ON s.student_id = a.student_id
-    WHERE {student_filter}
-    AND ({el_date_filter} OR a.attempt_id IS NULL)
-    AND s.department IS NOT NULL
-    GROUP BY s.department
-    ORDER BY avg_score DESC
-    """
-    
-    dept_summary_df = db.execute_query_df(dept_summary_query)
-    
-    if not dept_summary_df.empty:
-        dept_summary_df['active_rate'] = (dept_summary_df['active_students'] / dept_summary_df['total_students'] * 100).fillna(0)
-        dept_summary_df['avg_score'] = dept_summary_df['avg_score'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
-        dept_summary_df['min_score'] = dept_summary_df['min_score'].apply(
-            lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
-        )
-        dept_summary_df['max_score'] = dept_summary_df['max_score'].apply(
-            lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
-        )
-        dept_summary_df['avg_ces'] = dept_summary_df['avg_ces'].apply(
-            lambda x: f"{x:.1f}" if pd.notna(x) else "N/A"
-        )
-        dept_summary_df['total_hours'] = dept_summary_df['total_hours'].apply(
-            lambda x: f"{x:.0f}h" if pd.notna(x) else "0h"
-        )
-        dept_summary_df['active_rate'] = dept_summary_df['active_rate'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
+# The section is a fragment and marks itself
+progressive.fill("Administrative Data Tables")
+
+@section_fragment("Administrative Data Tables")
+def administrative_tables(student_filter, el_date_filter, date_params, selected_cohort, selected_department,
+                          date_range, start_date, end_date):
+    """Administrative reports; switching tabs reruns only this section"""
+    st.markdown("### 📋 Administrative Reports")
+    
+    report_tabs = LazyTabs('admin_report_tables', [
+        "📊 Department Summary",
+        "🏫 Campus Summary",
+        "📚 Case Study Analytics",
+        "🎯 Performance Benchmarks"
+    ])
+    # Only the open tab queries; its result is kept until a filter changes.
+    # Keyed on the period and its days, not date_params: preset periods end
+    # at datetime.now(), which differs on every rerun
+    report_tabs.sync(student_filter, date_range, start_date.date(), end_date.date())
+    active_tab = report_tabs.select()
+    
+    if active_tab == "📊 Department Summary":
+        st.markdown("#### Department Performance Summary")
         
-        render_data_table(dept_summary_df, f"department_summary_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.info("No department summary data available")
-
-with tab2:
-    st.markdown("#### Campus Performance Summary")
-    
-    campus_summary_query = f"""
-    SELECT 
-        s.campus,
-        COUNT(DISTINCT s.student_id) as total_students,
-        COUNT(DISTINCT CASE WHEN a.attempt_id IS NOT NULL THEN s.student_id END) as active_students,
-        COUNT(a.attempt_id) as total_attempts,
-        AVG(a.score) as avg_score,
-        AVG(a.ces_value) as avg_ces,
-        SUM(a.duration_seconds) / 3600.0 as total_hours,
-        COUNT(DISTINCT a.case_id) as cases_used
-    FROM students s
-    LEFT JOIN attempts a ON s.student_id = a.student_id
-    WHERE {student_filter}
-    AND ({el_date_filter} OR a.attempt_id IS NULL)
-    AND s.campus IS NOT NULL
-    GROUP BY s.campus
-    ORDER BY avg_score DESC
-    """
-    
-    campus_summary_df = db.execute_query_df(campus_summary_query)
-    
-    if not campus_summary_df.empty:
-        campus_summary_df['active_rate'] = (campus_summary_df['active_students'] / campus_summary_df['total_students'] * 100).fillna(0)
-        campus_summary_df['avg_score'] = campus_summary_df['avg_score'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
-        campus_summary_df['avg_ces'] = campus_summary_df['avg_ces'].apply(
-            lambda x: f"{x:.1f}" if pd.notna(x) else "N/A"
-        )
-        campus_summary_df['total_hours'] = campus_summary_df['total_hours'].apply(
-            lambda x: f"{x:.0f}h" if pd.notna(x) else "0h"
-        )
-        campus_summary_df['active_rate'] = campus_summary_df['active_rate'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
+        dept_summary_query = f"""
+        SELECT 
+            s.department,
+            COUNT(DISTINCT s.student_id) as total_students,
+            COUNT(DISTINCT CASE WHEN a.attempt_id IS NOT NULL THEN s.student_id END) as active_students,
+            COUNT(a.attempt_id) as total_attempts,
+            AVG(a.score) as avg_score,
+            MIN(a.score) as min_score,
+            MAX(a.score) as max_score,
+            AVG(a.ces_value) as avg_ces,
+            SUM(a.duration_seconds) / 3600.0 as total_hours,
+            COUNT(CASE WHEN a.score < 60 THEN 1 END) as at_risk_attempts
+        FROM students s
+        LEFT JOIN attempts a ON s.student_id = a.student_id
+        WHERE {student_filter}
+        AND ({el_date_filter} OR a.attempt_id IS NULL)
+        AND s.department IS NOT NULL
+        GROUP BY s.department
+        ORDER BY avg_score DESC
+        """
         
-        render_data_table(campus_summary_df, f"campus_summary_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.info("No campus summary data available")
-
-with tab3:
-    st.markdown("#### Case Study Analytics")
-    
-    case_analytics_query = f"""
-    SELECT 
-        cs.title as case_study,
-        COUNT(DISTINCT a.student_id) as unique_students,
-        COUNT(a.attempt_id) as total_attempts,
-        AVG(a.score) as avg_score,
-        MIN(a.score) as min_score,
-        MAX(a.score) as max_score,
-        AVG(a.duration_seconds) / 60.0 as avg_duration_min,
-        COUNT(CASE WHEN a.attempt_number = 2 THEN 1 END) * 100.0 / 
-            NULLIF(COUNT(CASE WHEN a.attempt_number = 1 THEN 1 END), 0) as retry_rate,
-        AVG(a.ces_value) as avg_ces
-    FROM case_studies cs
-    LEFT JOIN attempts a ON cs.case_id = a.case_id
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    GROUP BY cs.case_id, cs.title
-    HAVING COUNT(a.attempt_id) > 0
-    ORDER BY total_attempts DESC
-    """
-    
-    case_analytics_df = db.execute_query_df(case_analytics_query)
-    
-    if not case_analytics_df.empty:
-        case_analytics_df['avg_score'] = case_analytics_df['avg_score'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
-        )
-        case_analytics_df['min_score'] = case_analytics_df['min_score'].apply(
-            lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
-        )
-        case_analytics_df['max_score'] = case_analytics_df['max_score'].apply(
-            lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
-        )
-        case_analytics_df['avg_duration_min'] = case_analytics_df['avg_duration_min'].apply(
-            lambda x: f"{x:.1f} min" if pd.notna(x) else "N/A"
-        )
-        case_analytics_df['retry_rate'] = case_analytics_df['retry_rate'].apply(
-            lambda x: f"{x:.1f}%" if pd.notna(x) else "0%"
-        )
-        case_analytics_df['avg_ces'] = case_analytics_df['avg_ces'].apply(
-            lambda x: f"{x:.1f}" if pd.notna(x) else "N/A"
-        )
+        def load_department_summary():
+            """Run and format the department summary"""
+            dept_summary_df = db.execute_query_df(dept_summary_query, date_params)
+            
+            if not dept_summary_df.empty:
+                dept_summary_df['active_rate'] = (dept_summary_df['active_students'] / dept_summary_df['total_students'] * 100).fillna(0)
+                dept_summary_df['avg_score'] = dept_summary_df['avg_score'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+                )
+                dept_summary_df['min_score'] = dept_summary_df['min_score'].apply(
+                    lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
+                )
+                dept_summary_df['max_score'] = dept_summary_df['max_score'].apply(
+                    lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
+                )
+                dept_summary_df['avg_ces'] = dept_summary_df['avg_ces'].apply(
+                    lambda x: f"{x:.1f}" if pd.notna(x) else "N/A"
+                )
+                dept_summary_df['total_hours'] = dept_summary_df['total_hours'].apply(
+                    lambda x: f"{x:.0f}h" if pd.notna(x) else "0h"
+                )
+                dept_summary_df['active_rate'] = dept_summary_df['active_rate'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+                )
+            return dept_summary_df
         
-        render_data_table(case_analytics_df, f"case_analytics_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.info("No case study analytics available")
-
-with tab4:
-    st.markdown("#### Performance Benchmarks")
-    
-    benchmarks_query = f"""
-    SELECT 
-        'Platform Average' as metric,
-        AVG(score) as value,
-        'Overall student performance' as description
-    FROM attempts a
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    
-    UNION ALL
-    
-    SELECT 
-        'Completion Rate' as metric,
-        COUNT(CASE WHEN state = 'Completed' THEN 1 END) * 100.0 / NULLIF(COUNT(*), 0) as value,
-        'Percentage of completed attempts' as description
-    FROM attempts a
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    
-    UNION ALL
-    
-    SELECT 
-        'Average CES' as metric,
-        AVG(ces_value) as value,
-        'Customer Effort Score' as description
-    FROM attempts a
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    
-    UNION ALL
-    
-    SELECT 
-        'Avg Learning Hours/Student' as metric,
-        SUM(duration_seconds) / 3600.0 / NULLIF(COUNT(DISTINCT a.student_id), 0) as value,
-        'Total hours per student' as description
-    FROM attempts a
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    
-    UNION ALL
+        dept_summary_df = report_tabs.load(load_department_summary)
+        
+        if not dept_summary_df.empty:
+            render_data_table(dept_summary_df, f"department_summary_{datetime.now().strftime('%Y%m%d')}")
+        else:
+            st.info("No department summary data available")
     
-    SELECT 
-        'Student Engagement Rate' as metric,
-        COUNT(DISTINCT a.student_id) * 100.0 / 
-            NULLIF((SELECT COUNT(*) FROM students s2 WHERE {student_filter.replace('s.', 's2.')}), 0) as value,
-        'Percentage of students with attempts' as description
-    FROM attempts a
-    INNER JOIN students s ON a.student_id = s.student_id
-    WHERE {student_filter}
-    AND {el_date_filter}
-    """
+    elif active_tab == "🏫 Campus Summary":
+        st.markdown("#### Campus Performance Summary")
+        
+        campus_summary_query = f"""
+        SELECT 
+            s.campus,
+            COUNT(DISTINCT s.student_id) as total_students,
+            COUNT(DISTINCT CASE WHEN a.attempt_id IS NOT NULL THEN s.student_id END) as active_students,
+            COUNT(a.attempt_id) as total_attempts,
+            AVG(a.score) as avg_score,
+            AVG(a.ces_value) as avg_ces,
+            SUM(a.duration_seconds) / 3600.0 as total_hours,
+            COUNT(DISTINCT a.case_id) as cases_used
+        FROM students s
+        LEFT JOIN attempts a ON s.student_id = a.student_id
+        WHERE {student_filter}
+        AND ({el_date_filter} OR a.attempt_id IS NULL)
+        AND s.campus IS NOT NULL
+        GROUP BY s.campus
+        ORDER BY avg_score DESC
+        """
+        
+        def load_campus_summary():
+            """Run and format the campus summary"""
+            campus_summary_df = db.execute_query_df(campus_summary_query, date_params)
+            
+            if not campus_summary_df.empty:
+                campus_summary_df['active_rate'] = (campus_summary_df['active_students'] / campus_summary_df['total_students'] * 100).fillna(0)
+                campus_summary_df['avg_score'] = campus_summary_df['avg_score'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+                )
+                campus_summary_df['avg_ces'] = campus_summary_df['avg_ces'].apply(
+                    lambda x: f"{x:.1f}" if pd.notna(x) else "N/A"
+                )
+                campus_summary_df['total_hours'] = campus_summary_df['total_hours'].apply(
+                    lambda x: f"{x:.0f}h" if pd.notna(x) else "0h"
+                )
+                campus_summary_df['active_rate'] = campus_summary_df['active_rate'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+                )
+            return campus_summary_df
+        
+        campus_summary_df = report_tabs.load(load_campus_summary)
+        
+        if not campus_summary_df.empty:
+            render_data_table(campus_summary_df, f"campus_summary_{datetime.now().strftime('%Y%m%d')}")
+        else:
+            st.info("No campus summary data available")
     
-    benchmarks_df = db.execute_query_df(benchmarks_query)
+    elif active_tab == "📚 Case Study Analytics":
+        st.markdown("#### Case Study Analytics")
+        
+        case_analytics_query = f"""
+        SELECT 
+            cs.title as case_study,
+            COUNT(DISTINCT a.student_id) as unique_students,
+            COUNT(a.attempt_id) as total_attempts,
+            AVG(a.score) as avg_score,
+            MIN(a.score) as min_score,
+            MAX(a.score) as max_score,
+            AVG(a.duration_seconds) / 60.0 as avg_duration_min,
+            COUNT(CASE WHEN a.attempt_number = 2 THEN 1 END) * 100.0 / 
+                NULLIF(COUNT(CASE WHEN a.attempt_number = 1 THEN 1 END), 0) as retry_rate,
+            AVG(a.ces_value) as avg_ces
+        FROM case_studies cs
+        LEFT JOIN attempts a ON cs.case_id = a.case_id
+        INNER JOIN students s ON a.student_id = s.student_id
+        WHERE {student_filter}
+        AND {el_date_filter}
+        GROUP BY cs.case_id, cs.title
+        HAVING COUNT(a.attempt_id) > 0
+        ORDER BY total_attempts DESC
+        """
+        
+        def load_case_analytics():
+            """Run and format the case study analytics"""
+            case_analytics_df = db.execute_query_df(case_analytics_query, date_params)
+            
+            if not case_analytics_df.empty:
+                case_analytics_df['avg_score'] = case_analytics_df['avg_score'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
+                )
+                case_analytics_df['min_score'] = case_analytics_df['min_score'].apply(
+                    lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
+                )
+                case_analytics_df['max_score'] = case_analytics_df['max_score'].apply(
+                    lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A"
+                )
+                case_analytics_df['avg_duration_min'] = case_analytics_df['avg_duration_min'].apply(
+                    lambda x: f"{x:.1f} min" if pd.notna(x) else "N/A"
+                )
+                case_analytics_df['retry_rate'] = case_analytics_df['retry_rate'].apply(
+                    lambda x: f"{x:.1f}%" if pd.notna(x) else "0%"
+                )
+                case_analytics_df['avg_ces'] = case_analytics_df['avg_ces'].apply(
+                    lambda x: f"{x:.1f}" if pd.notna(x) else "N/A"
+                )
+            return case_analytics_df
+        
+        case_analytics_df = report_tabs.load(load_case_analytics)
+        
+        if not case_analytics_df.empty:
+            render_data_table(case_analytics_df, f"case_analytics_{datetime.now().strftime('%Y%m%d')}")
+        else:
+            st.info("No case study analytics available")
     
-    if not benchmarks_df.empty:
-        benchmarks_df['value'] = benchmarks_df['value'].apply(
-            lambda x: f"{x:.2f}" if pd.notna(x) else "N/A"
-        )
+    elif active_tab == "🎯 Performance Benchmarks":
+        st.markdown("#### Performance Benchmarks")
         
-        render_data_table(benchmarks_df, f"performance_benchmarks_{datetime.now().strftime('%Y%m%d')}")
-    else:
-        st.info("No benchmark data available")
+        def load_benchmarks():
+            """Run and format the performance benchmarks"""
+            benchmarks_df = fetch(
+                db,
+                'get_performance_benchmarks',
+                cohort_id=selected_cohort if selected_cohort != 'All' else None,
+                department=selected_department if selected_department != 'All' else None,
+                start_date=str(start_date),
+                end_date=str(end_date)
+            )
+            
+            if not benchmarks_df.empty:
+                benchmarks_df['value'] = benchmarks_df['value'].apply(
+                    lambda x: f"{x:.2f}" if pd.notna(x) else "N/A"
+                )
+            return benchmarks_df
+        
+        benchmarks_df = report_tabs.load(load_benchmarks)
+        
+        if not benchmarks_df.empty:
+            render_data_table(benchmarks_df, f"performance_benchmarks_{datetime.now().strftime('%Y%m%d')}")
+        else:
+            st.info("No benchmark data available")
+
+administrative_tables(student_filter, el_date_filter, date_params,
+                      selected_cohort, selected_department, date_range, start_date, end_date)
+
+progressive.close()
 
 st.markdown("---")
 st.caption("💡 MIND Unified Dashboard | Miva Open University")
+
+render_profile_panel()
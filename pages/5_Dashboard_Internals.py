@@ -0,0 +1,369 @@
+"""
+Dashboard Internals - This App's Own Performance
+Query latency, cache effectiveness, connection pool usage, rerun latency,
+session state and cached results, from the in-process telemetry of the dashboard itself
+"""
+
+import time
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+from auth import require_auth, get_current_user
+from theme_toggle import apply_theme, create_theme_toggle
+from theme import apply_streamlit_theme
+from db import get_db_manager
+from core.components import (
+    render_metric_grid, create_line_chart, create_bar_chart, render_data_table
+)
+from core.profiling import begin_page, mark, render_profile_panel
+from core.utils import format_number
+from core import metrics, telemetry
+from core.queries.registry import query_cache
+
+# Apply theme CSS (must be first)
+apply_theme()
+
+# Page config
+st.set_page_config(
+    page_title="Dashboard Internals - MIND",
+    page_icon="⏱️",
+    layout="wide"
+)
+
+# Apply custom theme
+st.markdown(apply_streamlit_theme(), unsafe_allow_html=True)
+
+# Require authentication
+require_auth(allowed_roles=["Developer", "Admin"])
+
+# Profile this run section by section (see core/profiling.py)
+begin_page("Dashboard Internals")
+mark("Setup")
+
+# Get user info
+user = get_current_user()
+
+# Initialize database (registers its connection pool with core/metrics.py)
+db = get_db_manager()
+
+# Header
+st.markdown("# ⏱️ Dashboard Internals")
+st.markdown(f"### Welcome, {user['name']}!")
+st.markdown("Performance of this dashboard process: queries, caches, connections and page reruns")
+st.markdown("---")
+
+# ============================================================================
+# CONTROLS
+# ============================================================================
+
+mark("Controls")
+
+# Theme toggle in sidebar
+with st.sidebar:
+    create_theme_toggle()
+
+col1, col2 = st.columns([1, 4])
+
+with col1:
+    # Any widget interaction reruns the page with fresh numbers
+    st.button("🔄 Refresh", use_container_width=True)
+
+with col2:
+    top_n = st.slider("Queries shown", min_value=5, max_value=50, value=15, step=5)
+
+st.caption(f"In-process figures since the dashboard started · as of {datetime.now():%H:%M:%S}")
+
+# ============================================================================
+# OVERVIEW KPIs
+# ============================================================================
+
+mark("Overview KPIs")
+st.markdown("### 📊 Overview")
+
+query_stats = pd.DataFrame([
+    dict(histogram.snapshot(), query=name)
+    for name, histogram in telemetry.query_histograms().items()
+])
+cache = query_cache.stats()
+lookups = cache['hits'] + cache['misses']
+pool = metrics.pool_totals()
+sessions = metrics.active_sessions()
+rss = metrics.resident_memory_bytes()
+slow_events = [e for e in telemetry.recent_events() if e['duration_ms'] >= telemetry.SLOW_QUERY_MS and e['kind'] != 'cache']
+
+total_queries = int(query_stats['count'].sum()) if not query_stats.empty else 0
+mean_query_ms = query_stats['sum_ms'].sum() / total_queries if total_queries else 0
+
+overview = [
+    {
+        'title': 'Queries Executed',
+        'value': format_number(total_queries, 0),
+        'accent': False
+    },
+    {
+        'title': 'Mean Query Time',
+        'value': f"{mean_query_ms:.0f} ms",
+        'accent': True if mean_query_ms > 200 else False
+    },
+    {
+        'title': 'Registry Cache Hit Rate',
+        'value': f"{cache['hits'] / lookups * 100:.1f}%" if lookups else "N/A",
+        'accent': True if lookups and cache['hits'] / lookups < 0.5 else False
+    },
+    {
+        'title': 'Recent Slow Queries',
+        'value': len(slow_events),
+        'accent': True if slow_events else False
+    },
+    {
+        'title': 'Connections In Use',
+        'value': f"{pool['in_use']} / {pool['size']}",
+        'accent': True if pool['size'] and pool['in_use'] >= pool['size'] else False
+    },
+    {
+        'title': 'Pool Waits / Timeouts',
+        'value': f"{pool['waits']} / {pool['timeouts']}",
+        'accent': True if pool['timeouts'] else False
+    },
+    {
+        'title': 'Active Sessions',
+        'value': len(sessions),
+        'accent': False
+    },
+    {
+        'title': 'Process Memory',
+        'value': f"{rss / 2 ** 20:,.0f} MB" if rss is not None else "N/A",
+        'accent': False
+    }
+]
+
+render_metric_grid(overview, columns=4)
+
+st.markdown("---")
+
+# ============================================================================
+# SLOWEST QUERIES
+# ============================================================================
+
+mark("Slowest Queries")
+st.markdown("### 🐢 Slowest Queries")
+
+if not query_stats.empty:
+    slowest = query_stats.sort_values('p95_ms', ascending=False).head(top_n)
+    
+    fig = create_bar_chart(
+        slowest.sort_values('p95_ms'),
+        x='p95_ms',
+        y='query',
+        title=f"Top {len(slowest)} Queries by p95 Latency",
+        orientation='h',
+        x_label="p95 (ms)",
+        y_label="Query"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    slowest_table = slowest[['query', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'sum_ms']].copy()
+    slowest_table.columns = ['Query', 'Executions', 'Mean (ms)', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Max (ms)', 'Total (ms)']
+    render_data_table(slowest_table.round(1), key="internals_slowest_queries")
+else:
+    st.info("No queries executed yet in this process")
+
+if slow_events:
+    st.markdown(f"#### Recent queries over {telemetry.SLOW_QUERY_MS:,.0f} ms")
+    slow_table = pd.DataFrame(slow_events)[['ts', 'name', 'duration_ms', 'rows', 'pool_wait_ms', 'page']]
+    slow_table.columns = ['Time', 'Query', 'Duration (ms)', 'Rows', 'Pool Wait (ms)', 'Page']
+    render_data_table(slow_table.iloc[::-1], height=300, key="internals_slow_events")
+    st.caption(f"Full history in {telemetry.SLOW_QUERY_LOG}")
+
+st.markdown("---")
+
+# ============================================================================
+# CACHE HIT RATES
+# ============================================================================
+
+mark("Cache Hit Rates")
+st.markdown("### 🎯 Cache Hit Rates by Query")
+
+cache_counts = pd.DataFrame([
+    dict(counts, query=name) for name, counts in telemetry.cache_counts().items()
+])
+
+if not cache_counts.empty:
+    cache_counts['lookups'] = cache_counts['hits'] + cache_counts['misses']
+    cache_counts['hit_rate'] = cache_counts['hits'] * 100.0 / cache_counts['lookups']
+    cache_counts = cache_counts.sort_values('lookups', ascending=False).head(top_n)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig = create_bar_chart(
+            cache_counts.sort_values('hit_rate'),
+            x='hit_rate',
+            y='query',
+            title="Registry Cache Hit Rate (%)",
+            orientation='h',
+            x_label="Hit Rate (%)",
+            y_label="Query"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        cache_table = cache_counts[['query', 'lookups', 'hits', 'misses', 'hit_rate']].copy()
+        cache_table.columns = ['Query', 'Lookups', 'Hits', 'Misses', 'Hit Rate (%)']
+        render_data_table(cache_table.round(1), key="internals_cache_hit_rates")
+else:
+    st.info("No registry cache lookups yet - open a dashboard page; its registered queries run through fetch()")
+
+st.markdown("---")
+
+# ============================================================================
+# CONNECTION POOL
+# ============================================================================
+
+mark("Connection Pool")
+st.markdown("### 🔌 Connection Pool Utilization")
+
+history = pd.DataFrame(metrics.pool_history())
+
+if len(history) > 1:
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        usage = history.melt(
+            id_vars='time', value_vars=['in_use', 'size'],
+            var_name='series', value_name='connections'
+        )
+        usage['series'] = usage['series'].map({'in_use': 'In use', 'size': 'Pool size'})
+        fig = create_line_chart(
+            usage,
+            x='time',
+            y='connections',
+            color='series',
+            title="Connections In Use",
+            x_label="Time",
+            y_label="Connections"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        # Counters are cumulative; plot what changed between samples
+        waits = history[['time']].copy()
+        waits['waits'] = history['waits'].diff().clip(lower=0)
+        waits['mean_wait_ms'] = (
+            history['wait_ms'].diff().clip(lower=0) / history['checkouts'].diff().clip(lower=1)
+        )
+        fig = create_line_chart(
+            waits.dropna(),
+            x='time',
+            y='mean_wait_ms',
+            title="Mean Wait for a Connection per Checkout",
+            x_label="Time",
+            y_label="Wait (ms)"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.caption(f"Sampled every {metrics.POOL_SAMPLE_SECONDS:g}s; peak {pool['peak_in_use']} of {pool['size']} "
+               f"connections, {pool['checkouts']:,} checkouts, {pool['wait_ms'] / 1000:,.1f}s waited in total")
+else:
+    st.info("Pool samples start with the first profiled page rerun; refresh in a few seconds")
+
+st.markdown("---")
+
+# ============================================================================
+# RERUN LATENCY
+# ============================================================================
+
+mark("Rerun Latency")
+st.markdown("### 🔁 Rerun Latency by Page")
+
+reruns = pd.DataFrame([
+    dict(histogram.snapshot(), page=page)
+    for page, histogram in metrics.rerun_histograms().items()
+])
+
+if not reruns.empty:
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        latency = reruns.melt(
+            id_vars='page', value_vars=['p50_ms', 'p95_ms'],
+            var_name='percentile', value_name='ms'
+        )
+        latency['percentile'] = latency['percentile'].map({'p50_ms': 'p50', 'p95_ms': 'p95'})
+        fig = create_bar_chart(
+            latency,
+            x='page',
+            y='ms',
+            color='percentile',
+            title="Rerun Wall Time by Page",
+            x_label="Page",
+            y_label="Wall Time (ms)"
+        )
+        fig.update_layout(barmode='group')
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        rerun_table = reruns[['page', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms']].copy()
+        rerun_table.columns = ['Page', 'Reruns', 'Mean (ms)', 'p50 (ms)', 'p95 (ms)', 'Max (ms)']
+        render_data_table(rerun_table.round(0), key="internals_rerun_latency")
+    
+    st.caption("Percentiles are estimated from histogram buckets. Open the ⏱️ Section profiler "
+               "in the sidebar for a section breakdown of a page's latest run.")
+else:
+    st.info("No profiled page reruns yet")
+
+st.markdown("---")
+
+# ============================================================================
+# SESSION STATE
+# ============================================================================
+
+mark("Session State")
+st.markdown("### 🧳 Session State by Session")
+
+if sessions:
+    now = time.monotonic()
+    session_table = pd.DataFrame([
+        {
+            'session': session_id,
+            'page': info['page'],
+            'size_kb': info['state_bytes'] / 1024,
+            'idle_s': now - info['last_seen'],
+            'sized_s': now - info['sized_at']
+        }
+        for session_id, info in sessions.items()
+    ]).sort_values('size_kb', ascending=False).head(top_n)
+    session_table.columns = ['Session', 'Last Page', 'State (KB)', 'Idle (s)', 'Sized (s ago)']
+    render_data_table(session_table.round(1), key="internals_session_state")
+    st.caption(f"Sizes are sampled at most every {metrics.SESSION_SIZE_SECONDS:g}s per session. "
+               "/metrics exports only the total and largest size per page.")
+else:
+    st.info("No active sessions")
+
+st.markdown("---")
+
+# ============================================================================
+# CACHED DATAFRAMES
+# ============================================================================
+
+mark("Cached DataFrames")
+st.markdown("### 🗄️ Largest Cached DataFrames")
+
+cached = pd.DataFrame(query_cache.entries())
+
+if not cached.empty:
+    cached = cached.sort_values('bytes', ascending=False).head(top_n)
+    cached['size_kb'] = cached['bytes'] / 1024
+    cached_table = cached[['query', 'arguments', 'rows', 'size_kb', 'expires_in_s']].copy()
+    cached_table.columns = ['Query', 'Arguments', 'Rows', 'Size (KB)', 'Expires In (s)']
+    render_data_table(cached_table.round(1), key="internals_cached_frames")
+    st.caption(f"{cache['entries']:,} results cached in total · sizes are shallow DataFrame memory")
+else:
+    st.info("The registry cache is empty")
+
+st.markdown("---")
+st.caption("💡 MIND Unified Dashboard | Miva Open University")
+
+render_profile_panel()
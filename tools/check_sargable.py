@@ -0,0 +1,231 @@
+"""
+Sargability check for time filters in the dashboard workload
+Fails when a query compares a wrapped or string-formatted timestamp,
+buckets days with DATE(timestamp) instead of mind_local_date, or
+(with --explain) when EXPLAIN shows a time filter on attempts,
+engagement_logs or system_reliability that is not served by an index
+range scan. Exits non-zero on any violation, so it can gate CI.
+
+Two kinds of plan node are not counted: scans of monthly partitions that
+are empty or lie wholly inside the queried range (the Filter passes every
+row, so there is nothing to range-scan), and scans driven by an index
+equality on another key, such as case_id, that the planner preferred.
+
+Usage:
+    python -m tools.check_sargable                  # static check, no database
+    python -m tools.check_sargable --explain        # also assert on EXPLAIN output
+    python -m tools.check_sargable --include-pages  # also check inline page queries
+"""
+
+import argparse
+import re
+import sys
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from tools.common import get_connection
+from tools.index_advisor import explain, walk_plan
+from tools.workload import collect_builder_queries, collect_page_queries
+
+# Time-series tables whose time filters must be index-range-scannable
+TIME_TABLES = {'attempts', 'engagement_logs', 'system_reliability'}
+
+# Monthly partitions from migrations/007 report their own relation name
+PARTITION_SUFFIX_RE = re.compile(r'_(?:p\d{4}_\d{2}|default)$')
+MONTH_PARTITION_RE = re.compile(r'_p(\d{4})_(\d{2})$')
+
+# A timestamp bound as EXPLAIN VERBOSE prints it once the params are inlined
+TIME_BOUND_RE = re.compile(
+    r'"?timestamp"?\s*(>=|>|<=|<)\s*\'([^\']+)\'::timestamp with time zone',
+    re.IGNORECASE
+)
+
+# The timestamp column, not the type name in a bound's cast
+TIME_COLUMN_RE = re.compile(r'\btimestamp\b(?! with time zone)', re.IGNORECASE)
+
+# Equality on a column other than timestamp, as it appears in an Index Cond
+KEY_EQUALITY_RE = re.compile(r'\b(\w+)"?\)?(?:::\w+(?: \w+)*)?\s*=\s', re.IGNORECASE)
+
+COMPARISON = r'\s*(?:<>|<=|>=|=|<|>|BETWEEN\b|IN\b)'
+
+# Static rules: (regex, message)
+STATIC_RULES = [
+    (re.compile(r'\b(?:DATE|DATE_TRUNC|EXTRACT|TO_CHAR|mind_local_date|mind_local_hour)\s*\([^()]*\btimestamp\b[^()]*\)' + COMPARISON,
+                re.IGNORECASE),
+     "function applied to timestamp in a comparison"),
+    (re.compile(r'\btimestamp\s*::\s*\w+' + COMPARISON, re.IGNORECASE),
+     "timestamp cast in a comparison"),
+    (re.compile(r'\btimestamp\s*(?:<=|>=|<|>|=)\s*\'', re.IGNORECASE),
+     "timestamp compared to a formatted string literal (bind a parameter)"),
+    (re.compile(r'\btimestamp\s*<=', re.IGNORECASE),
+     "closed upper bound on timestamp (use a half-open [start, end) range)"),
+    (re.compile(r'\bDATE\s*\([^()]*\btimestamp\b[^()]*\)', re.IGNORECASE),
+     "DATE(timestamp) depends on the session time zone and has no index (bucket with mind_local_date)"),
+]
+
+def static_violations(sql: str) -> List[str]:
+    """Messages for every static rule the SQL text breaks"""
+    return [message for pattern, message in STATIC_RULES if pattern.search(sql)]
+
+def base_table(relation: str) -> str:
+    """Map a partition name back to its parent table"""
+    return PARTITION_SUFFIX_RE.sub('', relation)
+
+def month_range(relation: str) -> Optional[Tuple[datetime, datetime]]:
+    """[start, end) of a monthly partition, from its name (None for others)"""
+    match = MONTH_PARTITION_RE.search(relation)
+    if match is None:
+        return None
+    year, month = int(match.group(1)), int(match.group(2))
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+def covers_partition(row_filter: str, relation: str) -> bool:
+    """
+    True when every timestamp bound in the Filter holds for the whole month
+
+    Any timestamp mention that is not a plain bound (a function call, a
+    comparison to another column) makes the answer False.
+    """
+    months = month_range(relation)
+    bounds = TIME_BOUND_RE.findall(row_filter)
+    if months is None or not bounds or len(bounds) != len(TIME_COLUMN_RE.findall(row_filter)):
+        return False
+
+    start, end = months
+    for operator, literal in bounds:
+        try:
+            value = datetime.fromisoformat(literal)
+        except ValueError:
+            return False
+        if value.tzinfo is None:
+            return False
+        if operator == '>=' and value > start:
+            return False
+        if operator == '>' and value >= start:
+            return False
+        if operator in ('<', '<=') and value < end:
+            return False
+    return True
+
+def uses_key_index(index_cond: str) -> bool:
+    """True when an Index / Recheck Cond has an equality on a non-time column"""
+    return any(column.lower() != 'timestamp' for column in KEY_EQUALITY_RE.findall(index_cond))
+
+def is_empty(conn, relation: str, cache: Dict[str, bool]) -> bool:
+    """True when a partition holds no rows (checked once per relation)"""
+    if conn is None:
+        return False
+    if relation not in cache:
+        with conn.cursor() as cursor:
+            cursor.execute(f'SELECT NOT EXISTS (SELECT 1 FROM ONLY "{relation}")')
+            cache[relation] = cursor.fetchone()[0]
+        conn.rollback()
+    return cache[relation]
+
+def plan_violations(plan: Dict[str, Any], conn=None, empty_cache: Optional[Dict[str, bool]] = None) -> List[str]:
+    """
+    Scan nodes on TIME_TABLES that filter on timestamp row by row
+
+    A timestamp predicate is fine when it appears in the node's Index Cond
+    (or Recheck Cond for bitmap scans); left in Filter, it is evaluated
+    against every row the scan returns. Partitions that are empty (needs
+    conn) or wholly inside the bound, and scans driven by an index equality
+    on another key, are not counted.
+    """
+    empty_cache = {} if empty_cache is None else empty_cache
+    violations = []
+    for node in walk_plan(plan):
+        relation = node.get('Relation Name')
+        if relation is None or base_table(relation) not in TIME_TABLES:
+            continue
+
+        row_filter = node.get('Filter', '')
+        index_cond = node.get('Index Cond', '') + node.get('Recheck Cond', '')
+        if 'timestamp' not in row_filter or 'timestamp' in index_cond:
+            continue
+        if uses_key_index(index_cond):
+            continue
+        if relation != base_table(relation) and (
+                covers_partition(row_filter, relation) or is_empty(conn, relation, empty_cache)):
+            continue
+        violations.append(f"{node['Node Type']} on {relation} filters timestamp: {row_filter}")
+
+    return violations
+
+def check(entries: List[Dict[str, Any]], conn=None) -> List[Dict[str, Any]]:
+    """
+    Check workload entries, returning one result per entry with a time filter
+
+    Args:
+        entries: Workload entries (see tools/workload.py)
+        conn: Optional database connection for the EXPLAIN assertions
+
+    Returns:
+        List of dicts with source and violations (empty when the entry passes)
+    """
+    if conn is not None:
+        # Small test tables are always cheaper to seq-scan; with seq scans
+        # priced out, any remaining one means no index can serve the filter
+        with conn.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+        conn.commit()
+
+    results = []
+    empty_cache: Dict[str, bool] = {}
+    for entry in entries:
+        sql = entry.get('sql')
+        if not sql or not re.search(r'\btimestamp\b|_at\b|\bday\b', sql):
+            continue
+
+        violations = static_violations(sql)
+        if conn is not None:
+            plan = explain(conn, sql)
+            if plan is None:
+                violations.append("EXPLAIN failed")
+            else:
+                violations.extend(plan_violations(plan, conn, empty_cache))
+
+        results.append({'source': entry['source'], 'violations': violations})
+
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check that dashboard time filters are index-range-scannable")
+    parser.add_argument('--dsn', help="libpq connection string (default: DATABASE_URL / DB_* env)")
+    parser.add_argument('--explain', action='store_true', help="also assert on EXPLAIN output")
+    parser.add_argument('--include-pages', action='store_true',
+                        help="also check the inline queries in pages/")
+    args = parser.parse_args(argv)
+
+    entries = collect_builder_queries()
+    if args.include_pages:
+        entries += collect_page_queries()
+
+    for entry in entries:
+        if entry.get('skipped'):
+            print(f"⚠️ {entry['source']}: skipped ({entry['skipped']})")
+
+    conn = get_connection(args.dsn) if args.explain else None
+    try:
+        results = check(entries, conn)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    failed = [r for r in results if r['violations']]
+    for result in failed:
+        print(f"❌ {result['source']}")
+        for violation in result['violations']:
+            print(f"     {violation}")
+
+    if failed:
+        print(f"\n❌ {len(failed)} of {len(results)} time-filtered queries are not sargable")
+        return 1
+
+    print(f"✅ {len(results)} time-filtered queries are sargable")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
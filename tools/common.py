@@ -0,0 +1,79 @@
+"""
+Shared helpers for the command-line tools in tools/
+Repository paths and a plain psycopg2 connection (no Streamlit needed)
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+import psycopg2
+from psycopg2.extensions import make_dsn
+from dotenv import load_dotenv
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = REPO_ROOT / "migrations"
+QUERIES_DIR = REPO_ROOT / "core" / "queries"
+PAGES_DIR = REPO_ROOT / "pages"
+
+# Make `core.*` importable when a tool is run as `python tools/<name>.py`
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+load_dotenv(REPO_ROOT / ".env")
+
+def resolve_dsn(dsn: Optional[str] = None) -> str:
+    """
+    Connection string a command-line tool uses
+    
+    The given DSN, else DATABASE_URL, else one built from the same DB_*
+    environment variables that db.py falls back to.
+    
+    Args:
+        dsn: Optional libpq connection string
+        
+    Returns:
+        libpq connection string
+    """
+    dsn = dsn or os.getenv('DATABASE_URL')
+    if dsn:
+        return dsn
+    
+    return make_dsn(
+        host=os.getenv('DB_HOST', 'localhost'),
+        dbname=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        port=os.getenv('DB_PORT', 5432),
+        sslmode=os.getenv('DB_SSLMODE', 'prefer')
+    )
+
+def use_dsn_for_app(dsn: Optional[str] = None) -> str:
+    """
+    Point the dashboard code run in this process at a tool's database
+    
+    db.py reads DATABASE_URL before .streamlit/secrets.toml, so setting it
+    here keeps pages rendered by a tool off the deployed database.
+    
+    Args:
+        dsn: Optional libpq connection string (see resolve_dsn)
+        
+    Returns:
+        The connection string now in DATABASE_URL
+    """
+    dsn = resolve_dsn(dsn)
+    os.environ['DATABASE_URL'] = dsn
+    return dsn
+
+def get_connection(dsn: Optional[str] = None):
+    """
+    Open a database connection for a command-line tool
+    
+    Args:
+        dsn: Optional libpq connection string (see resolve_dsn)
+        
+    Returns:
+        psycopg2 connection
+    """
+    return psycopg2.connect(resolve_dsn(dsn))
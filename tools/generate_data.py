@@ -0,0 +1,746 @@
+"""
+Synthetic data generator for production-scale local datasets
+Creates the eight tables the dashboards read (docs/schema.sql) at a
+configurable scale, up to 100k students, 5M attempts and 200M engagement
+events, and bulk-loads them into Postgres with COPY from parallel worker
+processes. Output is deterministic for a given seed and scale, whatever the
+number of workers.
+
+Distributions follow the shape of the production data: cohort sizes and
+case popularity are Zipf-like, student activity is log-normal (a few very
+active students, a long tail of light ones), usage grows over the period
+with weekday and evening peaks, scores depend on ability, case difficulty
+and environment quality, and second attempts improve on first ones.
+
+Usage:
+    python -m tools.generate_data --create-schema --scale demo
+    python -m tools.generate_data --scale large --workers 8 --truncate
+    python -m tools.generate_data --students 20000 --attempts 400000 --events 8000000
+    python -m tools.generate_data --scale demo --out /tmp/mind_data   # TSV files, no database
+"""
+
+import argparse
+import bisect
+import functools
+import io
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import psycopg2
+
+from tools.common import REPO_ROOT, get_connection
+
+SCHEMA_FILE = REPO_ROOT / "docs" / "schema.sql"
+
+# Presets; --students / --attempts / --events / --reliability-records override
+SCALES = {
+    'demo': {'students': 3206, 'attempts': 25648, 'events': 115691, 'reliability': 30000},
+    'medium': {'students': 20000, 'attempts': 500000, 'events': 10000000, 'reliability': 500000},
+    'large': {'students': 100000, 'attempts': 5000000, 'events': 200000000, 'reliability': 5000000},
+}
+
+# Tables and COPY columns, in foreign-key load order
+COLUMNS = {
+    'students': ('student_id', 'name', 'cohort_id', 'department', 'campus', 'role'),
+    'case_studies': ('case_id', 'title', 'description', 'difficulty'),
+    'attempts': ('attempt_id', 'student_id', 'case_id', 'attempt_number', 'score',
+                 'duration_seconds', 'ces_value', 'timestamp', 'state'),
+    'rubric_scores': ('rubric_score_id', 'attempt_id', 'rubric_dimension', 'score',
+                      'max_score', 'comment', 'improvement_flag'),
+    'environment_metrics': ('attempt_id', 'student_id', 'case_id', 'noise_level', 'noise_quality_index',
+                            'internet_latency_ms', 'internet_stability_score', 'connection_drops',
+                            'device_type', 'microphone_type', 'signal_strength'),
+    'engagement_logs': ('session_id', 'student_id', 'case_id', 'attempt_id', 'timestamp',
+                        'action_type', 'duration_seconds', 'session_phase'),
+    'system_reliability': ('record_id', 'api_name', 'latency_ms', 'error_rate',
+                           'reliability_index', 'timestamp', 'location', 'severity'),
+    'admin_aggregates': ('metric_id', 'metric_name', 'metric_value', 'timestamp', 'description'),
+}
+
+# Rollup rebuilds from migrations 001-005, in dependency order; run after a
+# load that skipped their triggers
+ROLLUP_REFRESHES = [
+    'refresh_rubric_mastery_cube',
+    'refresh_attempt_improvements',
+    'refresh_engagement_daily',
+    'refresh_student_snapshots',
+    'refresh_cohort_leaderboard',
+]
+
+PARTITIONED_TABLES = ['engagement_logs', 'system_reliability']
+
+STUDENTS_PER_CHUNK = 1000
+RELIABILITY_PER_CHUNK = 250000
+FLUSH_ROWS = 50000
+
+# ============================================
+# DISTRIBUTIONS
+# ============================================
+
+class Weighted:
+    """Weighted categorical distribution"""
+
+    def __init__(self, pairs: Sequence[Tuple[Any, float]]):
+        self.values = [value for value, _ in pairs]
+        self.cum = list(itertools.accumulate(weight for _, weight in pairs))
+
+    def pick(self, rng: random.Random) -> Any:
+        return self.values[bisect.bisect(self.cum, rng.random() * self.cum[-1])]
+
+# (department, cohort code, weight)
+DEPARTMENTS = [
+    ('Nursing', 'NUR', 30), ('Medicine', 'MED', 22), ('Pharmacy', 'PHA', 14),
+    ('Public Health', 'PUB', 12), ('Health Informatics', 'HIN', 8),
+    ('Physiotherapy', 'PHY', 8), ('Medical Laboratory Science', 'MLS', 6),
+]
+CAMPUSES = Weighted([('Lagos', 38), ('Abuja', 24), ('Online', 18), ('Port Harcourt', 12), ('Ibadan', 8)])
+INTAKES = Weighted([('2023A', 6), ('2023B', 8), ('2024A', 12), ('2024B', 16), ('2025A', 24), ('2025B', 34)])
+ROLES = Weighted([('Student', 970), ('Faculty', 20), ('Developer', 5), ('Admin', 5)])
+
+FIRST_NAMES = [
+    'Adaeze', 'Chinedu', 'Ngozi', 'Tunde', 'Aisha', 'Ibrahim', 'Funmilayo', 'Emeka', 'Zainab', 'Segun',
+    'Amara', 'Kelechi', 'Halima', 'Olumide', 'Chioma', 'Yusuf', 'Bisi', 'Obinna', 'Fatima', 'Tobi',
+    'Grace', 'David', 'Esther', 'Samuel', 'Mary', 'John', 'Ruth', 'Daniel', 'Joy', 'Michael',
+]
+LAST_NAMES = [
+    'Okafor', 'Adeyemi', 'Bello', 'Eze', 'Ogunleye', 'Musa', 'Nwosu', 'Abubakar', 'Olawale', 'Okonkwo',
+    'Danjuma', 'Adebayo', 'Umeh', 'Suleiman', 'Ibekwe', 'Lawal', 'Obi', 'Yakubu', 'Afolabi', 'Chukwu',
+]
+
+CASE_TOPICS = [
+    'Chest Pain Assessment', 'Paediatric Fever', 'Diabetic Foot Ulcer', 'Postpartum Haemorrhage',
+    'Medication Reconciliation', 'Sepsis Recognition', 'Asthma Exacerbation', 'Breaking Bad News',
+    'Hypertension Follow-up', 'Malaria in Pregnancy', 'Stroke Triage', 'Antibiotic Stewardship',
+    'Sickle Cell Crisis', 'Falls Risk in the Elderly', 'Mental Health Screening', 'Wound Care Planning',
+    'Neonatal Jaundice', 'Renal Dosing', 'Community Outbreak Response', 'Informed Consent',
+]
+NUMERALS = ['', ' II', ' III', ' IV', ' V', ' VI', ' VII', ' VIII', ' IX', ' X']
+
+# (difficulty, weight, score offset)
+DIFFICULTIES = [('Introductory', 30, 6), ('Intermediate', 45, 0), ('Advanced', 25, -8)]
+
+# (dimension, id suffix, max score) - max scores follow the rubric weights
+RUBRIC = [('Evidence-Based Reasoning', 'EBR', 40), ('Communication', 'COM', 30), ('Analysis', 'ANA', 30)]
+COMMENTS = [
+    (85, "Excellent work; clear, well-supported reasoning"),
+    (70, "Good performance with minor gaps"),
+    (60, "Adequate; some points need more supporting evidence"),
+    (0, "Needs improvement; revisit the case materials and rubric guidance"),
+]
+
+STATES = Weighted([('Completed', 88), ('Abandoned', 8), ('In Progress', 4)])
+SECOND_ATTEMPT_RATE = 0.65
+
+# Actions per session phase; a phase covers a share of an attempt's events
+PHASES = [
+    ('Briefing', 0.20, Weighted([('case_opened', 3), ('resource_viewed', 5), ('note_taken', 2)])),
+    ('Interaction', 0.65, Weighted([('question_asked', 6), ('response_recorded', 8), ('hint_requested', 1),
+                                    ('resource_viewed', 2), ('note_taken', 2)])),
+    ('Debrief', 0.15, Weighted([('feedback_viewed', 4), ('rubric_reviewed', 3), ('reflection_submitted', 2)])),
+]
+
+DEVICES = Weighted([('Laptop', 55), ('Desktop', 20), ('Mobile', 18), ('Tablet', 7)])
+MICROPHONES = Weighted([('Built-in', 50), ('Headset', 25), ('USB', 15), ('Bluetooth', 10)])
+CAMPUS_LATENCY_MS = {'Lagos': 45, 'Abuja': 55, 'Port Harcourt': 70, 'Ibadan': 65, 'Online': 110}
+
+# (api, weight, median latency ms)
+APIS = [('speech_to_text', 30, 180), ('llm_evaluation', 25, 900), ('text_to_speech', 20, 150),
+        ('auth', 10, 40), ('storage', 10, 60), ('analytics', 5, 120)]
+API_PICKER = Weighted([(index, weight) for index, (_, weight, _) in enumerate(APIS)])
+REGIONS = Weighted([('af-south-1', 45), ('eu-west-2', 35), ('us-east-1', 20)])
+
+# Hour-of-day weights (UTC, Lagos is UTC+1): late-morning and evening peaks
+HOURS = Weighted(list(enumerate([
+    1, 1, 1, 1, 1, 2, 4, 6, 9, 11, 12, 11, 9, 9, 10, 10, 11, 13, 16, 18, 17, 13, 7, 3
+])))
+
+ACTIVITY_SIGMA = 1.0     # log-normal spread of per-student activity
+USAGE_GROWTH = 1.5       # usage at the end of the period relative to the start, minus 1
+WEEKEND_DROP = 0.45      # share of weekend activity moved to weekdays
+
+def clamp(value: float, low: float, high: float) -> float:
+    return low if value < low else high if value > high else value
+
+def zipf_weights(count: int, exponent: float) -> List[float]:
+    return [1.0 / (rank + 1) ** exponent for rank in range(count)]
+
+@functools.lru_cache(maxsize=None)
+def build_cohorts(seed: int, students: int) -> Tuple[List[Tuple[str, str, str]], Weighted]:
+    """
+    Cohorts (cohort_id, department, campus) and a Zipf-like size distribution
+
+    Every worker rebuilds the same list from the seed.
+    """
+    rng = random.Random(f"{seed}:cohorts")
+    departments = Weighted([((name, code), weight) for name, code, weight in DEPARTMENTS])
+    cohorts = []
+    numbers: Dict[str, int] = {}
+    for _ in range(max(4, students // 120)):
+        name, code = departments.pick(rng)
+        prefix = f"{code}-{INTAKES.pick(rng)}"
+        numbers[prefix] = numbers.get(prefix, 0) + 1
+        cohorts.append((f"{prefix}-{numbers[prefix]:02d}", name, CAMPUSES.pick(rng)))
+
+    weights = zipf_weights(len(cohorts), 0.7)
+    rng.shuffle(weights)
+    return cohorts, Weighted(list(zip(range(len(cohorts)), weights)))
+
+@functools.lru_cache(maxsize=None)
+def build_cases(seed: int, count: int) -> Tuple[List[Dict[str, Any]], Weighted]:
+    """Case studies with difficulty and a Zipf-like popularity distribution"""
+    rng = random.Random(f"{seed}:cases")
+    difficulties = Weighted([((name, offset), weight) for name, weight, offset in DIFFICULTIES])
+    cases = []
+    for index in range(count):
+        topic = CASE_TOPICS[index % len(CASE_TOPICS)]
+        numeral = NUMERALS[(index // len(CASE_TOPICS)) % len(NUMERALS)]
+        variant = index // (len(CASE_TOPICS) * len(NUMERALS))
+        title = f"{topic}{numeral}" + (f" ({variant + 1})" if variant else "")
+        difficulty, offset = difficulties.pick(rng)
+        cases.append({
+            'case_id': f"CASE{index + 1:03d}",
+            'title': title,
+            'description': f"{difficulty} simulated consultation: {topic.lower()}",
+            'difficulty': difficulty,
+            'offset': offset
+        })
+
+    weights = zipf_weights(count, 0.9)
+    rng.shuffle(weights)
+    return cases, Weighted(list(zip(range(count), weights)))
+
+@functools.lru_cache(maxsize=None)
+def build_incidents(seed: int, start: datetime, days: int) -> Dict[int, List[Tuple[datetime, datetime, int, float]]]:
+    """
+    Incident windows (start, end, api index, severity factor), keyed by every
+    hour (since `start`) they overlap; about three incidents a week
+    """
+    rng = random.Random(f"{seed}:incidents")
+    by_hour: Dict[int, List[Tuple[datetime, datetime, int, float]]] = {}
+    for _ in range(max(1, int(days * 3 / 7))):
+        begin = start + timedelta(seconds=rng.uniform(0, days * 86400))
+        end = begin + timedelta(minutes=rng.uniform(10, 180))
+        window = (begin, end, API_PICKER.pick(rng), rng.choice([2.5, 4.0, 8.0]))
+        first = int((begin - start).total_seconds() // 3600)
+        last = int((end - start).total_seconds() // 3600)
+        for hour in range(first, last + 1):
+            by_hour.setdefault(hour, []).append(window)
+    return by_hour
+
+def sample_time(rng: random.Random, start: datetime, days: int) -> datetime:
+    """Activity timestamp: growing usage, fewer weekend sessions, evening peaks"""
+    for _ in range(3):
+        # Inverse CDF of a density rising linearly by USAGE_GROWTH over the period
+        u = rng.random()
+        x = (math.sqrt(1 + USAGE_GROWTH * (2 + USAGE_GROWTH) * u) - 1) / USAGE_GROWTH
+        day = start + timedelta(days=min(int(x * days), days - 1))
+        if day.weekday() < 5 or rng.random() >= WEEKEND_DROP:
+            break
+    return day + timedelta(hours=HOURS.pick(rng), seconds=rng.randrange(3600))
+
+# ============================================
+# OUTPUT
+# ============================================
+
+def copy_value(value: Any) -> str:
+    """Format a value for COPY text format"""
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    return str(value)
+
+class CopySink:
+    """
+    Buffers rows per table and bulk-loads them with COPY, or appends them to
+    TSV files under an output directory
+
+    Buffers are flushed together, in COLUMNS order, so parents always reach
+    the database before the rows that reference them.
+    """
+
+    def __init__(self, conn=None, out_dir: Optional[Path] = None, label: str = 'rows'):
+        self.conn = conn
+        self.out_dir = out_dir
+        self.label = label
+        self.buffers: Dict[str, List[str]] = {table: [] for table in COLUMNS}
+        self.counts: Dict[str, int] = {table: 0 for table in COLUMNS}
+        self.buffered = 0
+
+    def row(self, table: str, values: Sequence[Any]):
+        self.line(table, '\t'.join(map(copy_value, values)) + '\n')
+
+    def line(self, table: str, line: str):
+        """Add a row already formatted for COPY (hot paths skip copy_value)"""
+        self.buffers[table].append(line)
+        self.counts[table] += 1
+        self.buffered += 1
+        if self.buffered >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        for table, lines in self.buffers.items():
+            if not lines:
+                continue
+            if self.out_dir is not None:
+                path = self.out_dir / table / f"{self.label}.tsv"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with path.open('a', encoding='utf-8') as f:
+                    f.writelines(lines)
+            else:
+                with self.conn.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY {table} ({', '.join(COLUMNS[table])}) FROM STDIN",
+                        io.StringIO(''.join(lines))
+                    )
+            lines.clear()
+        self.buffered = 0
+
+# ============================================
+# GENERATORS
+# ============================================
+
+def generate_students(plan: Dict[str, Any], chunk: int, sink: CopySink) -> Dict[str, float]:
+    """
+    Students [chunk * STUDENTS_PER_CHUNK, ...) with their attempts, rubric
+    scores, environment metrics and engagement events
+
+    Returns:
+        Totals for admin_aggregates
+    """
+    rng = random.Random(f"{plan['seed']}:students:{chunk}")
+    cohorts, cohort_picker = build_cohorts(plan['seed'], plan['students'])
+    cases, case_picker = build_cases(plan['seed'], plan['cases'])
+    start, days = plan['start'], plan['days']
+    end = start + timedelta(days=days)
+    activity_mean = math.exp(ACTIVITY_SIGMA ** 2 / 2)
+
+    stats = {'students': 0, 'active_students': 0, 'attempts': 0, 'completed': 0, 'score_sum': 0,
+             'scored': 0, 'ces_sum': 0, 'duration_sum': 0, 'engagement_seconds': 0, 'latency_sum': 0}
+
+    first = chunk * STUDENTS_PER_CHUNK
+    for index in range(first, min(first + STUDENTS_PER_CHUNK, plan['students'])):
+        student_id = f"STU{index + 1:06d}"
+        cohort_id, department, campus = cohorts[cohort_picker.pick(rng)]
+        role = ROLES.pick(rng)
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        sink.row('students', (student_id, name, cohort_id, department, campus, role))
+        if role != 'Student':
+            continue
+        stats['students'] += 1
+
+        activity = rng.lognormvariate(0, ACTIVITY_SIGMA) / activity_mean
+        case_count = min(int(plan['cases_per_student'] * activity + rng.random()), len(cases))
+        if case_count == 0:
+            continue
+        stats['active_students'] += 1
+
+        if case_count * 10 >= len(cases) * 9:
+            chosen = rng.sample(range(len(cases)), case_count)
+        else:
+            chosen = set()
+            while len(chosen) < case_count:
+                chosen.add(case_picker.pick(rng))
+
+        ability = rng.gauss(0, 1)
+        profile = {
+            'device': DEVICES.pick(rng),
+            'microphone': MICROPHONES.pick(rng),
+            'latency': CAMPUS_LATENCY_MS[campus] * rng.lognormvariate(0, 0.35),
+            'noise': rng.gauss(45, 12)
+        }
+
+        for case_index in chosen:
+            case = cases[case_index]
+            timestamp = sample_time(rng, start, days)
+            skill = 62 + 11 * ability + case['offset']
+            write_attempt(rng, plan, sink, stats, student_id, case, 1, timestamp, skill, profile)
+
+            if rng.random() < SECOND_ATTEMPT_RATE:
+                timestamp += timedelta(days=rng.uniform(1, 14))
+                if timestamp < end:
+                    skill += rng.gauss(6, 7)
+                    write_attempt(rng, plan, sink, stats, student_id, case, 2, timestamp, skill, profile)
+
+    return stats
+
+def write_attempt(rng: random.Random, plan: Dict[str, Any], sink: CopySink, stats: Dict[str, float],
+                  student_id: str, case: Dict[str, Any], number: int, timestamp: datetime,
+                  skill: float, profile: Dict[str, Any]):
+    """One attempt with its environment metrics, rubric scores and engagement events"""
+    attempt_id = f"{student_id}-{case['case_id']}-{number}"
+    state = STATES.pick(rng)
+
+    # Environment: per-student baseline plus per-attempt jitter
+    latency = int(profile['latency'] * rng.lognormvariate(0, 0.5))
+    drops = int(rng.expovariate(1.0) * latency / 120)
+    stability = int(clamp(100 - latency / 6 - drops * 6 + rng.gauss(0, 6), 0, 100))
+    noise = int(clamp(profile['noise'] + rng.gauss(0, 8), 20, 110))
+    noise_quality = int(clamp(100 - (noise - 30) * 1.1 + rng.gauss(0, 5), 0, 100))
+    signal = ('Excellent' if stability >= 80 else 'Good' if stability >= 60
+              else 'Fair' if stability >= 40 else 'Poor')
+    penalty = max(0, latency - 100) / 40 + max(0, noise - 60) / 5
+
+    completed = state == 'Completed'
+    score = int(clamp(round(skill - penalty + rng.gauss(0, 9)), 0, 100)) if completed else None
+    duration = int(rng.lognormvariate(math.log(1500), 0.45) * (1 if completed else 0.35))
+    ces = int(clamp(round(55 + 0.35 * ((score if score is not None else 50) - 60)
+                          + rng.gauss(0, 12) - drops * 3), 0, 100))
+
+    sink.row('attempts', (attempt_id, student_id, case['case_id'], number, score,
+                          duration, ces, timestamp, state))
+    sink.row('environment_metrics', (attempt_id, student_id, case['case_id'], noise, noise_quality,
+                                     latency, stability, drops, profile['device'],
+                                     profile['microphone'], signal))
+
+    stats['attempts'] += 1
+    stats['ces_sum'] += ces
+    stats['duration_sum'] += duration
+    stats['latency_sum'] += latency
+
+    if completed:
+        stats['completed'] += 1
+        stats['score_sum'] += score
+        stats['scored'] += 1
+        for dimension, suffix, max_score in RUBRIC:
+            percentage = clamp(score + rng.gauss(0, 8), 0, 100)
+            comment = next(text for floor, text in COMMENTS if percentage >= floor)
+            sink.row('rubric_scores', (f"{attempt_id}-{suffix}", attempt_id, dimension,
+                                       round(percentage * max_score / 100), max_score,
+                                       comment, percentage < 60))
+
+    # Engagement: exponential event counts, spread over the attempt's duration
+    events = max(1, round(rng.expovariate(1.0) * plan['events_per_attempt'] * (1 if completed else 0.4)))
+    sessions = min(3, 1 + events // 60)
+    step = duration / events
+    began = timestamp - timedelta(seconds=duration)
+    keys = f"\t{student_id}\t{case['case_id']}\t{attempt_id}\t"
+    position = 0
+    for phase, share, actions in PHASES:
+        count = events - position if phase == PHASES[-1][0] else round(events * share)
+        for _ in range(max(0, count)):
+            at = began + timedelta(seconds=(position + rng.random()) * step)
+            seconds = max(1, int(step * (0.3 + 1.4 * rng.random())))
+            sink.line('engagement_logs', f"{attempt_id}-S{position * sessions // events + 1}{keys}"
+                                         f"{at.isoformat(sep=' ')}\t{actions.pick(rng)}\t{seconds}\t{phase}\n")
+            stats['engagement_seconds'] += seconds
+            position += 1
+
+def generate_reliability(plan: Dict[str, Any], chunk: int, sink: CopySink) -> Dict[str, float]:
+    """
+    system_reliability records [chunk * RELIABILITY_PER_CHUNK, ...), evenly
+    spaced over the period with latency and error spikes during incidents
+    """
+    rng = random.Random(f"{plan['seed']}:reliability:{chunk}")
+    start, total = plan['start'], plan['reliability']
+    incidents = build_incidents(plan['seed'], start, plan['days'])
+    spacing = plan['days'] * 86400 / max(total, 1)
+
+    stats = {'reliability_sum': 0.0, 'reliability_records': 0, 'critical': 0}
+
+    first = chunk * RELIABILITY_PER_CHUNK
+    for index in range(first, min(first + RELIABILITY_PER_CHUNK, total)):
+        timestamp = start + timedelta(seconds=(index + rng.random()) * spacing)
+        api = API_PICKER.pick(rng)
+        api_name, _, median = APIS[api]
+
+        factor = 1.0
+        for begin, end, incident_api, severity in incidents.get(int((timestamp - start).total_seconds() // 3600), ()):
+            if incident_api == api and begin <= timestamp < end:
+                factor = severity
+
+        latency = int(median * rng.lognormvariate(0, 0.4) * factor)
+        error_rate = round(min(100.0, abs(rng.gauss(0.15, 0.12)) * factor ** 1.5), 3)
+        reliability = round(clamp(100 - error_rate * 2.5 - max(0, latency - 3 * median) / median * 2, 0, 100), 2)
+        if error_rate >= 5 or latency >= 5 * median:
+            severity_label = 'Critical'
+        elif error_rate >= 1 or latency >= 2.5 * median:
+            severity_label = 'Warning'
+        else:
+            severity_label = 'Info'
+
+        sink.row('system_reliability', (f"SR{index + 1:010d}", api_name, latency, error_rate,
+                                        reliability, timestamp, REGIONS.pick(rng), severity_label))
+        stats['reliability_sum'] += reliability
+        stats['reliability_records'] += 1
+        stats['critical'] += severity_label == 'Critical'
+
+    return stats
+
+def admin_metrics(totals: Dict[str, float], generated_at: datetime) -> List[Tuple[Any, ...]]:
+    """admin_aggregates rows (platform KPIs) from the generators' totals"""
+    def ratio(numerator: str, denominator: str, scale: float = 1.0) -> float:
+        return round(totals.get(numerator, 0) * scale / totals[denominator], 2) if totals.get(denominator) else 0
+
+    metrics = [
+        ('total_students', totals.get('students', 0), "Registered students"),
+        ('active_students', totals.get('active_students', 0), "Students with at least one attempt"),
+        ('total_attempts', totals.get('attempts', 0), "Case study attempts"),
+        ('completion_rate', ratio('completed', 'attempts', 100), "Completed / total attempts (%)"),
+        ('avg_score', ratio('score_sum', 'scored'), "Mean score of completed attempts"),
+        ('avg_ces', ratio('ces_sum', 'attempts'), "Mean customer effort score"),
+        ('avg_duration_minutes', ratio('duration_sum', 'attempts', 1 / 60), "Mean attempt duration (minutes)"),
+        ('total_engagement_hours', round(totals.get('engagement_seconds', 0) / 3600, 2), "Logged engagement time (hours)"),
+        ('avg_internet_latency_ms', ratio('latency_sum', 'attempts'), "Mean student internet latency (ms)"),
+        ('avg_reliability_index', ratio('reliability_sum', 'reliability_records'), "Mean API reliability index"),
+        ('critical_incidents', totals.get('critical', 0), "Critical system reliability records"),
+    ]
+    return [(f"M{index:03d}", name, value, generated_at, description)
+            for index, (name, value, description) in enumerate(metrics, 1)]
+
+# ============================================
+# LOADING
+# ============================================
+
+def skip_triggers(conn) -> bool:
+    """
+    Skip triggers (rollup maintenance and foreign-key checks) for this
+    session; needs superuser, as a local database usually grants
+
+    Returns:
+        True if the session skips triggers
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SET session_replication_role = replica")
+        return True
+    except psycopg2.Error:
+        conn.rollback()
+        return False
+
+def run_task(task: Tuple[Dict[str, Any], str, int]) -> Dict[str, float]:
+    """Worker entry point: generate and load one chunk in one transaction"""
+    plan, kind, chunk = task
+    conn = None if plan['out'] else get_connection(plan['dsn'])
+    try:
+        skipped = skip_triggers(conn) if conn is not None and plan['skip_triggers'] else False
+        sink = CopySink(conn, plan['out'], f"{kind}_{chunk:05d}")
+        generate = generate_students if kind == 'students' else generate_reliability
+        stats = generate(plan, chunk, sink)
+        sink.flush()
+        if conn is not None:
+            conn.commit()
+        stats.update({f"rows:{table}": count for table, count in sink.counts.items()})
+        stats['triggers_skipped'] = int(skipped)
+        return stats
+    except Exception:
+        if conn is not None:
+            conn.rollback()
+        raise
+    finally:
+        if conn is not None:
+            conn.close()
+
+def ensure_partitions(conn, start: datetime, days: int) -> List[str]:
+    """Create the monthly partitions (migrations/007) covering the period"""
+    created = []
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regproc('mind_create_month_partition') IS NOT NULL")
+        if not cursor.fetchone()[0]:
+            return created
+        # One month of margin: an attempt's engagement events precede its timestamp
+        months = sorted({(start + timedelta(days=d)).date().replace(day=1) for d in range(-1, days + 1)})
+        for table in PARTITIONED_TABLES:
+            cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", (table,))
+            if cursor.fetchone() is None:
+                continue
+            for month in months:
+                cursor.execute("SELECT mind_create_month_partition(%s, %s)", (table, month))
+                created.append(cursor.fetchone()[0])
+    conn.commit()
+    return created
+
+def refresh_rollups(conn) -> List[str]:
+    """Rebuild every installed rollup (migrations 001-005)"""
+    refreshed = []
+    with conn.cursor() as cursor:
+        for function in ROLLUP_REFRESHES:
+            cursor.execute("SELECT to_regproc(%s) IS NOT NULL", (function,))
+            if cursor.fetchone()[0]:
+                cursor.execute(f"SELECT {function}()")
+                conn.commit()
+                refreshed.append(function)
+    # Close the transaction the last to_regproc() probe opened
+    conn.commit()
+    return refreshed
+
+def calibrate_cases_per_student(seed: int, wanted: float, cases: int) -> float:
+    """
+    Scale for per-student case counts whose mean, after capping at `cases`,
+    is `wanted` (bisection over a fixed sample of the activity distribution)
+    """
+    rng = random.Random(f"{seed}:calibration")
+    activity_mean = math.exp(ACTIVITY_SIGMA ** 2 / 2)
+    sample = [rng.lognormvariate(0, ACTIVITY_SIGMA) / activity_mean for _ in range(20000)]
+    target = min(wanted, cases * 0.95)
+    low, high = 0.0, wanted * 20
+    for _ in range(40):
+        middle = (low + high) / 2
+        mean = sum(min(middle * a, cases) for a in sample) / len(sample)
+        low, high = (middle, high) if mean < target else (low, middle)
+    return (low + high) / 2
+
+def build_plan(args) -> Dict[str, Any]:
+    """Resolve the scale preset and overrides into the plan shared with workers"""
+    scale = dict(SCALES[args.scale])
+    for key, value in (('students', args.students), ('attempts', args.attempts),
+                       ('events', args.events), ('reliability', args.reliability_records)):
+        if value is not None:
+            scale[key] = value
+
+    end_day = args.end_date or datetime.now(timezone.utc).date() - timedelta(days=1)
+    start = datetime.combine(end_day + timedelta(days=1 - args.days), datetime.min.time(), timezone.utc)
+
+    # Distinct cases an average active student takes so that, after the
+    # per-student cap at the number of cases, attempts land on the target
+    student_share = ROLES.cum[0] / ROLES.cum[-1]
+    attempts_per_case = 1 + SECOND_ATTEMPT_RATE * 0.97
+    wanted = scale['attempts'] / max(scale['students'] * student_share * attempts_per_case, 1)
+    cases = args.cases or int(clamp(math.ceil(wanted * 2.5), 4, 999))
+    cases_per_student = calibrate_cases_per_student(args.seed, wanted, cases)
+
+    # Abandoned and in-progress attempts log fewer events
+    completed_share = STATES.cum[0] / STATES.cum[-1]
+    events_per_attempt = scale['events'] / max(scale['attempts'], 1) / (completed_share + (1 - completed_share) * 0.4)
+
+    return {
+        'seed': args.seed,
+        'students': scale['students'],
+        'reliability': scale['reliability'],
+        'cases': cases,
+        'cases_per_student': cases_per_student,
+        'events_per_attempt': events_per_attempt,
+        'start': start,
+        'days': args.days,
+        'dsn': args.dsn,
+        'out': args.out,
+        'skip_triggers': not args.keep_triggers,
+        'targets': scale
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate and bulk-load a synthetic MIND dataset")
+    parser.add_argument('--dsn', help="libpq connection string (default: DATABASE_URL / DB_* env)")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='demo', help="size preset (default: demo)")
+    parser.add_argument('--students', type=int, help="override the preset's student count")
+    parser.add_argument('--attempts', type=int, help="override the preset's target attempt count")
+    parser.add_argument('--events', type=int, help="override the preset's target engagement event count")
+    parser.add_argument('--reliability-records', type=int, help="override the preset's system_reliability count")
+    parser.add_argument('--cases', type=int, help="number of case studies (default: derived from the scale)")
+    parser.add_argument('--days', type=int, default=365, help="length of the generated period (default: 365)")
+    parser.add_argument('--end-date', type=date.fromisoformat, help="last day of the period (default: yesterday, UTC)")
+    parser.add_argument('--seed', type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="parallel generator / COPY processes (default: CPU count)")
+    parser.add_argument('--create-schema', action='store_true', help=f"run {SCHEMA_FILE.relative_to(REPO_ROOT)} first")
+    parser.add_argument('--truncate', action='store_true', help="empty the eight tables before loading")
+    parser.add_argument('--keep-triggers', action='store_true',
+                        help="let rollup triggers and FK checks fire per row instead of rebuilding afterwards")
+    parser.add_argument('--out', type=Path, help="write TSV files (COPY text format) here instead of loading")
+    args = parser.parse_args(argv)
+
+    plan = build_plan(args)
+    targets = plan['targets']
+    print(f"📝 Generating {targets['students']:,} students, ~{targets['attempts']:,} attempts, "
+          f"~{targets['events']:,} engagement events, {targets['reliability']:,} reliability records")
+    print(f"   {plan['cases']} case studies, {plan['days']} days from {plan['start']:%Y-%m-%d}, "
+          f"seed {plan['seed']}, {args.workers} worker(s)")
+
+    conn = None
+    if args.out is None:
+        conn = get_connection(args.dsn)
+    else:
+        if any(args.out.glob('*/*.tsv')):
+            print(f"❌ {args.out} already holds generated files", file=sys.stderr)
+            return 1
+
+    started = time.monotonic()
+    try:
+        if conn is not None:
+            with conn.cursor() as cursor:
+                if args.create_schema:
+                    cursor.execute(SCHEMA_FILE.read_text(encoding='utf-8'))
+                if args.truncate:
+                    cursor.execute(f"TRUNCATE {', '.join(reversed(list(COLUMNS)))}")
+            conn.commit()
+            for name in ensure_partitions(conn, plan['start'], plan['days']):
+                print(f"   partition {name}")
+
+        cases, _ = build_cases(plan['seed'], plan['cases'])
+        sink = CopySink(conn, args.out, 'main')
+        for case in cases:
+            sink.row('case_studies', (case['case_id'], case['title'], case['description'], case['difficulty']))
+        sink.flush()
+        if conn is not None:
+            conn.commit()
+            # Forked workers must not inherit an open connection
+            conn.close()
+            conn = None
+
+        tasks = [(plan, 'students', chunk) for chunk in range(math.ceil(plan['students'] / STUDENTS_PER_CHUNK))]
+        tasks += [(plan, 'reliability', chunk) for chunk in range(math.ceil(plan['reliability'] / RELIABILITY_PER_CHUNK))]
+
+        totals: Dict[str, float] = {}
+        skipped = 0
+        with multiprocessing.Pool(max(args.workers, 1)) as pool:
+            for done, stats in enumerate(pool.imap_unordered(run_task, tasks), 1):
+                skipped += stats.pop('triggers_skipped')
+                for key, value in stats.items():
+                    totals[key] = totals.get(key, 0) + value
+                if done == len(tasks) or done % max(1, len(tasks) // 20) == 0:
+                    rows = sum(v for k, v in totals.items() if k.startswith('rows:'))
+                    elapsed = time.monotonic() - started
+                    print(f"   {done}/{len(tasks)} chunks, {rows:,.0f} rows, {rows / elapsed:,.0f} rows/s")
+
+        if args.out is None:
+            conn = get_connection(args.dsn)
+            sink.conn = conn
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM admin_aggregates WHERE metric_id LIKE 'M___'")
+        for row in admin_metrics(totals, plan['start'] + timedelta(days=plan['days'])):
+            sink.row('admin_aggregates', row)
+        sink.flush()
+
+        if conn is not None:
+            conn.commit()
+            if skipped or args.truncate:
+                refreshed = refresh_rollups(conn)
+                if refreshed:
+                    print(f"   rebuilt rollups: {', '.join(refreshed)}")
+            if skipped < len(tasks) and not args.keep_triggers:
+                print("⚠️ Could not skip triggers (needs superuser); rollups were maintained row by row")
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                for table in COLUMNS:
+                    cursor.execute(f"ANALYZE {table}")
+
+    except Exception as e:
+        print(f"❌ Data generation failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if conn is not None:
+            conn.close()
+
+    elapsed = time.monotonic() - started
+    counts = {table: totals.get(f"rows:{table}", 0) + sink.counts[table] for table in COLUMNS}
+    for table, count in counts.items():
+        print(f"   {table:<22} {count:>14,.0f}")
+    total_rows = sum(counts.values())
+    target = f"to {args.out}" if args.out else "into the database"
+    print(f"✅ Loaded {total_rows:,.0f} rows {target} in {elapsed:,.1f}s ({total_rows / elapsed:,.0f} rows/s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
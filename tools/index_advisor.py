@@ -0,0 +1,336 @@
+"""
+Index advisor for the dashboard workload
+Runs EXPLAIN over every dashboard query (see tools/workload.py), finds
+sequential scans and residual filters on large tables, and proposes
+composite / covering indexes. Proposals can be checked with hypothetical
+indexes (hypopg, when installed) and written out as a versioned,
+idempotent migration.
+
+Usage:
+    python -m tools.index_advisor
+    python -m tools.index_advisor --min-rows 50000 --verify
+    python -m tools.index_advisor --write-migration
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+
+from tools.common import MIGRATIONS_DIR, get_connection
+from tools.workload import collect_workload
+
+# Scan nodes whose Filter is evaluated row by row
+SCAN_NODES = {'Seq Scan', 'Index Scan', 'Index Only Scan', 'Bitmap Heap Scan'}
+
+# `col = ...`, `(col)::text = ...`, `s.col >= ...` as printed by EXPLAIN
+PREDICATE_RE = re.compile(
+    r'(?:\b[a-z_][a-z0-9_]*\.)?"?([a-z_][a-z0-9_]*)"?\)?(?:::[a-z ]+?)?\s*(>=|<=|<>|=|>|<)\s',
+    re.IGNORECASE
+)
+
+# Covering indexes only when the scan outputs a handful of extra columns
+MAX_INCLUDE_COLUMNS = 4
+
+def load_catalog(conn) -> Dict[str, Dict[str, Any]]:
+    """
+    Load table sizes, columns, n_distinct and existing index keys
+
+    Returns:
+        Dict keyed by table name
+    """
+    catalog = defaultdict(lambda: {'rows': 0, 'columns': set(), 'n_distinct': {}, 'indexes': []})
+
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT c.relname, c.reltuples::BIGINT
+            FROM pg_class c
+            INNER JOIN pg_namespace n ON c.relnamespace = n.oid
+            WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+        """)
+        for table, rows in cursor.fetchall():
+            catalog[table]['rows'] = max(rows, 0)
+
+        cursor.execute("""
+            SELECT table_name, column_name
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+        """)
+        for table, column in cursor.fetchall():
+            catalog[table]['columns'].add(column)
+
+        cursor.execute("""
+            SELECT tablename, attname, n_distinct
+            FROM pg_stats
+            WHERE schemaname = current_schema()
+        """)
+        for table, column, n_distinct in cursor.fetchall():
+            # Negative n_distinct is a fraction of the row count
+            rows = catalog[table]['rows'] or 1
+            catalog[table]['n_distinct'][column] = n_distinct if n_distinct >= 0 else -n_distinct * rows
+
+        cursor.execute("""
+            SELECT t.relname, ARRAY(
+                SELECT a.attname
+                FROM unnest(i.indkey[0:i.indnkeyatts - 1]) WITH ORDINALITY AS k(attnum, ord)
+                INNER JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+                ORDER BY k.ord
+            )
+            FROM pg_index i
+            INNER JOIN pg_class t ON i.indrelid = t.oid
+            INNER JOIN pg_namespace n ON t.relnamespace = n.oid
+            WHERE n.nspname = current_schema()
+        """)
+        for table, keys in cursor.fetchall():
+            catalog[table]['indexes'].append(tuple(keys))
+
+    return catalog
+
+def explain(conn, sql: str) -> Optional[Dict[str, Any]]:
+    """
+    EXPLAIN (VERBOSE, FORMAT JSON) a query, returning the top plan node
+
+    Bind parameters carried by a BoundQuery are passed along.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (VERBOSE, FORMAT JSON) {sql}", getattr(sql, 'params', None))
+            plan = cursor.fetchone()[0]
+        conn.rollback()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+    except Exception:
+        conn.rollback()
+        return None
+
+def walk_plan(node: Dict[str, Any]):
+    """Yield every node in a plan tree"""
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk_plan(child)
+
+def parse_predicates(condition: str, columns: set) -> Tuple[List[str], List[str]]:
+    """
+    Split a Filter / Recheck expression into equality and range columns
+
+    Only names that are real columns of the scanned table are kept.
+    """
+    equality, ranges = [], []
+    for column, operator in PREDICATE_RE.findall(condition or ''):
+        column = column.lower()
+        if column not in columns:
+            continue
+        if operator == '=':
+            if column not in equality:
+                equality.append(column)
+        elif operator != '<>' and column not in ranges:
+            ranges.append(column)
+    return equality, [c for c in ranges if c not in equality]
+
+def propose_for_node(node: Dict[str, Any], table_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Propose an index for one scan node, or None"""
+    condition = node.get('Filter')
+    if not condition:
+        return None
+
+    equality, ranges = parse_predicates(condition, table_info['columns'])
+    if not equality and not ranges:
+        return None
+
+    # Most selective equality columns first, then a single range column
+    n_distinct = table_info['n_distinct']
+    equality.sort(key=lambda c: -n_distinct.get(c, 0))
+    keys = equality + ranges[:1]
+
+    output = []
+    for expression in node.get('Output', []):
+        column = expression.split('.')[-1].strip('"')
+        if column in table_info['columns'] and column not in keys and column not in output:
+            output.append(column)
+    include = output if 0 < len(output) <= MAX_INCLUDE_COLUMNS else []
+
+    return {'keys': tuple(keys), 'include': tuple(include)}
+
+def is_covered(keys: Tuple[str, ...], existing: List[Tuple[str, ...]]) -> bool:
+    """True when an existing index already starts with these key columns"""
+    return any(index[:len(keys)] == keys for index in existing)
+
+def index_name(table: str, keys: Tuple[str, ...], include: Tuple[str, ...]) -> str:
+    """Build a stable index name within PostgreSQL's 63-char limit"""
+    name = f"idx_{table}_{'_'.join(keys)}" + ('_covering' if include else '')
+    return name[:63]
+
+def index_ddl(proposal: Dict[str, Any], named: bool = True) -> str:
+    """CREATE INDEX statement for a proposal (IF NOT EXISTS when named)"""
+    target = f"IF NOT EXISTS {proposal['name']}\n   " if named else ""
+    ddl = (f"CREATE INDEX {target} ON {proposal['table']} ({', '.join(proposal['keys'])})")
+    if proposal['include']:
+        ddl += f"\n    INCLUDE ({', '.join(proposal['include'])})"
+    return ddl + ";"
+
+def advise(conn, min_rows: int = 10000) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Run the workload through EXPLAIN and collect index proposals
+
+    Args:
+        conn: Database connection
+        min_rows: Ignore tables with fewer estimated rows
+
+    Returns:
+        (proposals sorted by number of queries served, workload entries that
+        could not be explained)
+    """
+    catalog = load_catalog(conn)
+    proposals: Dict[Tuple, Dict[str, Any]] = {}
+    failures = []
+
+    for entry in collect_workload():
+        if not entry.get('sql'):
+            failures.append(entry)
+            continue
+
+        plan = explain(conn, entry['sql'])
+        if plan is None:
+            failures.append(dict(entry, skipped='EXPLAIN failed'))
+            continue
+
+        for node in walk_plan(plan):
+            table = node.get('Relation Name')
+            if node.get('Node Type') not in SCAN_NODES or table not in catalog:
+                continue
+            if catalog[table]['rows'] < min_rows:
+                continue
+
+            proposal = propose_for_node(node, catalog[table])
+            if proposal is None or is_covered(proposal['keys'], catalog[table]['indexes']):
+                continue
+
+            key = (table, proposal['keys'])
+            if key not in proposals:
+                proposals[key] = {
+                    'table': table,
+                    'keys': proposal['keys'],
+                    'include': proposal['include'],
+                    'name': index_name(table, proposal['keys'], proposal['include']),
+                    'sources': [],
+                    'sql': []
+                }
+            merged = proposals[key]
+            # Merge INCLUDE lists while they stay small
+            include = tuple(dict.fromkeys(merged['include'] + proposal['include']))
+            merged['include'] = include if len(include) <= MAX_INCLUDE_COLUMNS else merged['include']
+            merged['name'] = index_name(table, merged['keys'], merged['include'])
+            if entry['source'] not in merged['sources']:
+                merged['sources'].append(entry['source'])
+                merged['sql'].append(entry['sql'])
+
+    ranked = sorted(proposals.values(), key=lambda p: (-len(p['sources']), p['table'], p['keys']))
+    return ranked, failures
+
+def verify_with_hypopg(conn, proposals: List[Dict[str, Any]]) -> bool:
+    """
+    Re-cost each proposal's queries with a hypothetical index (hypopg)
+
+    Adds 'cost_before' / 'cost_after' to each proposal.
+
+    Returns:
+        False when hypopg is not available
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS hypopg")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        return False
+
+    for proposal in proposals:
+        before = sum((explain(conn, sql) or {}).get('Total Cost', 0) for sql in proposal['sql'])
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT * FROM hypopg_create_index(%s)",
+                           (index_ddl(proposal, named=False).rstrip(';'),))
+        conn.commit()
+        after = sum((explain(conn, sql) or {}).get('Total Cost', 0) for sql in proposal['sql'])
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT hypopg_reset()")
+        conn.commit()
+        proposal['cost_before'] = before
+        proposal['cost_after'] = after
+
+    return True
+
+def next_migration_path(slug: str):
+    """Path for the next NNN_<slug>.sql migration"""
+    versions = [int(p.name[:3]) for p in MIGRATIONS_DIR.glob('[0-9][0-9][0-9]_*.sql')]
+    return MIGRATIONS_DIR / f"{max(versions, default=0) + 1:03d}_{slug}.sql"
+
+def render_migration(proposals: List[Dict[str, Any]], title: str) -> str:
+    """Render proposals as an idempotent migration file"""
+    lines = [
+        "-- " + "=" * 76,
+        f"-- {title}",
+        "--",
+        "-- Generated by tools/index_advisor.py from EXPLAIN over the dashboard",
+        "-- workload. Each index lists the queries it serves.",
+        "--",
+        "-- Safe to re-run: every index is created with IF NOT EXISTS.",
+        "-- " + "=" * 76,
+        "",
+    ]
+    for proposal in proposals:
+        for source in proposal['sources']:
+            lines.append(f"-- {source}")
+        lines.append(index_ddl(proposal))
+        lines.append("")
+    return "\n".join(lines)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Propose indexes for the dashboard query workload")
+    parser.add_argument('--dsn', help="libpq connection string (default: DATABASE_URL / DB_* env)")
+    parser.add_argument('--min-rows', type=int, default=10000,
+                        help="ignore tables with fewer estimated rows (default: 10000)")
+    parser.add_argument('--verify', action='store_true',
+                        help="re-cost proposals with hypothetical indexes (needs hypopg)")
+    parser.add_argument('--write-migration', action='store_true',
+                        help="write proposals to the next migrations/NNN_advisor_indexes.sql")
+    args = parser.parse_args(argv)
+
+    conn = get_connection(args.dsn)
+    try:
+        proposals, failures = advise(conn, min_rows=args.min_rows)
+
+        if args.verify and proposals:
+            if verify_with_hypopg(conn, proposals):
+                proposals = [p for p in proposals if p['cost_after'] < p['cost_before']]
+            else:
+                print("⚠️ hypopg is not available; skipping verification", file=sys.stderr)
+    finally:
+        conn.close()
+
+    if not proposals:
+        print("✅ No index proposals: every filtered scan is already served by an index")
+    for proposal in proposals:
+        print(index_ddl(proposal))
+        if 'cost_before' in proposal:
+            print(f"    -- estimated cost {proposal['cost_before']:.0f} -> {proposal['cost_after']:.0f}")
+        print(f"    -- serves {len(proposal['sources'])} quer{'y' if len(proposal['sources']) == 1 else 'ies'}:")
+        for source in proposal['sources']:
+            print(f"    --   {source}")
+        print()
+
+    for entry in failures:
+        print(f"⚠️ Skipped {entry['source']}: {entry.get('skipped')}", file=sys.stderr)
+
+    if args.write_migration and proposals:
+        path = next_migration_path('advisor_indexes')
+        path.write_text(render_migration(proposals, f"{path.stem[:3]} - Advisor-proposed indexes"),
+                        encoding='utf-8')
+        print(f"📝 Wrote {path.relative_to(MIGRATIONS_DIR.parent)}")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
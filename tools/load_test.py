@@ -0,0 +1,325 @@
+"""
+Concurrent-session load test for one dashboard instance
+Simulates N simultaneous Streamlit sessions in one process, the way a
+Streamlit server runs every session's script on its own thread against the
+shared st.cache_resource DatabaseManager and its connection pool. Sessions
+are spread over the four roles, open pages their role admits, think for an
+exponentially distributed time, then change a filter or move to another
+page. Concurrency ramps through stages; each stage reports throughput,
+render latency percentiles, error rate and connection-pool saturation.
+
+Every simulated session connects to --dsn (else DATABASE_URL / DB_*),
+never the database in .streamlit/secrets.toml.
+
+Usage:
+    python -m tools.load_test                                   # 1, 5, 10, 25, 50 sessions
+    python -m tools.load_test --concurrency 10,20,40 --duration 120 --think 3
+    python -m tools.load_test --mix Faculty=1 --json load.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from tools.common import REPO_ROOT, PAGES_DIR, get_connection, use_dsn_for_app
+from tools.query_benchmark import detect_scale, percentile
+from tools.render_benchmark import HOME, PageSession, demo_users, page_roles
+
+DEFAULT_CONCURRENCY = '1,5,10,25,50'
+
+# Share of sessions per role: mostly students, as in production
+DEFAULT_MIX = 'Student=0.7,Faculty=0.15,Admin=0.1,Developer=0.05'
+
+# Distinct students for the Student sessions, in a stable pseudo-random order
+STUDENT_SAMPLE = "SELECT student_id FROM students ORDER BY md5(student_id) LIMIT %s"
+
+# Seconds between pool occupancy samples
+SAMPLE_INTERVAL = 0.5
+
+# ============================================
+# SESSIONS
+# ============================================
+
+class Recorder:
+    """Render outcomes from every session of one stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.renders: List[Dict[str, Any]] = []
+
+    def add(self, started: float, latency_ms: float, page: str, role: str, error: Optional[str]):
+        with self._lock:
+            self.renders.append({
+                'started': started,
+                'latency_ms': latency_ms,
+                'page': page,
+                'role': role,
+                'error': error
+            })
+
+class SimulatedSession(threading.Thread):
+    """One user: open a page, think, change a filter or navigate, repeat"""
+
+    def __init__(self, role: str, user: Dict[str, Any], pages: List[Path], args,
+                 recorder: Recorder, stop: threading.Event, seed: int):
+        super().__init__(daemon=True)
+        self.role = role
+        self.user = user
+        self.pages = pages
+        self.args = args
+        self.recorder = recorder
+        self.stop = stop
+        self.rng = random.Random(seed)
+        self.session: Optional[PageSession] = None
+
+    def think(self) -> bool:
+        """Wait a think time; False once the stage has ended"""
+        return not self.stop.wait(self.rng.expovariate(1 / self.args.think) if self.args.think > 0 else 0)
+
+    def render(self):
+        page = self.session.path.relative_to(REPO_ROOT).as_posix()
+        error = None
+        started = time.perf_counter()
+        try:
+            self.session.app.run(timeout=self.args.timeout)
+            if self.session.app.exception:
+                error = str(self.session.app.exception[0].message).strip().splitlines()[0]
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}".splitlines()[0]
+        self.recorder.add(started, (time.perf_counter() - started) * 1000, page, self.role, error)
+
+    def open_page(self):
+        self.session = PageSession(self.rng.choice(self.pages), self.role, self.user, self.args.timeout)
+        self.session.log_in()
+        self.render()
+
+    def change_filter(self) -> bool:
+        """Pick another value for one filter and rerun; False if there are none"""
+        widgets = [w for w in self.session.widgets() if len(w[2]) > 1]
+        if not widgets:
+            return False
+        kind, label, options, value = self.rng.choice(widgets)
+        self.session.apply({label: self.rng.choice([o for o in options if o != value])})
+        self.render()
+        return True
+
+    def run(self):
+        # Stagger arrivals over one think time
+        if self.stop.wait(self.rng.uniform(0, self.args.think)):
+            return
+        self.open_page()
+        while self.think():
+            if self.rng.random() < self.args.navigate or not self.change_filter():
+                self.open_page()
+
+# ============================================
+# STAGES
+# ============================================
+
+def parse_mix(text: str, roles: List[str]) -> Dict[str, float]:
+    """'Student=0.7,Faculty=0.3' -> normalized weights per known role"""
+    weights = {}
+    for part in text.split(','):
+        role, _, weight = part.partition('=')
+        role = role.strip()
+        if role not in roles:
+            raise argparse.ArgumentTypeError(f"Unknown role '{role}' (choose from {', '.join(roles)})")
+        weights[role] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("Role weights must add up to more than 0")
+    return {role: weight / total for role, weight in weights.items() if weight > 0}
+
+def assign_roles(count: int, mix: Dict[str, float]) -> List[str]:
+    """Roles for count sessions, in proportion to mix (largest remainder)"""
+    quotas = {role: count * share for role, share in mix.items()}
+    roles = {role: int(quota) for role, quota in quotas.items()}
+    by_remainder = sorted(quotas, key=lambda role: quotas[role] - roles[role], reverse=True)
+    for role in by_remainder[:count - sum(roles.values())]:
+        roles[role] += 1
+    return [role for role in mix for _ in range(roles[role])]
+
+def load_students(dsn: Optional[str], count: int) -> List[str]:
+    """Student ids for the Student sessions, empty when the database is unreachable"""
+    try:
+        conn = get_connection(dsn)
+    except Exception:
+        return []
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(STUDENT_SAMPLE, (count,))
+            return [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+def run_stage(concurrency: int, roles: List[str], users: Dict[str, Dict[str, Any]], students: List[str],
+              pages: Dict[str, List[Path]], manager, args, seed: int) -> Dict[str, Any]:
+    """
+    Run concurrency sessions for args.duration seconds
+
+    Renders that start during the first args.warmup seconds are left out of
+    the latency and throughput figures.
+
+    Returns:
+        Stage summary: throughput, latency percentiles, errors and pool figures
+    """
+    recorder = Recorder()
+    stop = threading.Event()
+    sessions = []
+    for number, role in enumerate(roles):
+        user = dict(users[role])
+        if role == 'Student' and students:
+            user['student_id'] = students[number % len(students)]
+        sessions.append(SimulatedSession(role, user, pages[role], args, recorder, stop, seed + number))
+
+    manager.reset_pool_stats()
+    occupancy = []
+    started = time.perf_counter()
+    for session in sessions:
+        session.start()
+    while time.perf_counter() - started < args.duration:
+        time.sleep(SAMPLE_INTERVAL)
+        occupancy.append(manager.pool_stats()['in_use'])
+    stop.set()
+    for session in sessions:
+        session.join(args.timeout + 5)
+    pool = manager.pool_stats()
+
+    window_start = started + args.warmup
+    window_end = started + args.duration
+    measured = [r for r in recorder.renders if window_start <= r['started'] < window_end]
+    latencies = sorted(r['latency_ms'] for r in measured if r['error'] is None)
+    errors = [r for r in measured if r['error'] is not None]
+
+    by_role = {}
+    for role in dict.fromkeys(roles):
+        role_latencies = sorted(r['latency_ms'] for r in measured if r['role'] == role and r['error'] is None)
+        if role_latencies:
+            by_role[role] = {'renders': len(role_latencies), 'p95_ms': round(percentile(role_latencies, 0.95), 1)}
+
+    window = max(args.duration - args.warmup, 1e-9)
+    return {
+        'concurrency': concurrency,
+        'renders': len(measured),
+        'throughput': round(len(measured) / window, 3),
+        'p50_ms': round(percentile(latencies, 0.50), 1) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 1) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 1) if latencies else None,
+        'errors': len(errors),
+        'error_rate': round(len(errors) / len(measured), 4) if measured else 0.0,
+        'first_errors': sorted({r['error'] for r in errors})[:3],
+        'by_role': by_role,
+        'pool': {
+            'size': pool['size'],
+            'peak_in_use': pool['peak_in_use'],
+            'mean_in_use': round(statistics.mean(occupancy), 2) if occupancy else 0.0,
+            'checkouts': pool['checkouts'],
+            'waits': pool['waits'],
+            'mean_wait_ms': round(pool['wait_ms'] / pool['checkouts'], 2) if pool['checkouts'] else 0.0,
+            'max_wait_ms': round(pool['max_wait_ms'], 1),
+            'timeouts': pool['timeouts']
+        }
+    }
+
+def stage_passes(stage: Dict[str, Any], args) -> bool:
+    """A stage is sustained when renders complete within the p95 and error budgets"""
+    return (stage['p95_ms'] is not None
+            and stage['p95_ms'] <= args.slo_p95_ms
+            and stage['error_rate'] <= args.max_error_rate)
+
+def print_stage(stage: Dict[str, Any], passed: bool):
+    pool = stage['pool']
+    marker = "✅" if passed else "❌"
+    latency = (f"p50 {stage['p50_ms']:>7,.0f}  p95 {stage['p95_ms']:>7,.0f}  p99 {stage['p99_ms']:>7,.0f} ms"
+               if stage['p50_ms'] is not None else f"{'no completed renders':<40}")
+    print(f"{marker} {stage['concurrency']:>4} sessions  {stage['throughput']:>6.2f} renders/s  {latency}  "
+          f"errors {stage['error_rate']:>6.1%}  pool {pool['peak_in_use']}/{pool['size']} peak, "
+          f"{pool['mean_in_use']:.1f} mean, {pool['waits']} waits "
+          f"(max {pool['max_wait_ms']:,.0f} ms), {pool['timeouts']} timeouts")
+    for error in stage['first_errors']:
+        print(f"     {error}")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ramp concurrent simulated dashboard sessions against one instance")
+    parser.add_argument('--dsn', help="libpq connection string the sessions run against "
+                                      "(default: DATABASE_URL / DB_* env)")
+    parser.add_argument('--concurrency', default=DEFAULT_CONCURRENCY,
+                        help=f"comma-separated session counts, one stage each (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--duration', type=float, default=60, help="seconds per stage (default: 60)")
+    parser.add_argument('--warmup', type=float, default=10,
+                        help="seconds at the start of each stage left out of the figures (default: 10)")
+    parser.add_argument('--think', type=float, default=5, help="mean think time between actions in seconds (default: 5)")
+    parser.add_argument('--navigate', type=float, default=0.3,
+                        help="chance an action opens another page instead of changing a filter (default: 0.3)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"role weights (default: {DEFAULT_MIX})")
+    parser.add_argument('--seed', type=int, default=42, help="random seed for session behaviour (default: 42)")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds per render (default: 120)")
+    parser.add_argument('--slo-p95-ms', type=float, default=3000,
+                        help="p95 render latency a sustained stage stays under (default: 3000)")
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help="error rate a sustained stage stays under (default: 0.01)")
+    parser.add_argument('--full-ramp', action='store_true', help="keep ramping after a stage fails")
+    parser.add_argument('--json', type=Path, help="also write the stage results to this file")
+    args = parser.parse_args(argv)
+
+    # Pages import db, auth and core.* relative to the repository root
+    os.chdir(REPO_ROOT)
+    # ... and would otherwise connect to the host in .streamlit/secrets.toml
+    args.dsn = use_dsn_for_app(args.dsn)
+    from db import get_db_manager
+
+    users = demo_users(None)
+    try:
+        mix = parse_mix(args.mix, list(users))
+        levels = [int(level) for level in args.concurrency.split(',')]
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+
+    paths = [HOME] + sorted(PAGES_DIR.glob('*.py'))
+    pages = {role: [p for p in paths if role in page_roles(p, [role])] for role in mix}
+    students = load_students(args.dsn, max(levels))
+    try:
+        conn = get_connection(args.dsn)
+        print(f"Dataset: {detect_scale(conn)} scale")
+        conn.close()
+    except Exception as e:
+        print(f"⚠️ Could not inspect the dataset: {e}", file=sys.stderr)
+
+    manager = get_db_manager()
+    print(f"Connection pool: {manager.pool_size} connections, {manager.pool_timeout:g}s checkout timeout")
+    print(f"Stages: {', '.join(map(str, levels))} sessions, {args.duration:.0f}s each, "
+          f"{args.think:.1f}s mean think time\n")
+
+    stages = []
+    for level in levels:
+        stage = run_stage(level, assign_roles(level, mix), users, students, pages, manager, args,
+                          args.seed + 1000 * len(stages))
+        stage['passed'] = stage_passes(stage, args)
+        stages.append(stage)
+        print_stage(stage, stage['passed'])
+        if not stage['passed'] and not args.full_ramp:
+            break
+
+    if args.json:
+        document = {'settings': {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+                    'stages': stages}
+        args.json.write_text(json.dumps(document, indent=2) + "\n", encoding='utf-8')
+        print(f"\n📝 Results written to {args.json}")
+
+    sustained = [stage['concurrency'] for stage in stages if stage['passed']]
+    if not sustained:
+        print(f"\n❌ No stage met p95 <= {args.slo_p95_ms:,.0f} ms with errors <= {args.max_error_rate:.1%}")
+        return 1
+    print(f"\n✅ Sustains {max(sustained)} concurrent sessions "
+          f"(p95 <= {args.slo_p95_ms:,.0f} ms, errors <= {args.max_error_rate:.1%})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
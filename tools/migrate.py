@@ -0,0 +1,179 @@
+"""
+Migration runner for the SQL files in migrations/
+Applies pending NNN_name.sql files in order and records them in
+schema_migrations
+
+Usage:
+    python -m tools.migrate              # apply pending migrations
+    python -m tools.migrate --status     # list applied / pending
+    python -m tools.migrate --dry-run    # show what would be applied
+    python -m tools.migrate --baseline 005   # mark 001-005 as applied without running
+
+Each file runs in one transaction. A file whose header contains the line
+
+    -- migrate: no-transaction
+
+runs in autocommit instead, one statement at a time, which statements
+such as CREATE INDEX CONCURRENTLY require. Such a file must be safe to
+re-run after a failure part-way through; it is recorded only once every
+statement has succeeded.
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+from typing import List, Dict
+
+from tools.common import MIGRATIONS_DIR, get_connection
+
+SCHEMA_MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version     VARCHAR(10)  PRIMARY KEY,
+    filename    TEXT         NOT NULL,
+    checksum    VARCHAR(64)  NOT NULL,
+    applied_at  TIMESTAMPTZ  NOT NULL DEFAULT NOW()
+)
+"""
+
+NO_TRANSACTION_RE = re.compile(r'^--\s*migrate:\s*no-transaction\s*$', re.IGNORECASE | re.MULTILINE)
+
+# Comments, quoted strings / identifiers and dollar quotes (which may hide a ';'), or a ';'
+SQL_TOKEN_RE = re.compile(
+    r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|(\$\w*\$).*?\1|;",
+    re.DOTALL
+)
+COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+def split_statements(sql: str) -> List[str]:
+    """Split a SQL script on its top-level semicolons, dropping comment-only pieces"""
+    statements, start = [], 0
+    for match in SQL_TOKEN_RE.finditer(sql):
+        if match.group(0) == ';':
+            statements.append(sql[start:match.start()])
+            start = match.end()
+    statements.append(sql[start:])
+    return [statement.strip() for statement in statements if COMMENT_RE.sub('', statement).strip()]
+
+def list_migrations() -> List[Dict[str, str]]:
+    """
+    List migration files in version order
+
+    Returns:
+        List of dicts with version, filename, path and checksum
+    """
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob('[0-9][0-9][0-9]_*.sql')):
+        migrations.append({
+            'version': path.name.split('_', 1)[0],
+            'filename': path.name,
+            'path': path,
+            'checksum': hashlib.sha256(path.read_bytes()).hexdigest()
+        })
+    return migrations
+
+def get_applied(conn) -> Dict[str, Dict[str, str]]:
+    """Get applied migrations keyed by version"""
+    with conn.cursor() as cursor:
+        cursor.execute(SCHEMA_MIGRATIONS_DDL)
+        cursor.execute("SELECT version, filename, checksum, applied_at FROM schema_migrations")
+        rows = cursor.fetchall()
+    conn.commit()
+    return {
+        row[0]: {'filename': row[1], 'checksum': row[2], 'applied_at': row[3]}
+        for row in rows
+    }
+
+def apply_migration(conn, migration: Dict[str, str], run_sql: bool = True):
+    """
+    Apply one migration file in its own transaction and record it
+
+    Files marked no-transaction run statement by statement in autocommit
+    first; only the schema_migrations row is then written in a transaction.
+
+    Args:
+        conn: Database connection
+        migration: Entry from list_migrations()
+        run_sql: False to only record the migration (baseline)
+    """
+    sql = migration['path'].read_text(encoding='utf-8')
+    if run_sql and NO_TRANSACTION_RE.search(sql):
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                for statement in split_statements(sql):
+                    cursor.execute(statement)
+        finally:
+            conn.autocommit = False
+        run_sql = False
+
+    try:
+        with conn.cursor() as cursor:
+            if run_sql:
+                cursor.execute(sql)
+            cursor.execute(
+                """
+                INSERT INTO schema_migrations (version, filename, checksum)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (version) DO UPDATE
+                SET filename = EXCLUDED.filename, checksum = EXCLUDED.checksum, applied_at = NOW()
+                """,
+                (migration['version'], migration['filename'], migration['checksum'])
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Apply SQL migrations in migrations/")
+    parser.add_argument('--dsn', help="libpq connection string (default: DATABASE_URL / DB_* env)")
+    parser.add_argument('--status', action='store_true', help="list applied and pending migrations")
+    parser.add_argument('--dry-run', action='store_true', help="show pending migrations without applying")
+    parser.add_argument('--baseline', metavar='VERSION', nargs='?', const='999',
+                        help="record migrations up to VERSION (default: all) as applied without running them")
+    args = parser.parse_args(argv)
+
+    migrations = list_migrations()
+    conn = get_connection(args.dsn)
+
+    try:
+        applied = get_applied(conn)
+        pending = [m for m in migrations if m['version'] not in applied]
+        if args.baseline:
+            pending = [m for m in pending if m['version'] <= args.baseline.zfill(3)]
+
+        if args.status:
+            for m in migrations:
+                record = applied.get(m['version'])
+                if record is None:
+                    print(f"  pending  {m['filename']}")
+                elif record['checksum'] != m['checksum']:
+                    print(f"  changed  {m['filename']} (applied {record['applied_at']:%Y-%m-%d %H:%M})")
+                else:
+                    print(f"  applied  {m['filename']} ({record['applied_at']:%Y-%m-%d %H:%M})")
+            return 0
+
+        if not pending:
+            print("✅ No pending migrations")
+            return 0
+
+        for m in pending:
+            if args.dry_run:
+                print(f"Would apply {m['filename']}")
+                continue
+            print(f"{'Recording' if args.baseline else 'Applying'} {m['filename']} ...")
+            apply_migration(conn, m, run_sql=not args.baseline)
+
+        if not args.dry_run:
+            print(f"✅ {len(pending)} migration(s) {'recorded' if args.baseline else 'applied'}")
+        return 0
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Partition manager for the monthly-partitioned time-series tables
+Pre-creates future monthly partitions and archives old ones for the tables
+converted by migrations/007_time_partitions.sql. Meant to run daily (cron,
+scheduled job); every action is idempotent.
+
+Usage:
+    python -m tools.partition_manager --status
+    python -m tools.partition_manager --ensure --months-ahead 3
+    python -m tools.partition_manager --archive --retain-months 12
+"""
+
+import argparse
+import sys
+from datetime import date
+from typing import List, Dict, Any
+
+from tools.common import get_connection
+
+PARTITIONED_TABLES = ['engagement_logs', 'system_reliability']
+
+def months_ago(today: date, months: int) -> date:
+    """First day of the month `months` before today's month"""
+    index = today.year * 12 + (today.month - 1) - months
+    return date(index // 12, index % 12 + 1, 1)
+
+def get_partitions(conn, table: str) -> List[Dict[str, Any]]:
+    """
+    List a table's partitions with bounds and estimated rows
+
+    Returns:
+        List of dicts with name, bounds and rows
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                c.relname,
+                pg_get_expr(c.relpartbound, c.oid) as bounds,
+                GREATEST(c.reltuples::BIGINT, 0) as rows
+            FROM pg_inherits i
+            INNER JOIN pg_class c ON i.inhrelid = c.oid
+            WHERE i.inhparent = %s::REGCLASS
+            ORDER BY c.relname
+        """, (table,))
+        return [{'name': r[0], 'bounds': r[1], 'rows': r[2]} for r in cursor.fetchall()]
+
+def default_partition_months(conn, table: str) -> List[Dict[str, Any]]:
+    """
+    Count the rows held in a table's DEFAULT partition, by month
+
+    Creating the partition for one of these months moves its rows out of
+    the default (see mind_create_month_partition).
+
+    Returns:
+        List of dicts with month and rows, oldest first
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT NULLIF(partdefid, 0)::REGCLASS::TEXT
+            FROM pg_partitioned_table
+            WHERE partrelid = %s::REGCLASS
+        """, (table,))
+        row = cursor.fetchone()
+        if row is None or row[0] is None:
+            return []
+        cursor.execute(f"""
+            SELECT date_trunc('month', mind_local_date(timestamp)::TIMESTAMP)::DATE as month, count(*)
+            FROM {row[0]}
+            GROUP BY 1
+            ORDER BY 1
+        """)
+        return [{'month': r[0], 'rows': r[1]} for r in cursor.fetchall()]
+
+def ensure_partitions(conn, table: str, months_ahead: int) -> List[str]:
+    """Create any missing partitions from this month through months_ahead"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT mind_ensure_month_partitions(%s, %s)", (table, months_ahead))
+        names = [r[0] for r in cursor.fetchall()]
+    conn.commit()
+    return names
+
+def archive_partitions(conn, table: str, cutoff: date, archive_schema: str) -> List[str]:
+    """Detach partitions that end on or before cutoff into archive_schema"""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT mind_archive_partitions_before(%s, %s, %s)",
+            (table, cutoff, archive_schema)
+        )
+        names = [r[0] for r in cursor.fetchall()]
+    conn.commit()
+    return names
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain monthly partitions for time-series tables")
+    parser.add_argument('--dsn', help="libpq connection string (default: DATABASE_URL / DB_* env)")
+    parser.add_argument('--table', action='append', choices=PARTITIONED_TABLES,
+                        help="limit to one table (repeatable; default: all)")
+    parser.add_argument('--status', action='store_true', help="list partitions")
+    parser.add_argument('--ensure', action='store_true', help="pre-create future partitions")
+    parser.add_argument('--months-ahead', type=int, default=3,
+                        help="months to pre-create beyond the current one (default: 3)")
+    parser.add_argument('--archive', action='store_true', help="detach partitions older than the retention")
+    parser.add_argument('--retain-months', type=int, default=12,
+                        help="whole months to keep attached before the current one (default: 12)")
+    parser.add_argument('--archive-schema', default='archive',
+                        help="schema that detached partitions move to (default: archive)")
+    args = parser.parse_args(argv)
+
+    if not (args.status or args.ensure or args.archive):
+        parser.error("choose at least one of --status, --ensure, --archive")
+
+    tables = args.table or PARTITIONED_TABLES
+    conn = get_connection(args.dsn)
+
+    try:
+        for table in tables:
+            if args.ensure:
+                for name in ensure_partitions(conn, table, args.months_ahead):
+                    print(f"  ensured   {name}")
+
+            if args.archive:
+                cutoff = months_ago(date.today(), args.retain_months)
+                archived = archive_partitions(conn, table, cutoff, args.archive_schema)
+                for name in archived:
+                    print(f"  archived  {name}")
+                if not archived:
+                    print(f"  {table}: nothing older than {cutoff:%Y-%m}")
+
+            if args.status:
+                print(f"{table}:")
+                for part in get_partitions(conn, table):
+                    print(f"  {part['name']:<40} {part['rows']:>12,} rows  {part['bounds']}")
+                for month in default_partition_months(conn, table):
+                    print(f"  default holds {month['rows']:>12,} rows for {month['month']:%Y-%m}"
+                          f"  (moved out when that month's partition is created)")
+        return 0
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Partition maintenance failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
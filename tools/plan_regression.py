@@ -0,0 +1,304 @@
+"""
+Plan capture and regression report for the dashboard workload
+Runs every dashboard query (see tools/workload.py) under
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) against a seeded database, stores
+plan shapes and timings as a baseline, and on later runs reports plan-shape
+changes, new sequential scans and timing regressions. Exits non-zero when
+anything regressed, so it can gate CI.
+
+Usage:
+    python -m tools.plan_regression --update          # capture a new baseline
+    python -m tools.plan_regression                   # compare against it
+    python -m tools.plan_regression --threshold 0.5 --min-ms 20
+
+Each query runs once untimed to warm the cache, then --runs times. A
+slowdown only counts when it is larger than both --min-ms and the spread
+between the fastest and slowest baseline run.
+"""
+
+import argparse
+import difflib
+import json
+import re
+import statistics
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from tools.common import REPO_ROOT, get_connection
+from tools.index_advisor import walk_plan
+from tools.workload import collect_workload
+
+DEFAULT_BASELINE = REPO_ROOT / "tools" / "baselines" / "plans.json"
+
+# Plan node keys that identify the shape of a node (not its costs)
+SHAPE_KEYS = ('Node Type', 'Relation Name', 'Index Name', 'Join Type', 'Strategy')
+
+# Monthly partitions (migrations/007) in relation and index names, so a new
+# month does not read as a plan change
+PARTITION_RE = re.compile(r'_(?:p\d{4}_\d{2}|default)(?=_|$)')
+
+# `pages/x.py:123:name_query` -> line number dropped from baseline keys
+PAGE_LINE_RE = re.compile(r':\d+:')
+
+def baseline_keys(entries: List[Dict[str, Any]]) -> List[str]:
+    """
+    Stable baseline keys for workload entries
+
+    Page query sources carry a line number that moves with every edit; keys
+    use the file and variable name instead, numbered when a page assigns the
+    same name twice.
+    """
+    keys = []
+    for entry in entries:
+        key = PAGE_LINE_RE.sub(':', entry['source'])
+        ordinal = 2
+        candidate = key
+        while candidate in keys:
+            candidate = f"{key}#{ordinal}"
+            ordinal += 1
+        keys.append(candidate)
+    return keys
+
+def explain_analyze(conn, sql: str, timeout_ms: int) -> Dict[str, Any]:
+    """
+    Run a query under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+
+    The statement runs inside a transaction that is always rolled back.
+
+    Returns:
+        The EXPLAIN document (Plan, Planning Time, Execution Time)
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", getattr(sql, 'params', None))
+            document = cursor.fetchone()[0]
+        if isinstance(document, str):
+            document = json.loads(document)
+        return document[0]
+    finally:
+        conn.rollback()
+
+def plan_shape(node: Dict[str, Any], depth: int = 0) -> List[str]:
+    """
+    Flatten a plan tree into indented shape lines (no costs or timings)
+
+    Partition names are normalised and identical sibling subtrees (one per
+    partition under an Append) are listed once.
+    """
+    parts = [PARTITION_RE.sub('', str(node[key])) for key in SHAPE_KEYS if key in node]
+    lines = ["  " * depth + " ".join(parts)]
+    children = []
+    for child in node.get('Plans', []):
+        shape = plan_shape(child, depth + 1)
+        if shape not in children:
+            children.append(shape)
+    for shape in children:
+        lines.extend(shape)
+    return lines
+
+def seq_scans(node: Dict[str, Any]) -> List[str]:
+    """Relations read by a Seq Scan anywhere in the plan"""
+    return sorted({PARTITION_RE.sub('', n['Relation Name']) for n in walk_plan(node)
+                   if n.get('Node Type') == 'Seq Scan' and 'Relation Name' in n})
+
+def capture(conn, entries: List[Dict[str, Any]], runs: int, timeout_ms: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Capture shape, timing and buffer counts for each workload entry
+
+    Args:
+        conn: Database connection
+        entries: Workload entries (see tools/workload.py)
+        runs: Timed executions per query, after one warm-up; the median
+            timing and the min-max spread are kept
+        timeout_ms: Per-statement timeout
+
+    Returns:
+        Dict keyed by baseline_keys()
+    """
+    captured = {}
+    for source, entry in zip(baseline_keys(entries), entries):
+        if not entry.get('sql'):
+            captured[source] = {'error': entry.get('skipped', 'not rendered')}
+            continue
+
+        try:
+            explain_analyze(conn, entry['sql'], timeout_ms)
+            documents = [explain_analyze(conn, entry['sql'], timeout_ms) for _ in range(runs)]
+        except Exception as e:
+            captured[source] = {'error': str(e).strip().splitlines()[0]}
+            continue
+
+        plan = documents[-1]['Plan']
+        timings = [d.get('Execution Time', 0.0) for d in documents]
+        captured[source] = {
+            'shape': plan_shape(plan),
+            'seq_scans': seq_scans(plan),
+            'planning_ms': statistics.median(d.get('Planning Time', 0.0) for d in documents),
+            'execution_ms': statistics.median(timings),
+            'execution_spread_ms': max(timings) - min(timings),
+            'rows': plan.get('Actual Rows', 0),
+            'shared_hit': plan.get('Shared Hit Blocks', 0),
+            'shared_read': plan.get('Shared Read Blocks', 0),
+            'total_cost': plan.get('Total Cost', 0.0)
+        }
+    return captured
+
+def compare(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]],
+            threshold: float, min_ms: float) -> List[Dict[str, Any]]:
+    """
+    Compare a capture against the baseline
+
+    Args:
+        baseline: Stored capture
+        current: New capture
+        threshold: Relative slowdown that counts as a regression (0.25 = 25%)
+        min_ms: Absolute slowdown below which timing changes are ignored;
+            raised to the baseline's own run-to-run spread when that is larger
+
+    Returns:
+        One finding per query: source, status, details and regressed flag
+    """
+    findings = []
+    for source, now in sorted(current.items()):
+        before = baseline.get(source)
+        details = []
+        regressed = False
+
+        if 'error' in now:
+            status = 'failed'
+            details.append(now['error'])
+            regressed = before is not None and 'error' not in before
+        elif before is None or 'error' in before:
+            status = 'new'
+        else:
+            status = 'unchanged'
+            if now['shape'] != before['shape']:
+                status = 'plan changed'
+                added = sorted(set(now['seq_scans']) - set(before['seq_scans']))
+                if added:
+                    details.append(f"new Seq Scan on {', '.join(added)}")
+                    regressed = True
+
+            delta = now['execution_ms'] - before['execution_ms']
+            noise_ms = max(min_ms, before.get('execution_spread_ms', 0.0))
+            if delta > noise_ms and now['execution_ms'] > before['execution_ms'] * (1 + threshold):
+                status = 'slower' if status == 'unchanged' else f"{status}, slower"
+                details.append(f"{before['execution_ms']:.1f} ms -> {now['execution_ms']:.1f} ms")
+                regressed = True
+            elif -delta > noise_ms and before['execution_ms'] > now['execution_ms'] * (1 + threshold):
+                status = 'faster' if status == 'unchanged' else f"{status}, faster"
+                details.append(f"{before['execution_ms']:.1f} ms -> {now['execution_ms']:.1f} ms")
+
+            reads = now['shared_hit'] + now['shared_read']
+            reads_before = before['shared_hit'] + before['shared_read']
+            if reads_before and reads > reads_before * (1 + threshold):
+                details.append(f"buffers {reads_before:,} -> {reads:,}")
+
+        findings.append({'source': source, 'status': status, 'details': details,
+                         'regressed': regressed, 'before': before, 'now': now})
+
+    for source in sorted(set(baseline) - set(current)):
+        findings.append({'source': source, 'status': 'removed', 'details': [],
+                         'regressed': False, 'before': baseline[source], 'now': None})
+
+    return findings
+
+def shape_diff(before: List[str], after: List[str]) -> List[str]:
+    """Unified diff of two plan shapes"""
+    return list(difflib.unified_diff(before, after, 'baseline', 'current', lineterm='', n=1))[2:]
+
+def load_baseline(path: Path) -> Optional[Dict[str, Any]]:
+    """Read a baseline file, or None if it does not exist"""
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+def save_baseline(path: Path, queries: Dict[str, Dict[str, Any]], runs: int):
+    """Write a baseline file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        'captured_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'runs': runs,
+        'queries': queries
+    }
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding='utf-8')
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Capture EXPLAIN ANALYZE baselines and report plan regressions")
+    parser.add_argument('--dsn', help="libpq connection string (default: DATABASE_URL / DB_* env)")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                        help=f"baseline file (default: {DEFAULT_BASELINE.relative_to(REPO_ROOT)})")
+    parser.add_argument('--update', action='store_true', help="write the capture as the new baseline")
+    parser.add_argument('--runs', type=int, default=7,
+                        help="timed executions per query after one warm-up, median kept (default: 7)")
+    parser.add_argument('--timeout-ms', type=int, default=30000, help="per-statement timeout (default: 30000)")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="relative slowdown counted as a regression (default: 0.25)")
+    parser.add_argument('--min-ms', type=float, default=20.0,
+                        help="ignore timing changes smaller than this or the baseline's spread (default: 20 ms)")
+    parser.add_argument('--only', metavar='SUBSTRING', help="limit to queries whose source contains SUBSTRING")
+    parser.add_argument('--verbose', '-v', action='store_true', help="also list unchanged queries")
+    args = parser.parse_args(argv)
+
+    entries = collect_workload()
+    if args.only:
+        entries = [e for e in entries if args.only in e['source']]
+
+    conn = get_connection(args.dsn)
+    try:
+        current = capture(conn, entries, max(args.runs, 1), args.timeout_ms)
+    except Exception as e:
+        print(f"❌ Plan capture failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+    if args.update:
+        existing = load_baseline(args.baseline) if args.only else None
+        if existing:
+            # A partial capture refreshes only the selected queries
+            current = dict(existing['queries'], **current)
+        save_baseline(args.baseline, current, args.runs)
+        errors = sum(1 for q in current.values() if 'error' in q)
+        print(f"📝 Baseline written to {args.baseline} ({len(current)} queries, {errors} failed)")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"⚠️ No baseline at {args.baseline}; run with --update first", file=sys.stderr)
+        return 1
+
+    stored = baseline['queries']
+    if args.only:
+        stored = {source: q for source, q in stored.items() if args.only in source}
+
+    findings = compare(stored, current, args.threshold, args.min_ms)
+    for finding in findings:
+        if finding['status'] == 'unchanged' and not args.verbose:
+            continue
+        marker = "❌" if finding['regressed'] else ("⚠️" if finding['status'] not in ('unchanged', 'faster') else "✅")
+        print(f"{marker} {finding['status']:<22} {finding['source']}")
+        for detail in finding['details']:
+            print(f"     {detail}")
+        if finding['status'].startswith('plan changed'):
+            for line in shape_diff(finding['before']['shape'], finding['now']['shape']):
+                print(f"       {line}")
+
+    regressions = [f for f in findings if f['regressed']]
+    counts = {}
+    for finding in findings:
+        counts[finding['status']] = counts.get(finding['status'], 0) + 1
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"\nCompared {len(current)} queries against baseline from {baseline.get('captured_at', '?')}: {summary}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s)")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Query benchmark suite for the dashboard workload
+Times every query builder in core/queries/ and every inline page query (see
+tools/workload.py) end to end, as the dashboard runs them: execute, fetch
+every row, repeat. Reports p50 / p95 latency, rows returned and bytes
+transferred per query, stores results per dataset scale in a JSON baseline,
+and exits non-zero when a query got slower than the threshold allows, so it
+can gate SQL changes in CI.
+
+Per-entity queries use the busiest student, cohort and case in the
+connected database (tools.workload.load_sample_params).
+
+Usage:
+    python -m tools.query_benchmark --update                 # baseline for the loaded dataset
+    python -m tools.query_benchmark                          # compare against it
+    python -m tools.query_benchmark --generate --scale demo --scale medium --update
+    python -m tools.query_benchmark --only attempts_queries --runs 20 -v
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from tools.common import REPO_ROOT, get_connection
+from tools.generate_data import SCALES, main as generate_data
+from tools.plan_regression import baseline_keys
+from tools.workload import collect_workload, load_sample_params
+
+DEFAULT_BASELINE = REPO_ROOT / "tools" / "baselines" / "benchmarks.json"
+
+# Per-row and per-field framing of a DataRow message in the wire protocol
+ROW_OVERHEAD_BYTES = 7
+FIELD_OVERHEAD_BYTES = 4
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def wire_bytes(rows: List[tuple]) -> int:
+    """
+    Approximate bytes transferred for a result set
+
+    Results arrive in text format; each value is counted at the length of
+    its text form plus the DataRow framing.
+    """
+    total = 0
+    for row in rows:
+        total += ROW_OVERHEAD_BYTES
+        for value in row:
+            total += FIELD_OVERHEAD_BYTES
+            if value is not None:
+                total += len(str(value).encode('utf-8'))
+    return total
+
+def time_query(conn, sql: str, timeout_ms: int) -> Dict[str, Any]:
+    """
+    Execute a query and fetch every row, inside a transaction that is
+    always rolled back
+
+    Returns:
+        Dict with ms, rows and bytes
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            started = time.perf_counter()
+            cursor.execute(sql, getattr(sql, 'params', None))
+            rows = cursor.fetchall()
+            elapsed = (time.perf_counter() - started) * 1000
+        return {'ms': elapsed, 'rows': len(rows), 'bytes': wire_bytes(rows)}
+    finally:
+        conn.rollback()
+
+def benchmark(conn, entries: List[Dict[str, Any]], runs: int, warmup: int,
+              timeout_ms: int, progress: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Time each workload entry
+
+    Args:
+        conn: Database connection
+        entries: Workload entries (see tools/workload.py)
+        runs: Timed executions per query
+        warmup: Untimed executions first (warm caches, plan cache)
+        timeout_ms: Per-statement timeout
+        progress: Print one line per query
+
+    Returns:
+        Dict keyed by baseline_keys() with p50_ms, p95_ms, mean_ms, min_ms,
+        max_ms, rows and bytes (or an error)
+    """
+    results = {}
+    for source, entry in zip(baseline_keys(entries), entries):
+        if not entry.get('sql'):
+            results[source] = {'error': entry.get('skipped', 'not rendered')}
+            continue
+
+        try:
+            for _ in range(warmup):
+                time_query(conn, entry['sql'], timeout_ms)
+            samples = [time_query(conn, entry['sql'], timeout_ms) for _ in range(runs)]
+        except Exception as e:
+            results[source] = {'error': str(e).strip().splitlines()[0]}
+            if progress:
+                print(f"   ❌ {source}: {results[source]['error']}")
+            continue
+
+        timings = [s['ms'] for s in samples]
+        results[source] = {
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'min_ms': round(min(timings), 3),
+            'max_ms': round(max(timings), 3),
+            'rows': samples[-1]['rows'],
+            'bytes': samples[-1]['bytes']
+        }
+        if progress:
+            r = results[source]
+            print(f"   {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['rows']:>9,} {r['bytes'] / 1024:>10,.1f}  {source}")
+    return results
+
+def compare(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]],
+            metric: str, threshold: float, min_ms: float) -> List[Dict[str, Any]]:
+    """
+    Compare a run against the baseline for the same scale
+
+    Args:
+        baseline: Stored results
+        current: New results
+        metric: 'p50_ms' or 'p95_ms', the latency that gates
+        threshold: Relative slowdown that counts as a regression (0.25 = 25%)
+        min_ms: Absolute slowdown below which changes are ignored
+
+    Returns:
+        One finding per query: source, status, details and regressed flag
+    """
+    findings = []
+    for source, now in sorted(current.items()):
+        before = baseline.get(source)
+        details = []
+        regressed = False
+
+        if 'error' in now:
+            status = 'failed'
+            details.append(now['error'])
+            regressed = before is not None and 'error' not in before
+        elif before is None or 'error' in before:
+            status = 'new'
+        else:
+            status = 'unchanged'
+            delta = now[metric] - before[metric]
+            if delta > min_ms and now[metric] > before[metric] * (1 + threshold):
+                status = 'slower'
+                regressed = True
+            elif -delta > min_ms and before[metric] > now[metric] * (1 + threshold):
+                status = 'faster'
+            if status != 'unchanged':
+                details.append(f"{metric[:3]} {before[metric]:.1f} ms -> {now[metric]:.1f} ms")
+            if now['rows'] != before['rows']:
+                details.append(f"rows {before['rows']:,} -> {now['rows']:,}")
+            if before['bytes'] and now['bytes'] > before['bytes'] * (1 + threshold):
+                details.append(f"bytes {before['bytes']:,} -> {now['bytes']:,}")
+
+        findings.append({'source': source, 'status': status, 'details': details, 'regressed': regressed})
+
+    for source in sorted(set(baseline) - set(current)):
+        findings.append({'source': source, 'status': 'removed', 'details': [], 'regressed': False})
+
+    return findings
+
+def detect_scale(conn) -> str:
+    """Name of the generate_data preset matching the loaded student count"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM students")
+        students = cursor.fetchone()[0]
+    conn.rollback()
+    for name, scale in SCALES.items():
+        if scale['students'] == students:
+            return name
+    return f"custom-{students}"
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    """Read a baseline file ({'scales': {name: run}}), empty if missing"""
+    if not path.exists():
+        return {'scales': {}}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+def save_baseline(path: Path, document: Dict[str, Any]):
+    """Write a baseline file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding='utf-8')
+
+def run_scale(args, scale: Optional[str]) -> Dict[str, Any]:
+    """Optionally (re)load a dataset, then benchmark the workload against it"""
+    if args.generate:
+        dsn = ['--dsn', args.dsn] if args.dsn else []
+        print(f"📝 Loading the '{scale}' dataset ...")
+        if generate_data(['--truncate', '--scale', scale, '--seed', str(args.seed)] + dsn) != 0:
+            raise RuntimeError(f"could not generate the '{scale}' dataset")
+
+    conn = get_connection(args.dsn)
+    try:
+        scale = scale or detect_scale(conn)
+        changed = load_sample_params(conn)
+        if changed:
+            print(f"📝 [{scale}] sample params: " + ", ".join(f"{k}={v}" for k, v in sorted(changed.items())))
+
+        entries = collect_workload()
+        if args.only:
+            entries = [e for e in entries if args.only in e['source']]
+
+        if args.verbose:
+            print(f"   {'p50 ms':>9} {'p95 ms':>9} {'rows':>9} {'KB':>10}  query")
+        results = benchmark(conn, entries, max(args.runs, 1), args.warmup, args.timeout_ms, args.verbose)
+    finally:
+        conn.close()
+
+    return {
+        'scale': scale,
+        'captured_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'runs': args.runs,
+        'queries': results
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dashboard queries and gate on latency regressions")
+    parser.add_argument('--dsn', help="libpq connection string (default: DATABASE_URL / DB_* env)")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                        help=f"baseline file (default: {DEFAULT_BASELINE.relative_to(REPO_ROOT)})")
+    parser.add_argument('--update', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--scale', action='append', choices=sorted(SCALES),
+                        help="dataset scale label; repeat with --generate to run several (default: detected)")
+    parser.add_argument('--generate', action='store_true',
+                        help="load each --scale with tools.generate_data first (replaces the data!)")
+    parser.add_argument('--seed', type=int, default=42, help="generator seed for --generate (default: 42)")
+    parser.add_argument('--runs', type=int, default=10, help="timed executions per query (default: 10)")
+    parser.add_argument('--warmup', type=int, default=1, help="untimed executions first (default: 1)")
+    parser.add_argument('--timeout-ms', type=int, default=30000, help="per-statement timeout (default: 30000)")
+    parser.add_argument('--metric', choices=['p50', 'p95'], default='p50', help="latency that gates (default: p50)")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="relative slowdown counted as a regression (default: 0.25)")
+    parser.add_argument('--min-ms', type=float, default=5.0,
+                        help="ignore latency changes smaller than this (default: 5 ms)")
+    parser.add_argument('--only', metavar='SUBSTRING', help="limit to queries whose source contains SUBSTRING")
+    parser.add_argument('--verbose', '-v', action='store_true', help="print every timing and unchanged queries")
+    args = parser.parse_args(argv)
+
+    scales = args.scale or [None]
+    if len(scales) > 1 and not args.generate:
+        parser.error("several --scale values need --generate (one dataset is loaded at a time)")
+
+    document = load_baseline(args.baseline)
+    metric = f"{args.metric}_ms"
+    regressions = 0
+
+    for scale in scales:
+        try:
+            run = run_scale(args, scale)
+        except Exception as e:
+            print(f"❌ Benchmark failed: {e}", file=sys.stderr)
+            return 1
+
+        name = run['scale']
+        if args.update:
+            stored = document['scales'].get(name)
+            if args.only and stored:
+                # A partial run refreshes only the selected queries
+                run['queries'] = dict(stored['queries'], **run['queries'])
+            document['scales'][name] = run
+            save_baseline(args.baseline, document)
+            errors = sum(1 for q in run['queries'].values() if 'error' in q)
+            print(f"📝 [{name}] baseline written to {args.baseline} ({len(run['queries'])} queries, {errors} failed)")
+            continue
+
+        stored = document['scales'].get(name)
+        if stored is None:
+            print(f"⚠️ [{name}] no baseline in {args.baseline}; run with --update first", file=sys.stderr)
+            return 1
+
+        baseline = stored['queries']
+        if args.only:
+            baseline = {source: q for source, q in baseline.items() if args.only in source}
+
+        findings = compare(baseline, run['queries'], metric, args.threshold, args.min_ms)
+        for finding in findings:
+            if finding['status'] == 'unchanged' and not args.verbose:
+                continue
+            marker = "❌" if finding['regressed'] else ("✅" if finding['status'] in ('unchanged', 'faster') else "⚠️")
+            print(f"{marker} [{name}] {finding['status']:<9} {finding['source']}")
+            for detail in finding['details']:
+                print(f"     {detail}")
+
+        counts = {}
+        for finding in findings:
+            counts[finding['status']] = counts.get(finding['status'], 0) + 1
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        print(f"\n[{name}] {len(run['queries'])} queries against baseline from {stored.get('captured_at', '?')}: {summary}")
+        regressions += sum(1 for f in findings if f['regressed'])
+
+    if args.update:
+        return 0
+    if regressions:
+        print(f"❌ {regressions} regression(s)")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
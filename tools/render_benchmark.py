@@ -0,0 +1,507 @@
+"""
+Headless page-render benchmark for the dashboards
+Runs Home.py and every page in pages/ with Streamlit's app-testing API
+(streamlit.testing.v1.AppTest), logged in as each role the page admits,
+and re-renders it for each filter combination. Every render records wall
+time, the number of DatabaseManager calls, the time spent in them and the
+peak Python memory allocated. Results can be stored as a JSON baseline; a
+later run reports, per page and per scenario, what got faster or slower and
+exits non-zero on regressions.
+
+Usage:
+    python -m tools.render_benchmark --update                    # baseline
+    python -m tools.render_benchmark                             # compare against it
+    python -m tools.render_benchmark --page Faculty --role Admin -v
+    python -m tools.render_benchmark --combinations all --max-options 3 --cold
+
+Pages render against --dsn (else DATABASE_URL / DB_*), never the database
+in .streamlit/secrets.toml.
+
+Pages with LazyTabs are also rerun once with unchanged widgets; a tab cache
+that does not survive that rerun fails the run.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+from tools.common import REPO_ROOT, PAGES_DIR, get_connection, use_dsn_for_app
+
+DEFAULT_BASELINE = REPO_ROOT / "tools" / "baselines" / "renders.json"
+HOME = REPO_ROOT / "Home.py"
+
+ALLOWED_ROLES_RE = re.compile(r'require_auth\(\s*allowed_roles\s*=\s*\[([^\]]*)\]')
+LAZY_TABS_RE = re.compile(r"LazyTabs\(\s*'(\w+)'")
+
+# ============================================
+# DATABASE METERING
+# ============================================
+
+class DbMeter:
+    """Counts DatabaseManager calls, and the time spent in them, per render"""
+
+    METHODS = ('execute_query', 'execute_query_df', 'execute_write')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._installed = False
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.queries = 0
+            self.ms = 0.0
+
+    def record(self, ms: float):
+        with self._lock:
+            self.queries += 1
+            self.ms += ms
+
+    def install(self):
+        """Wrap the DatabaseManager query methods (once per process)"""
+        if self._installed:
+            return
+        import db
+
+        for name in self.METHODS:
+            original = getattr(db.DatabaseManager, name)
+
+            def timed(manager, *args, _original=original, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return _original(manager, *args, **kwargs)
+                finally:
+                    self.record((time.perf_counter() - started) * 1000)
+
+            setattr(db.DatabaseManager, name, timed)
+        self._installed = True
+
+meter = DbMeter()
+
+# ============================================
+# SCENARIOS
+# ============================================
+
+def page_roles(path: Path, roles: Sequence[str]) -> List[str]:
+    """Roles a page admits, read from its require_auth() call (all for Home)"""
+    match = ALLOWED_ROLES_RE.search(path.read_text(encoding='utf-8'))
+    if match is None:
+        return list(roles)
+    allowed = re.findall(r'["\'](\w+)["\']', match.group(1))
+    return [role for role in roles if role in allowed]
+
+def demo_users(student_id: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """One demo login per role (auth.DEFAULT_USERS), keyed by role"""
+    from auth import DEFAULT_USERS
+
+    users = {}
+    for email, user in DEFAULT_USERS.items():
+        users[user['role']] = {
+            'email': email,
+            'password': user['password'],
+            'name': user['name'],
+            'student_id': (student_id or user.get('student_id')) if user['role'] == 'Student' else None
+        }
+    return users
+
+def busiest_student(dsn: Optional[str]) -> Optional[str]:
+    """Student with the most attempts in the database, for the Student role"""
+    from tools.workload import SAMPLE_LOOKUPS
+
+    try:
+        conn = get_connection(dsn)
+    except Exception:
+        return None
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(SAMPLE_LOOKUPS['student_id'])
+            row = cursor.fetchone()
+        return row[0] if row else None
+    except Exception:
+        return None
+    finally:
+        conn.close()
+
+def filter_combinations(widgets: List[Tuple[str, str, List[Any], Any]], strategy: str,
+                        max_options: int) -> List[Dict[str, Any]]:
+    """
+    Filter settings to render, after the default one
+
+    Args:
+        widgets: (kind, label, options, default) per filter widget
+        strategy: 'each' varies one filter at a time; 'all' takes the
+            product of every filter's options
+        max_options: Options tried per filter (the default always included)
+
+    Returns:
+        List of {label: value} dicts; the 'each' ones hold only the changed filter
+    """
+    choices = []
+    for kind, label, options, default in widgets:
+        values = [default] + [o for o in options if o != default][:max(max_options - 1, 0)]
+        choices.append((label, values))
+
+    if strategy == 'each':
+        return [{label: value} for label, values in choices for value in values[1:]]
+
+    combos = []
+    for values in itertools.product(*(values for _, values in choices)):
+        combo = {label: value for (label, _), value in zip(choices, values)}
+        if any(value != choice[1][0] for value, choice in zip(values, choices)):
+            combos.append(combo)
+    return combos
+
+def describe(filters: Dict[str, Any]) -> str:
+    return ", ".join(f"{label}={value}" for label, value in filters.items()) or "defaults"
+
+# ============================================
+# RENDERING
+# ============================================
+
+class PageSession:
+    """One headless session of a page, logged in as a role"""
+
+    def __init__(self, path: Path, role: str, user: Dict[str, Any], timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.path = path
+        self.role = role
+        self.user = user
+        self.timeout = timeout
+        self.app = AppTest.from_file(str(path), default_timeout=timeout)
+
+    def log_in(self):
+        """Set the session state login_form() sets on success"""
+        self.app.session_state['authenticated'] = True
+        self.app.session_state['user_email'] = self.user['email']
+        self.app.session_state['user_role'] = self.role
+        self.app.session_state['user_name'] = self.user['name']
+        self.app.session_state['user_id'] = self.user['student_id']
+
+    def widgets(self) -> List[Tuple[str, str, List[Any], Any]]:
+        """Filter widgets in the last render: (kind, label, options, value)"""
+        found = [('selectbox', w.label, list(w.options), w.value) for w in self.app.selectbox]
+        found += [('checkbox', w.label, [w.value, not w.value], w.value) for w in self.app.checkbox]
+        found += [('toggle', w.label, [w.value, not w.value], w.value) for w in self.app.toggle
+                  if w.key != 'section_profiler']
+        return found
+
+    def apply(self, filters: Dict[str, Any]):
+        """Set filter widgets by label before the next run"""
+        for widget in list(self.app.selectbox) + list(self.app.checkbox) + list(self.app.toggle):
+            if widget.label in filters:
+                widget.set_value(filters[widget.label])
+
+    def render(self, cold: bool, memory: bool) -> Dict[str, Any]:
+        """Run the script once, measuring it"""
+        if cold:
+            clear_caches()
+
+        meter.reset()
+        if memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+
+        started = time.perf_counter()
+        self.app.run(timeout=self.timeout)
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        result = {
+            'wall_ms': wall_ms,
+            'queries': meter.queries,
+            'db_ms': meter.ms,
+            'peak_mb': (tracemalloc.get_traced_memory()[1] - before) / 2 ** 20 if memory else None
+        }
+        if self.app.exception:
+            result['error'] = str(self.app.exception[0].message).strip().splitlines()[0]
+        return result
+
+def check_lazy_tabs(session: 'PageSession') -> Optional[str]:
+    """
+    Rerun a page with unchanged widgets and check its LazyTabs kept their cache
+
+    Only results cached before the rerun are checked: a strip whose default
+    tab is not cached (the keyset-paged Developer log) has nothing to keep.
+
+    Returns:
+        A problem description, or None when every tab cache survived
+    """
+    keys = LAZY_TABS_RE.findall(session.path.read_text(encoding='utf-8'))
+    if not keys:
+        return None
+
+    def snapshot():
+        state = {}
+        for key in keys:
+            name = f"lazy_tabs_{key}"
+            if name in session.app.session_state:
+                tabs = session.app.session_state[name]
+                state[key] = (tabs['filters'], set(map(repr, tabs['results'])))
+        return state
+
+    before = snapshot()
+    session.app.run(timeout=session.timeout)
+    after = snapshot()
+    for key, (filters, results) in before.items():
+        if not results:
+            continue
+        kept = after.get(key)
+        if kept is None or kept[0] != filters or not results <= kept[1]:
+            return f"lazy tabs '{key}' dropped its cache on a rerun with unchanged widgets"
+    return None
+
+def clear_caches():
+    """Drop st.cache_data and the query registry cache (cold render)"""
+    import streamlit as st
+    from core.queries.registry import query_cache
+
+    st.cache_data.clear()
+    query_cache.invalidate()
+
+def summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median of repeated renders of one scenario"""
+    errors = [s['error'] for s in samples if 'error' in s]
+    if errors:
+        return {'error': errors[0]}
+    summary = {
+        'wall_ms': round(statistics.median(s['wall_ms'] for s in samples), 1),
+        'queries': max(s['queries'] for s in samples),
+        'db_ms': round(statistics.median(s['db_ms'] for s in samples), 1)
+    }
+    if samples[0]['peak_mb'] is not None:
+        summary['peak_mb'] = round(max(s['peak_mb'] for s in samples), 2)
+    return summary
+
+def bench_page(path: Path, role: str, user: Dict[str, Any], args) -> Dict[str, Dict[str, Any]]:
+    """
+    Render one page as one role: defaults first, then each filter setting
+
+    Returns:
+        Scenario results keyed 'page | role | filters'
+    """
+    name = path.relative_to(REPO_ROOT).as_posix()
+    session = PageSession(path, role, user, args.timeout)
+    results = {}
+
+    def measure(label: str):
+        samples = [session.render(args.cold, not args.no_memory) for _ in range(max(args.runs, 1))]
+        results[f"{name} | {role} | {label}"] = summary = summarize(samples)
+        if args.verbose:
+            if 'error' in summary:
+                print(f"   ❌ {name} | {role} | {label}: {summary['error']}")
+            else:
+                peak = f"{summary['peak_mb']:>8.1f}" if 'peak_mb' in summary else f"{'-':>8}"
+                print(f"   {summary['wall_ms']:>9.0f} {summary['queries']:>7} {summary['db_ms']:>9.0f} {peak}  "
+                      f"{name} | {role} | {label}")
+        return summary
+
+    if path == HOME:
+        # Home exercises the real login form
+        session.app.run(timeout=args.timeout)
+        session.app.text_input[0].input(user['email'])
+        session.app.text_input[1].input(user['password'])
+        session.app.button[0].click()
+        measure('login')
+        return results
+
+    session.log_in()
+    if 'error' in measure('defaults'):
+        return results
+
+    problem = check_lazy_tabs(session)
+    if problem:
+        results[f"{name} | {role} | lazy tabs"] = {'error': problem}
+        print(f"❌ {name} | {role}: {problem}")
+
+    widgets = session.widgets()
+    defaults = {label: value for _, label, _, value in widgets}
+    for filters in filter_combinations(widgets, args.combinations, args.max_options):
+        session.apply(filters)
+        measure(describe(filters))
+        if args.combinations == 'each':
+            # Back to the defaults before varying the next filter
+            session.apply({label: defaults[label] for label in filters})
+            session.app.run(timeout=args.timeout)
+    return results
+
+# ============================================
+# BASELINE
+# ============================================
+
+def page_summary(scenarios: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Median wall time, DB time and queries per page across its scenarios"""
+    pages: Dict[str, List[Dict[str, Any]]] = {}
+    for key, result in scenarios.items():
+        if 'error' not in result:
+            pages.setdefault(key.split(' | ')[0], []).append(result)
+    return {
+        page: {
+            'wall_ms': round(statistics.median(r['wall_ms'] for r in results), 1),
+            'db_ms': round(statistics.median(r['db_ms'] for r in results), 1),
+            'queries': round(statistics.median(r['queries'] for r in results), 1),
+            'scenarios': len(results)
+        }
+        for page, results in sorted(pages.items())
+    }
+
+def compare(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]],
+            threshold: float, min_ms: float) -> List[Dict[str, Any]]:
+    """
+    Compare scenario results against the baseline
+
+    A scenario regresses when its wall time grows by more than threshold
+    (relative) and min_ms (absolute), or when it starts failing.
+
+    Returns:
+        One finding per scenario: source, status, details and regressed flag
+    """
+    findings = []
+    for key, now in sorted(current.items()):
+        before = baseline.get(key)
+        details = []
+        regressed = False
+
+        if 'error' in now:
+            status = 'failed'
+            details.append(now['error'])
+            regressed = before is not None and 'error' not in before
+        elif before is None or 'error' in before:
+            status = 'new'
+        else:
+            status = 'unchanged'
+            delta = now['wall_ms'] - before['wall_ms']
+            if delta > min_ms and now['wall_ms'] > before['wall_ms'] * (1 + threshold):
+                status = 'slower'
+                regressed = True
+            elif -delta > min_ms and before['wall_ms'] > now['wall_ms'] * (1 + threshold):
+                status = 'faster'
+            if status != 'unchanged':
+                details.append(f"wall {before['wall_ms']:.0f} ms -> {now['wall_ms']:.0f} ms "
+                               f"(db {before['db_ms']:.0f} ms -> {now['db_ms']:.0f} ms)")
+            if now['queries'] != before['queries']:
+                details.append(f"queries {before['queries']} -> {now['queries']}")
+
+        findings.append({'source': key, 'status': status, 'details': details, 'regressed': regressed})
+
+    for key in sorted(set(baseline) - set(current)):
+        findings.append({'source': key, 'status': 'removed', 'details': [], 'regressed': False})
+    return findings
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark headless dashboard renders per role and filter")
+    parser.add_argument('--dsn', help="libpq connection string the pages render against "
+                                      "(default: DATABASE_URL / DB_* env)")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                        help=f"baseline file (default: {DEFAULT_BASELINE.relative_to(REPO_ROOT)})")
+    parser.add_argument('--update', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--page', metavar='SUBSTRING', help="only pages whose file name contains SUBSTRING")
+    parser.add_argument('--role', action='append', help="only these roles (repeatable)")
+    parser.add_argument('--student-id', help="student_id for the Student login (default: busiest student)")
+    parser.add_argument('--combinations', choices=['each', 'all'], default='each',
+                        help="vary one filter at a time, or render every combination (default: each)")
+    parser.add_argument('--max-options', type=int, default=5,
+                        help="options tried per filter, the default included (default: 5)")
+    parser.add_argument('--runs', type=int, default=1, help="renders per scenario, median kept (default: 1)")
+    parser.add_argument('--cold', action='store_true', help="clear st.cache_data and the query cache before each render")
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc (it slows renders down)")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds per render (default: 120)")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="relative slowdown counted as a regression (default: 0.25)")
+    parser.add_argument('--min-ms', type=float, default=50.0,
+                        help="ignore wall-time changes smaller than this (default: 50 ms)")
+    parser.add_argument('--verbose', '-v', action='store_true', help="print every render and unchanged scenarios")
+    args = parser.parse_args(argv)
+
+    # Pages import db, auth and core.* relative to the repository root
+    os.chdir(REPO_ROOT)
+    # ... and would otherwise connect to the host in .streamlit/secrets.toml
+    args.dsn = use_dsn_for_app(args.dsn)
+    meter.install()
+    if not args.no_memory:
+        tracemalloc.start()
+
+    users = demo_users(args.student_id or busiest_student(args.dsn))
+    roles = [role for role in users if not args.role or role in args.role]
+    paths = [HOME] + sorted(PAGES_DIR.glob('*.py'))
+    if args.page:
+        paths = [p for p in paths if args.page in p.name]
+
+    if args.verbose:
+        print(f"   {'wall ms':>9} {'queries':>7} {'db ms':>9} {'peak MB':>8}  page | role | filters")
+
+    scenarios: Dict[str, Dict[str, Any]] = {}
+    started = time.monotonic()
+    for path in paths:
+        for role in page_roles(path, roles):
+            try:
+                scenarios.update(bench_page(path, role, users[role], args))
+            except Exception as e:
+                key = f"{path.relative_to(REPO_ROOT).as_posix()} | {role} | defaults"
+                scenarios[key] = {'error': str(e).strip().splitlines()[0]}
+                print(f"❌ {key}: {scenarios[key]['error']}")
+
+    pages = page_summary(scenarios)
+    print(f"\nRendered {len(scenarios)} scenarios in {time.monotonic() - started:,.1f}s")
+
+    if args.update:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        document = {
+            'captured_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'runs': args.runs,
+            'pages': pages,
+            'scenarios': scenarios
+        }
+        args.baseline.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding='utf-8')
+        for page, summary in pages.items():
+            print(f"   {page:<36} median {summary['wall_ms']:>8,.0f} ms, "
+                  f"{summary['queries']:>5.0f} queries, db {summary['db_ms']:>8,.0f} ms")
+        print(f"📝 Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"⚠️ No baseline at {args.baseline}; run with --update first", file=sys.stderr)
+        return 1
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+
+    stored = {key: result for key, result in baseline['scenarios'].items()
+              if key.split(' | ')[0] in {p.relative_to(REPO_ROOT).as_posix() for p in paths}
+              and key.split(' | ')[1] in roles}
+    findings = compare(stored, scenarios, args.threshold, args.min_ms)
+    for finding in findings:
+        if finding['status'] == 'unchanged' and not args.verbose:
+            continue
+        marker = "❌" if finding['regressed'] else ("✅" if finding['status'] in ('unchanged', 'faster') else "⚠️")
+        print(f"{marker} {finding['status']:<9} {finding['source']}")
+        for detail in finding['details']:
+            print(f"     {detail}")
+
+    print()
+    for page, summary in pages.items():
+        before = baseline['pages'].get(page)
+        if before and before['wall_ms']:
+            change = (summary['wall_ms'] - before['wall_ms']) / before['wall_ms'] * 100
+            trend = f"{abs(change):.0f}% {'slower' if change > 0 else 'faster'}" if abs(change) >= 1 else "no change"
+            print(f"   {page:<36} median {summary['wall_ms']:>8,.0f} ms (baseline {before['wall_ms']:,.0f} ms, {trend})")
+        else:
+            print(f"   {page:<36} median {summary['wall_ms']:>8,.0f} ms (no baseline)")
+
+    # A page whose lazy tabs lose their cache on a plain rerun always fails
+    regressions = [f for f in findings if f['regressed'] or f['source'].endswith(' | lazy tabs')]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s)")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Dashboard query workload extraction
+Collects every SQL statement the dashboard can issue, with representative
+parameters, from the query builders in core/queries/ and the inline
+f-string queries in pages/
+"""
+
+import ast
+import importlib
+import inspect
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+
+from core.queries.bound_query import BoundQuery
+from core.queries.time_bounds import time_range
+from tools.common import QUERIES_DIR, PAGES_DIR
+
+# Representative values, keyed by builder parameter name
+SAMPLE_PARAMS: Dict[str, Any] = {
+    'student_id': 'STU001',
+    'cohort_id': 'COH001',
+    'case_id': 'CASE001',
+    'case_ids': ['CASE001', 'CASE002'],
+    'attempt_id': 'ATT001',
+    'department': 'Business',
+    'campus': 'Lagos',
+    'dimension': 'Communication',
+    'api_name': 'speech_to_text',
+    'metric_names': ['total_students', 'avg_score'],
+    'start_date': (datetime.now() - timedelta(days=30)).date().isoformat(),
+    'end_date': datetime.now().date().isoformat(),
+    'days': 30,
+    'weeks': 12,
+    'hours': 24,
+    'limit': 10,
+    'threshold': 50,
+    'min_hours': 1.0,
+}
+
+# Page-level names the inline queries read, besides selected_* filters
+PAGE_NAMESPACE: Dict[str, Any] = {
+    'student_id': SAMPLE_PARAMS['student_id'],
+    'start_date': datetime.now() - timedelta(days=30),
+    'end_date': datetime.now(),
+    'days': 30,
+    'datetime': datetime,
+    'timedelta': timedelta,
+    'time_range': time_range,
+}
+
+# Page-level calls that are evaluated (in source order) before queries render
+PAGE_SETUP_CALLS = ('build_', 'time_range')
+
+# Lookups that replace SAMPLE_PARAMS with values present in a loaded
+# dataset (e.g. one from tools/generate_data.py): the busiest student,
+# cohort and cases, so per-entity queries touch realistic row counts
+SAMPLE_LOOKUPS: Dict[str, str] = {
+    'student_id': "SELECT student_id FROM attempts GROUP BY student_id ORDER BY COUNT(*) DESC LIMIT 1",
+    'cohort_id': "SELECT cohort_id FROM students WHERE cohort_id IS NOT NULL "
+                 "GROUP BY cohort_id ORDER BY COUNT(*) DESC LIMIT 1",
+    'case_id': "SELECT case_id FROM attempts GROUP BY case_id ORDER BY COUNT(*) DESC LIMIT 1",
+    'case_ids': "SELECT case_id FROM attempts GROUP BY case_id ORDER BY COUNT(*) DESC LIMIT 2",
+    'attempt_id': "SELECT attempt_id FROM environment_metrics LIMIT 1",
+    'department': "SELECT department FROM students WHERE department IS NOT NULL "
+                  "GROUP BY department ORDER BY COUNT(*) DESC LIMIT 1",
+    'campus': "SELECT campus FROM students WHERE campus IS NOT NULL "
+              "GROUP BY campus ORDER BY COUNT(*) DESC LIMIT 1",
+    'dimension': "SELECT rubric_dimension FROM rubric_scores LIMIT 1",
+    'api_name': "SELECT api_name FROM system_reliability LIMIT 1",
+}
+
+def load_sample_params(conn) -> Dict[str, Any]:
+    """
+    Point SAMPLE_PARAMS (and the page namespace) at values that exist in
+    the connected database; lookups that return nothing keep their default
+
+    Returns:
+        The values that changed
+    """
+    changed = {}
+    with conn.cursor() as cursor:
+        for name, sql in SAMPLE_LOOKUPS.items():
+            cursor.execute(sql)
+            values = [row[0] for row in cursor.fetchall()]
+            if values:
+                changed[name] = values if isinstance(SAMPLE_PARAMS[name], list) else values[0]
+    conn.rollback()
+
+    SAMPLE_PARAMS.update(changed)
+    PAGE_NAMESPACE['student_id'] = SAMPLE_PARAMS['student_id']
+    return changed
+
+def _builder_variants(func) -> List[Dict[str, Any]]:
+    """Argument sets for a builder: required params only, then all known params"""
+    signature = inspect.signature(func)
+    required = {}
+    full = {}
+
+    for name, param in signature.parameters.items():
+        has_sample = name in SAMPLE_PARAMS
+        if param.default is inspect.Parameter.empty:
+            if not has_sample:
+                return []
+            required[name] = SAMPLE_PARAMS[name]
+            full[name] = SAMPLE_PARAMS[name]
+        elif has_sample:
+            full[name] = SAMPLE_PARAMS[name]
+
+    return [required] if full == required else [required, full]
+
+def collect_builder_queries() -> List[Dict[str, Any]]:
+    """
+    Call every public `-> str` builder in core/queries/*_queries.py
+
+    Modules that fail to import are reported as skipped entries.
+
+    Returns:
+        List of workload entries (source, sql, params)
+    """
+    entries = []
+
+    for path in sorted(QUERIES_DIR.glob('*_queries.py')):
+        module_name = f"core.queries.{path.stem}"
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as e:
+            entries.append({'source': module_name, 'sql': None, 'params': None,
+                            'skipped': f"import failed: {e}"})
+            continue
+
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith('_') or func.__module__ != module_name:
+                continue
+            if inspect.signature(func).return_annotation is not str:
+                continue
+
+            source = f"{module_name}.{name}"
+            variants = _builder_variants(func)
+            if not variants:
+                entries.append({'source': source, 'sql': None, 'params': None,
+                                'skipped': 'no sample value for a required parameter'})
+
+            for index, kwargs in enumerate(variants):
+                entries.append({
+                    'source': source if index == 0 else f"{source}[filtered]",
+                    'sql': func(**kwargs),
+                    'params': kwargs
+                })
+
+    return entries
+
+def _page_namespace(tree: ast.Module) -> Dict[str, Any]:
+    """Seed a namespace for evaluating a page's inline queries"""
+    namespace = dict(PAGE_NAMESPACE)
+
+    # Every sidebar filter at its 'All' default
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id.startswith('selected_'):
+            namespace[node.id] = 'All'
+
+    # The page's own build_*_filter helpers
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name.startswith('build_'):
+            exec(compile(ast.Module(body=[node], type_ignores=[]), '<page>', 'exec'), namespace)
+
+    return namespace
+
+def collect_page_queries() -> List[Dict[str, Any]]:
+    """
+    Evaluate the inline `*_query = f"..."` assignments in pages/*.py
+
+    Pages are parsed, not executed: only the build_* helpers and the
+    `x = build_...()` / `date_params = time_range(...)` assignments run, in
+    source order, before each query string is rendered. Queries with bind
+    placeholders carry the page's date_params.
+
+    Returns:
+        List of workload entries (source, sql, params)
+    """
+    entries = []
+
+    for path in sorted(PAGES_DIR.glob('*.py')):
+        tree = ast.parse(path.read_text(encoding='utf-8'))
+        namespace = _page_namespace(tree)
+
+        assigns = sorted(
+            (n for n in ast.walk(tree)
+             if isinstance(n, ast.Assign) and len(n.targets) == 1
+             and isinstance(n.targets[0], ast.Name)),
+            key=lambda n: n.lineno
+        )
+
+        for node in assigns:
+            target = node.targets[0].id
+            value = node.value
+
+            if (isinstance(value, ast.Call) and isinstance(value.func, ast.Name)
+                    and value.func.id.startswith(PAGE_SETUP_CALLS)):
+                try:
+                    exec(compile(ast.Module(body=[node], type_ignores=[]), '<page>', 'exec'), namespace)
+                except Exception:
+                    pass
+                continue
+
+            if not target.endswith('_query'):
+                continue
+            if not (isinstance(value, ast.JoinedStr)
+                    or (isinstance(value, ast.Constant) and isinstance(value.value, str))):
+                continue
+
+            source = f"pages/{path.name}:{node.lineno}:{target}"
+            try:
+                sql = eval(compile(ast.Expression(body=value), '<page>', 'eval'), namespace)
+                if '%(' in sql:
+                    sql = BoundQuery(sql, namespace.get('date_params'))
+                entries.append({'source': source, 'sql': sql, 'params': None})
+            except Exception as e:
+                entries.append({'source': source, 'sql': None, 'params': None,
+                                'skipped': f"could not render: {e}"})
+
+    return entries
+
+def collect_workload() -> List[Dict[str, Any]]:
+    """
+    Collect the full dashboard workload
+
+    Returns:
+        Builder queries followed by page queries. Entries that could not be
+        rendered carry a 'skipped' reason and a None sql.
+    """
+    return collect_builder_queries() + collect_page_queries()
+
+if __name__ == '__main__':
+    for entry in collect_workload():
+        status = entry.get('skipped') or f"{len(entry['sql'])} chars"
+        print(f"{entry['source']}: {status}")